@@ -0,0 +1,58 @@
+"""add_sync_checkpoints_table
+
+Revision ID: h3i4j5k6l7m8
+Revises: g1h2i3j4k5l6
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'h3i4j5k6l7m8'
+down_revision: Union[str, Sequence[str], None] = 'g1h2i3j4k5l6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create sync_checkpoints table
+    op.create_table('sync_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sync_type', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('stage', sa.String(length=50), nullable=False),
+        sa.Column('directory_id', sa.Integer(), nullable=True),
+        sa.Column('project_id', sa.Integer(), nullable=True),
+        sa.Column('phase_id', sa.Integer(), nullable=True),
+        sa.Column('delta', sa.Boolean(), nullable=False),
+        sa.Column('cache_mode', sa.String(length=50), nullable=True),
+        sa.Column('changed_project_ids', sa.JSON(), nullable=True),
+        sa.Column('changed_phase_ids', sa.JSON(), nullable=True),
+        sa.Column('directories_processed', sa.Integer(), nullable=False),
+        sa.Column('projects_processed', sa.Integer(), nullable=False),
+        sa.Column('phases_processed', sa.Integer(), nullable=False),
+        sa.Column('elevations_processed', sa.Integer(), nullable=False),
+        sa.Column('resume_count', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    # Create indexes
+    op.create_index(op.f('ix_sync_checkpoints_id'), 'sync_checkpoints', ['id'], unique=False)
+    op.create_index(op.f('ix_sync_checkpoints_sync_type'), 'sync_checkpoints', ['sync_type'], unique=False)
+
+
+def downgrade() -> None:
+    # Drop indexes
+    op.drop_index(op.f('ix_sync_checkpoints_sync_type'), table_name='sync_checkpoints')
+    op.drop_index(op.f('ix_sync_checkpoints_id'), table_name='sync_checkpoints')
+
+    # Drop table
+    op.drop_table('sync_checkpoints')
@@ -0,0 +1,61 @@
+"""add_elevation_parts_table
+
+Revision ID: i4j5k6l7m8n9
+Revises: h3i4j5k6l7m8
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'i4j5k6l7m8n9'
+down_revision: Union[str, Sequence[str], None] = 'h3i4j5k6l7m8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match models.elevation_part.ELEVATION_PARTS_PARTITIONS
+PARTITIONS = 16
+
+
+def upgrade() -> None:
+    # Create elevation_parts, hash-partitioned by elevation
+    op.create_table('elevation_parts',
+        sa.Column('elevation_id', sa.Integer(), nullable=False),
+        sa.Column('source_table', sa.String(length=100), nullable=False),
+        sa.Column('line_no', sa.Integer(), nullable=False),
+        sa.Column('article_number', sa.String(length=100), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('system_code', sa.String(length=100), nullable=True),
+        sa.Column('color', sa.String(length=255), nullable=True),
+        sa.Column('quantity', sa.Float(), nullable=True),
+        sa.Column('unit', sa.String(length=50), nullable=True),
+        sa.Column('length', sa.Float(), nullable=True),
+        sa.Column('weight', sa.Float(), nullable=True),
+        sa.Column('attributes', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['elevation_id'], ['elevations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('elevation_id', 'source_table', 'line_no'),
+        postgresql_partition_by='HASH (elevation_id)'
+    )
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE elevation_parts_p{remainder} PARTITION OF elevation_parts "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+        )
+
+    # Create indexes (propagated to every partition)
+    op.create_index(op.f('ix_elevation_parts_article_number'), 'elevation_parts', ['article_number'], unique=False)
+    op.create_index(op.f('ix_elevation_parts_system_code'), 'elevation_parts', ['system_code'], unique=False)
+
+
+def downgrade() -> None:
+    # Drop indexes
+    op.drop_index(op.f('ix_elevation_parts_system_code'), table_name='elevation_parts')
+    op.drop_index(op.f('ix_elevation_parts_article_number'), table_name='elevation_parts')
+
+    # Drop table (and its partitions)
+    op.drop_table('elevation_parts')
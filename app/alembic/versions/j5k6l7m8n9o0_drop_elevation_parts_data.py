@@ -0,0 +1,28 @@
+"""drop_elevation_parts_data
+
+Revision ID: j5k6l7m8n9o0
+Revises: i4j5k6l7m8n9
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'j5k6l7m8n9o0'
+down_revision: Union[str, Sequence[str], None] = 'i4j5k6l7m8n9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Parts lists are streamed to the .db archive (parts_db_path); the base64 copy is no longer kept
+    op.drop_column('elevations', 'parts_data')
+
+
+def downgrade() -> None:
+    op.add_column('elevations', sa.Column('parts_data', sa.Text(), nullable=True,
+                                          comment='Base64-encoded SQLite database from parts-list API'))
@@ -1,5 +1,7 @@
 from celery import Celery
+from celery.signals import task_postrun, task_prerun, worker_process_shutdown, worker_shutdown
 from core.config import settings
+from core.connection_manager import clear_task_deadline, shutdown_worker_loop, start_task_deadline
 import os
 
 # Create Celery instance
@@ -22,6 +24,8 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     task_track_started=True,
+    # Threads-pool workers cannot enforce these; the soft limit is applied to the
+    # task's coroutines by run_in_worker_loop() instead (see start_time_limit)
     task_time_limit=30 * 60,  # 30 minutes
     task_soft_time_limit=25 * 60,  # 25 minutes
     worker_prefetch_multiplier=1,
@@ -31,8 +35,17 @@ celery_app.conf.update(
     result_expires=3600,  # 1 hour
     # Task routing
     task_routes={
+        # Full syncs run on the maintenance lane; interactive project syncs are sent
+        # to "sync_interactive" explicitly (see core.priority)
+        "tasks.sync_tasks.full_sync_task": {"queue": "sync_maintenance"},
+        "tasks.sync_tasks.full_sync_shard_task": {"queue": "sync_maintenance"},
+        "tasks.sync_tasks.full_sync_reduce_task": {"queue": "sync_maintenance"},
+        "tasks.sync_tasks.force_sync_job_task": {"queue": "sync_interactive"},
         "tasks.sync_tasks.*": {"queue": "sync"},
         "tasks.scheduler_tasks.*": {"queue": "scheduler"},
+        # Batch parses start parse processes of their own, so they run on a threads-pool worker
+        "tasks.sqlite_parser_tasks.batch_parse_elevations": {"queue": "sqlite_parser_batch"},
+        "tasks.sqlite_parser_tasks.reparse_all_elevations": {"queue": "sqlite_parser_batch"},
         "tasks.sqlite_parser_tasks.*": {"queue": "sqlite_parser"},
     },
     # Periodic task settings
@@ -54,5 +67,41 @@ celery_app.conf.result_backend_transport_options = {
     "master_name": "mymaster",
 }
 
+
+@task_prerun.connect
+def start_time_limit(task=None, **kwargs):
+    """Enforce the soft time limit on the task's coroutines (threads pools ignore it)"""
+    time_limits = getattr(task.request, 'timelimit', None) or (None, None)
+    start_task_deadline(time_limits[1] or task.soft_time_limit or celery_app.conf.task_soft_time_limit)
+
+
+@task_postrun.connect
+def flush_api_logs(**kwargs):
+    """Write the API log records buffered by the finished task"""
+    from core.api_log_sink import get_api_log_sink
+    get_api_log_sink().flush()
+
+
+@task_postrun.connect
+def clear_time_limit(**kwargs):
+    """Drop the finished task's deadline so it does not leak into the thread's next task"""
+    clear_task_deadline()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def close_logikal_connections(**kwargs):
+    """
+    Close the worker's Logikal session pools and pooled HTTP connections
+
+    Prefork children close theirs on process shutdown; threads-pool workers
+    close the loops of all their threads when the worker shuts down.
+    """
+    from services.logikal_session_pool import close_logikal_session_pools
+    from core.rate_limiter import close_rate_limiter_clients
+    from core.api_log_sink import close_api_log_sink
+    shutdown_worker_loop(cleanups=[close_api_log_sink, close_logikal_session_pools, close_rate_limiter_clients])
+
+
 if __name__ == "__main__":
     celery_app.start()
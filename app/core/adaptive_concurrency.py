@@ -0,0 +1,301 @@
+"""
+AIMD concurrency limiter shared by all fan-out points of an event loop.
+
+The limit grows by one while the observed p95 latency and error rate stay
+within target, and is cut multiplicatively on 429/5xx responses, timeouts or
+a window that misses the targets. The learned limit is stored in Redis so the
+next run (and the other worker processes) start from it instead of from a
+hard-coded value.
+
+Slots nest: a work unit that holds a slot lends it to one unit of a nested
+fan-out at a time (e.g. the phases of a project synced by a batch task), so a
+fan-out inside a slot always makes progress even when every slot is taken.
+"""
+import asyncio
+import time
+import logging
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Optional
+
+from core.config import settings
+from core.rate_limiter import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class _HeldSlot:
+    """A slot held by the current task tree, lendable to one nested work unit"""
+    __slots__ = ('lent',)
+
+    def __init__(self):
+        self.lent = False
+
+
+# Slots held by the current task and its ancestors, keyed by limiter
+_held_slots: ContextVar[Dict[int, _HeldSlot]] = ContextVar('adaptive_concurrency_held_slots', default={})
+
+
+class AdaptiveConcurrencyLimiter:
+    """Additive-increase / multiplicative-decrease limit on concurrent work units"""
+
+    def __init__(self, name: str, initial_limit: int, min_limit: int, max_limit: int,
+                 target_p95_seconds: float, max_error_rate: float, window_size: int = 20,
+                 decrease_factor: float = 0.7, redis_url: Optional[str] = None,
+                 key_prefix: str = "logikal:concurrency"):
+        self.name = name
+        self.min_limit = max(min_limit, 1)
+        self.max_limit = max(max_limit, self.min_limit)
+        self.target_p95_seconds = target_p95_seconds
+        self.max_error_rate = max_error_rate
+        self.window_size = window_size
+        self.decrease_factor = decrease_factor
+        self.redis_url = redis_url
+        self.key = f"{key_prefix}:{name}"
+
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._lent = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._latencies: Deque[float] = deque(maxlen=window_size)
+        self._errors = 0
+        self._saturated = False
+        self._last_decrease_at = 0.0
+        self._loaded = False
+        self._load_task: Optional[asyncio.Task] = None
+        self._stats = {'increases': 0, 'decreases': 0, 'overload_signals': 0, 'samples': 0, 'waits': 0}
+
+    @property
+    def limit(self) -> int:
+        if not self._loaded:
+            self._start_load()
+        return max(int(self._limit), self.min_limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def _load(self) -> None:
+        """Start from the limit learned by a previous run"""
+        self._loaded = True
+        if not self.redis_url:
+            return
+        try:
+            stored = await get_redis_client(self.redis_url).get(self.key)
+            if stored is not None:
+                self._limit = float(min(max(float(stored), self.min_limit), self.max_limit))
+                logger.info(f"Concurrency limiter '{self.name}' resumed at limit {self.limit}")
+        except Exception as e:
+            logger.debug(f"Could not load learned concurrency limit for '{self.name}': {str(e)}")
+
+    def _start_load(self) -> Optional[asyncio.Task]:
+        """Load the learned limit once, in the background of the running loop"""
+        if self._load_task is None and not self._loaded:
+            try:
+                self._load_task = asyncio.get_running_loop().create_task(self._load())
+            except RuntimeError:
+                pass
+        return self._load_task
+
+    async def _persist(self) -> None:
+        if not self.redis_url:
+            return
+        try:
+            await get_redis_client(self.redis_url).set(self.key, f"{self._limit:.2f}")
+        except Exception as e:
+            logger.debug(f"Could not persist concurrency limit for '{self.name}': {str(e)}")
+
+    def _schedule_persist(self) -> None:
+        try:
+            asyncio.get_running_loop().create_task(self._persist())
+        except RuntimeError:
+            pass
+
+    def _wake_waiters(self, everyone: bool = False) -> None:
+        free = len(self._waiters) if everyone else self.limit - self._in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    async def _wait(self, held: Optional[_HeldSlot] = None) -> bool:
+        """
+        Wait for a free slot, or for the slot held by an enclosing work unit.
+
+        Returns True when the enclosing unit's slot was borrowed instead of
+        taking a new one.
+        """
+        if not self._loaded:
+            # Shielded: a cancelled acquirer must not cancel the load for the others
+            await asyncio.shield(self._start_load())
+
+        waited = False
+        while self._in_flight >= self.limit:
+            # Demand beyond the limit - the window may raise it
+            self._saturated = True
+            if held is not None and not held.lent:
+                held.lent = True
+                self._lent += 1
+                return True
+            if not waited:
+                self._stats['waits'] += 1
+                waited = True
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    # Pass the wake-up on to the next waiter
+                    self._wake_waiters(everyone=held is not None)
+                raise
+        self._in_flight += 1
+        if self._in_flight >= self.limit:
+            self._saturated = True
+        return False
+
+    async def acquire(self) -> None:
+        """Wait for a free slot under the current limit"""
+        await self._wait()
+
+    def release(self) -> None:
+        """Give a slot back"""
+        self._in_flight = max(self._in_flight - 1, 0)
+        self._wake_waiters()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one slot for the duration of a work unit"""
+        held = _held_slots.get().get(id(self))
+        borrowed = await self._wait(held)
+        token = _held_slots.set({**_held_slots.get(), id(self): _HeldSlot()})
+        try:
+            yield
+        finally:
+            _held_slots.reset(token)
+            if borrowed:
+                held.lent = False
+                self._lent -= 1
+                # Nested units waiting on the lent slot are only woken here
+                self._wake_waiters(everyone=True)
+            else:
+                self.release()
+
+    def record(self, latency_seconds: float, success: bool = True, overloaded: bool = False) -> None:
+        """Feed one request sample; ``overloaded`` marks 429/5xx responses and timeouts"""
+        self._stats['samples'] += 1
+        if overloaded:
+            self._stats['overload_signals'] += 1
+            self._decrease(f"overload signal after {latency_seconds:.2f}s")
+            return
+
+        self._latencies.append(latency_seconds)
+        if not success:
+            self._errors += 1
+        if len(self._latencies) < self.window_size:
+            return
+
+        latencies = sorted(self._latencies)
+        p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+        error_rate = self._errors / len(latencies)
+        if p95 > self.target_p95_seconds or error_rate > self.max_error_rate:
+            self._decrease(f"p95 {p95:.2f}s, error rate {error_rate:.1%}")
+        elif self._saturated:
+            self._increase(f"p95 {p95:.2f}s, error rate {error_rate:.1%}")
+        else:
+            self._reset_window()
+
+    def _reset_window(self) -> None:
+        self._latencies.clear()
+        self._errors = 0
+        self._saturated = self._in_flight >= self.limit or self._lent > 0 or bool(self._waiters)
+
+    def _increase(self, reason: str) -> None:
+        previous = self.limit
+        self._limit = min(self._limit + 1, self.max_limit)
+        self._reset_window()
+        if self.limit != previous:
+            self._stats['increases'] += 1
+            logger.info(f"Concurrency limiter '{self.name}' raised to {self.limit} ({reason})")
+            self._wake_waiters()
+            self._schedule_persist()
+
+    def _decrease(self, reason: str) -> None:
+        # Requests that were already in flight report the same overload - cut once per episode
+        now = time.monotonic()
+        if now - self._last_decrease_at < self.target_p95_seconds:
+            self._reset_window()
+            return
+        self._last_decrease_at = now
+        previous = self.limit
+        self._limit = max(self._limit * self.decrease_factor, self.min_limit)
+        self._reset_window()
+        if self.limit != previous:
+            self._stats['decreases'] += 1
+            logger.warning(f"Concurrency limiter '{self.name}' lowered to {self.limit} ({reason})")
+            self._schedule_persist()
+
+    def get_stats(self) -> Dict:
+        """Get limiter statistics"""
+        return {
+            'name': self.name,
+            'limit': self.limit,
+            'in_flight': self._in_flight,
+            'waiting': len(self._waiters),
+            'lent': self._lent,
+            'min_limit': self.min_limit,
+            'max_limit': self.max_limit,
+            **self._stats
+        }
+
+
+# Waiters are futures of the loop that created them, so every event loop (one per
+# process, or per thread of a threads-pool Celery worker) gets limiters of its own
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AdaptiveConcurrencyLimiter]]" = \
+    weakref.WeakKeyDictionary()
+# Limiters asked for outside an event loop, e.g. to size a fan-out before it starts
+_unbound_limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+
+
+def get_concurrency_limiter(name: str = "logikal") -> AdaptiveConcurrencyLimiter:
+    """
+    Get the limiter of the running event loop for a class of work.
+
+    ``logikal`` gates every fan-out over Logikal API calls and learns from the
+    per-request samples of retry_async; ``sqlite_parser`` gates local parsing.
+    """
+    try:
+        limiters = _limiters.setdefault(asyncio.get_running_loop(), {})
+    except RuntimeError:
+        limiters = _unbound_limiters
+    limiter = limiters.get(name)
+    if limiter is None:
+        redis_url = settings.LOGIKAL_RATE_LIMIT_REDIS_URL or settings.REDIS_URL
+        if name == "sqlite_parser":
+            limiter = AdaptiveConcurrencyLimiter(
+                name,
+                initial_limit=settings.SQLITE_PARSER_CONCURRENCY_INITIAL,
+                min_limit=settings.SQLITE_PARSER_CONCURRENCY_MIN,
+                max_limit=settings.SQLITE_PARSER_CONCURRENCY_MAX,
+                target_p95_seconds=settings.SQLITE_PARSER_CONCURRENCY_TARGET_P95_SECONDS,
+                max_error_rate=settings.SQLITE_PARSER_CONCURRENCY_MAX_ERROR_RATE,
+                window_size=10,
+                redis_url=redis_url
+            )
+        else:
+            limiter = AdaptiveConcurrencyLimiter(
+                name,
+                initial_limit=settings.LOGIKAL_CONCURRENCY_INITIAL,
+                min_limit=settings.LOGIKAL_CONCURRENCY_MIN,
+                max_limit=settings.LOGIKAL_CONCURRENCY_MAX,
+                target_p95_seconds=settings.LOGIKAL_CONCURRENCY_TARGET_P95_SECONDS,
+                max_error_rate=settings.LOGIKAL_CONCURRENCY_MAX_ERROR_RATE,
+                redis_url=redis_url
+            )
+        limiters[name] = limiter
+    return limiter
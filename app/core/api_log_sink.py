@@ -0,0 +1,203 @@
+"""
+Buffered writer for Logikal API call logs.
+
+Services used to add an ApiLog row to the sync's own session for every API
+call, often with the whole stringified payload. The sink keeps records in
+memory instead and writes them with one multi-row INSERT per batch, on a
+timer or once the batch size is reached, outside the sync transaction.
+
+Records can be sampled per operation (failures are always kept), response
+bodies truncated or replaced by a hash, and in ``metrics_only`` mode nothing
+is written to ``api_logs`` at all - only the Prometheus counters are updated.
+"""
+import asyncio
+import hashlib
+import random
+import threading
+import logging
+from typing import Any, Dict, List, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BODY_POLICIES = ('full', 'truncate', 'hash', 'none')
+
+
+class ApiLogSink:
+    """In-memory buffer of api_logs rows flushed in batches"""
+
+    def __init__(self, mode: str = None, body_policy: str = None, body_max_chars: int = None,
+                 sample_rates: Dict[str, float] = None, default_sample_rate: float = None,
+                 batch_size: int = None, flush_interval_seconds: float = None, max_buffer: int = None):
+        self.mode = mode or settings.API_LOG_MODE
+        self.body_policy = body_policy or settings.API_LOG_BODY_POLICY
+        if self.body_policy not in BODY_POLICIES:
+            logger.warning(f"Unknown API log body policy '{self.body_policy}', using 'truncate'")
+            self.body_policy = 'truncate'
+        self.body_max_chars = body_max_chars or settings.API_LOG_BODY_MAX_CHARS
+        self.sample_rates = sample_rates if sample_rates is not None else settings.API_LOG_SAMPLE_RATES
+        self.default_sample_rate = default_sample_rate if default_sample_rate is not None else settings.API_LOG_DEFAULT_SAMPLE_RATE
+        self.batch_size = batch_size or settings.API_LOG_FLUSH_BATCH_SIZE
+        self.flush_interval_seconds = flush_interval_seconds or settings.API_LOG_FLUSH_INTERVAL_SECONDS
+        self.max_buffer = max_buffer or settings.API_LOG_MAX_BUFFER
+
+        self._buffer: List[Dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        self._stats = {'recorded': 0, 'sampled_out': 0, 'dropped': 0, 'written': 0, 'flushes': 0, 'flush_failures': 0}
+
+    def _sampled(self, operation: str, success: bool) -> bool:
+        if not success:
+            return True
+        rate = self.sample_rates.get(operation, self.default_sample_rate)
+        return rate >= 1.0 or random.random() < rate
+
+    def _format_body(self, body: Any) -> Optional[str]:
+        if body is None or self.body_policy == 'none':
+            return None
+        text = body if isinstance(body, str) else str(body)
+        if self.body_policy == 'hash':
+            return f"sha256:{hashlib.sha256(text.encode('utf-8', 'replace')).hexdigest()} ({len(text)} chars)"
+        if self.body_policy == 'truncate' and len(text) > self.body_max_chars:
+            return f"{text[:self.body_max_chars]}... [truncated, {len(text)} chars]"
+        return text
+
+    def record(self, operation: str, success: bool, status_code: Optional[int], duration_ms: Optional[int],
+               request_url: str = None, request_method: str = None, default_method: str = 'GET',
+               request_payload: Any = None, response_body: Any = None, response_summary: str = None,
+               error_message: str = None) -> None:
+        """Queue one API call log record; never blocks on the database"""
+        self._record_metrics(operation, success, duration_ms)
+        if self.mode == 'metrics_only':
+            return
+        if not self._sampled(operation, success):
+            self._stats['sampled_out'] += 1
+            return
+
+        row = {
+            'endpoint': request_url.split('/')[-1] if request_url else operation,
+            'method': request_method or default_method,
+            'status_code': status_code,
+            'response_time_ms': duration_ms,
+            'success': success,
+            'error_message': error_message,
+            'request_url': request_url,
+            'request_method': request_method,
+            'request_payload': self._format_body(request_payload) if request_payload else None,
+            'response_body': self._format_body(response_body),
+            'response_summary': response_summary[:500] if response_summary else None,
+        }
+        with self._lock:
+            self._buffer.append(row)
+            if len(self._buffer) > self.max_buffer:
+                # Database unavailable for a while - keep the most recent records
+                overflow = len(self._buffer) - self.max_buffer
+                del self._buffer[:overflow]
+                self._stats['dropped'] += overflow
+            full = len(self._buffer) >= self.batch_size
+        self._stats['recorded'] += 1
+
+        self._ensure_flusher()
+        if full:
+            self._schedule_flush()
+
+    def _record_metrics(self, operation: str, success: bool, duration_ms: Optional[int]) -> None:
+        try:
+            from monitoring.prometheus import PrometheusMetrics
+            PrometheusMetrics.record_logikal_api_call(operation, success, (duration_ms or 0) / 1000.0)
+        except ImportError:
+            pass
+
+    def flush(self) -> int:
+        """Write all buffered records with one multi-row INSERT per batch; returns rows written"""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+
+            from core.database import engine
+            from models.api_log import ApiLog
+            written = 0
+            try:
+                with engine.begin() as connection:
+                    for start in range(0, len(rows), self.batch_size):
+                        batch = rows[start:start + self.batch_size]
+                        connection.execute(ApiLog.__table__.insert(), batch)
+                        written += len(batch)
+            except Exception as e:
+                self._stats['flush_failures'] += 1
+                logger.error(f"Failed to flush {len(rows)} API log records: {str(e)}")
+                with self._lock:
+                    # Put them back in front of newer records; max_buffer bounds the retry backlog
+                    self._buffer[:0] = rows
+                return 0
+
+            self._stats['flushes'] += 1
+            self._stats['written'] += written
+            return written
+
+    async def flush_async(self) -> int:
+        """Flush from a worker thread so the event loop is not blocked"""
+        return await asyncio.to_thread(self.flush)
+
+    def _schedule_flush(self) -> None:
+        try:
+            asyncio.get_running_loop().create_task(self.flush_async())
+        except RuntimeError:
+            self.flush()
+
+    def _ensure_flusher(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._flusher is None or self._flusher.done() or self._flusher.get_loop() is not loop:
+            self._flusher = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self.flush_async()
+            except Exception as e:
+                logger.debug(f"API log flush error: {str(e)}")
+
+    async def close(self) -> None:
+        """Stop the timer and write what is left"""
+        if self._flusher and not self._flusher.done():
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._flusher = None
+        await self.flush_async()
+
+    def get_stats(self) -> Dict:
+        """Get sink statistics"""
+        return {
+            'mode': self.mode,
+            'body_policy': self.body_policy,
+            'buffered': len(self._buffer),
+            **self._stats
+        }
+
+
+_api_log_sink: Optional[ApiLogSink] = None
+
+
+def get_api_log_sink() -> ApiLogSink:
+    """Get the process-wide API log sink"""
+    global _api_log_sink
+    if _api_log_sink is None:
+        _api_log_sink = ApiLogSink()
+    return _api_log_sink
+
+
+async def close_api_log_sink() -> None:
+    """Flush the API log sink (application / worker shutdown)"""
+    if _api_log_sink is not None:
+        await _api_log_sink.close()
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import validator
-from typing import Optional
+from typing import Dict, List, Optional
 import os
 
 
@@ -12,6 +12,97 @@ class Settings(BaseSettings):
     AUTH_USERNAME: str = "your_logikal_username"
     AUTH_PASSWORD: str = "your_logikal_password"
     
+    # Logikal HTTP client (one keep-alive pool per worker process)
+    LOGIKAL_HTTP_MAX_CONNECTIONS: int = 10
+    LOGIKAL_HTTP_KEEPALIVE_TIMEOUT: float = 30.0
+    LOGIKAL_HTTP_TIMEOUT: float = 60.0
+    
+    # Logikal session pool (pre-authenticated tokens leased to sync units)
+    LOGIKAL_SESSION_POOL_SIZE: int = 4
+    LOGIKAL_SESSION_POOL_MIN_IDLE: int = 1
+    LOGIKAL_SESSION_MAX_AGE_SECONDS: int = 1800
+    LOGIKAL_SESSION_REFRESH_INTERVAL_SECONDS: int = 30
+    
+    # Logikal rate limits per endpoint class (token bucket shared through Redis)
+    LOGIKAL_RATE_LIMIT_REDIS_URL: Optional[str] = None  # Defaults to REDIS_URL
+    LOGIKAL_RATE_LIMIT_AUTH_RPS: float = 1.0
+    LOGIKAL_RATE_LIMIT_AUTH_BURST: float = 2.0
+    LOGIKAL_RATE_LIMIT_NAVIGATION_RPS: float = 4.0
+    LOGIKAL_RATE_LIMIT_NAVIGATION_BURST: float = 8.0
+    LOGIKAL_RATE_LIMIT_LISTING_RPS: float = 2.0
+    LOGIKAL_RATE_LIMIT_LISTING_BURST: float = 4.0
+    # Parts-list and thumbnail downloads are only bounded by the adaptive concurrency limit unless a
+    # download budget measured against the Logikal server is set here (0 = no download rate limit)
+    LOGIKAL_RATE_LIMIT_DOWNLOAD_RPS: float = 0.0
+    LOGIKAL_RATE_LIMIT_DOWNLOAD_BURST: float = 3.0
+    
+    # Adaptive (AIMD) concurrency for fan-outs; the learned limit is kept in Redis
+    LOGIKAL_CONCURRENCY_INITIAL: int = 2
+    LOGIKAL_CONCURRENCY_MIN: int = 1
+    LOGIKAL_CONCURRENCY_MAX: int = 8
+    LOGIKAL_CONCURRENCY_TARGET_P95_SECONDS: float = 2.0
+    LOGIKAL_CONCURRENCY_MAX_ERROR_RATE: float = 0.05
+    SQLITE_PARSER_CONCURRENCY_INITIAL: int = 2
+    SQLITE_PARSER_CONCURRENCY_MIN: int = 1
+    SQLITE_PARSER_CONCURRENCY_MAX: int = 6
+    SQLITE_PARSER_CONCURRENCY_TARGET_P95_SECONDS: float = 30.0
+    SQLITE_PARSER_CONCURRENCY_MAX_ERROR_RATE: float = 0.1
+    # Identical in-flight listings share one call; results are memoised briefly
+    LOGIKAL_READ_MEMO_TTL_SECONDS: float = 10.0
+    # Listing cache (Redis + in-process L1); TTLs come from ObjectSyncConfig staleness thresholds
+    LOGIKAL_LISTING_CACHE_REDIS_URL: Optional[str] = None  # Defaults to REDIS_URL
+    LOGIKAL_LISTING_CACHE_L1_TTL_SECONDS: float = 60.0
+    LOGIKAL_LISTING_CACHE_L1_MAX_ENTRIES: int = 512
+    LOGIKAL_LISTING_FINGERPRINT_TTL_SECONDS: int = 604800  # 7 days
+    LOGIKAL_LISTING_CACHE_CONFIG_REFRESH_SECONDS: int = 300
+    # Force sync: phases synced in parallel (also bounded by the adaptive Logikal limit)
+    FORCE_SYNC_MAX_PARALLEL_PHASES: int = 4
+    ELEVATION_THUMBNAIL_WORKERS: int = 4
+    # Sync plans: listing nodes run in parallel (also bounded by the adaptive Logikal limit)
+    SYNC_PLAN_MAX_PARALLEL_NODES: int = 8
+    # Full sync checkpoints: an interrupted run older than this starts over instead of resuming
+    SYNC_CHECKPOINT_MAX_AGE_HOURS: int = 24
+    # Sharded full sync: root directories above this many projects are split across shards
+    FULL_SYNC_SHARD_MAX_PROJECTS: int = 200
+    # Sync deduplication: one running job per sync scope across processes (Redis, in-process fallback)
+    SYNC_DEDUP_ENABLED: bool = True
+    SYNC_DEDUP_LEASE_SECONDS: int = 60  # Renewed while the job runs; a crashed holder frees the scope after this
+    SYNC_DEDUP_ATTACH_TIMEOUT_SECONDS: int = 1800  # Longest a duplicate request waits for the running job
+    SYNC_DEDUP_RESULT_TTL_SECONDS: int = 300
+    # Priority lanes: interactive (Odoo force syncs), scheduled (smart sync), maintenance (full syncs)
+    # Share of each rate-limit burst a class leaves for the classes above it; unused capacity is never held back
+    LOGIKAL_PRIORITY_RATE_RESERVES: Dict[str, float] = {"interactive": 0.0, "scheduled": 0.3, "maintenance": 0.5}
+    SYNC_PRIORITY_YIELD_ENABLED: bool = True
+    SYNC_PRIORITY_MAX_YIELD_SECONDS: float = 30.0  # Longest a background sync pauses at one boundary
+    SYNC_PRIORITY_ACTIVITY_TTL_SECONDS: int = 30  # Renewed while interactive work runs
+    # Force sync jobs: progress and results in Redis (in-process fallback), streamed to Odoo
+    FORCE_SYNC_JOBS_IN_WORKER: bool = True  # Run jobs on the sync_interactive Celery worker while Redis is up
+    FORCE_SYNC_JOB_TTL_SECONDS: int = 3600
+    FORCE_SYNC_RESULT_CACHE_SECONDS: int = 300  # A repeated request within this gets the last result
+    FORCE_SYNC_PROGRESS_FLUSH_SECONDS: float = 0.5
+    FORCE_SYNC_MAX_LOCAL_EVENTS: int = 1000  # Progress events kept per job by the in-process fallback
+    # Parts lists: parse the downloaded SQLite database in memory; the .db file is only an archive
+    PARTS_LIST_IN_MEMORY_PARSE: bool = True
+    PARTS_LIST_ARCHIVE_FILES: bool = True  # Written in the background after parsing
+    PARTS_PARSE_PROCESSES: int = 2  # Parse stage worker processes; 0 parses in threads of the syncing process
+    PARTS_PARSE_MAX_PENDING: int = 8  # Downloaded databases waiting for a parse process before the sync waits
+    # Batch re-parse of archived parts databases (sqlite_parser_batch queue)
+    BATCH_PARSE_PROCESSES: int = 0  # 0 = one per CPU core
+    BATCH_PARSE_CHUNK_SIZE: int = 200  # Elevations written per commit
+    # Part line items of every parts-list table with an article number, stored in elevation_parts
+    PARTS_EXTRACT_LINE_ITEMS: bool = True
+    PARTS_LINE_ITEM_TABLES: List[str] = []  # Restrict to these SQLite tables; empty = all line-item tables
+    
+    # Logikal API call logging (buffered writer for the api_logs table)
+    API_LOG_MODE: str = "buffered"  # "buffered" or "metrics_only"
+    API_LOG_BODY_POLICY: str = "truncate"  # full, truncate, hash or none
+    API_LOG_BODY_MAX_CHARS: int = 2000
+    API_LOG_DEFAULT_SAMPLE_RATE: float = 1.0
+    API_LOG_SAMPLE_RATES: Dict[str, float] = {}  # Per operation, e.g. {"select_directory": 0.1}
+    API_LOG_FLUSH_BATCH_SIZE: int = 200
+    API_LOG_FLUSH_INTERVAL_SECONDS: float = 5.0
+    API_LOG_MAX_BUFFER: int = 10000
+    
     # Database Configuration
     DATABASE_URL: str = "postgresql://admin:admin@db:5432/logikal_middleware"
     
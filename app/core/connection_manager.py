@@ -3,9 +3,12 @@ Enhanced Connection Manager for clean connection handling and reduced log noise.
 """
 import asyncio
 import logging
+import threading
 import time
+import weakref
 from contextlib import asynccontextmanager
-from typing import Optional, Dict, Any, Callable
+from typing import Optional, Dict, Any, List, Callable, Awaitable, TypeVar
+from urllib.parse import urlsplit
 from dataclasses import dataclass
 from enum import Enum
 import aiohttp
@@ -39,6 +42,7 @@ class ConnectionConfig:
     enable_keepalive: bool = True
     keepalive_timeout: float = 5.0
     max_keepalive_connections: int = 5
+    share_cookies: bool = True  # False: never store or send cookies (session shared by many tokens)
 
 
 class ConnectionManager:
@@ -74,7 +78,7 @@ class ConnectionManager:
     
     async def connect(self) -> None:
         """Establish async connection with proper error handling"""
-        if self.state == ConnectionState.CONNECTED:
+        if self.state == ConnectionState.CONNECTED and self.session and not self.session.closed:
             return
             
         self.state = ConnectionState.CONNECTING
@@ -99,7 +103,8 @@ class ConnectionManager:
             self.session = aiohttp.ClientSession(
                 timeout=timeout,
                 connector=connector,
-                headers={'Connection': 'keep-alive' if self.config.enable_keepalive else 'close'}
+                headers={'Connection': 'keep-alive' if self.config.enable_keepalive else 'close'},
+                cookie_jar=None if self.config.share_cookies else aiohttp.DummyCookieJar()
             )
             
             self.state = ConnectionState.CONNECTED
@@ -201,6 +206,10 @@ class ConnectionManager:
         finally:
             self._connection_count -= 1
     
+    def touch(self) -> None:
+        """Record activity, so the pool does not treat the connection as idle"""
+        self._last_activity = time.time()
+    
     def get_sync_connection(self):
         """Get sync connection with automatic setup"""
         if not self.requests_session:
@@ -302,4 +311,132 @@ def get_global_connection_pool() -> ConnectionPool:
     return _global_pool
 
 
+# Logikal API client
+#
+# aiohttp sessions are bound to the event loop they were created on, so the
+# keep-alive pool is kept per running loop. FastAPI has one loop per worker
+# process; Celery workers get one per pool thread from run_in_worker_loop().
+
+T = TypeVar("T")
+
+_logikal_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ConnectionPool]" = weakref.WeakKeyDictionary()
+_worker_loops: Dict[int, asyncio.AbstractEventLoop] = {}
+_worker_loops_lock = threading.Lock()
+# Soft time limit deadline of the Celery task running on each worker thread
+_task_deadlines = threading.local()
+
+
+def get_logikal_connection_config() -> ConnectionConfig:
+    """Build the connection config used for Logikal API calls"""
+    from core.config import settings
+    return ConnectionConfig(
+        timeout=settings.LOGIKAL_HTTP_TIMEOUT,
+        pool_connections=settings.LOGIKAL_HTTP_MAX_CONNECTIONS,
+        pool_maxsize=settings.LOGIKAL_HTTP_MAX_CONNECTIONS,
+        keepalive_timeout=settings.LOGIKAL_HTTP_KEEPALIVE_TIMEOUT,
+        # Every token and lease shares the session; cookies set for one must not reach the others
+        share_cookies=False
+    )
+
+
+def get_logikal_connection_pool() -> ConnectionPool:
+    """Get the Logikal connection pool for the running event loop"""
+    loop = asyncio.get_running_loop()
+    pool = _logikal_pools.get(loop)
+    if pool is None:
+        pool = ConnectionPool(max_connections=4, config=get_logikal_connection_config())
+        _logikal_pools[loop] = pool
+    return pool
+
+
+async def get_logikal_session(url: str) -> aiohttp.ClientSession:
+    """
+    Get the shared keep-alive session for the Logikal server behind ``url``.
+    
+    The session is owned by the pool - callers must not close it.
+    """
+    parts = urlsplit(url)
+    key = f"{parts.scheme}://{parts.netloc}"
+    manager = await get_logikal_connection_pool().get_connection(key)
+    if not manager.session or manager.session.closed:
+        await manager.connect()
+    manager.touch()
+    return manager.session
+
+
+async def close_logikal_sessions() -> None:
+    """Close the Logikal sessions bound to the running event loop"""
+    loop = asyncio.get_running_loop()
+    pool = _logikal_pools.pop(loop, None)
+    if pool is not None:
+        await pool.close_all()
+        logger.info("Closed pooled Logikal HTTP sessions")
+
+
+def run_in_worker_loop(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine on the long-lived event loop of this worker thread.
+    
+    Unlike asyncio.run(), the loop (and with it the Logikal keep-alive
+    connections) survives between Celery tasks. Every thread of a threads-pool
+    worker gets a loop of its own; a prefork child has a single one.
+    """
+    thread_id = threading.get_ident()
+    with _worker_loops_lock:
+        loop = _worker_loops.get(thread_id)
+        if loop is None or loop.is_closed():
+            loop = asyncio.new_event_loop()
+            _worker_loops[thread_id] = loop
+    asyncio.set_event_loop(loop)
+    deadline = getattr(_task_deadlines, 'deadline', None)
+    if deadline is not None:
+        coro = _within_deadline(coro, deadline)
+    return loop.run_until_complete(coro)
+
+
+def start_task_deadline(soft_time_limit: Optional[float]) -> None:
+    """
+    Start the soft time limit of the Celery task on this worker thread.
+
+    A threads-pool worker cannot interrupt a running thread, so Celery ignores
+    task_soft_time_limit/task_time_limit there; run_in_worker_loop() cancels
+    the task's coroutines at the deadline and raises SoftTimeLimitExceeded
+    instead. Code blocking the loop is only interrupted at its next await.
+    """
+    _task_deadlines.deadline = time.monotonic() + soft_time_limit if soft_time_limit else None
+
 
+def clear_task_deadline() -> None:
+    """Forget the deadline of the Celery task that finished on this thread"""
+    _task_deadlines.deadline = None
+
+
+async def _within_deadline(coro: Awaitable[T], deadline: float) -> T:
+    from celery.exceptions import SoftTimeLimitExceeded
+
+    try:
+        return await asyncio.wait_for(coro, timeout=max(deadline - time.monotonic(), 0))
+    except asyncio.TimeoutError:
+        if time.monotonic() < deadline:
+            # A timeout of the task itself, not the time limit
+            raise
+        raise SoftTimeLimitExceeded("Soft time limit exceeded")
+
+
+def shutdown_worker_loop(cleanups: Optional[List[Callable[[], Awaitable[None]]]] = None) -> None:
+    """Run ``cleanups``, close pooled sessions and every worker event loop of this process"""
+    with _worker_loops_lock:
+        loops = list(_worker_loops.values())
+        _worker_loops.clear()
+    for loop in loops:
+        if loop.is_closed():
+            continue
+        try:
+            for cleanup in cleanups or []:
+                loop.run_until_complete(cleanup())
+            loop.run_until_complete(close_logikal_sessions())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        except Exception as e:
+            logger.debug(f"Error during worker loop shutdown: {str(e)}")
+        finally:
+            loop.close()
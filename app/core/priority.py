@@ -0,0 +1,272 @@
+"""
+Priority lanes for Logikal work.
+
+Every sync runs in one of three classes: interactive (Odoo users waiting on a
+force sync), scheduled (smart sync of stale projects) and maintenance (full
+syncs). The class travels with the coroutine in a context variable. All
+classes draw from the same Logikal rate-limit budget, but background calls
+leave a reserve in it, so interactive calls go first whenever they are
+waiting and get the whole budget when nothing else runs.
+
+While interactive work runs it is registered in Redis; scheduled and
+maintenance syncs check for it at phase and elevation boundaries and pause
+until it is done (at most SYNC_PRIORITY_MAX_YIELD_SECONDS per boundary, so
+they cannot starve). Without Redis the registry falls back to the process,
+like the rate limiters.
+
+A background sync that interactive work is waiting on (see sync_dedup) is
+promoted to the interactive class for the rest of its run instead of
+yielding to its own waiter.
+"""
+import asyncio
+import time
+import uuid
+import logging
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Dict, Optional, TypeVar
+
+from redis.exceptions import RedisError
+
+from core.config import settings
+from core.rate_limiter import REDIS_RETRY_INTERVAL_SECONDS, TokenBucketRateLimiter, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+INTERACTIVE = 'interactive'
+SCHEDULED = 'scheduled'
+MAINTENANCE = 'maintenance'
+PRIORITY_CLASSES = (INTERACTIVE, SCHEDULED, MAINTENANCE)
+
+# Celery queue of each class; interactive tasks get a worker of their own
+PRIORITY_QUEUES = {INTERACTIVE: 'sync_interactive', SCHEDULED: 'sync', MAINTENANCE: 'sync_maintenance'}
+
+
+class PriorityLane:
+    """Priority class of a sync, shared by all tasks it spawns so it can be promoted"""
+
+    def __init__(self, priority: str):
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class '{priority}'")
+        self.priority = priority
+
+    def promote(self) -> None:
+        if self.priority != INTERACTIVE:
+            logger.info(f"Promoting {self.priority} sync to interactive")
+            self.priority = INTERACTIVE
+
+
+_current_lane: ContextVar[Optional[PriorityLane]] = ContextVar('logikal_priority_lane', default=None)
+
+
+def current_lane() -> Optional[PriorityLane]:
+    return _current_lane.get()
+
+
+def current_priority() -> str:
+    """Priority class of the running sync (scheduled unless set)"""
+    lane = _current_lane.get()
+    return lane.priority if lane else SCHEDULED
+
+
+@contextmanager
+def priority_scope(priority: str):
+    """Run the enclosed code - and the tasks it creates - in ``priority``"""
+    token = _current_lane.set(PriorityLane(priority))
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+async def with_priority(priority: str, coro: Awaitable[T]) -> T:
+    """
+    Await ``coro`` in ``priority``.
+
+    For Celery tasks: run_in_worker_loop() runs the coroutine in the context of
+    the worker loop, so the class has to be set from inside it.
+    """
+    if priority == INTERACTIVE:
+        async with interactive_work():
+            return await coro
+    with priority_scope(priority):
+        return await coro
+
+
+class InteractiveActivity:
+    """Registry of running interactive jobs, shared across processes through Redis"""
+
+    def __init__(self, redis_url: Optional[str] = None, key: str = "logikal:priority:interactive",
+                 ttl_seconds: float = None, check_interval_seconds: float = 0.5):
+        self.redis_url = redis_url
+        self.key = key
+        self.ttl_seconds = ttl_seconds or settings.SYNC_PRIORITY_ACTIVITY_TTL_SECONDS
+        self.check_interval_seconds = check_interval_seconds
+
+        # In-process fallback: job id -> expiry
+        self._local_jobs: Dict[str, float] = {}
+        self._checked_at = 0.0
+        self._active = False
+
+        self._redis_retry_at = 0.0
+        self._stats = {'interactive_jobs': 0, 'yields': 0, 'yield_seconds_total': 0.0, 'redis_errors': 0}
+
+    @property
+    def backend(self) -> str:
+        if self.redis_url and time.monotonic() >= self._redis_retry_at:
+            return 'redis'
+        return 'local'
+
+    def _redis_failed(self, e: Exception) -> None:
+        self._stats['redis_errors'] += 1
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL_SECONDS
+        logger.warning(f"Interactive activity falling back to in-process registry: {str(e)}")
+
+    async def register(self, job_id: str, renewal: bool = False) -> None:
+        """Register or renew a running interactive job"""
+        if not renewal:
+            self._stats['interactive_jobs'] += 1
+        expires_at = time.time() + self.ttl_seconds
+        self._local_jobs[job_id] = expires_at
+        if self.backend == 'redis':
+            try:
+                await get_redis_client(self.redis_url).zadd(self.key, {job_id: expires_at})
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+
+    async def unregister(self, job_id: str) -> None:
+        self._local_jobs.pop(job_id, None)
+        self._checked_at = 0.0
+        if self.backend == 'redis':
+            try:
+                await get_redis_client(self.redis_url).zrem(self.key, job_id)
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+
+    async def is_active(self) -> bool:
+        """Whether interactive work is running anywhere; re-checked at most every check interval"""
+        if time.monotonic() - self._checked_at < self.check_interval_seconds:
+            return self._active
+        now = time.time()
+        active = None
+        if self.backend == 'redis':
+            try:
+                client = get_redis_client(self.redis_url)
+                await client.zremrangebyscore(self.key, '-inf', now)
+                active = await client.zcard(self.key) > 0
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+        if active is None:
+            for job_id, expires_at in list(self._local_jobs.items()):
+                if expires_at <= now:
+                    del self._local_jobs[job_id]
+            active = bool(self._local_jobs)
+        self._active = active
+        self._checked_at = time.monotonic()
+        return active
+
+    async def heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.ttl_seconds / 3)
+            await self.register(job_id, renewal=True)
+
+    def record_yield(self, waited: float) -> None:
+        self._stats['yields'] += 1
+        self._stats['yield_seconds_total'] += waited
+
+    def get_stats(self) -> Dict:
+        return {'backend': self.backend, 'active': self._active, **self._stats}
+
+
+# Redis clients are bound to the event loop that created them
+_activities: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, InteractiveActivity]" = weakref.WeakKeyDictionary()
+
+
+def get_interactive_activity() -> InteractiveActivity:
+    """Get the interactive activity registry of the running event loop"""
+    loop = asyncio.get_running_loop()
+    activity = _activities.get(loop)
+    if activity is None:
+        activity = InteractiveActivity(settings.LOGIKAL_RATE_LIMIT_REDIS_URL or settings.REDIS_URL)
+        _activities[loop] = activity
+    return activity
+
+
+@asynccontextmanager
+async def interactive_work():
+    """Run the enclosed sync as interactive work; background syncs yield to it meanwhile"""
+    activity = get_interactive_activity()
+    job_id = uuid.uuid4().hex
+    await activity.register(job_id)
+    heartbeat = asyncio.create_task(activity.heartbeat(job_id))
+    try:
+        with priority_scope(INTERACTIVE):
+            yield
+    finally:
+        heartbeat.cancel()
+        await activity.unregister(job_id)
+
+
+async def yield_to_interactive() -> float:
+    """
+    Pause a scheduled or maintenance sync while interactive work is running.
+
+    Called between work units (phases, elevations), never inside one, so no
+    Logikal navigation is left half done. Returns the time waited.
+    """
+    if current_priority() == INTERACTIVE or not settings.SYNC_PRIORITY_YIELD_ENABLED:
+        return 0.0
+    activity = get_interactive_activity()
+    if not await activity.is_active():
+        return 0.0
+
+    started_at = time.monotonic()
+    deadline = started_at + settings.SYNC_PRIORITY_MAX_YIELD_SECONDS
+    logger.debug(f"{current_priority().capitalize()} sync yielding to interactive work")
+    while time.monotonic() < deadline and current_priority() != INTERACTIVE and await activity.is_active():
+        await asyncio.sleep(activity.check_interval_seconds)
+    waited = time.monotonic() - started_at
+    activity.record_yield(waited)
+    return waited
+
+
+class PriorityRateLimiter:
+    """
+    Rate limit of one Logikal endpoint class shared by all priority classes.
+
+    There is one token bucket per endpoint class. Lower classes leave a
+    reserve of the burst in it (LOGIKAL_PRIORITY_RATE_RESERVES), so they only
+    take tokens the classes above them are not waiting for: interactive calls
+    get the full budget when they are alone and go first when the lanes
+    compete, and background syncs use whatever capacity interactive work
+    leaves idle.
+    """
+
+    def __init__(self, endpoint_class: str, requests_per_second: float, burst: float,
+                 redis_url: Optional[str] = None, reserves: Dict[str, float] = None):
+        self.bucket = TokenBucketRateLimiter(endpoint_class, requests_per_second, burst, redis_url)
+        self.endpoint_class = endpoint_class
+        reserves = settings.LOGIKAL_PRIORITY_RATE_RESERVES if reserves is None else reserves
+        self.reserves: Dict[str, float] = {
+            priority: max(reserves.get(priority, 0.0), 0.0) * self.bucket.burst for priority in PRIORITY_CLASSES
+        }
+        self._lane_stats = {priority: {'acquired': 0, 'wait_seconds_total': 0.0} for priority in PRIORITY_CLASSES}
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait for ``tokens`` from the shared budget, leaving the reserve of the current priority class"""
+        priority = current_priority()
+        waited = await self.bucket.acquire(tokens, reserve=self.reserves[priority])
+        self._lane_stats[priority]['acquired'] += 1
+        self._lane_stats[priority]['wait_seconds_total'] += waited
+        return waited
+
+    def get_stats(self) -> Dict:
+        """Get limiter statistics, with calls and waits per priority class"""
+        return {
+            **self.bucket.get_stats(),
+            'reserves': dict(self.reserves),
+            'lanes': {priority: dict(stats) for priority, stats in self._lane_stats.items()}
+        }
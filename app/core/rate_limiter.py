@@ -0,0 +1,199 @@
+"""
+Token-bucket rate limiting for Logikal API calls, shared across processes.
+
+Each endpoint class (auth, navigation, listing, download) has its own bucket
+with a sustained rate and a burst capacity. Bucket state lives in Redis so the
+budget holds across uvicorn and Celery worker processes; when Redis is not
+reachable every process falls back to an in-process bucket with the same
+budget until Redis comes back.
+
+A caller can ask to leave a reserve in the bucket: it only gets tokens while
+more than the reserve would remain. Lower-priority traffic uses this so it
+never takes the last tokens from higher-priority callers, while still using
+the whole budget when nobody else needs it.
+"""
+import asyncio
+import threading
+import time
+import logging
+import weakref
+from typing import Dict, Optional, Tuple
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# Refill and take ``requested`` tokens atomically; uses the Redis clock so all
+# processes agree on elapsed time. ``reserve`` tokens are left in the bucket
+# for other callers. Returns {allowed, tokens, wait_seconds}.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local reserve = math.max(0, math.min(tonumber(ARGV[4] or '0'), burst - requested))
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+    tokens = burst
+    ts = now
+end
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local wait = 0
+if tokens >= requested + reserve then
+    tokens = tokens - requested
+    allowed = 1
+else
+    wait = (requested + reserve - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(wait)}
+"""
+
+# How long to stay on the in-process bucket after a Redis error
+REDIS_RETRY_INTERVAL_SECONDS = 30.0
+
+# Redis clients are bound to the event loop that created their connections
+_redis_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, aioredis.Redis]]" = weakref.WeakKeyDictionary()
+_redis_scripts: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, object]]" = weakref.WeakKeyDictionary()
+
+
+def get_redis_client(redis_url: str) -> aioredis.Redis:
+    """Get the shared Redis client of the running loop for coordination state"""
+    clients = _redis_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(redis_url)
+    if client is None:
+        client = aioredis.from_url(redis_url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        clients[redis_url] = client
+    return client
+
+
+def _get_redis_script(redis_url: str):
+    """Get the token-bucket script bound to the Redis client of the running loop"""
+    scripts = _redis_scripts.setdefault(asyncio.get_running_loop(), {})
+    script = scripts.get(redis_url)
+    if script is None:
+        script = get_redis_client(redis_url).register_script(TOKEN_BUCKET_SCRIPT)
+        scripts[redis_url] = script
+    return script
+
+
+async def close_rate_limiter_clients() -> None:
+    """Close the rate limiter Redis clients bound to the running event loop"""
+    loop = asyncio.get_running_loop()
+    _redis_scripts.pop(loop, None)
+    clients = _redis_clients.pop(loop, {})
+    for client in clients.values():
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.debug(f"Error closing rate limiter Redis client: {str(e)}")
+
+
+class TokenBucketRateLimiter:
+    """Distributed token bucket for one Logikal endpoint class"""
+
+    def __init__(self, endpoint_class: str, requests_per_second: float, burst: float,
+                 redis_url: Optional[str] = None, key_prefix: str = "logikal:ratelimit"):
+        self.endpoint_class = endpoint_class
+        self.requests_per_second = requests_per_second
+        self.burst = max(burst, 1.0)
+        self.redis_url = redis_url
+        self.key = f"{key_prefix}:{endpoint_class}"
+
+        # In-process fallback bucket
+        self._local_tokens = self.burst
+        self._local_updated = time.monotonic()
+        self._local_lock = threading.Lock()
+
+        self._redis_retry_at = 0.0
+        self._tokens = self.burst
+        self._stats = {'acquired': 0, 'waits': 0, 'wait_seconds_total': 0.0, 'redis_errors': 0, 'local_fallbacks': 0}
+
+    @property
+    def backend(self) -> str:
+        if self.redis_url and time.monotonic() >= self._redis_retry_at:
+            return 'redis'
+        return 'local'
+
+    def _take_local(self, tokens: float, reserve: float = 0.0) -> Tuple[bool, float, float]:
+        reserve = max(0.0, min(reserve, self.burst - tokens))
+        with self._local_lock:
+            now = time.monotonic()
+            elapsed = now - self._local_updated
+            self._local_tokens = min(self.burst, self._local_tokens + elapsed * self.requests_per_second)
+            self._local_updated = now
+            if self._local_tokens >= tokens + reserve:
+                self._local_tokens -= tokens
+                return True, self._local_tokens, 0.0
+            return False, self._local_tokens, (tokens + reserve - self._local_tokens) / self.requests_per_second
+
+    async def _take_redis(self, tokens: float, reserve: float = 0.0) -> Tuple[bool, float, float]:
+        script = _get_redis_script(self.redis_url)
+        allowed, available, wait = await script(keys=[self.key],
+                                                args=[self.requests_per_second, self.burst, tokens, reserve])
+        return bool(int(allowed)), float(available), float(wait)
+
+    async def _take(self, tokens: float, reserve: float = 0.0) -> Tuple[bool, float, float]:
+        if self.backend == 'redis':
+            try:
+                return await self._take_redis(tokens, reserve)
+            except (RedisError, OSError) as e:
+                self._stats['redis_errors'] += 1
+                self._redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL_SECONDS
+                logger.warning(f"Rate limiter '{self.endpoint_class}' falling back to in-process bucket: {str(e)}")
+        if self.redis_url:
+            self._stats['local_fallbacks'] += 1
+        return self._take_local(tokens, reserve)
+
+    async def acquire(self, tokens: float = 1.0, reserve: float = 0.0) -> float:
+        """
+        Wait until ``tokens`` are available and take them.
+
+        Coroutines only wait for their own share of the budget, so concurrent
+        callers are not serialised while tokens are left. With a ``reserve``
+        the caller waits until that many tokens would still be left over.
+        Returns the time waited.
+        """
+        waited = 0.0
+        while True:
+            allowed, available, wait = await self._take(tokens, reserve)
+            self._tokens = available
+            if allowed:
+                break
+            logger.debug(f"Rate limiting '{self.endpoint_class}': sleeping for {wait:.2f} seconds")
+            await asyncio.sleep(wait)
+            waited += wait
+
+        self._stats['acquired'] += 1
+        if waited > 0:
+            self._stats['waits'] += 1
+            self._stats['wait_seconds_total'] += waited
+        self._record_metrics(waited)
+        return waited
+
+    def _record_metrics(self, waited: float) -> None:
+        try:
+            from monitoring.prometheus import PrometheusMetrics
+            PrometheusMetrics.record_rate_limit(self.endpoint_class, self._tokens, waited)
+        except ImportError:
+            pass
+
+    def get_stats(self) -> Dict:
+        """Get limiter statistics"""
+        return {
+            'endpoint_class': self.endpoint_class,
+            'requests_per_second': self.requests_per_second,
+            'burst': self.burst,
+            'backend': self.backend,
+            'tokens': round(self._tokens, 3),
+            **self._stats
+        }
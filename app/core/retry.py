@@ -4,6 +4,10 @@ import logging
 from typing import Callable, Any, Optional, Union
 from functools import wraps
 import time
+from core.config import settings
+from core.priority import PriorityRateLimiter
+from core.rate_limiter import TokenBucketRateLimiter
+from core.adaptive_concurrency import AdaptiveConcurrencyLimiter, get_concurrency_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -27,32 +31,11 @@ class RetryConfig:
         self.retryable_status_codes = retryable_status_codes or {503, 502, 504, 429}
 
 
-class RateLimiter:
-    """Simple rate limiter using asyncio"""
-    
-    def __init__(self, requests_per_second: float = 2.0):
-        self.requests_per_second = requests_per_second
-        self.min_interval = 1.0 / requests_per_second
-        self.last_request_time = 0.0
-        self._lock = asyncio.Lock()
-    
-    async def acquire(self):
-        """Acquire permission to make a request"""
-        async with self._lock:
-            current_time = time.time()
-            time_since_last = current_time - self.last_request_time
-            
-            if time_since_last < self.min_interval:
-                sleep_time = self.min_interval - time_since_last
-                logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-                await asyncio.sleep(sleep_time)
-            
-            self.last_request_time = time.time()
-
-
 def retry_async(
     config: Optional[RetryConfig] = None,
-    rate_limiter: Optional[RateLimiter] = None
+    rate_limiter: Optional[Union[TokenBucketRateLimiter, PriorityRateLimiter]] = None,
+    concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    record_latency: bool = True
 ):
     """
     Decorator for async functions with retry logic and rate limiting
@@ -60,6 +43,10 @@ def retry_async(
     Args:
         config: Retry configuration
         rate_limiter: Rate limiter instance
+        concurrency_limiter: Limiter fed with each attempt's latency and outcome
+            (defaults to the shared Logikal limiter)
+        record_latency: Whether attempts feed the concurrency limiter at all; off for
+            calls such as logins whose latency says nothing about the fan-out
     """
     if config is None:
         config = RetryConfig()
@@ -76,7 +63,17 @@ def retry_async(
                         await rate_limiter.acquire()
                     
                     # Execute the function
-                    result = await func(*args, **kwargs)
+                    started_at = time.monotonic()
+                    try:
+                        result = await func(*args, **kwargs)
+                    except Exception as e:
+                        if record_latency:
+                            (concurrency_limiter or get_concurrency_limiter()).record(
+                                time.monotonic() - started_at, success=False, overloaded=_is_overload_error(e)
+                            )
+                        raise
+                    if record_latency:
+                        (concurrency_limiter or get_concurrency_limiter()).record(time.monotonic() - started_at)
                     
                     # If successful, return the result
                     if attempt > 0:
@@ -128,6 +125,13 @@ def _is_retryable_error(error: Exception, retryable_status_codes: set) -> bool:
     return False
 
 
+def _is_overload_error(error: Exception) -> bool:
+    """Check if an error means the server is overloaded (429/5xx or a timeout)"""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    return _is_retryable_error(error, {429, 500, 502, 503, 504})
+
+
 def _calculate_delay(attempt: int, config: RetryConfig) -> float:
     """Calculate delay for exponential backoff with jitter"""
     # Exponential backoff
@@ -144,9 +148,29 @@ def _calculate_delay(attempt: int, config: RetryConfig) -> float:
     return delay
 
 
-# Global rate limiters for different API endpoints
-auth_rate_limiter = RateLimiter(requests_per_second=1.0)  # Slower for auth
-api_rate_limiter = RateLimiter(requests_per_second=2.0)   # Faster for regular API calls
+# Rate limiters per Logikal endpoint class, shared across processes through Redis;
+# interactive calls take precedence over background calls within each budget
+_rate_limit_redis_url = settings.LOGIKAL_RATE_LIMIT_REDIS_URL or settings.REDIS_URL
+
+auth_rate_limiter = PriorityRateLimiter(
+    'auth', settings.LOGIKAL_RATE_LIMIT_AUTH_RPS, settings.LOGIKAL_RATE_LIMIT_AUTH_BURST, _rate_limit_redis_url
+)
+navigation_rate_limiter = PriorityRateLimiter(
+    'navigation', settings.LOGIKAL_RATE_LIMIT_NAVIGATION_RPS, settings.LOGIKAL_RATE_LIMIT_NAVIGATION_BURST, _rate_limit_redis_url
+)
+listing_rate_limiter = PriorityRateLimiter(
+    'listing', settings.LOGIKAL_RATE_LIMIT_LISTING_RPS, settings.LOGIKAL_RATE_LIMIT_LISTING_BURST, _rate_limit_redis_url
+)
+# Downloads are not rate limited unless a download budget is configured
+download_rate_limiter = PriorityRateLimiter(
+    'download', settings.LOGIKAL_RATE_LIMIT_DOWNLOAD_RPS, settings.LOGIKAL_RATE_LIMIT_DOWNLOAD_BURST, _rate_limit_redis_url
+) if settings.LOGIKAL_RATE_LIMIT_DOWNLOAD_RPS > 0 else None
+
+
+def get_rate_limiter_stats() -> list:
+    """Get statistics of all Logikal rate limiters"""
+    return [limiter.get_stats() for limiter in
+            (auth_rate_limiter, navigation_rate_limiter, listing_rate_limiter, download_rate_limiter) if limiter]
 
 # Default retry configurations
 default_retry_config = RetryConfig(
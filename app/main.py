@@ -105,4 +105,14 @@ async def shutdown_event():
     """
     logger = logging.getLogger(__name__)
     logger.info("Application shutting down...")
+    
+    # Close the Logikal session pools and pooled HTTP connections of this worker
+    from services.logikal_session_pool import close_logikal_session_pools
+    from core.connection_manager import close_logikal_sessions
+    from core.rate_limiter import close_rate_limiter_clients
+    from core.api_log_sink import close_api_log_sink
+    await close_api_log_sink()
+    await close_logikal_session_pools()
+    await close_logikal_sessions()
+    await close_rate_limiter_clients()
 
@@ -10,5 +10,7 @@ from .sync_log import SyncLog
 from .elevation_glass import ElevationGlass
 from .parsing_error_log import ParsingErrorLog
 from .object_sync_config import ObjectSyncConfig
+from .sync_checkpoint import SyncCheckpoint
+from .elevation_part import ElevationPart
 
-__all__ = ["Directory", "Session", "ApiLog", "Project", "Elevation", "Phase", "SyncConfig", "SyncLog", "ElevationGlass", "ParsingErrorLog", "ObjectSyncConfig"]
\ No newline at end of file
+__all__ = ["Directory", "Session", "ApiLog", "Project", "Elevation", "Phase", "SyncConfig", "SyncLog", "ElevationGlass", "ParsingErrorLog", "ObjectSyncConfig", "SyncCheckpoint", "ElevationPart"]
\ No newline at end of file
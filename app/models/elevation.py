@@ -31,7 +31,6 @@ class Elevation(Base):
     sync_status = Column(String(50), default='pending', nullable=False, comment="Sync status: pending, synced, error")
     
     # Parts/Components (from parts-list endpoint)
-    parts_data = Column(Text, nullable=True, comment="Base64-encoded SQLite database from parts-list API")
     parts_db_path = Column(String(500), nullable=True, comment="Local filesystem path to extracted SQLite file")
     parts_count = Column(Integer, nullable=True, comment="Number of parts/components")
     has_parts_data = Column(Boolean, default=False, nullable=False, comment="Whether parts list has been fetched")
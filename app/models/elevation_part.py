@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, JSON, DDL, event
+from sqlalchemy.sql import func
+from core.database import Base
+
+# Hash partitions of elevation_parts (PostgreSQL); an elevation's lines always live in one partition
+ELEVATION_PARTS_PARTITIONS = 16
+
+
+class ElevationPart(Base):
+    """Part line item (profile, article, accessory, glass, ...) from a parts-list SQLite table"""
+    __tablename__ = "elevation_parts"
+    __table_args__ = {"postgresql_partition_by": "HASH (elevation_id)"}
+
+    elevation_id = Column(Integer, ForeignKey("elevations.id", ondelete="CASCADE"), primary_key=True)
+    source_table = Column(String(100), primary_key=True, comment="SQLite table the line comes from")
+    line_no = Column(Integer, primary_key=True, comment="Row number within the SQLite table")
+    article_number = Column(String(100), nullable=True, index=True)
+    description = Column(Text, nullable=True)
+    system_code = Column(String(100), nullable=True, index=True)
+    color = Column(String(255), nullable=True)
+    quantity = Column(Float, nullable=True)
+    unit = Column(String(50), nullable=True)
+    length = Column(Float, nullable=True)
+    weight = Column(Float, nullable=True)
+    attributes = Column(JSON, nullable=True, comment="Remaining columns of the SQLite row")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<ElevationPart(elevation_id={self.elevation_id}, source_table='{self.source_table}', line_no={self.line_no}, article_number='{self.article_number}')>"
+
+
+for _remainder in range(ELEVATION_PARTS_PARTITIONS):
+    event.listen(
+        ElevationPart.__table__,
+        "after_create",
+        DDL(
+            f"CREATE TABLE IF NOT EXISTS elevation_parts_p{_remainder} PARTITION OF elevation_parts "
+            f"FOR VALUES WITH (MODULUS {ELEVATION_PARTS_PARTITIONS}, REMAINDER {_remainder})"
+        ).execute_if(dialect="postgresql")
+    )
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, JSON
+from sqlalchemy.sql import func
+from core.database import Base
+
+
+class SyncCheckpoint(Base):
+    """Resume cursor of a long-running sync, advanced after each committed unit"""
+    __tablename__ = "sync_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sync_type = Column(String(50), nullable=False, index=True)  # 'full', 'project'
+    status = Column(String(50), nullable=False, default='running')  # 'running', 'completed', 'abandoned'
+    stage = Column(String(50), nullable=False)  # 'directories', 'projects', 'phases', 'elevations'
+
+    # Cursor: id of the last unit committed in the current stage (units run in id order)
+    directory_id = Column(Integer, nullable=True)
+    project_id = Column(Integer, nullable=True)
+    phase_id = Column(Integer, nullable=True)
+
+    # Run options a resumed run must keep
+    delta = Column(Boolean, default=False, nullable=False)
+    cache_mode = Column(String(50), nullable=True)
+    changed_project_ids = Column(JSON, nullable=True)  # Delta runs: projects whose subtree still has to be walked
+    changed_phase_ids = Column(JSON, nullable=True)
+
+    # Totals carried across resumes
+    directories_processed = Column(Integer, default=0, nullable=False)
+    projects_processed = Column(Integer, default=0, nullable=False)
+    phases_processed = Column(Integer, default=0, nullable=False)
+    elevations_processed = Column(Integer, default=0, nullable=False)
+    resume_count = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<SyncCheckpoint(id={self.id}, sync_type={self.sync_type}, status={self.status}, stage={self.stage})>"
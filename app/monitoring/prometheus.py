@@ -98,6 +98,33 @@ celery_queue_size = Gauge(
     ['queue_name']
 )
 
+# Logikal Rate Limiter Metrics
+logikal_rate_limit_tokens = Gauge(
+    'logikal_rate_limit_tokens',
+    'Tokens left in the Logikal rate limit bucket',
+    ['endpoint_class']
+)
+
+logikal_rate_limit_wait_seconds = Histogram(
+    'logikal_rate_limit_wait_seconds',
+    'Time spent waiting for Logikal rate limit tokens',
+    ['endpoint_class'],
+    buckets=[0.0, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+)
+
+logikal_api_calls_total = Counter(
+    'logikal_api_calls_total',
+    'Total number of Logikal API calls',
+    ['operation', 'status']
+)
+
+logikal_api_call_duration_seconds = Histogram(
+    'logikal_api_call_duration_seconds',
+    'Duration of Logikal API calls',
+    ['operation'],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+)
+
 # Application Info
 app_info = Info(
     'app_info',
@@ -227,6 +254,27 @@ class PrometheusMetrics:
         except Exception as e:
             logger.error(f"Error updating Celery queue size: {e}")
 
+    @staticmethod
+    def record_rate_limit(endpoint_class: str, tokens: float, wait_seconds: float):
+        """Record Logikal rate limiter tokens and wait time"""
+        try:
+            logikal_rate_limit_tokens.labels(endpoint_class=endpoint_class).set(tokens)
+            logikal_rate_limit_wait_seconds.labels(endpoint_class=endpoint_class).observe(wait_seconds)
+        except Exception as e:
+            logger.error(f"Error recording rate limit metrics: {e}")
+
+    @staticmethod
+    def record_logikal_api_call(operation: str, success: bool, duration: float):
+        """Record an outgoing Logikal API call"""
+        try:
+            logikal_api_calls_total.labels(
+                operation=operation,
+                status='success' if success else 'error'
+            ).inc()
+            logikal_api_call_duration_seconds.labels(operation=operation).observe(duration)
+        except Exception as e:
+            logger.error(f"Error recording Logikal API call metrics: {e}")
+
 
 class PrometheusMiddleware:
     """
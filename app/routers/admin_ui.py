@@ -488,7 +488,7 @@ async def admin_dashboard():
                                     <h6>Features:</h6>
                                     <ul class="list-unstyled">
                                         <li><i class="fas fa-check text-success"></i> Async SQLite parsing</li>
-                                        <li><i class="fas fa-check text-success"></i> 2-worker concurrency limit</li>
+                                        <li><i class="fas fa-check text-success"></i> Adaptive (AIMD) concurrency limit</li>
                                         <li><i class="fas fa-check text-success"></i> Comprehensive error handling</li>
                                         <li><i class="fas fa-check text-success"></i> Retry logic with backoff</li>
                                         <li><i class="fas fa-check text-success"></i> Security validation</li>
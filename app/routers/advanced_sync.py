@@ -13,7 +13,7 @@ from schemas.advanced_sync import (
     DataHashComparison, SyncPerformanceMetrics, ProjectSyncMetrics, SyncEfficiencyReport,
     AlertInfo, AlertNotificationResult, AlertHistoryResponse, AlertAcknowledgement,
     CustomAlertRequest, AdvancedSyncStatusResponse, SyncStrategyConfig,
-    SyncOperationRequest, SyncOperationResponse, SyncAnalyticsResponse
+    SyncOperationRequest, SyncOperationResponse, SyncAnalyticsResponse, SyncPlanRequest, SyncPlanResult
 )
 import logging
 from datetime import datetime
@@ -218,6 +218,39 @@ async def trigger_dependency_sync(
         )
 
 
+@router.post("/plan", response_model=SyncPlanResult)
+async def execute_sync_plan(
+    request: SyncPlanRequest,
+    db: Session = Depends(get_db),
+    current_client: dict = Depends(require_permission("projects:write"))
+):
+    """
+    Compile a full, directory, project or selective sync into a dependency
+    graph of listing nodes and execute it, running ready nodes in parallel.
+    Requires 'projects:write' permission.
+    """
+    try:
+        advanced_sync_service = AdvancedSyncService(db)
+        result = await advanced_sync_service.run_sync_plan(
+            request.scope, request.object_ids, request.object_type,
+            delta=request.delta, max_parallel_nodes=request.max_parallel_nodes
+        )
+
+        return SyncPlanResult(**result)
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "INVALID_SYNC_PLAN", "message": str(e)}
+        )
+    except Exception as e:
+        logger.error(f"Error executing {request.scope} sync plan: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"code": "INTERNAL_ERROR", "message": "Internal server error", "details": str(e)}
+        )
+
+
 @router.get("/validate-consistency/{project_id}", response_model=DataValidationResult)
 async def validate_data_consistency(
     project_id: str,
@@ -12,6 +12,8 @@ from models.phase import Phase
 from models.project import Project
 from models.directory import Directory
 from models.elevation_glass import ElevationGlass
+from models.elevation_part import ElevationPart
+from services.parts_extractor import bill_of_materials
 # Import Celery tasks conditionally to avoid import errors in test environments
 try:
     from tasks.sqlite_parser_tasks import parse_elevation_sqlite_task
@@ -285,6 +287,68 @@ async def get_global_enrichment_status(db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@router.get("/parts/bom")
+async def get_bill_of_materials(
+    elevation_ids: Optional[List[int]] = Query(None, description="Elevations to include (default: all)"),
+    system_code: Optional[str] = Query(None, description="Filter by system code"),
+    article_number: Optional[str] = Query(None, description="Filter by article number"),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """Get part quantities per article across elevations from the parsed parts lists"""
+    
+    try:
+        articles = bill_of_materials(db, elevation_ids, system_code=system_code,
+                                     article_number=article_number, limit=limit)
+        return {
+            "articles": articles,
+            "count": len(articles),
+            "elevation_ids": elevation_ids
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/{elevation_id}/parts")
+async def get_elevation_parts(
+    elevation_id: int,
+    source_table: Optional[str] = Query(None, description="Only lines of this parts-list table"),
+    db: Session = Depends(get_db)
+):
+    """Get the part line items parsed from an elevation's parts list"""
+    
+    try:
+        query = db.query(ElevationPart).filter(ElevationPart.elevation_id == elevation_id)
+        if source_table:
+            query = query.filter(ElevationPart.source_table == source_table)
+        parts = query.order_by(ElevationPart.source_table, ElevationPart.line_no).all()
+        
+        return {
+            "elevation_id": elevation_id,
+            "parts": [
+                {
+                    "source_table": part.source_table,
+                    "line_no": part.line_no,
+                    "article_number": part.article_number,
+                    "description": part.description,
+                    "system_code": part.system_code,
+                    "color": part.color,
+                    "quantity": part.quantity,
+                    "unit": part.unit,
+                    "length": part.length,
+                    "weight": part.weight,
+                    "attributes": part.attributes
+                }
+                for part in parts
+            ],
+            "count": len(parts)
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
 @router.get("/{elevation_id}")
 async def get_elevation_details(elevation_id: int, db: Session = Depends(get_db)):
     """Get detailed elevation information including enriched data"""
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Dict, Optional
 from core.database import get_db
+from core.priority import interactive_work
 from services.directory_sync_service import DirectorySyncService
+from services.force_sync_jobs import FINISHED, stream_job_events, submit_force_sync_job, wait_for_job
 from services.project_sync_service import ProjectSyncService
 
 router = APIRouter(prefix="/sync/force", tags=["forced-sync"])
@@ -16,11 +19,12 @@ async def force_sync_directories_ui(db: Session = Depends(get_db)):
         settings = get_settings()
         
         directory_sync_service = DirectorySyncService(db)
-        result = await directory_sync_service.sync_directories_from_logikal(
-            settings.LOGIKAL_API_BASE_URL,
-            settings.LOGIKAL_AUTH_USERNAME,
-            settings.LOGIKAL_AUTH_PASSWORD
-        )
+        async with interactive_work():
+            result = await directory_sync_service.sync_directories_from_logikal(
+                settings.LOGIKAL_API_BASE_URL,
+                settings.LOGIKAL_AUTH_USERNAME,
+                settings.LOGIKAL_AUTH_PASSWORD
+            )
         
         if result['success']:
             return {
@@ -55,6 +59,7 @@ async def force_sync_directories_ui(db: Session = Depends(get_db)):
 async def force_sync_project_ui(
     project_id: str,
     directory_id: Optional[str] = Query(None, description="Directory ID for project context"),
+    delta: bool = Query(False, description="Only refresh phases and elevations whose Logikal changedDate changed"),
     db: Session = Depends(get_db)
 ):
     """Force sync specific project from Logikal (no authentication required for Odoo integration)"""
@@ -68,7 +73,8 @@ async def force_sync_project_ui(
             directory_id,
             settings.LOGIKAL_API_BASE_URL,
             settings.LOGIKAL_AUTH_USERNAME,
-            settings.LOGIKAL_AUTH_PASSWORD
+            settings.LOGIKAL_AUTH_PASSWORD,
+            delta=delta
         )
         
         if result['success']:
@@ -78,9 +84,12 @@ async def force_sync_project_ui(
                 "project_id": project_id,
                 "directory_id": directory_id,
                 "phases_synced": result.get('phases_synced', 0),
+                "phases_failed": result.get('phases_failed', 0),
                 "elevations_synced": result.get('elevations_synced', 0),
                 "parts_lists_synced": result.get('parts_lists_synced', 0),
                 "parts_lists_failed": result.get('parts_lists_failed', 0),
+                "errors": result.get('errors', []),
+                "skipped_unchanged": result.get('skipped_unchanged', []),
                 "duration_seconds": result.get('duration_seconds', 0)
             }
         else:
@@ -153,3 +162,97 @@ async def force_sync_directory_projects_ui(
                 "details": str(e)
             }
         )
+
+
+def _job_response(request: Request, job: Dict) -> Dict:
+    return {
+        "success": True,
+        "job_id": job['job_id'],
+        "status": job['status'],
+        "cached": job.get('cached', False),
+        "project_id": job['project_id'],
+        "directory_id": job['directory_id'],
+        "delta": job['delta'],
+        "stage": job.get('stage'),
+        "counters": job.get('counters', {}),
+        "result": job.get('result'),
+        "duration_seconds": job.get('duration_seconds'),
+        "status_url": str(request.url_for("get_force_sync_job", job_id=job['job_id'])),
+        "events_url": str(request.url_for("stream_force_sync_job", job_id=job['job_id']))
+    }
+
+
+@router.post("/project/{project_id}/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_force_sync_project_job(
+    project_id: str,
+    request: Request,
+    response: Response,
+    directory_id: Optional[str] = Query(None, description="Directory ID for project context"),
+    delta: bool = Query(False, description="Only refresh phases and elevations whose Logikal changedDate changed"),
+    refresh: bool = Query(False, description="Sync again even if a recent result is cached"),
+):
+    """
+    Start a force sync of a project as a background job (no authentication required for Odoo integration)
+    
+    Returns 202 with the job id right away; progress is available from the status
+    (long-poll) and events (Server-Sent Events) URLs. A request for a project that
+    is already being synced returns the running job; a recent result is returned
+    with 200 without syncing again.
+    """
+    try:
+        job = await submit_force_sync_job(project_id, directory_id, delta=delta, refresh=refresh)
+        if job['status'] in FINISHED:
+            response.status_code = status.HTTP_200_OK
+        return _job_response(request, job)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "code": "INTERNAL_ERROR",
+                "message": "Internal server error",
+                "details": str(e)
+            }
+        )
+
+
+@router.get("/jobs/{job_id}")
+async def get_force_sync_job(
+    job_id: str,
+    request: Request,
+    after: int = Query(0, ge=0, description="Only return progress events after this sequence number"),
+    wait: float = Query(0, ge=0, le=30, description="Seconds to wait for new progress (long-poll)")
+):
+    """Get the status, counters and new progress events of a force sync job"""
+    job = await wait_for_job(job_id, after=after, timeout=wait)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "code": "FORCE_SYNC_JOB_NOT_FOUND",
+                "message": f"Force sync job {job_id} not found"
+            }
+        )
+    return {**_job_response(request, job), "events": job['events']}
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_force_sync_job(
+    job_id: str,
+    after: int = Query(0, ge=0, description="Only stream progress events after this sequence number"),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID")
+):
+    """Stream the progress of a force sync job as Server-Sent Events until it finishes"""
+    if await wait_for_job(job_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "code": "FORCE_SYNC_JOB_NOT_FOUND",
+                "message": f"Force sync job {job_id} not found"
+            }
+        )
+    # Reconnecting EventSource clients resume after the last event they saw
+    return StreamingResponse(
+        stream_job_events(job_id, after=last_event_id if last_event_id is not None else after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from core.database import get_db
+from core.priority import interactive_work
 from services.direct_project_service import DirectProjectService
 from services.smart_sync_service import SmartSyncService
 from core.security import require_permission, get_current_client, require_projects_read, require_elevations_read
@@ -202,7 +203,8 @@ async def get_project_complete_for_odoo(
         # Check if smart sync is needed
         if auto_sync:
             sync_service = SmartSyncService(db)
-            sync_result = sync_service.sync_project_if_needed(project_id)
+            async with interactive_work():
+                sync_result = await sync_service.sync_project_if_needed(project_id)
             if not sync_result["success"]:
                 logger.warning(f"Smart sync failed for project {project_id}: {sync_result.get('error')}")
         
@@ -46,7 +46,7 @@ async def sync_directories_ui(db: Session = Depends(get_db)):
 
 @router.post("/directories/concurrent")
 async def sync_directories_concurrent_ui(db: Session = Depends(get_db)):
-    """Sync directories concurrently with 2 workers for UI (no authentication required)"""
+    """Sync directories concurrently under the adaptive concurrency limit for UI (no authentication required)"""
     try:
         # Try to get stored credentials from environment or use defaults
         from core.config_production import get_settings
@@ -268,10 +268,14 @@ async def trigger_full_sync(
     """Trigger a full sync operation"""
     try:
         sync_service = SyncService(db)
+        options = {'cache_mode': request.cache_mode} if request.cache_mode else {}
         result = await sync_service.full_sync(
             request.base_url, 
             request.username, 
-            request.password
+            request.password,
+            delta=request.delta,
+            resume=request.resume,
+            **options
         )
         
         if result['success']:
@@ -283,7 +287,9 @@ async def trigger_full_sync(
                 projects_processed=result.get('projects_processed', 0),
                 phases_processed=result.get('phases_processed', 0),
                 elevations_processed=result.get('elevations_processed', 0),
-                total_items=result.get('total_items', 0)
+                total_items=result.get('total_items', 0),
+                skipped_unchanged=result.get('skipped_unchanged', []),
+                resumed=result.get('resumed', False)
             )
         else:
             raise HTTPException(
@@ -316,10 +322,12 @@ async def trigger_incremental_sync(
     """Trigger an incremental sync operation"""
     try:
         sync_service = SyncService(db)
+        options = {'cache_mode': request.cache_mode} if request.cache_mode else {}
         result = await sync_service.incremental_sync(
             request.base_url, 
             request.username, 
-            request.password
+            request.password,
+            **options
         )
         
         if result['success']:
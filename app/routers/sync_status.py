@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import Optional
 from core.database import get_db
+from core.priority import interactive_work
 from core.security import get_current_client, require_permission
 from services.smart_sync_service import SmartSyncService
 from schemas.sync_status import SyncStatusResponse, SyncResultResponse, SyncStatusSummaryResponse
@@ -45,13 +46,14 @@ async def sync_project_if_needed(
 ):
     """
     Perform smart sync for a project if needed.
-    Only syncs if data is stale or if force_sync is True.
-    Implements cascading sync logic.
+    Only syncs if data is stale or if force_sync is True, and then only
+    re-reads the stale phases and elevations from Logikal.
     Requires 'projects:read' permission.
     """
     try:
         sync_service = SmartSyncService(db)
-        sync_result = sync_service.sync_project_if_needed(project_id, force_sync=force_sync)
+        async with interactive_work():
+            sync_result = await sync_service.sync_project_if_needed(project_id, force_sync=force_sync)
         
         return SyncResultResponse(**sync_result)
     except Exception as e:
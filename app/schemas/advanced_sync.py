@@ -58,6 +58,36 @@ class DependencySyncResult(BaseModel):
     success: bool
 
 
+class SyncPlanRequest(BaseModel):
+    """Request to compile and execute a sync plan"""
+    scope: str  # full, directory, project or selective
+    object_type: Optional[str] = None  # project, phase or elevation for selective plans
+    object_ids: List[str] = []
+    delta: bool = False
+    max_parallel_nodes: Optional[int] = None
+
+
+class SyncPlanResult(BaseModel):
+    """Result of an executed sync plan with per-node timings"""
+    success: bool
+    message: str
+    scope: str
+    duration_seconds: float
+    nodes_total: int
+    nodes_completed: int
+    nodes_failed: int
+    nodes_blocked: int
+    peak_parallel_nodes: int
+    directories_processed: int
+    projects_processed: int
+    phases_processed: int
+    elevations_processed: int
+    missing_ids: List[str]
+    skipped_unchanged: List[Dict[str, Any]]
+    errors: List[str]
+    nodes: List[Dict[str, Any]]
+
+
 class DataValidationResult(BaseModel):
     """Result of data validation"""
     project_id: str
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime
 
 
@@ -8,6 +8,11 @@ class SyncRequest(BaseModel):
     base_url: str = Field(..., description="Base URL of the Logikal API")
     username: str = Field(..., description="Logikal API username")
     password: str = Field(..., description="Logikal API password")
+    cache_mode: Optional[Literal["cache-ok", "must-revalidate"]] = Field(
+        None, description="Use cached Logikal listings ('cache-ok') or re-read them ('must-revalidate'); defaults per sync type"
+    )
+    delta: bool = Field(False, description="Skip projects, phases and elevations whose Logikal changedDate did not change")
+    resume: bool = Field(True, description="Continue an interrupted full sync from its last checkpoint instead of starting over")
 
 
 class SyncResponse(BaseModel):
@@ -20,6 +25,8 @@ class SyncResponse(BaseModel):
     phases_processed: int = Field(0, description="Number of phases processed")
     elevations_processed: int = Field(0, description="Number of elevations processed")
     total_items: int = Field(0, description="Total number of items processed")
+    skipped_unchanged: List[Dict[str, Any]] = Field(default_factory=list, description="Objects skipped by a delta sync")
+    resumed: bool = Field(False, description="Whether the sync continued from the checkpoint of an interrupted run")
 
 
 class SyncConfigResponse(BaseModel):
@@ -329,6 +329,31 @@ class AdvancedSyncService:
                 "completed_at": datetime.utcnow()
             }
 
+    async def run_sync_plan(self, scope: str, object_ids: List[str] = None, object_type: str = None,
+                            delta: bool = False, max_parallel_nodes: int = None) -> Dict:
+        """
+        Compile a full, directory, project or selective sync into a plan of
+        listing nodes and execute it with the configured Logikal credentials.
+        """
+        from core.config_production import get_settings
+        from services.sync_plan import compile_sync_plan
+        from services.sync_plan_executor import SyncPlanExecutor
+
+        plan = compile_sync_plan(self.db, scope, object_ids or [], object_type=object_type, delta=delta)
+        logger.info(f"Executing {scope} sync plan with {len(plan.nodes)} initial nodes (delta={delta})")
+
+        production_settings = get_settings()
+        executor = SyncPlanExecutor(
+            plan,
+            production_settings.LOGIKAL_API_BASE_URL,
+            production_settings.LOGIKAL_AUTH_USERNAME,
+            production_settings.LOGIKAL_AUTH_PASSWORD,
+            max_parallel_nodes=max_parallel_nodes
+        )
+        result = await executor.run()
+        result['scope'] = scope
+        return result
+
     def get_sync_dependencies(self, object_type: str, object_id: str) -> List[str]:
         """
         Get the dependency chain for syncing an object.
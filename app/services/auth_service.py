@@ -1,13 +1,13 @@
-import aiohttp
 import time
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, Tuple
+from typing import Any, Optional, Tuple
 from sqlalchemy.orm import Session
 from core.config import settings
 from core.retry import retry_async, auth_retry_config, auth_rate_limiter
+from core.connection_manager import get_logikal_session
 from models.session import Session as SessionModel
-from models.api_log import ApiLog
+from core.api_log_sink import get_api_log_sink
 
 logger = logging.getLogger(__name__)
 
@@ -21,19 +21,20 @@ class AuthService:
         self.current_directory: Optional[str] = None
         self.current_project: Optional[str] = None
         
-    @retry_async(config=auth_retry_config, rate_limiter=auth_rate_limiter)
+    # Logins take seconds regardless of load and must not drag the shared concurrency limit down
+    @retry_async(config=auth_retry_config, rate_limiter=auth_rate_limiter, record_latency=False)
     async def _authenticate_request(self, url: str, payload: dict) -> Tuple[bool, str, dict]:
         """Internal method to make the actual authentication request with retry logic"""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, timeout=30) as response:
-                response_text = await response.text()
+        session = await get_logikal_session(url)
+        async with session.post(url, json=payload, timeout=30) as response:
+            response_text = await response.text()
                 
-                if response.status == 200:
-                    data = await response.json()
-                    return True, "Authentication successful", data
-                else:
-                    error_msg = f"Authentication failed: {response.status} - {response_text}"
-                    raise Exception(error_msg)
+            if response.status == 200:
+                data = await response.json()
+                return True, "Authentication successful", data
+            else:
+                error_msg = f"Authentication failed: {response.status} - {response_text}"
+                raise Exception(error_msg)
     
     async def authenticate(self, base_url: str, username: str, password: str) -> Tuple[bool, str]:
         """Authenticate with Logikal API and return session token"""
@@ -80,7 +81,7 @@ class AuthService:
                         request_url=url,
                         request_method='POST',
                         request_payload=payload,
-                        response_body=str(data),
+                        response_body=data,
                         response_summary=f"Authenticated user: {data['data'].get('username', 'Unknown')}"
                     )
                     
@@ -97,7 +98,7 @@ class AuthService:
                         request_url=url,
                         request_method='POST',
                         request_payload=payload,
-                        response_body=str(data),
+                        response_body=data,
                         response_summary="Authentication failed - unexpected response structure"
                     )
                     return False, error_msg
@@ -199,33 +200,22 @@ class AuthService:
     
     async def _log_api_call(self, operation: str, status: str, response_code: int, 
                            duration: int, request_url: str = None, request_method: str = None,
-                           request_payload: dict = None, response_body: str = None,
+                           request_payload: dict = None, response_body: Any = None,
                            response_summary: str = None, error_message: str = None):
-        """Log API call to database"""
-        try:
-            # Extract endpoint from URL
-            endpoint = request_url.split('/')[-1] if request_url else operation
-            
-            api_log = ApiLog(
-                endpoint=endpoint,
-                method=request_method or 'POST',
-                status_code=response_code,
-                response_time_ms=duration,
-                success=(status == 'success'),
-                error_message=error_message,
-                request_url=request_url,
-                request_method=request_method,
-                request_payload=str(request_payload) if request_payload else None,
-                response_body=response_body,
-                response_summary=response_summary
-            )
-            
-            self.db.add(api_log)
-            # DO NOT commit or rollback - let the main transaction handle it
-            
-        except Exception as e:
-            logger.error(f"Failed to log API call: {str(e)}")
-            # DO NOT rollback - let the main transaction handle it
+        """Queue API call log record (buffered, written outside the sync transaction)"""
+        get_api_log_sink().record(
+            operation=operation,
+            success=(status == 'success'),
+            status_code=response_code,
+            duration_ms=duration,
+            request_url=request_url,
+            request_method=request_method,
+            default_method='POST',
+            request_payload=request_payload,
+            response_body=response_body,
+            response_summary=response_summary,
+            error_message=error_message
+        )
     
     async def reset_navigation(self, base_url: str, username: str, password: str) -> Tuple[bool, str]:
         """Reset navigation by re-authenticating to return to root directory context"""
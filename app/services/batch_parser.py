@@ -0,0 +1,163 @@
+"""
+Batch parsing of archived parts databases.
+
+Re-parsing after a parser change used to mean one Celery task, one database
+session and several commits per elevation. The batch parser reads the
+elevations of a batch in one query, extracts their SQLite files in the parse
+processes (one per core by default) and writes the results per chunk with a
+handful of statements: one UPDATE of the enrichment columns, one of the
+failures, the changed glass records only (see sync_glass_records), a DELETE
+and a COPY of the part line items, and one commit.
+"""
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.elevation import Elevation
+from models.parsing_error_log import ParsingErrorLog
+from services.bulk_upsert import bulk_update_rows
+from services.parts_extractor import replace_part_lines
+from services.parts_parse_stage import PartsParseStage
+from services.sqlite_parser_service import ParsingStatus, sync_glass_records
+
+logger = logging.getLogger(__name__)
+
+# Elevation columns written from the Elevations table of a parts database
+ELEVATION_DATA_COLUMNS = (
+    'auto_description', 'auto_description_short', 'width_out', 'width_unit', 'height_out', 'height_unit',
+    'weight_out', 'weight_unit', 'area_output', 'area_unit', 'system_code', 'system_name',
+    'system_long_name', 'color_base_long'
+)
+PARSED_COLUMNS = ELEVATION_DATA_COLUMNS + ('parse_status', 'parse_error', 'data_parsed_at', 'parts_file_hash')
+FAILED_COLUMNS = ('parse_status', 'parse_error', 'data_parsed_at')
+
+
+class BatchParser:
+    """Parses the parts databases of many elevations and persists them in bulk"""
+
+    def __init__(self, db: Session, processes: Optional[int] = None, chunk_size: Optional[int] = None):
+        self.db = db
+        if processes is None:
+            processes = settings.BATCH_PARSE_PROCESSES or os.cpu_count() or 1
+        self.chunk_size = chunk_size or settings.BATCH_PARSE_CHUNK_SIZE
+        # Enough queued work to keep every process busy while a chunk is written
+        self.stage = PartsParseStage(processes=processes, max_pending=processes * 2)
+
+    async def parse(self, elevation_ids: Sequence[int], force: bool = False) -> Dict:
+        """
+        Parse the archived parts databases of ``elevation_ids``.
+
+        Elevations whose file hash matches the last successful parse are
+        skipped unless ``force`` is set.
+        """
+        start_time = time.time()
+        totals = {'parsed': 0, 'skipped': 0, 'failed': 0, 'missing': 0, 'glass_records': 0, 'glass_changes': 0,
+                  'part_lines': 0}
+        errors: List[Dict] = []
+
+        try:
+            for start in range(0, len(elevation_ids), self.chunk_size):
+                chunk = list(elevation_ids[start:start + self.chunk_size])
+                result = await self._parse_chunk(chunk, force)
+                for key in totals:
+                    totals[key] += result[key]
+                errors.extend(result['errors'])
+                logger.info(f"Batch parse: {min(start + self.chunk_size, len(elevation_ids))}/{len(elevation_ids)} "
+                            f"elevations ({totals['parsed']} parsed, {totals['failed']} failed)")
+        finally:
+            self.stage.shutdown()
+
+        duration = time.time() - start_time
+        return {
+            'success': True,
+            'message': f"Parsed {totals['parsed']} of {len(elevation_ids)} elevations",
+            'count': totals['parsed'],
+            **totals,
+            'errors': errors[:100],
+            'duration_seconds': duration
+        }
+
+    async def _parse_chunk(self, elevation_ids: List[int], force: bool) -> Dict:
+        elevations = self.db.query(
+            Elevation.id, Elevation.name, Elevation.parts_db_path, Elevation.parts_file_hash, Elevation.parse_status
+        ).filter(Elevation.id.in_(elevation_ids)).all()
+        missing = len(elevation_ids) - len(elevations)
+
+        to_parse = []
+        for elevation in elevations:
+            if not elevation.parts_db_path:
+                missing += 1
+                continue
+            known_hash = None
+            if not force and elevation.parse_status == ParsingStatus.SUCCESS:
+                known_hash = elevation.parts_file_hash
+            to_parse.append((elevation, known_hash))
+
+        extractions = await asyncio.gather(*[
+            self.stage.extract_file(elevation.parts_db_path, elevation.name, known_hash)
+            for elevation, known_hash in to_parse
+        ])
+
+        now = datetime.utcnow()
+        parsed_rows, failed_rows, error_logs, errors = [], [], [], []
+        glass_by_elevation = {}
+        part_lines = {}
+        skipped = 0
+        for (elevation, _), extraction in zip(to_parse, extractions):
+            if extraction.get('skipped'):
+                skipped += 1
+            elif extraction['valid']:
+                elevation_data = extraction['elevation_data']
+                parsed_rows.append({
+                    'id': elevation.id,
+                    **{name: elevation_data.get(name) for name in ELEVATION_DATA_COLUMNS},
+                    'parse_status': ParsingStatus.SUCCESS,
+                    'parse_error': None,
+                    'data_parsed_at': now,
+                    'parts_file_hash': extraction['file_hash']
+                })
+                glass_by_elevation[elevation.id] = extraction['glass_data']
+                if extraction.get('part_lines') is not None:
+                    part_lines[elevation.id] = extraction['part_lines']
+            else:
+                status = (ParsingStatus.VALIDATION_FAILED if extraction['error_type'] == 'validation_failed'
+                          else ParsingStatus.FAILED)
+                failed_rows.append({'id': elevation.id, 'parse_status': status,
+                                    'parse_error': extraction['message'], 'data_parsed_at': now})
+                error_logs.append({'elevation_id': elevation.id, 'error_type': extraction['error_type'],
+                                   'error_message': extraction['message'],
+                                   'error_details': extraction.get('details') or {}, 'retry_count': 0})
+                errors.append({'elevation_id': elevation.id, 'error': extraction['message']})
+
+        try:
+            bulk_update_rows(self.db, Elevation, parsed_rows, PARSED_COLUMNS)
+            bulk_update_rows(self.db, Elevation, failed_rows, FAILED_COLUMNS)
+            glass_changes = sync_glass_records(self.db, glass_by_elevation)
+            part_line_count = replace_part_lines(self.db, part_lines)
+            if error_logs:
+                self.db.execute(insert(ParsingErrorLog.__table__), error_logs)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return {'parsed': len(parsed_rows), 'skipped': skipped, 'failed': len(failed_rows), 'missing': missing,
+                'glass_records': sum(len(glass) for glass in glass_by_elevation.values()),
+                'glass_changes': glass_changes['inserted'] + glass_changes['updated'] + glass_changes['deleted'],
+                'part_lines': part_line_count, 'errors': errors}
+
+
+def parseable_elevation_ids(db: Session) -> List[int]:
+    """IDs of all elevations with an archived parts database, in ID order"""
+    rows = db.query(Elevation.id).filter(
+        Elevation.has_parts_data == True,
+        Elevation.parts_db_path.isnot(None)
+    ).order_by(Elevation.id).all()
+    return [row.id for row in rows]
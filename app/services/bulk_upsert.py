@@ -0,0 +1,259 @@
+"""
+Set-based upserts of Logikal listings.
+
+A whole API listing (the projects of a directory, the phases of a project, ...)
+is written with one ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING id``
+statement per batch instead of a SELECT, an INSERT/UPDATE and a commit per
+row. Callers commit once per listing.
+
+``last_update_date`` keeps its previous value when a row comes without a
+usable ``changedDate``, exactly like the per-row code did.
+
+bulk_update_rows() and copy_rows() do the same for parser output: many rows
+updated by primary key in one ``UPDATE ... FROM (VALUES ...)`` and new rows
+loaded with ``COPY`` (executemany on SQLite).
+"""
+import csv
+import io
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Integer, bindparam, cast, column, func, update, values
+from sqlalchemy.orm import Session
+
+from models.directory import Directory
+from models.elevation import Elevation
+from models.phase import Phase
+from models.project import Project
+
+logger = logging.getLogger(__name__)
+
+# Default phase/elevation of a Logikal project that has no explicit ones
+NULL_GUID = '00000000-0000-0000-0000-000000000000'
+
+# Rows per statement; keeps bind parameters well below the PostgreSQL limit
+UPSERT_BATCH_SIZE = 1000
+
+
+def parse_changed_date(value, name: str = None) -> Optional[datetime]:
+    """Convert a Logikal ``changedDate`` (Unix timestamp) to an aware datetime"""
+    if not value:
+        return None
+    try:
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    except (ValueError, TypeError, OverflowError) as e:
+        logger.warning(f"Failed to parse changedDate for {name or 'object'}: {e}")
+        return None
+
+
+def _insert(db: Session):
+    """Dialect-specific INSERT supporting ON CONFLICT"""
+    if db.get_bind().dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert
+
+
+def upsert_rows(db: Session, model, rows: Sequence[Dict], conflict_columns: Sequence[str],
+                update_columns: Iterable[str], keep_existing: Iterable[str] = ()) -> Dict[Tuple, int]:
+    """
+    Upsert ``rows`` into ``model``'s table and return ``{conflict key: id}``.
+
+    ``keep_existing`` columns are only overwritten when the new value is not
+    NULL. Duplicate keys within ``rows`` are collapsed (the last one wins, as
+    with sequential updates). Nothing is committed.
+    """
+    if not rows:
+        return {}
+
+    deduplicated: Dict[Tuple, Dict] = {}
+    for row in rows:
+        deduplicated[tuple(row[name] for name in conflict_columns)] = row
+    rows = list(deduplicated.values())
+
+    insert = _insert(db)
+    table = model.__table__
+    keep_existing = set(keep_existing)
+    ids: Dict[Tuple, int] = {}
+
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        statement = insert(table).values(rows[start:start + UPSERT_BATCH_SIZE])
+        set_ = {}
+        for name in update_columns:
+            if name in keep_existing:
+                set_[name] = func.coalesce(statement.excluded[name], table.c[name])
+            else:
+                set_[name] = statement.excluded[name]
+        if 'updated_at' in table.c:
+            set_['updated_at'] = func.now()
+        statement = statement.on_conflict_do_update(index_elements=list(conflict_columns), set_=set_)
+        statement = statement.returning(table.c.id, *[table.c[name] for name in conflict_columns])
+
+        for returned in db.execute(statement):
+            ids[tuple(returned[1:])] = returned[0]
+    return ids
+
+
+def bulk_update_rows(db: Session, model, rows: Sequence[Dict], columns: Sequence[str]) -> int:
+    """
+    Set ``columns`` of the ``model`` rows identified by each row's ``id``.
+
+    Returns the number of rows given. Nothing is committed.
+    """
+    if not rows:
+        return 0
+
+    table = model.__table__
+    if db.get_bind().dialect.name == 'sqlite':
+        # SQLite has no column list for VALUES aliases - one executemany instead
+        statement = update(table).where(table.c.id == bindparam('row_id')).values(
+            {name: bindparam(f'new_{name}') for name in columns}
+        )
+        db.execute(statement, [{'row_id': row['id'], **{f'new_{name}': row[name] for name in columns}}
+                               for row in rows])
+        return len(rows)
+
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        batch = rows[start:start + UPSERT_BATCH_SIZE]
+        data = values(
+            column('id', Integer), *[column(name, table.c[name].type) for name in columns], name='new_values'
+        ).data([(row['id'], *[row[name] for name in columns]) for row in batch])
+        # Casts keep all-NULL VALUES columns (typed text by PostgreSQL) assignable
+        db.execute(
+            update(table).where(table.c.id == data.c.id).values(
+                {name: cast(data.c[name], table.c[name].type) for name in columns}
+            )
+        )
+    return len(rows)
+
+
+def copy_rows(db: Session, model, columns: Sequence[str], rows: Sequence[Sequence]) -> int:
+    """
+    Insert ``rows`` (tuples in ``columns`` order) into ``model``'s table.
+
+    Uses ``COPY ... FROM STDIN`` on PostgreSQL, within the session's
+    transaction. Returns the number of rows. Nothing is committed.
+    """
+    if not rows:
+        return 0
+
+    table = model.__table__
+    if db.get_bind().dialect.name != 'postgresql':
+        db.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+        return len(rows)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([r'\N' if value is None else json.dumps(value) if isinstance(value, (dict, list)) else value
+                         for value in row])
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer
+        )
+    finally:
+        cursor.close()
+    return len(rows)
+
+
+def bulk_upsert_projects(db: Session, projects_data: List[Dict], directory_id: Optional[int]) -> Dict[str, int]:
+    """Upsert the projects of one directory listing; returns ``{logikal_id: id}``"""
+    now = datetime.utcnow()
+    rows = []
+    for project_data in projects_data:
+        identifier = project_data.get('id', '')
+        name = project_data.get('name', 'Unnamed Project')
+        if not identifier:
+            logger.error(f"Project data missing 'id' field, skipping: {project_data}")
+            continue
+        rows.append({
+            'logikal_id': identifier,
+            'name': name,
+            'directory_id': directory_id,
+            'last_sync_date': now,
+            'last_update_date': parse_changed_date(project_data.get('changedDate'), f"project {name}"),
+        })
+
+    ids = upsert_rows(db, Project, rows, ('logikal_id',),
+                      ('name', 'directory_id', 'last_sync_date', 'last_update_date'),
+                      keep_existing=('last_update_date',))
+    return {key[0]: row_id for key, row_id in ids.items()}
+
+
+def bulk_upsert_phases(db: Session, phases_data: List[Dict], project_id: int) -> Dict[str, int]:
+    """Upsert the phases of one project listing; returns ``{logikal_id: id}``"""
+    now = datetime.utcnow()
+    rows = []
+    for phase_data in phases_data:
+        name = phase_data.get('name', 'Unnamed Phase')
+        rows.append({
+            # Store null GUIDs as-is - the default phase of a project without explicit phases
+            'logikal_id': phase_data.get('id') or NULL_GUID,
+            'name': name,
+            'project_id': project_id,
+            'synced_at': now,
+            'sync_status': 'synced',
+            'last_sync_date': now,
+            'last_update_date': parse_changed_date(phase_data.get('changedDate'), f"phase {name}"),
+        })
+
+    ids = upsert_rows(db, Phase, rows, ('logikal_id', 'project_id'),
+                      ('name', 'synced_at', 'sync_status', 'last_sync_date', 'last_update_date'),
+                      keep_existing=('last_update_date',))
+    return {key[0]: row_id for key, row_id in ids.items()}
+
+
+def bulk_upsert_elevations(db: Session, elevations_data: List[Dict], phase_id: int) -> Dict[str, int]:
+    """Upsert the elevations of one phase listing; returns ``{logikal_id: id}``"""
+    now = datetime.utcnow()
+    rows = []
+    for elevation_data in elevations_data:
+        name = elevation_data.get('name', 'Unnamed Elevation')
+        rows.append({
+            'logikal_id': elevation_data.get('id') or NULL_GUID,
+            'name': name,
+            'phase_id': phase_id,
+            'synced_at': now,
+            'sync_status': 'synced',
+            'last_sync_date': now,
+            'last_update_date': parse_changed_date(elevation_data.get('changedDate'), f"elevation {name}"),
+        })
+
+    ids = upsert_rows(db, Elevation, rows, ('logikal_id',),
+                      ('name', 'phase_id', 'synced_at', 'sync_status', 'last_sync_date', 'last_update_date'),
+                      keep_existing=('last_update_date',))
+    return {key[0]: row_id for key, row_id in ids.items()}
+
+
+def bulk_upsert_directories(db: Session, directories_data: List[Dict], parent_id: Optional[int],
+                            level: int) -> Dict[str, int]:
+    """Upsert the child folders of one directory listing; returns ``{logikal_id: id}``"""
+    now = datetime.utcnow()
+    rows = []
+    for directory_data in directories_data:
+        # Logikal API uses the 'path' field as identifier
+        identifier = directory_data.get('path', directory_data.get('name', ''))
+        name = directory_data.get('name', 'Unnamed Directory')
+        if not identifier:
+            logger.warning(f"Directory data missing both 'path' and 'name' fields, skipping: {directory_data}")
+            continue
+        rows.append({
+            'logikal_id': identifier,
+            'name': name,
+            'full_path': directory_data.get('path', name),
+            'level': level,
+            'parent_id': parent_id,
+            'exclude_from_sync': False,  # Only applies to new folders - never updated here
+            'synced_at': now,
+            'sync_status': 'synced',
+        })
+
+    ids = upsert_rows(db, Directory, rows, ('logikal_id',),
+                      ('name', 'full_path', 'level', 'parent_id', 'synced_at', 'sync_status'))
+    return {key[0]: row_id for key, row_id in ids.items()}
@@ -0,0 +1,123 @@
+"""
+changedDate-driven pruning of Logikal listings.
+
+Every listing entry carries Logikal's ``changedDate``, which is stored as
+``last_update_date``. In delta mode a listing is split before anything below
+it is navigated or downloaded: entries whose ``changedDate`` equals the stored
+value - and whose subtree finished syncing after that change - are skipped.
+
+A subtree counts as finished when each of its elevations has a thumbnail and
+a parts list synced after the elevation's last change, so an interrupted run
+is picked up again by the next one even though the listing did not move.
+"""
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from models.elevation import Elevation
+from models.phase import Phase
+from models.project import Project
+from services.bulk_upsert import NULL_GUID, parse_changed_date
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DeltaPartition:
+    """A listing split into entries to sync and entries left alone"""
+    object_type: str
+    changed: List[Dict] = field(default_factory=list)
+    unchanged: List[Dict] = field(default_factory=list)
+
+    def skipped(self) -> List[Dict]:
+        """Skip records for the sync result"""
+        return [{
+            'type': self.object_type,
+            'logikal_id': item.get('id') or NULL_GUID,
+            'name': item.get('name'),
+            'changed_date': item.get('changedDate'),
+            'reason': 'unchanged'
+        } for item in self.unchanged]
+
+
+def _same_instant(stored: Optional[datetime], changed_date) -> bool:
+    """Whether a stored last_update_date matches a listed changedDate"""
+    listed = parse_changed_date(changed_date)
+    if stored is None or listed is None:
+        return False
+    if stored.tzinfo is None:
+        stored = stored.replace(tzinfo=timezone.utc)
+    return abs((stored - listed).total_seconds()) < 1
+
+
+def incomplete_elevation():
+    """Elevations whose thumbnail or parts list is missing or older than their last change"""
+    return or_(
+        Elevation.image_path.is_(None),
+        Elevation.parts_synced_at.is_(None),
+        Elevation.parts_synced_at < Elevation.last_update_date
+    )
+
+
+def _partition(object_type: str, items: List[Dict], stored: Dict[str, Optional[datetime]],
+               incomplete: Set[str]) -> DeltaPartition:
+    partition = DeltaPartition(object_type)
+    for item in items:
+        identifier = item.get('id') or NULL_GUID
+        if (identifier in stored and identifier not in incomplete
+                and _same_instant(stored[identifier], item.get('changedDate'))):
+            partition.unchanged.append(item)
+        else:
+            partition.changed.append(item)
+    if partition.unchanged:
+        logger.info(f"Delta sync: {len(partition.unchanged)} of {len(items)} {object_type}s unchanged, skipping")
+    return partition
+
+
+def partition_projects(db: Session, projects_data: List[Dict]) -> DeltaPartition:
+    """Split a project listing; must run before the listing is upserted"""
+    identifiers = [item.get('id') for item in projects_data if item.get('id')]
+    if not identifiers:
+        return DeltaPartition('project', changed=list(projects_data))
+
+    stored = dict(db.query(Project.logikal_id, Project.last_update_date)
+                  .filter(Project.logikal_id.in_(identifiers)).all())
+    # Projects without phases were never walked; projects with unfinished elevations are retried
+    walked = {logikal_id for (logikal_id,) in db.query(Project.logikal_id)
+              .join(Phase, Phase.project_id == Project.id)
+              .filter(Project.logikal_id.in_(identifiers)).distinct()}
+    unfinished = {logikal_id for (logikal_id,) in db.query(Project.logikal_id)
+                  .join(Phase, Phase.project_id == Project.id)
+                  .join(Elevation, Elevation.phase_id == Phase.id)
+                  .filter(Project.logikal_id.in_(identifiers), incomplete_elevation()).distinct()}
+    return _partition('project', projects_data, stored, (set(stored) - walked) | unfinished)
+
+
+def partition_phases(db: Session, phases_data: List[Dict], project_id: int) -> DeltaPartition:
+    """Split the phase listing of one project; must run before the listing is upserted"""
+    stored = dict(db.query(Phase.logikal_id, Phase.last_update_date)
+                  .filter(Phase.project_id == project_id).all())
+    walked = {logikal_id for (logikal_id,) in db.query(Phase.logikal_id)
+              .join(Elevation, Elevation.phase_id == Phase.id)
+              .filter(Phase.project_id == project_id).distinct()}
+    unfinished = {logikal_id for (logikal_id,) in db.query(Phase.logikal_id)
+                  .join(Elevation, Elevation.phase_id == Phase.id)
+                  .filter(Phase.project_id == project_id, incomplete_elevation()).distinct()}
+    return _partition('phase', phases_data, stored, (set(stored) - walked) | unfinished)
+
+
+def partition_elevations(db: Session, elevations_data: List[Dict]) -> DeltaPartition:
+    """Split the elevation listing of one phase; must run before the listing is upserted"""
+    identifiers = [item.get('id') or NULL_GUID for item in elevations_data]
+    if not identifiers:
+        return DeltaPartition('elevation')
+
+    stored = dict(db.query(Elevation.logikal_id, Elevation.last_update_date)
+                  .filter(Elevation.logikal_id.in_(identifiers)).all())
+    unfinished = {logikal_id for (logikal_id,) in db.query(Elevation.logikal_id)
+                  .filter(Elevation.logikal_id.in_(identifiers), incomplete_elevation())}
+    return _partition('elevation', elevations_data, stored, unfinished)
@@ -1,11 +1,12 @@
-import aiohttp
 import time
 import logging
-from typing import List, Optional, Tuple
+from typing import Any, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from core.retry import retry_async, default_retry_config, api_rate_limiter
+from core.retry import retry_async, default_retry_config, navigation_rate_limiter, listing_rate_limiter
+from core.connection_manager import get_logikal_session
 from models.directory import Directory
-from models.api_log import ApiLog
+from services.bulk_upsert import upsert_rows
+from core.api_log_sink import get_api_log_sink
 from schemas.directory import DirectoryCreate, DirectoryUpdate
 
 logger = logging.getLogger(__name__)
@@ -21,20 +22,20 @@ class DirectoryService:
         self.current_directory: Optional[str] = None
         self.enable_logging = enable_logging
         
-    @retry_async(config=default_retry_config, rate_limiter=api_rate_limiter)
+    @retry_async(config=default_retry_config, rate_limiter=listing_rate_limiter)
     async def _get_directories_request(self, url: str, headers: dict) -> Tuple[bool, List[dict], str]:
         """Internal method to make the actual directories request with retry logic"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, timeout=30) as response:
-                response_text = await response.text()
+        session = await get_logikal_session(url)
+        async with session.get(url, headers=headers, timeout=30) as response:
+            response_text = await response.text()
                 
-                if response.status == 200:
-                    data = await response.json()
-                    directories = data.get('data', []) if isinstance(data, dict) else data
-                    return True, directories, "Success"
-                else:
-                    error_msg = f"Failed to get directories: {response.status} - {response_text}"
-                    raise Exception(error_msg)
+            if response.status == 200:
+                data = await response.json()
+                directories = data.get('data', []) if isinstance(data, dict) else data
+                return True, directories, "Success"
+            else:
+                error_msg = f"Failed to get directories: {response.status} - {response_text}"
+                raise Exception(error_msg)
     
     async def get_directories(self) -> Tuple[bool, List[dict], str]:
         """Get directories from current context (root or selected folder)"""
@@ -61,7 +62,7 @@ class DirectoryService:
                     duration=duration,
                     request_url=url,
                     request_method='GET',
-                    response_body=str(directories),
+                    response_body=directories,
                     response_summary=f"Retrieved {len(directories)} directories"
                 )
                 
@@ -86,18 +87,18 @@ class DirectoryService:
             )
             return False, [], error_msg
     
-    @retry_async(config=default_retry_config, rate_limiter=api_rate_limiter)
+    @retry_async(config=default_retry_config, rate_limiter=navigation_rate_limiter)
     async def _select_directory_request(self, url: str, payload: dict, headers: dict) -> Tuple[bool, str]:
         """Internal method to make the actual directory selection request with retry logic"""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=headers, timeout=30) as response:
-                response_text = await response.text()
+        session = await get_logikal_session(url)
+        async with session.post(url, json=payload, headers=headers, timeout=30) as response:
+            response_text = await response.text()
                 
-                if response.status == 200:
-                    return True, "Directory selected successfully"
-                else:
-                    error_msg = f"Failed to select directory: {response.status} - {response_text}"
-                    raise Exception(error_msg)
+            if response.status == 200:
+                return True, "Directory selected successfully"
+            else:
+                error_msg = f"Failed to select directory: {response.status} - {response_text}"
+                raise Exception(error_msg)
     
     async def select_directory(self, identifier: str) -> Tuple[bool, str]:
         """Select a directory by identifier (required for folder-scoped operations)"""
@@ -232,27 +233,14 @@ class DirectoryService:
     async def cache_directories(self, directories: List[dict]) -> bool:
         """Cache directories in PostgreSQL database"""
         try:
-            for dir_data in directories:
-                # Extract identifier - Logikal API uses 'path' field as identifier
-                identifier = dir_data.get('path', '')
-                
-                # Check if directory already exists
-                existing_dir = self.db.query(Directory).filter(
-                    Directory.logikal_id == identifier
-                ).first()
-                
-                if existing_dir:
-                    # Update existing directory
-                    existing_dir.name = dir_data.get('name', existing_dir.name)
-                    existing_dir.parent_id = dir_data.get('parent_id', existing_dir.parent_id)
-                else:
-                    # Create new directory
-                    new_directory = Directory(
-                        logikal_id=identifier,
-                        name=dir_data.get('name', ''),
-                        parent_id=dir_data.get('parent_id')
-                    )
-                    self.db.add(new_directory)
+            # Logikal API uses the 'path' field as identifier; one statement for the whole listing
+            rows = [{
+                'logikal_id': dir_data.get('path', ''),
+                'name': dir_data.get('name', ''),
+                'parent_id': dir_data.get('parent_id'),
+            } for dir_data in directories]
+            upsert_rows(self.db, Directory, rows, ('logikal_id',), ('name', 'parent_id'),
+                        keep_existing=('parent_id',))
             
             self.db.commit()
             logger.info(f"Cached {len(directories)} directories in database")
@@ -470,33 +458,22 @@ class DirectoryService:
     
     async def _log_api_call(self, operation: str, status: str, response_code: int, 
                            duration: int, request_url: str = None, request_method: str = None,
-                           request_payload: dict = None, response_body: str = None,
+                           request_payload: dict = None, response_body: Any = None,
                            response_summary: str = None, error_message: str = None):
-        """Log API call to database (only if logging is enabled)"""
+        """Queue API call log record (only if logging is enabled)"""
         if not self.enable_logging:
             return  # Skip logging if disabled
         
-        try:
-            # Extract endpoint from URL
-            endpoint = request_url.split('/')[-1] if request_url else operation
-            
-            api_log = ApiLog(
-                endpoint=endpoint,
-                method=request_method or 'GET',
-                status_code=response_code,
-                response_time_ms=duration,
-                success=(status == 'success'),
-                error_message=error_message,
-                request_url=request_url,
-                request_method=request_method,
-                request_payload=str(request_payload) if request_payload else None,
-                response_body=response_body,
-                response_summary=response_summary
-            )
-            
-            self.db.add(api_log)
-            # DO NOT commit or rollback - let the main transaction handle it
-            
-        except Exception as e:
-            logger.error(f"Failed to log API call: {str(e)}")
-            # DO NOT rollback - let the main transaction handle it
+        get_api_log_sink().record(
+            operation=operation,
+            success=(status == 'success'),
+            status_code=response_code,
+            duration_ms=duration,
+            request_url=request_url,
+            request_method=request_method,
+            default_method='GET',
+            request_payload=request_payload,
+            response_body=response_body,
+            response_summary=response_summary,
+            error_message=error_message
+        )
@@ -3,12 +3,17 @@ import time
 import logging
 import asyncio
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from models.directory import Directory
+from core.adaptive_concurrency import get_concurrency_limiter
 from models.sync_log import SyncLog
 from services.auth_service import AuthService
 from services.directory_service import DirectoryService
+from services.logikal_session_pool import get_logikal_session_pool
+from services.logikal_navigation import NavigationContext, NavigationSession, ROOT_CONTEXT
+from services.logikal_listing_cache import MUST_REVALIDATE, get_listing_cache
+from services.bulk_upsert import bulk_upsert_directories
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +26,14 @@ class DirectorySyncService:
         self.auth_service = AuthService(db)
         self.directory_service = None  # Will be initialized per operation
     
-    async def discover_and_sync_directories(self, base_url: str, username: str, password: str) -> Dict:
+    async def discover_and_sync_directories(self, base_url: str, username: str, password: str,
+                                            cache_mode: str = MUST_REVALIDATE) -> Dict:
         """
         Optimized directory discovery and sync following the Odoo module pattern
         Uses one session per root folder tree with path-based navigation
+        
+        With ``cache_mode='cache-ok'`` cached directory listings are used and a
+        session is only leased for listings that are not cached.
         """
         sync_start_time = time.time()
         sync_log = None
@@ -43,7 +52,7 @@ class DirectorySyncService:
             logger.info("Starting optimized directory discovery and sync")
             
             # Step 1: Discovery session to find root directories (one-time auth)
-            root_directories = await self._discover_root_directories(base_url, username, password)
+            root_directories = await self._discover_root_directories(base_url, username, password, cache_mode)
             logger.info(f"Discovery session found {len(root_directories)} root directories")
             
             total_directories = 0
@@ -62,7 +71,7 @@ class DirectorySyncService:
                 
                 # Process the complete directory tree for this root with one session
                 directory_count = await self._process_root_directory_tree(
-                    base_url, username, password, root_directory
+                    base_url, username, password, root_directory, cache_mode
                 )
                 total_directories += directory_count
                 logger.info(f"Completed root directory '{root_name}': {directory_count} total directories")
@@ -112,9 +121,10 @@ class DirectorySyncService:
                 'error': str(e)
             }
     
-    async def discover_and_sync_directories_concurrent(self, base_url: str, username: str, password: str) -> Dict:
+    async def discover_and_sync_directories_concurrent(self, base_url: str, username: str, password: str,
+                                                       cache_mode: str = MUST_REVALIDATE) -> Dict:
         """
-        Concurrent directory discovery and sync with 2 workers for conservative testing
+        Concurrent directory discovery and sync under the adaptive Logikal concurrency limit
         Uses asyncio.gather to process root directory trees in parallel
         """
         sync_start_time = time.time()
@@ -125,16 +135,16 @@ class DirectorySyncService:
             sync_log = SyncLog(
                 sync_type='directory_concurrent',
                 status='started',
-                message='Concurrent directory discovery and sync started (2 workers)',
+                message='Concurrent directory discovery and sync started (adaptive workers)',
                 started_at=datetime.utcnow()
             )
             self.db.add(sync_log)
             self.db.commit()
             
-            logger.info("Starting concurrent directory discovery and sync (2 workers)")
+            logger.info(f"Starting concurrent directory discovery and sync ({get_concurrency_limiter().limit} workers)")
             
             # Step 1: Discovery session to find root directories (one-time auth)
-            root_directories = await self._discover_root_directories(base_url, username, password)
+            root_directories = await self._discover_root_directories(base_url, username, password, cache_mode)
             logger.info(f"Discovery session found {len(root_directories)} root directories")
             
             # Step 2: Filter out excluded directories
@@ -149,7 +159,7 @@ class DirectorySyncService:
             
             # Step 3: Process root directory trees concurrently with semaphore limit
             total_directories = await self._process_root_trees_concurrently(
-                base_url, username, password, processable_roots
+                base_url, username, password, processable_roots, cache_mode
             )
             
             # Calculate duration
@@ -173,7 +183,7 @@ class DirectorySyncService:
                 'count': total_directories,
                 'duration_seconds': duration,
                 'directories_processed': total_directories,
-                'concurrent_workers': 2
+                'concurrent_workers': get_concurrency_limiter().limit
             }
             
         except Exception as e:
@@ -199,23 +209,23 @@ class DirectorySyncService:
             }
     
     async def _process_root_trees_concurrently(self, base_url: str, username: str, password: str, 
-                                             root_directories: List[Dict]) -> int:
+                                             root_directories: List[Dict],
+                                             cache_mode: str = MUST_REVALIDATE) -> int:
         """
-        Process root directory trees concurrently with conservative 2-worker limit
+        Process root directory trees concurrently under the adaptive Logikal concurrency limit
         """
-        # Conservative limit of 2 concurrent workers to avoid API overload
-        MAX_CONCURRENT_WORKERS = 2
-        semaphore = asyncio.Semaphore(MAX_CONCURRENT_WORKERS)
+        # Shared AIMD limit - grows while Logikal stays fast and backs off on 429/5xx
+        limiter = get_concurrency_limiter()
         
         async def process_with_semaphore(root_directory):
-            """Process a single root directory tree with semaphore protection"""
-            async with semaphore:
+            """Process a single root directory tree within a concurrency slot"""
+            async with limiter.slot():
                 root_name = root_directory.get('name', 'Unknown')
                 logger.info(f"Starting concurrent processing of root directory tree: {root_name}")
                 
                 try:
                     result = await self._process_root_directory_tree(
-                        base_url, username, password, root_directory
+                        base_url, username, password, root_directory, cache_mode
                     )
                     logger.info(f"Completed concurrent processing of '{root_name}': {result} directories")
                     return result
@@ -227,7 +237,7 @@ class DirectorySyncService:
         tasks = [process_with_semaphore(rd) for rd in root_directories]
         
         # Process all root directory trees concurrently
-        logger.info(f"Launching {len(tasks)} concurrent tasks with {MAX_CONCURRENT_WORKERS} worker limit")
+        logger.info(f"Launching {len(tasks)} concurrent tasks with adaptive worker limit (currently {limiter.limit})")
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
         # Aggregate results and handle exceptions
@@ -248,22 +258,23 @@ class DirectorySyncService:
         
         return total_directories
     
-    async def _discover_root_directories(self, base_url: str, username: str, password: str) -> List[Dict]:
+    async def _discover_root_directories(self, base_url: str, username: str, password: str,
+                                         cache_mode: str = MUST_REVALIDATE) -> List[Dict]:
         """Discover root directories using a temporary session"""
         try:
-            # Create discovery session
-            logger.info("Authenticating for root directory discovery")
-            success, token = await self.auth_service.authenticate(base_url, username, password)
-            
-            if not success:
-                raise Exception(f"Authentication failed: {token}")
-            
-            # Get root directories
-            directory_service = DirectoryService(self.db, token, base_url)
-            success, directories, message = await directory_service.get_directories()
+            async def fetch_root_directories() -> List[Dict]:
+                # Lease a clean session - root listing needs the post-login context
+                logger.info("Leasing session for root directory discovery")
+                async with get_logikal_session_pool(base_url, username, password).lease() as lease:
+                    directory_service = DirectoryService(self.db, lease.token, base_url)
+                    success, directories, message = await directory_service.get_directories()
+                if not success:
+                    raise Exception(f"Failed to get root directories: {message}")
+                return directories
             
-            if not success:
-                raise Exception(f"Failed to get root directories: {message}")
+            directories = await get_listing_cache().get_listing(
+                base_url, ROOT_CONTEXT, 'directories', fetch_root_directories, cache_mode
+            )
             
             logger.info(f"Discovery session retrieved {len(directories)} root directories")
             return directories
@@ -273,12 +284,42 @@ class DirectorySyncService:
             raise
     
     async def _process_root_directory_tree(self, base_url: str, username: str, password: str, 
-                                         root_directory: Dict) -> int:
+                                         root_directory: Dict, cache_mode: str = MUST_REVALIDATE) -> int:
         """
         Process a complete root directory tree with dedicated session using path-based navigation
         Following the Odoo module pattern for optimized session management
+        
+        The session is only leased once a listing has to be read from Logikal,
+        and navigation issues only the selects that listing needs.
         """
         directory_count = 0
+        session_pool = get_logikal_session_pool(base_url, username, password)
+        lease = None
+        navigation = None
+        
+        async def list_children(path: str) -> List[Dict]:
+            """Child folders of ``path``, from the listing cache when ``cache_mode`` allows"""
+            target = NavigationContext(directory=path)
+            
+            async def fetch_children() -> List[Dict]:
+                nonlocal lease, navigation
+                if navigation is None:
+                    # Lease a dedicated session for this root directory tree
+                    lease = await session_pool.acquire(target=target)
+                    navigation = NavigationSession(self.db, lease, base_url, pool=session_pool)
+                
+                logger.info(f"Navigating to folder using path: {path}")
+                success, message = await navigation.navigate_to(target)
+                if not success:
+                    raise Exception(f"Failed to select directory {path}: {message}")
+                
+                directory_service = DirectoryService(self.db, navigation.token, base_url)
+                success, directories, message = await directory_service.get_directories()
+                if not success:
+                    raise Exception(message)
+                return directories
+            
+            return await get_listing_cache().get_listing(base_url, target, 'directories', fetch_children, cache_mode)
         
         try:
             # Extract root directory information
@@ -288,25 +329,7 @@ class DirectorySyncService:
             if not root_path:
                 raise ValueError(f"Root directory missing 'path' and 'name' fields: {root_directory}")
             
-            logger.info(f"Starting dedicated session for root directory tree: {root_name} (path: {root_path})")
-            
-            # Create dedicated session for this root directory tree
-            success, token = await self.auth_service.authenticate(base_url, username, password)
-            
-            if not success:
-                logger.error(f"Failed to authenticate for root directory tree: {root_name}")
-                return directory_count
-            
-            # Initialize directory service with the session
-            directory_service = DirectoryService(self.db, token, base_url)
-            
-            # Select the root directory using path-based navigation
-            logger.info(f"Selecting root directory using path: {root_path}")
-            success, message = await directory_service.select_directory(root_path)
-            
-            if not success:
-                logger.warning(f"Failed to select root directory {root_path}: {message}")
-                # Continue anyway - the directory might still be accessible
+            logger.info(f"Processing root directory tree: {root_name} (path: {root_path})")
             
             # Create the root directory record
             root_directory_record = await self._create_or_update_directory(root_directory, parent_id=None, level=0)
@@ -315,7 +338,7 @@ class DirectorySyncService:
             
             # Process all children recursively within this session using path-based navigation
             child_count = await self._process_folder_children_optimized(
-                directory_service, root_directory_record, root_path
+                list_children, root_directory_record, root_path
             )
             directory_count += child_count
             
@@ -325,21 +348,24 @@ class DirectorySyncService:
         except Exception as e:
             logger.error(f"Error processing root directory tree '{root_name}': {str(e)}")
             raise
+        finally:
+            if lease:
+                await session_pool.release(lease)
     
-    async def _process_folder_children_optimized(self, directory_service: DirectoryService, 
+    async def _process_folder_children_optimized(self, list_children: Callable[[str], Awaitable[List[Dict]]], 
                                                parent_folder_record: 'Directory', parent_path: str) -> int:
         """
-        Process child folders using path-based navigation with state continuity
+        Process child folders using path-based navigation
         Following the Odoo module pattern for recursive tree processing
         """
         child_count = 0
         
         try:
-            # Get child directories of currently selected folder
-            success, child_directories, message = await directory_service.get_directories()
-            
-            if not success:
-                logger.warning(f"Failed to get children for folder {parent_folder_record.name}: {message}")
+            # Get child directories of the folder
+            try:
+                child_directories = await list_children(parent_path)
+            except Exception as e:
+                logger.warning(f"Failed to get children for folder {parent_folder_record.name}: {str(e)}")
                 return child_count
             
             logger.info(f"Found {len(child_directories)} children in folder: {parent_folder_record.name}")
@@ -348,73 +374,42 @@ class DirectorySyncService:
                 logger.debug(f"No children found in folder: {parent_folder_record.name}")
                 return child_count
             
-            # Process children with path-based navigation (state continuity)
-            logger.info(f"Processing {len(child_directories)} child folders with path-based navigation")
-            
+            child_folders = []
             for child_folder in child_directories:
+                # Use 'path' for navigation, 'name' for display (following Odoo pattern)
+                if not child_folder.get('path'):
+                    logger.warning(f"Child folder missing 'path' field, skipping: {child_folder}")
+                    continue
+                child_folders.append(child_folder)
+            
+            # Create all child folder records of this listing in one statement and commit once
+            try:
+                child_ids = bulk_upsert_directories(
+                    self.db, child_folders,
+                    parent_id=parent_folder_record.id,
+                    level=parent_folder_record.level + 1
+                )
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            child_count += len(child_ids)
+            child_records = {
+                record.logikal_id: record
+                for record in self.db.query(Directory).filter(Directory.id.in_(list(child_ids.values()))).all()
+            }
+            
+            for child_folder in child_folders:
+                child_folder_record = child_records.get(child_folder['path'])
+                if child_folder_record is None:
+                    continue
                 try:
-                    # Use 'path' for navigation, 'name' for display (following Odoo pattern)
-                    child_path = child_folder.get('path')  # Full path for API navigation
-                    child_name = child_folder.get('name', 'Unknown')  # Display name
-                    
-                    if not child_path:
-                        logger.warning(f"Child folder missing 'path' field, skipping: {child_folder}")
-                        continue
-                    
-                    # Create child folder record
-                    child_folder_record = await self._create_or_update_directory(
-                        child_folder, 
-                        parent_id=parent_folder_record.id,
-                        level=parent_folder_record.level + 1
+                    # Recursively process grandchildren; navigation back to a parent
+                    # context happens on demand when its next listing is read
+                    grandchild_count = await self._process_folder_children_optimized(
+                        list_children, child_folder_record, child_folder['path']
                     )
-                    child_count += 1
-                    logger.debug(f"Created child folder record: {child_name} (path: {child_path})")
-                    
-                    # Navigate to child using full path (state continuity)
-                    try:
-                        logger.info(f"Navigating to child folder using path: {child_path}")
-                        success, message = await directory_service.select_directory(child_path)
-                        
-                        if not success:
-                            logger.warning(f"Failed to navigate to child folder {child_path}: {message}")
-                            # Continue with next child
-                            continue
-                        
-                        logger.info(f"Successfully navigated to: {child_name} (path: {child_path})")
-                        
-                        # Recursively process grandchildren within same session
-                        grandchild_count = await self._process_folder_children_optimized(
-                            directory_service, child_folder_record, child_path
-                        )
-                        child_count += grandchild_count
-                        
-                        # Return to parent context using stored path (state management)
-                        logger.debug(f"Returning to parent context using path: {parent_path}")
-                        success, message = await directory_service.select_directory(parent_path)
-                        
-                        if not success:
-                            logger.warning(f"Failed to return to parent context {parent_path}: {message}")
-                            # Session state may be corrupted, but continue
-                        
-                        logger.debug(f"Successfully returned to parent: {parent_folder_record.name}")
-                        
-                    except Exception as nav_error:
-                        logger.error(f"Path-based navigation failed for '{child_path}': {str(nav_error)}")
-                        logger.error("This indicates API path format issue or access permissions")
-                        
-                        # Attempt to recover parent context using path
-                        try:
-                            success, message = await directory_service.select_directory(parent_path)
-                            if success:
-                                logger.info(f"Recovered parent context using path: {parent_path}")
-                            else:
-                                logger.error(f"Failed to recover parent context: {message}")
-                        except Exception as recovery_error:
-                            logger.error(f"Failed to recover parent context: {str(recovery_error)}")
-                            # Continue with next child - session state may be corrupted
-                        
-                        # Continue with next child
-                        continue
+                    child_count += grandchild_count
                     
                 except Exception as e:
                     logger.error(f"Error processing child folder '{child_folder.get('name')}': {str(e)}")
@@ -445,29 +440,25 @@ class DirectorySyncService:
             directory_record = await self._create_or_update_directory(directory_data, parent_id, level)
             directory_count += 1
             
-            # Create dedicated session for this directory tree
-            logger.info(f"Creating session for directory: {directory_data.get('name', 'Unknown')}")
-            success, token = await self.auth_service.authenticate(base_url, username, password)
-            
-            if not success:
-                logger.error(f"Failed to authenticate for directory {directory_data.get('name', 'Unknown')}")
-                return directory_count
-            
             # Select the directory using path-based navigation
             directory_path = directory_data.get('path', directory_data.get('name', ''))
             if directory_path:
-                directory_service = DirectoryService(self.db, token, base_url)
-                
-                # Try to select the directory, but don't fail if it doesn't exist
-                success, message = await directory_service.select_directory(directory_path)
-                
-                if not success:
-                    logger.warning(f"Failed to select directory {directory_path}: {message}")
-                    # Don't return here - continue to process children if possible
-                    # The directory might exist but not be accessible from current context
-                
-                # Get child directories regardless of selection success
-                success, child_directories, message = await directory_service.get_directories()
+                # Lease a session for this directory only - it is returned before
+                # recursing so nested levels do not hold one session each
+                logger.info(f"Leasing session for directory: {directory_data.get('name', 'Unknown')}")
+                async with get_logikal_session_pool(base_url, username, password).lease() as lease:
+                    directory_service = DirectoryService(self.db, lease.token, base_url)
+                    
+                    # Try to select the directory, but don't fail if it doesn't exist
+                    success, message = await directory_service.select_directory(directory_path)
+                    
+                    if not success:
+                        logger.warning(f"Failed to select directory {directory_path}: {message}")
+                        # Don't return here - continue to process children if possible
+                        # The directory might exist but not be accessible from current context
+                    
+                    # Get child directories regardless of selection success
+                    success, child_directories, message = await directory_service.get_directories()
                 
                 if success and child_directories:
                     logger.info(f"Found {len(child_directories)} children in directory: {directory_data.get('name', 'Unknown')}")
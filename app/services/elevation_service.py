@@ -1,11 +1,11 @@
-import aiohttp
 import time
 import logging
-from typing import List, Optional, Tuple
+from typing import Any, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from core.retry import retry_async, default_retry_config, api_rate_limiter
+from core.retry import retry_async, default_retry_config, navigation_rate_limiter, listing_rate_limiter, download_rate_limiter
+from core.connection_manager import get_logikal_session
 from models.elevation import Elevation
-from models.api_log import ApiLog
+from core.api_log_sink import get_api_log_sink
 from schemas.elevation import ElevationCreate
 
 logger = logging.getLogger(__name__)
@@ -19,20 +19,20 @@ class ElevationService:
         self.session_token = session_token
         self.base_url = base_url.rstrip('/')
         
-    @retry_async(config=default_retry_config, rate_limiter=api_rate_limiter)
+    @retry_async(config=default_retry_config, rate_limiter=listing_rate_limiter)
     async def _get_elevations_request(self, url: str, headers: dict) -> Tuple[bool, List[dict], str]:
         """Internal method to make the actual elevations request with retry logic"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, timeout=30) as response:
-                response_text = await response.text()
+        session = await get_logikal_session(url)
+        async with session.get(url, headers=headers, timeout=30) as response:
+            response_text = await response.text()
                 
-                if response.status == 200:
-                    data = await response.json()
-                    elevations_data = data.get('data', data) if isinstance(data, dict) else data
-                    return True, elevations_data, "Success"
-                else:
-                    error_msg = f"Failed to get elevations: {response.status} - {response_text}"
-                    raise Exception(error_msg)
+            if response.status == 200:
+                data = await response.json()
+                elevations_data = data.get('data', data) if isinstance(data, dict) else data
+                return True, elevations_data, "Success"
+            else:
+                error_msg = f"Failed to get elevations: {response.status} - {response_text}"
+                raise Exception(error_msg)
     
     async def get_elevations(self) -> Tuple[bool, List[dict], str]:
         """Get all elevations in the current project"""
@@ -59,7 +59,7 @@ class ElevationService:
                     duration=duration,
                     request_url=url,
                     request_method='GET',
-                    response_body=str(elevations_data),
+                    response_body=elevations_data,
                     response_summary=f"Retrieved elevations for current project"
                 )
                 
@@ -84,23 +84,84 @@ class ElevationService:
             )
             return False, [], error_msg
     
-    @retry_async(config=default_retry_config, rate_limiter=api_rate_limiter)
+    @retry_async(config=default_retry_config, rate_limiter=navigation_rate_limiter)
+    async def _select_elevation_request(self, url: str, payload: dict, headers: dict) -> Tuple[bool, str]:
+        """Internal method to make the actual elevation selection request with retry logic"""
+        session = await get_logikal_session(url)
+        async with session.post(url, json=payload, headers=headers, timeout=30) as response:
+            response_text = await response.text()
+            
+            if response.status == 200:
+                return True, "Elevation selected successfully"
+            else:
+                error_msg = f"Failed to select elevation: {response.status} - {response_text}"
+                raise Exception(error_msg)
+    
+    async def select_elevation(self, elevation_identifier: str) -> Tuple[bool, str]:
+        """Select an elevation by identifier (required for parts-list operations)"""
+        if not self.session_token:
+            return False, "No active session. Please authenticate first."
+        
+        url = f"{self.base_url}/elevations/select"
+        payload = {"identifier": elevation_identifier}
+        start_time = time.time()
+        logger.info(f"Selecting elevation: {elevation_identifier}")
+        
+        try:
+            headers = {"Authorization": f"Bearer {self.session_token}"}
+            success, message = await self._select_elevation_request(url, payload, headers)
+            duration = int((time.time() - start_time) * 1000)
+            
+            await self._log_api_call(
+                operation='select_elevation',
+                status='success',
+                response_code=200,
+                duration=duration,
+                request_url=url,
+                request_method='POST',
+                request_payload=payload,
+                response_body=message,
+                response_summary=f"Selected elevation: {elevation_identifier}"
+            )
+            
+            return True, "Elevation selected successfully"
+                        
+        except Exception as e:
+            duration = int((time.time() - start_time) * 1000)
+            error_msg = f"Error while selecting elevation {elevation_identifier}: {str(e)}"
+            logger.error(error_msg)
+            await self._log_api_call(
+                operation='select_elevation',
+                status='failed',
+                response_code=0,
+                error_message=error_msg,
+                duration=duration,
+                request_url=url,
+                request_method='POST',
+                request_payload=payload,
+                response_body=None,
+                response_summary=f"Error selecting elevation {elevation_identifier}"
+            )
+            return False, error_msg
+    
+    # Thumbnails through this path were always rate limited; without a download budget they use the listing one
+    @retry_async(config=default_retry_config, rate_limiter=download_rate_limiter or listing_rate_limiter)
     async def _get_elevation_thumbnail_request(self, url: str, params: dict, headers: dict) -> Tuple[bool, str, str]:
         """Internal method to make the actual thumbnail request with retry logic"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, params=params, timeout=30) as response:
-                response_text = await response.text()
+        session = await get_logikal_session(url)
+        async with session.get(url, headers=headers, params=params, timeout=30) as response:
+            response_text = await response.text()
                 
-                if response.status == 200:
-                    # Get the image data
-                    image_data = await response.read()
-                    # Convert to base64 for storage
-                    import base64
-                    base64_data = base64.b64encode(image_data).decode('utf-8')
-                    return True, base64_data, "Success"
-                else:
-                    error_msg = f"Failed to get thumbnail: {response.status} - {response_text}"
-                    raise Exception(error_msg)
+            if response.status == 200:
+                # Get the image data
+                image_data = await response.read()
+                # Convert to base64 for storage
+                import base64
+                base64_data = base64.b64encode(image_data).decode('utf-8')
+                return True, base64_data, "Success"
+            else:
+                error_msg = f"Failed to get thumbnail: {response.status} - {response_text}"
+                raise Exception(error_msg)
     
     async def get_elevation_thumbnail(self, elevation_id: str, width: int = 300, height: int = 300, 
                                     format: str = "PNG", view: str = "Exterior", 
@@ -221,30 +282,19 @@ class ElevationService:
     
     async def _log_api_call(self, operation: str, status: str, response_code: int, 
                            duration: int, request_url: str = None, request_method: str = None,
-                           request_payload: dict = None, response_body: str = None,
+                           request_payload: dict = None, response_body: Any = None,
                            response_summary: str = None, error_message: str = None):
-        """Log API call to database"""
-        try:
-            # Extract endpoint from URL
-            endpoint = request_url.split('/')[-1] if request_url else operation
-            
-            api_log = ApiLog(
-                endpoint=endpoint,
-                method=request_method or 'GET',
-                status_code=response_code,
-                response_time_ms=duration,
-                success=(status == 'success'),
-                error_message=error_message,
-                request_url=request_url,
-                request_method=request_method,
-                request_payload=str(request_payload) if request_payload else None,
-                response_body=response_body,
-                response_summary=response_summary
-            )
-            
-            self.db.add(api_log)
-            self.db.commit()
-            
-        except Exception as e:
-            logger.error(f"Failed to log API call: {str(e)}")
-            self.db.rollback()
+        """Queue API call log record (buffered, written outside the sync transaction)"""
+        get_api_log_sink().record(
+            operation=operation,
+            success=(status == 'success'),
+            status_code=response_code,
+            duration_ms=duration,
+            request_url=request_url,
+            request_method=request_method,
+            default_method='GET',
+            request_payload=request_payload,
+            response_body=response_body,
+            response_summary=response_summary,
+            error_message=error_message
+        )
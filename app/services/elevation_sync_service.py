@@ -1,19 +1,25 @@
-import aiohttp
+import asyncio
 import time
 import logging
 import os
 import aiofiles
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
+from core.config import settings
+from core.connection_manager import get_logikal_session
+from core.priority import yield_to_interactive
+from core.retry import download_rate_limiter
 from models.elevation import Elevation
 from models.phase import Phase
 from models.sync_log import SyncLog
 from services.auth_service import AuthService
 from services.elevation_service import ElevationService
-from services.phase_service import PhaseService
-from services.project_service import ProjectService
-from services.directory_service import DirectoryService
+from services.logikal_session_pool import get_logikal_session_pool
+from services.logikal_navigation import NavigationContext, NavigationSession
+from services.bulk_upsert import NULL_GUID, bulk_upsert_elevations
+from services.delta_sync import partition_elevations
+from services.sync_progress import report_progress
 
 logger = logging.getLogger(__name__)
 
@@ -83,22 +89,24 @@ class ElevationSyncService:
             
             logger.info(f"Fetching thumbnail for elevation {elevation_name} (ID: {elevation_id})")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(thumbnail_url, params=params, headers=headers, timeout=30) as response:
-                    if response.status == 200:
-                        thumbnail_data = await response.read()
+            if download_rate_limiter:
+                await download_rate_limiter.acquire()
+            session = await get_logikal_session(thumbnail_url)
+            async with session.get(thumbnail_url, params=params, headers=headers, timeout=30) as response:
+                if response.status == 200:
+                    thumbnail_data = await response.read()
                         
-                        # Save to file
-                        async with aiofiles.open(local_path, 'wb') as f:
-                            await f.write(thumbnail_data)
+                    # Save to file
+                    async with aiofiles.open(local_path, 'wb') as f:
+                        await f.write(thumbnail_data)
                         
-                        thumbnail_size = len(thumbnail_data)
-                        logger.info(f"Successfully downloaded thumbnail for elevation {elevation_name}: {local_path} ({thumbnail_size} bytes)")
-                        return local_path
-                    else:
-                        error_text = await response.text()
-                        logger.warning(f"Failed to download thumbnail for elevation {elevation_name}: HTTP {response.status} - {error_text}")
-                        return None
+                    thumbnail_size = len(thumbnail_data)
+                    logger.info(f"Successfully downloaded thumbnail for elevation {elevation_name}: {local_path} ({thumbnail_size} bytes)")
+                    return local_path
+                else:
+                    error_text = await response.text()
+                    logger.warning(f"Failed to download thumbnail for elevation {elevation_name}: HTTP {response.status} - {error_text}")
+                    return None
                         
         except Exception as e:
             logger.error(f"Error downloading elevation thumbnail for {elevation_data.get('name', 'unknown')}: {str(e)}")
@@ -106,14 +114,9 @@ class ElevationSyncService:
     
     async def phase_exists_in_api(self, db: Session, base_url: str, username: str, password: str, phase: Phase) -> bool:
         """Check if phase exists in Logikal API before syncing elevations"""
+        session_pool = get_logikal_session_pool(base_url, username, password)
+        lease = None
         try:
-            # Create dedicated session for this phase
-            success, token = await self.auth_service.authenticate(base_url, username, password)
-            
-            if not success:
-                logger.warning(f"Authentication failed for phase validation: {token}")
-                return False
-            
             # Navigate to the phase's project directory first (required for folder-scoped API)
             if not phase.project:
                 logger.warning(f"Phase {phase.name} has no project association")
@@ -127,33 +130,18 @@ class ElevationSyncService:
                 logger.warning(f"Directory '{phase.project.directory.name}' has no full_path")
                 return False
             
-            # Navigate to the directory using hierarchical navigation
-            directory_service = DirectoryService(db, token, base_url)
-            success, message = await directory_service.navigate_to_directory(phase.project.directory.full_path)
-            
-            if not success:
-                logger.warning(f"Failed to navigate to directory {phase.project.directory.name}: {message}")
-                return False
-            
-            # Select the project within the directory context
-            project_service = ProjectService(db, token, base_url)
-            success, message = await project_service.select_project(phase.project.logikal_id)
-            
-            if not success:
-                logger.warning(f"Failed to select project {phase.project.name}: {message}")
-                return False
-            
-            # Try to select the phase within the project context
-            phase_service = PhaseService(db, token, base_url)
-            normalized_phase_id = self.normalize_guid(phase.logikal_id)
-            success, message = await phase_service.select_phase(normalized_phase_id)
+            # Lease the session closest to the phase context and try to select the phase
+            target = NavigationContext.for_phase(phase)
+            lease = await session_pool.acquire(target=target)
+            navigation = NavigationSession(db, lease, base_url, pool=session_pool)
+            success, message = await navigation.navigate_to(target)
             
             if not success:
                 if "404" in message or "Could not retrieve" in message:
                     logger.warning(f"Phase {phase.name} ({phase.logikal_id}) not found in Logikal API")
                     return False
                 else:
-                    logger.warning(f"Failed to select phase {phase.name}: {message}")
+                    logger.warning(f"Failed to navigate to phase {phase.name}: {message}")
                     return False
             
             logger.info(f"Phase {phase.name} exists in Logikal API - proceeding with elevation sync")
@@ -162,14 +150,22 @@ class ElevationSyncService:
         except Exception as e:
             logger.error(f"Error validating phase existence in API: {str(e)}")
             return False
+        finally:
+            if lease:
+                await session_pool.release(lease)
     
     async def sync_elevations_for_phase(self, db: Session, base_url: str, username: str, password: str, 
-                                       phase: Phase) -> Dict:
+                                       phase: Phase, delta: bool = False) -> Dict:
         """
         Sync all elevations for a specific phase
+        
+        With ``delta`` no thumbnail or parts list is downloaded for elevations
+        whose ``changedDate`` did not move; they are listed under 'skipped_unchanged'.
         """
         sync_start_time = time.time()
         sync_log = None
+        session_pool = get_logikal_session_pool(base_url, username, password)
+        lease = None
         
         try:
             # Create sync log entry
@@ -184,12 +180,6 @@ class ElevationSyncService:
             
             logger.info(f"Starting elevation sync for phase: {phase.name}")
             
-            # Create dedicated session for this phase
-            success, token = await self.auth_service.authenticate(base_url, username, password)
-            
-            if not success:
-                raise Exception(f"Authentication failed: {token}")
-            
             # Navigate to the phase's project directory first (required for folder-scoped API)
             if not phase.project:
                 raise Exception(f"Phase {phase.name} has no project association")
@@ -200,24 +190,13 @@ class ElevationSyncService:
             if not phase.project.directory.full_path:
                 raise Exception(f"Directory '{phase.project.directory.name}' has no full_path")
             
-            # Navigate to the directory using hierarchical navigation
-            directory_service = DirectoryService(self.db, token, base_url)
-            success, message = await directory_service.navigate_to_directory(phase.project.directory.full_path)
-            
-            if not success:
-                raise Exception(f"Failed to navigate to directory {phase.project.directory.name}: {message}")
-            
-            # Select the project within the directory context
-            project_service = ProjectService(self.db, token, base_url)
-            success, message = await project_service.select_project(phase.project.logikal_id)
-            
-            if not success:
-                raise Exception(f"Failed to select project {phase.project.name}: {message}")
-            
-            # Select the phase within the project context - normalize GUID for API
-            phase_service = PhaseService(self.db, token, base_url)
-            normalized_phase_id = self.normalize_guid(phase.logikal_id)
-            success, message = await phase_service.select_phase(normalized_phase_id)
+            # Lease the session closest to the phase context and issue only the missing selects
+            target = NavigationContext.for_phase(phase)
+            lease = await session_pool.acquire(target=target)
+            navigation = NavigationSession(self.db, lease, base_url, pool=session_pool)
+            success, message = await navigation.navigate_to(target)
+            # Navigation may have renewed the token
+            token = lease.token
             
             if not success:
                 # Check if this is a 404 error (phase not found)
@@ -240,52 +219,14 @@ class ElevationSyncService:
             if not success:
                 raise Exception(f"Failed to get elevations for phase {phase.name}: {message}")
             
-            # Process and cache elevations
-            elevations_processed = 0
-            parts_lists_synced = 0
-            parts_lists_failed = 0
-            
-            for elevation_data in elevations_data:
-                try:
-                    elevation = await self._create_or_update_elevation(db, elevation_data, phase.id, base_url, token)
-                    elevations_processed += 1
-                except Exception as e:
-                    logger.error(f"Failed to process elevation {elevation_data.get('name', 'Unknown')}: {str(e)}")
-            
-            # Now sync parts lists for all elevations (requires creating new sessions for each)
-            # We cannot reuse the current token because it's locked in phase context
-            if base_url and username and password and elevations_processed > 0:
-                logger.info(f"Starting parts list sync for {elevations_processed} elevations in phase {phase.name}")
-                from services.parts_list_sync_service import PartsListSyncService
-                parts_service = PartsListSyncService(db)
-                
-                # Get all elevations for this phase
-                phase_elevations = db.query(Elevation).filter(Elevation.phase_id == phase.id).all()
-                
-                for elevation in phase_elevations:
-                    try:
-                        # Create a fresh token for each elevation (session is stateful, locked to current context)
-                        auth_service = AuthService(db)
-                        auth_success, fresh_token = await auth_service.authenticate(base_url, username, password)
-                        
-                        if not auth_success or not fresh_token:
-                            parts_lists_failed += 1
-                            logger.warning(f"Failed to authenticate for parts list sync: {elevation.name}")
-                            continue
-                        
-                        # Parts list sync will navigate to elevation context with fresh session
-                        success, message = await parts_service.sync_parts_for_elevation(
-                            elevation.id, base_url, fresh_token, skip_navigation=False
-                        )
-                        if success:
-                            parts_lists_synced += 1
-                            logger.info(f"Parts list synced for elevation {elevation.name}: {message}")
-                        else:
-                            parts_lists_failed += 1
-                            logger.warning(f"Parts list sync failed for elevation {elevation.name}: {message}")
-                    except Exception as e:
-                        parts_lists_failed += 1
-                        logger.error(f"Error syncing parts list for elevation {elevation.name}: {str(e)}")
+            # Upsert elevations and pipeline their thumbnail and parts-list downloads behind the upserts
+            pipeline = await self._run_elevation_pipeline(
+                db, phase, elevations_data, navigation, session_pool, target, base_url,
+                sync_parts_lists=bool(base_url and username and password), delta=delta
+            )
+            elevations_processed = pipeline['elevations_processed']
+            parts_lists_synced = pipeline['parts_lists_synced']
+            parts_lists_failed = pipeline['parts_lists_failed']
             
             # Calculate duration
             duration = int(time.time() - sync_start_time)
@@ -307,8 +248,11 @@ class ElevationSyncService:
                 'success': True,
                 'message': f'Elevation sync completed for phase: {phase.name}',
                 'count': elevations_processed,
+                'thumbnails_synced': pipeline['thumbnails_synced'],
                 'parts_lists_synced': parts_lists_synced,
                 'parts_lists_failed': parts_lists_failed,
+                'errors': pipeline['errors'],
+                'skipped_unchanged': pipeline['skipped_unchanged'],
                 'duration_seconds': duration
             }
             
@@ -333,119 +277,145 @@ class ElevationSyncService:
                 'duration_seconds': duration,
                 'error': str(e)
             }
+        finally:
+            if lease:
+                await session_pool.release(lease)
     
-    async def _create_or_update_elevation(self, db: Session, elevation_data: Dict, phase_id: int, base_url: str = None, token: str = None) -> Elevation:
-        """Create or update an elevation record from API data"""
-        try:
-            # Extract identifier - Logikal API uses 'id' field (GUID) as identifier
-            identifier = elevation_data.get('id', '')
-            name = elevation_data.get('name', 'Unnamed Elevation')
-            
-            # Store null GUIDs as-is from the API (00000000-0000-0000-0000-000000000000)
-            # This is the default elevation in Logikal when no specific elevations are created
-            if not identifier:
-                identifier = '00000000-0000-0000-0000-000000000000'
-            
-            if not identifier:
-                raise ValueError(f"Elevation data missing 'id' field: {elevation_data}")
-            
-            # Check if elevation already exists
-            existing_elevation = db.query(Elevation).filter(
-                Elevation.logikal_id == identifier
-            ).first()
-            
-            if existing_elevation:
-                # Update existing elevation
-                existing_elevation.name = name
-                existing_elevation.phase_id = phase_id
-                existing_elevation.synced_at = datetime.utcnow()
-                existing_elevation.sync_status = 'synced'
-                existing_elevation.last_sync_date = datetime.utcnow()
-                
-                # Extract and store last_update_date from Logikal API
-                if 'changedDate' in elevation_data and elevation_data['changedDate']:
-                    try:
-                        # Parse the Unix timestamp and store it
-                        api_updated_at = datetime.fromtimestamp(elevation_data['changedDate'], tz=timezone.utc)
-                        existing_elevation.last_update_date = api_updated_at
-                        logger.info(f"Updated last_update_date for elevation {name}: {api_updated_at}")
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"Failed to parse changedDate for elevation {name}: {e}")
-                
-                # Download and store image if available
-                if base_url and token:
-                    image_path = await self.download_elevation_image(elevation_data, base_url, token)
-                    if image_path:
-                        existing_elevation.image_path = image_path
-                
-                db.commit()
-                
-                # Sync parts list if base_url and token provided
-                # NOTE: We cannot sync parts list inline here because we're in phase context, not elevation context
-                # Parts list sync will be done separately after all elevations are processed
-                # This avoids the 405 error: "This operation expects the session to be in an elevation."
-                
-                logger.debug(f"Updated existing elevation: {name} (ID: {identifier})")
-                return existing_elevation
-            else:
-                # Create new elevation
-                
-                # Check for duplicates before insert
-                duplicate_check = db.query(Elevation).filter(
-                    Elevation.logikal_id == identifier
-                ).first()
-                if duplicate_check:
-                    logger.warning(f"Duplicate elevation ID detected: {identifier} - returning existing")
-                    return duplicate_check
-                
-                # Extract last_update_date from Logikal API
-                last_update_date = None
-                if 'changedDate' in elevation_data and elevation_data['changedDate']:
-                    try:
-                        # Parse the Unix timestamp and store it
-                        last_update_date = datetime.fromtimestamp(elevation_data['changedDate'], tz=timezone.utc)
-                        logger.info(f"Setting last_update_date for new elevation {name}: {last_update_date}")
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"Failed to parse changedDate for new elevation {name}: {e}")
+    async def _run_elevation_pipeline(self, db: Session, phase: Phase, elevations_data: List[Dict],
+                                      navigation: NavigationSession, session_pool, target: NavigationContext,
+                                      base_url: str, sync_parts_lists: bool = True, delta: bool = False) -> Dict:
+        """
+        Upsert the listed elevations and download their thumbnails and parts lists.
+        
+        The listing is upserted in one statement and then feeds two queues.
+        Parts lists are walked on the phase session (one elevation select
+        each) while thumbnails are fetched by ELEVATION_THUMBNAIL_WORKERS
+        concurrent downloads on a second session.
+        If no second session is free the thumbnails follow the parts lists on
+        the phase session instead of waiting for one. With ``delta`` unchanged
+        elevations are upserted but not queued.
+        """
+        from services.parts_list_sync_service import PartsListSyncService
+        parts_service = PartsListSyncService(db)
+        
+        stats = {'elevations_processed': 0, 'thumbnails_synced': 0,
+                 'parts_lists_synced': 0, 'parts_lists_failed': 0, 'errors': [], 'skipped_unchanged': []}
+        thumbnail_workers = max(settings.ELEVATION_THUMBNAIL_WORKERS, 1)
+        thumbnail_queue: asyncio.Queue = asyncio.Queue()
+        parts_queue: asyncio.Queue = asyncio.Queue()
+        parts_done = asyncio.Event()
+        image_paths: Dict[int, str] = {}
+        
+        async def sync_parts_lists() -> None:
+            try:
+                while True:
+                    item = await parts_queue.get()
+                    if item is None:
+                        break
+                    elevation_id, name = item
+                    await yield_to_interactive()
+                    success, message = await parts_service.sync_parts_for_elevation(
+                        elevation_id, base_url, navigation.token, navigation=navigation
+                    )
+                    if success:
+                        stats['parts_lists_synced'] += 1
+                        report_progress('parts_lists', elevations_done=1, parts_lists_synced=1)
+                    else:
+                        stats['parts_lists_failed'] += 1
+                        stats['errors'].append(f"{name}: {message}")
+                        report_progress('parts_lists', elevations_done=1, parts_lists_failed=1)
+            finally:
+                parts_done.set()
+        
+        async def download_thumbnails() -> None:
+            thumbnail_lease = await session_pool.try_acquire(target=target)
+            try:
+                if thumbnail_lease is not None:
+                    thumbnail_navigation = NavigationSession(self.db, thumbnail_lease, base_url, pool=session_pool)
+                    success, message = await thumbnail_navigation.navigate_to(target)
+                    if not success:
+                        logger.warning(f"Thumbnail session could not reach phase {phase.name}: {message}")
+                        await session_pool.release(thumbnail_lease, discard=True)
+                        thumbnail_lease = None
+                if thumbnail_lease is None:
+                    # Share the phase session once the parts-list walk is done with it
+                    await parts_done.wait()
+                    await navigation.navigate_to(target)
+                    thumbnail_navigation = navigation
                 
-                # Download and store image if available
-                image_path = None
-                if base_url and token:
-                    image_path = await self.download_elevation_image(elevation_data, base_url, token)
+                async def worker() -> None:
+                    while True:
+                        item = await thumbnail_queue.get()
+                        if item is None:
+                            break
+                        elevation_id, elevation_data = item
+                        await yield_to_interactive()
+                        image_path = await self.download_elevation_image(
+                            elevation_data, base_url, thumbnail_navigation.token
+                        )
+                        if image_path:
+                            image_paths[elevation_id] = image_path
+                        # Elevations count as done with their parts list, or their thumbnail without one
+                        report_progress('thumbnails', thumbnails_synced=1 if image_path else 0,
+                                        elevations_done=0 if sync_parts_lists else 1)
                 
-                new_elevation = Elevation(
-                    logikal_id=identifier,
-                    name=name,
-                    phase_id=phase_id,
-                    synced_at=datetime.utcnow(),
-                    sync_status='synced',
-                    last_sync_date=datetime.utcnow(),
-                    last_update_date=last_update_date,
-                    image_path=image_path
-                )
-                db.add(new_elevation)
+                await asyncio.gather(*[worker() for _ in range(thumbnail_workers)])
+            finally:
+                if thumbnail_lease is not None:
+                    await session_pool.release(thumbnail_lease)
+        
+        consumers = [asyncio.ensure_future(download_thumbnails())]
+        if sync_parts_lists:
+            consumers.append(asyncio.ensure_future(sync_parts_lists()))
+        else:
+            parts_done.set()
+        
+        try:
+            # Compare with the stored changedDates before the upsert overwrites them
+            to_download = elevations_data
+            if delta:
+                partition = partition_elevations(db, elevations_data)
+                to_download = partition.changed
+                stats['skipped_unchanged'] = partition.skipped()
+            
+            # One statement for the whole listing, committed before the downloads need the rows
+            try:
+                elevation_ids = bulk_upsert_elevations(db, elevations_data, phase.id)
                 db.commit()
-                
-                # Verify the elevation was actually saved
-                saved_elevation = db.query(Elevation).filter(Elevation.logikal_id == identifier).first()
-                if saved_elevation:
-                    logger.info(f"Successfully created new elevation: {name} (ID: {identifier}) - Verified in database")
-                    
-                    # Sync parts list if base_url and token provided
-                    # NOTE: We cannot sync parts list inline here because we're in phase context, not elevation context
-                    # Parts list sync will be done separately after all elevations are processed
-                    # This avoids the 405 error: "This operation expects the session to be in an elevation."
-                else:
-                    logger.error(f"Elevation creation failed - elevation not found in database after commit: {name} (ID: {identifier})")
-                
-                logger.debug(f"Created new elevation: {name} (ID: {identifier})")
-                return new_elevation
-                
-        except Exception as e:
-            logger.error(f"Failed to create or update elevation: {str(e)}")
-            # DO NOT rollback the entire transaction - just raise the exception
-            # The rollback was causing all previous work to be lost
-            raise
+            except Exception:
+                db.rollback()
+                raise
+            stats['elevations_processed'] = len(elevation_ids)
+            report_progress('elevations', f"{len(elevation_ids)} elevations listed in phase {phase.name}",
+                            elevations_listed=len(elevation_ids))
+            for elevation_data in to_download:
+                elevation_id = elevation_ids.get(elevation_data.get('id') or NULL_GUID)
+                if elevation_id is None:
+                    continue
+                name = elevation_data.get('name', 'Unnamed Elevation')
+                thumbnail_queue.put_nowait((elevation_id, elevation_data))
+                parts_queue.put_nowait((elevation_id, name))
+        finally:
+            for _ in range(thumbnail_workers):
+                thumbnail_queue.put_nowait(None)
+            parts_queue.put_nowait(None)
+        
+        results = await asyncio.gather(*consumers, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Elevation download pipeline for phase {phase.name} failed: {str(result)}")
+                stats['errors'].append(str(result))
+        
+        if image_paths:
+            for elevation in db.query(Elevation).filter(Elevation.id.in_(list(image_paths))).all():
+                elevation.image_path = image_paths[elevation.id]
+            db.commit()
+        stats['thumbnails_synced'] = len(image_paths)
+        
+        logger.info(f"Phase {phase.name}: {stats['elevations_processed']} elevations, "
+                    f"{stats['thumbnails_synced']} thumbnails, {stats['parts_lists_synced']} parts lists synced, "
+                    f"{stats['parts_lists_failed']} failed")
+        return stats
     
     async def get_all_elevations(self) -> List[Elevation]:
         """Get all elevations from the database"""
@@ -0,0 +1,415 @@
+"""
+Asynchronous force-sync jobs.
+
+A force sync submitted as a job returns a job id right away. The sync runs on
+the sync_interactive Celery worker (in the API process when Redis or Celery
+is not available) and publishes its progress - phases, elevations, parts
+lists and thumbnails as reported through services.sync_progress - to the job
+store, from which clients long-poll or stream it as Server-Sent Events.
+
+Jobs and their events live in Redis for FORCE_SYNC_JOB_TTL_SECONDS, with an
+in-process fallback like the rate limiters that only holds what was written
+while Redis was down. A completed job is also kept per
+target (directory, project, mode) for FORCE_SYNC_RESULT_CACHE_SECONDS, so a
+repeated request returns its result instead of syncing again, and a request
+for a target that is already being synced returns the running job.
+"""
+import asyncio
+import json
+import time
+import uuid
+import logging
+import weakref
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from redis.exceptions import RedisError
+
+from core.config import settings
+from core.rate_limiter import REDIS_RETRY_INTERVAL_SECONDS, get_redis_client
+from services.sync_progress import SyncProgress, track_progress
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+FINISHED = (COMPLETED, FAILED)
+
+# A running job whose runner has not written for this long is considered dead. Queued
+# jobs have no runner to write yet (they may wait behind other interactive syncs), so
+# they stay active until a worker picks them up or their active marker expires
+STALE_JOB_SECONDS = 60.0
+JOB_HEARTBEAT_SECONDS = 10.0
+
+SyncCallable = Callable[[str, Optional[str], bool], Awaitable[Dict]]
+
+
+def force_sync_target(project_id: str, directory_id: Optional[str], delta: bool) -> str:
+    return f"{directory_id or '*'}:{project_id}:{'delta' if delta else 'full'}"
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class ForceSyncJobStore:
+    """
+    Job records, progress events and result cache of force-sync jobs
+
+    The in-process fallback only holds what was written while Redis was not
+    available. Finished jobs are dropped from it after the job TTL and each
+    job keeps at most ``max_events`` progress events.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, key_prefix: str = "logikal:forcesync",
+                 job_ttl_seconds: int = None, result_ttl_seconds: int = None, max_events: int = None):
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.job_ttl_seconds = job_ttl_seconds or settings.FORCE_SYNC_JOB_TTL_SECONDS
+        self.result_ttl_seconds = result_ttl_seconds or settings.FORCE_SYNC_RESULT_CACHE_SECONDS
+        self.max_events = max_events or settings.FORCE_SYNC_MAX_LOCAL_EVENTS
+
+        # In-process fallback
+        self._local_jobs: Dict[str, Dict] = {}
+        self._local_events: Dict[str, List[Dict]] = {}
+        self._local_events_dropped: Dict[str, int] = {}
+        self._local_targets: Dict[str, str] = {}
+        self._local_results: Dict[str, tuple] = {}
+
+        self._redis_retry_at = 0.0
+
+    @property
+    def backend(self) -> str:
+        if self.redis_url and time.monotonic() >= self._redis_retry_at:
+            return 'redis'
+        return 'local'
+
+    def _redis_failed(self, e: Exception) -> None:
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL_SECONDS
+        logger.warning(f"Force sync jobs falling back to in-process store: {str(e)}")
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.key_prefix}:job:{job_id}"
+
+    def _events_key(self, job_id: str) -> str:
+        return f"{self.key_prefix}:events:{job_id}"
+
+    def _active_key(self, target: str) -> str:
+        return f"{self.key_prefix}:active:{target}"
+
+    def _result_key(self, target: str) -> str:
+        return f"{self.key_prefix}:result:{target}"
+
+    def _evict_local(self) -> None:
+        """Drop fallback jobs that finished more than the job TTL ago, and expired results"""
+        expired_before = time.time() - self.job_ttl_seconds
+        for job_id, job in list(self._local_jobs.items()):
+            if job['status'] in FINISHED and job['updated_at'] < expired_before:
+                del self._local_jobs[job_id]
+                self._local_events.pop(job_id, None)
+                self._local_events_dropped.pop(job_id, None)
+        now = time.monotonic()
+        for target, (_, expires_at) in list(self._local_results.items()):
+            if expires_at <= now:
+                del self._local_results[target]
+
+    async def save(self, job: Dict) -> None:
+        job['updated_at'] = time.time()
+        if self.backend == 'redis':
+            try:
+                await get_redis_client(self.redis_url).set(self._job_key(job['job_id']), json.dumps(job, default=str),
+                                                           ex=self.job_ttl_seconds)
+                return
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+        self._evict_local()
+        self._local_jobs[job['job_id']] = job
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        if self.backend == 'redis':
+            try:
+                job = await get_redis_client(self.redis_url).get(self._job_key(job_id))
+                if job:
+                    return json.loads(job)
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+        return self._local_jobs.get(job_id)
+
+    async def active_job(self, target: str) -> Optional[Dict]:
+        """The unfinished, live job syncing ``target``, if any"""
+        job_id = self._local_targets.get(target)
+        if self.backend == 'redis':
+            try:
+                job_id = _decode(await get_redis_client(self.redis_url).get(self._active_key(target))) or job_id
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+        job = await self.get(job_id) if job_id else None
+        if not job or job['status'] in FINISHED:
+            return None
+        if job['status'] == RUNNING and time.time() - job['updated_at'] >= STALE_JOB_SECONDS:
+            return None
+        return job
+
+    async def set_active(self, target: str, job_id: str) -> None:
+        if self.backend == 'redis':
+            try:
+                await get_redis_client(self.redis_url).set(self._active_key(target), job_id, ex=self.job_ttl_seconds)
+                return
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+        self._local_targets[target] = job_id
+
+    async def append_event(self, job_id: str, event: Dict) -> None:
+        if self.backend == 'redis':
+            try:
+                client = get_redis_client(self.redis_url)
+                await client.rpush(self._events_key(job_id), json.dumps(event, default=str))
+                await client.expire(self._events_key(job_id), self.job_ttl_seconds)
+                return
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+        events = self._local_events.setdefault(job_id, [])
+        events.append(event)
+        overflow = len(events) - self.max_events
+        if overflow > 0:
+            # Oldest events go first; sequence numbers of the rest stay the same
+            del events[:overflow]
+            self._local_events_dropped[job_id] = self._local_events_dropped.get(job_id, 0) + overflow
+
+    async def events(self, job_id: str, after: int = 0) -> List[Dict]:
+        """Events after sequence number ``after``; sequence numbers start at 1"""
+        if self.backend == 'redis':
+            try:
+                events = [json.loads(event) for event in
+                          await get_redis_client(self.redis_url).lrange(self._events_key(job_id), after, -1)]
+                if events or job_id not in self._local_events:
+                    return [{'seq': after + index + 1, **event} for index, event in enumerate(events)]
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+        dropped = self._local_events_dropped.get(job_id, 0)
+        after = max(after, dropped)
+        events = self._local_events.get(job_id, [])[after - dropped:]
+        return [{'seq': after + index + 1, **event} for index, event in enumerate(events)]
+
+    async def finish(self, job: Dict, target: str) -> None:
+        """Store the finished job, cache it for the target if it succeeded and free the target"""
+        await self.save(job)
+        if self._local_targets.get(target) == job['job_id']:
+            del self._local_targets[target]
+        if self.backend == 'redis':
+            try:
+                client = get_redis_client(self.redis_url)
+                if job['status'] == COMPLETED:
+                    await client.set(self._result_key(target), job['job_id'], ex=self.result_ttl_seconds)
+                if _decode(await client.get(self._active_key(target))) == job['job_id']:
+                    await client.delete(self._active_key(target))
+                return
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+        if job['status'] == COMPLETED:
+            self._local_results[target] = (job['job_id'], time.monotonic() + self.result_ttl_seconds)
+
+    async def cached_job(self, target: str) -> Optional[Dict]:
+        """The completed job for ``target`` while its result is cached"""
+        job_id = None
+        cached = self._local_results.get(target)
+        if cached and cached[1] > time.monotonic():
+            job_id = cached[0]
+        if self.backend == 'redis':
+            try:
+                job_id = _decode(await get_redis_client(self.redis_url).get(self._result_key(target))) or job_id
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+        return await self.get(job_id) if job_id else None
+
+    async def invalidate(self, target: str) -> None:
+        self._local_results.pop(target, None)
+        if self.backend == 'redis':
+            try:
+                await get_redis_client(self.redis_url).delete(self._result_key(target))
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+
+
+# Redis clients are bound to the event loop that created them
+_stores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ForceSyncJobStore]" = weakref.WeakKeyDictionary()
+# Keeps in-process jobs referenced until they finish
+_local_runs = set()
+
+
+def get_force_sync_job_store() -> ForceSyncJobStore:
+    """Get the force-sync job store of the running event loop"""
+    loop = asyncio.get_running_loop()
+    store = _stores.get(loop)
+    if store is None:
+        store = ForceSyncJobStore(settings.LOGIKAL_RATE_LIMIT_REDIS_URL or settings.REDIS_URL)
+        _stores[loop] = store
+    return store
+
+
+async def submit_force_sync_job(project_id: str, directory_id: Optional[str] = None, delta: bool = False,
+                                refresh: bool = False, sync: SyncCallable = None) -> Dict:
+    """
+    Start a force sync of a project as a job, or return the job that already covers it.
+
+    Returns the job record with 'cached' (result served from the cache) and
+    'created' (a new job was started) flags. ``refresh`` bypasses the cache.
+    """
+    store = get_force_sync_job_store()
+    target = force_sync_target(project_id, directory_id, delta)
+    if refresh:
+        await store.invalidate(target)
+    else:
+        cached = await store.cached_job(target)
+        if cached:
+            return {**cached, 'cached': True, 'created': False}
+
+    running = await store.active_job(target)
+    if running:
+        return {**running, 'cached': False, 'created': False}
+
+    job = {
+        'job_id': uuid.uuid4().hex,
+        'project_id': project_id,
+        'directory_id': directory_id,
+        'delta': delta,
+        'status': QUEUED,
+        'stage': None,
+        'counters': {},
+        'result': None,
+        'created_at': time.time(),
+        'finished_at': None
+    }
+    await store.save(job)
+    await store.set_active(target, job['job_id'])
+    _dispatch(store, job, sync)
+    logger.info(f"Submitted force sync job {job['job_id']} for project {project_id}")
+    return {**job, 'cached': False, 'created': True}
+
+
+def _dispatch(store: ForceSyncJobStore, job: Dict, sync: Optional[SyncCallable]) -> None:
+    """Hand the job to the interactive Celery worker, or run it in this process"""
+    if sync is None and settings.FORCE_SYNC_JOBS_IN_WORKER and store.backend == 'redis':
+        try:
+            from tasks.sync_tasks import force_sync_job_task
+            force_sync_job_task.delay(job['job_id'])
+            return
+        except Exception as e:
+            logger.warning(f"Could not queue force sync job {job['job_id']}, running it in process: {str(e)}")
+    task = asyncio.create_task(run_force_sync_job(job['job_id'], sync=sync))
+    _local_runs.add(task)
+    task.add_done_callback(_local_runs.discard)
+
+
+async def _force_sync_project(project_id: str, directory_id: Optional[str], delta: bool) -> Dict:
+    from core.config_production import get_settings
+    from core.database import SessionLocal
+    from services.project_sync_service import ProjectSyncService
+
+    production_settings = get_settings()
+    db = SessionLocal()
+    try:
+        return await ProjectSyncService(db).force_sync_project_from_logikal(
+            project_id, directory_id,
+            production_settings.LOGIKAL_API_BASE_URL,
+            production_settings.LOGIKAL_AUTH_USERNAME,
+            production_settings.LOGIKAL_AUTH_PASSWORD,
+            delta=delta
+        )
+    finally:
+        db.close()
+
+
+async def run_force_sync_job(job_id: str, sync: SyncCallable = None) -> Dict:
+    """Run a submitted job, publishing its progress while it runs; returns the finished job"""
+    store = get_force_sync_job_store()
+    job = await store.get(job_id)
+    if job is None:
+        logger.error(f"Force sync job {job_id} not found")
+        return {'job_id': job_id, 'status': FAILED, 'result': {'success': False, 'message': 'Job not found'}}
+    if job['status'] != QUEUED:
+        # Redelivered task - the job already ran or is running elsewhere
+        return job
+    target = force_sync_target(job['project_id'], job['directory_id'], job['delta'])
+
+    progress = SyncProgress()
+    job['status'] = RUNNING
+    job['started_at'] = time.time()
+    await store.save(job)
+
+    async def publish() -> None:
+        snapshot = progress.drain()
+        if snapshot is not None:
+            job['stage'] = snapshot['stage']
+            job['counters'] = snapshot['counters']
+            await store.append_event(job_id, snapshot)
+            await store.save(job)
+        elif time.time() - job['updated_at'] >= JOB_HEARTBEAT_SECONDS:
+            await store.save(job)
+
+    async def publish_periodically() -> None:
+        while True:
+            await asyncio.sleep(settings.FORCE_SYNC_PROGRESS_FLUSH_SECONDS)
+            await publish()
+
+    publisher = asyncio.create_task(publish_periodically())
+    try:
+        with track_progress(progress):
+            result = await (sync or _force_sync_project)(job['project_id'], job['directory_id'], job['delta'])
+    except Exception as e:
+        logger.error(f"Force sync job {job_id} failed: {str(e)}")
+        result = {'success': False, 'message': f"Force sync failed: {str(e)}", 'error': str(e)}
+    finally:
+        publisher.cancel()
+    await publish()
+
+    job['status'] = COMPLETED if result.get('success') else FAILED
+    job['result'] = result
+    job['finished_at'] = time.time()
+    job['duration_seconds'] = job['finished_at'] - job['started_at']
+    await store.finish(job, target)
+    logger.info(f"Force sync job {job_id} {job['status']} in {job['duration_seconds']:.1f}s")
+    return job
+
+
+async def wait_for_job(job_id: str, after: int = 0, timeout: float = 0.0,
+                       poll_interval_seconds: float = 0.5) -> Optional[Dict]:
+    """
+    Long-poll a job: returns it with the events after ``after`` as soon as
+    there are any, it has finished or ``timeout`` has passed. None if unknown.
+    """
+    store = get_force_sync_job_store()
+    deadline = time.monotonic() + timeout
+    while True:
+        job = await store.get(job_id)
+        if job is None:
+            return None
+        events = await store.events(job_id, after)
+        if events or job['status'] in FINISHED or time.monotonic() >= deadline:
+            return {**job, 'events': events}
+        await asyncio.sleep(poll_interval_seconds)
+
+
+def _sse(event: str, data: Dict, event_id: Optional[int] = None) -> str:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", f"data: {json.dumps(data, default=str)}"]
+    return '\n'.join(lines) + '\n\n'
+
+
+async def stream_job_events(job_id: str, after: int = 0, keepalive_seconds: float = 15.0) -> AsyncIterator[str]:
+    """Server-Sent Events of a job: a 'progress' event per update, then 'completed' or 'failed'"""
+    cursor = after
+    while True:
+        job = await wait_for_job(job_id, cursor, timeout=keepalive_seconds)
+        if job is None:
+            yield _sse('error', {'job_id': job_id, 'message': f'Force sync job {job_id} not found'})
+            return
+        for event in job['events']:
+            cursor = event['seq']
+            yield _sse('progress', event, event_id=cursor)
+        if job['status'] in FINISHED:
+            yield _sse(job['status'], {key: value for key, value in job.items() if key != 'events'})
+            return
+        if not job['events']:
+            yield ": keep-alive\n\n"
@@ -0,0 +1,191 @@
+"""
+Sharding of the full sync across Celery workers.
+
+After the directory tree is synced, the syncable directories are grouped by
+their root directory. Roots that held more than FULL_SYNC_SHARD_MAX_PROJECTS
+projects at the last sync are split into several shards (a directory is never
+split). Each shard syncs the projects, phases and elevations of its
+directories in its own task, with its own checkpoint, so a killed shard
+resumes on the next run without redoing the others. A reducer folds the shard
+results into one SyncLog.
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.priority import MAINTENANCE, priority_scope
+from models.directory import Directory
+from models.project import Project
+from models.sync_config import SyncConfig
+from models.sync_log import SyncLog
+from services.logikal_listing_cache import MUST_REVALIDATE
+from services.sync_checkpoint_service import SyncCheckpointService
+from services.sync_dedup import directory_scope, run_deduplicated
+
+logger = logging.getLogger(__name__)
+
+
+def plan_full_sync_shards(db: Session, max_projects: int = None) -> List[Dict]:
+    """
+    Group the syncable directories into shards of whole root directories.
+
+    Shards are plain dicts (key, root_id, directory_ids, estimated_projects) so
+    they can be sent to Celery as task arguments.
+    """
+    max_projects = max_projects or settings.FULL_SYNC_SHARD_MAX_PROJECTS
+    parents = dict(db.query(Directory.id, Directory.parent_id).all())
+    syncable = [directory_id for (directory_id,) in
+                db.query(Directory.id).filter(Directory.exclude_from_sync == False).order_by(Directory.id)]
+    project_counts = dict(db.query(Project.directory_id, func.count(Project.id))
+                          .filter(Project.directory_id.isnot(None))
+                          .group_by(Project.directory_id).all())
+
+    def root_of(directory_id: int) -> int:
+        seen = set()
+        while parents.get(directory_id) is not None and directory_id not in seen:
+            seen.add(directory_id)
+            directory_id = parents[directory_id]
+        return directory_id
+
+    roots: Dict[int, List[int]] = {}
+    for directory_id in syncable:
+        roots.setdefault(root_of(directory_id), []).append(directory_id)
+
+    shards = []
+    for root_id, directory_ids in roots.items():
+        chunk, estimated = [], 0
+        for directory_id in directory_ids:
+            count = project_counts.get(directory_id, 0)
+            if chunk and estimated + count > max_projects:
+                shards.append(_shard(root_id, chunk, estimated))
+                chunk, estimated = [], 0
+            chunk.append(directory_id)
+            estimated += count
+        if chunk:
+            shards.append(_shard(root_id, chunk, estimated))
+
+    # Largest shards first so the longest ones do not start last
+    shards.sort(key=lambda shard: -shard['estimated_projects'])
+    logger.info(f"Planned {len(shards)} full sync shards over {len(syncable)} directories "
+                f"from {len(roots)} root directories")
+    return shards
+
+
+def _shard(root_id: int, directory_ids: List[int], estimated_projects: int) -> Dict:
+    return {
+        'key': f"{root_id}:{directory_ids[0]}",
+        'root_id': root_id,
+        'directory_ids': directory_ids,
+        'estimated_projects': estimated_projects
+    }
+
+
+async def run_full_sync_shard(db: Session, shard: Dict, base_url: str, username: str, password: str,
+                              cache_mode: str = MUST_REVALIDATE, delta: bool = False, resume: bool = True) -> Dict:
+    """
+    Sync the projects, phases and elevations of one shard under its own checkpoint
+
+    The shard holds the sync scope of each of its directories, so smart syncs
+    of their projects join it instead of running twice (interactive force
+    syncs do not wait for it).
+    Shards run as maintenance work.
+    """
+    directories = db.query(Directory).filter(Directory.id.in_(shard['directory_ids'])).all()
+    with priority_scope(MAINTENANCE):
+        return await run_deduplicated(
+            [directory_scope(directory.logikal_id) for directory in directories],
+            lambda: _sync_shard(db, shard, directories, base_url, username, password, cache_mode, delta, resume)
+        )
+
+
+async def _sync_shard(db: Session, shard: Dict, directories: List[Directory], base_url: str, username: str,
+                      password: str, cache_mode: str, delta: bool, resume: bool) -> Dict:
+    from services.sync_service import SyncService
+
+    checkpoints = SyncCheckpointService(db)
+    checkpoint = None
+    try:
+        checkpoint, resumed = checkpoints.start(
+            f"full_shard:{shard['key']}", first_stage='projects', delta=delta, cache_mode=cache_mode, resume=resume
+        )
+        logger.info(f"Full sync shard {shard['key']}: {len(directories)} directories"
+                    f"{' (resumed)' if resumed else ''}")
+
+        skipped_unchanged = await SyncService(db).sync_directory_trees(
+            base_url, username, password, directories, checkpoint,
+            cache_mode=cache_mode, delta=delta, scoped=True
+        )
+        checkpoints.complete(checkpoint)
+
+        return {
+            'success': True,
+            'shard': shard['key'],
+            'resumed': resumed,
+            'directories_processed': len(directories),
+            'projects_processed': checkpoint.projects_processed,
+            'phases_processed': checkpoint.phases_processed,
+            'elevations_processed': checkpoint.elevations_processed,
+            'skipped_unchanged': len(skipped_unchanged)
+        }
+    except Exception as e:
+        logger.error(f"Full sync shard {shard['key']} failed: {str(e)}")
+        # The checkpoint stays 'running' so the next full sync resumes this shard
+        if checkpoint:
+            checkpoints.record_failure(checkpoint, str(e))
+        return {
+            'success': False,
+            'shard': shard['key'],
+            'message': f"Shard {shard['key']} failed: {str(e)}",
+            'error': str(e)
+        }
+
+
+def reduce_full_sync_shards(db: Session, sync_log_id: int, results: List[Dict], started_at: float) -> Dict:
+    """Fold the shard results into the full sync's SyncLog"""
+    totals = {key: sum(result.get(key, 0) for result in results)
+              for key in ('directories_processed', 'projects_processed', 'phases_processed',
+                          'elevations_processed', 'skipped_unchanged')}
+    failed = [result for result in results if not result.get('success')]
+    duration = int(time.time() - started_at)
+    items = (totals['directories_processed'] + totals['projects_processed']
+             + totals['phases_processed'] + totals['elevations_processed'])
+
+    sync_log = db.query(SyncLog).filter(SyncLog.id == sync_log_id).first()
+    if sync_log:
+        sync_log.status = 'failed' if failed else 'completed'
+        sync_log.message = (f'Sharded full sync: {len(results) - len(failed)}/{len(results)} shards completed'
+                            if failed else f'Sharded full sync completed ({len(results)} shards)')
+        sync_log.items_processed = items
+        sync_log.items_successful = items
+        sync_log.items_failed = len(failed)
+        sync_log.duration_seconds = duration
+        sync_log.completed_at = datetime.utcnow()
+        if failed:
+            sync_log.error_details = '\n'.join(result.get('message', '') for result in failed)
+
+    if not failed:
+        sync_config = db.query(SyncConfig).first()
+        if not sync_config:
+            sync_config = SyncConfig()
+            db.add(sync_config)
+        sync_config.last_full_sync = datetime.utcnow()
+    db.commit()
+
+    logger.info(f"Sharded full sync finished in {duration}s: {len(results) - len(failed)}/{len(results)} shards, "
+                f"{totals['projects_processed']} projects, {totals['phases_processed']} phases, "
+                f"{totals['elevations_processed']} elevations")
+    return {
+        'success': not failed,
+        'message': sync_log.message if sync_log else 'Sharded full sync finished',
+        'duration_seconds': duration,
+        'shards_total': len(results),
+        'shards_failed': len(failed),
+        'total_items': items,
+        'errors': [result.get('message') for result in failed],
+        **totals
+    }
@@ -0,0 +1,243 @@
+"""
+Shared cache for Logikal directory, project and phase listings.
+
+Listings are keyed by the navigation context they were read in (directory
+path, project and phase identifiers) instead of the session token, so full,
+incremental and force syncs running minutes apart share them. Entries live in
+Redis with an in-process L1 in front; the TTL of a listing is the
+``staleness_threshold_minutes`` of the listed object type in ObjectSyncConfig.
+
+Every fresh listing is compared with the ``changedDate`` of each child seen the
+previous time. Listings below a child whose ``changedDate`` moved (or that
+disappeared) are dropped, so a cached phase listing never outlives a change to
+its project.
+
+Callers choose per call: ``cache-ok`` serves a cached listing when there is
+one, ``must-revalidate`` always reads Logikal and refreshes the cache.
+"""
+import hashlib
+import json
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.config import settings
+from core.rate_limiter import get_redis_client
+from services.logikal_navigation import NavigationContext
+
+logger = logging.getLogger(__name__)
+
+CACHE_OK = "cache-ok"
+MUST_REVALIDATE = "must-revalidate"
+CACHE_MODES = (CACHE_OK, MUST_REVALIDATE)
+
+# Listing endpoint -> object type of the listed children (ObjectSyncConfig.object_type)
+LISTING_OBJECT_TYPES = {
+    'directories': 'directory',
+    'projects': 'project',
+    'phases': 'phase',
+}
+
+# Listings that depend on a child of each listing, relative to the child's context
+CHILD_LISTINGS = {
+    'directories': ('directories', 'projects'),
+    'projects': ('phases',),
+    'phases': ('elevations',),
+}
+
+# ObjectSyncConfig.staleness_threshold_minutes column default
+DEFAULT_STALENESS_MINUTES = 120
+
+
+def child_identifier(endpoint: str, child: Dict) -> Optional[str]:
+    """Identifier a child is selected by: the path for directories, the GUID otherwise"""
+    if endpoint == 'directories':
+        return child.get('path') or child.get('name')
+    return child.get('id')
+
+
+def child_context(endpoint: str, context: NavigationContext, identifier: str) -> NavigationContext:
+    """Navigation context of a listed child"""
+    if endpoint == 'directories':
+        return NavigationContext(directory=identifier)
+    if endpoint == 'projects':
+        return replace(context.truncate(1), project=identifier)
+    return replace(context.truncate(2), phase=identifier)
+
+
+def changed_dates(endpoint: str, items: List[Dict]) -> Dict[str, Any]:
+    """``changedDate`` of every child of a listing, by identifier"""
+    fingerprint = {}
+    for item in items:
+        identifier = child_identifier(endpoint, item)
+        if identifier:
+            fingerprint[identifier] = item.get('changedDate')
+    return fingerprint
+
+
+class LogikalListingCache:
+    """Redis-backed listing cache with an in-process L1"""
+
+    def __init__(self, redis_url: Optional[str] = None, key_prefix: str = "logikal:listing",
+                 l1_ttl_seconds: float = None, l1_max_entries: int = None,
+                 fingerprint_ttl_seconds: int = None):
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.l1_ttl_seconds = l1_ttl_seconds if l1_ttl_seconds is not None else settings.LOGIKAL_LISTING_CACHE_L1_TTL_SECONDS
+        self.l1_max_entries = l1_max_entries or settings.LOGIKAL_LISTING_CACHE_L1_MAX_ENTRIES
+        self.fingerprint_ttl_seconds = fingerprint_ttl_seconds or settings.LOGIKAL_LISTING_FINGERPRINT_TTL_SECONDS
+
+        self._l1: "OrderedDict[str, Tuple[float, List[Dict]]]" = OrderedDict()
+        # Local copy of the changedDate fingerprints, used when Redis is unavailable
+        self._fingerprints: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._ttls: Dict[str, int] = {}
+        self._ttls_loaded_at = 0.0
+        self._redis_down_until = 0.0
+        self._stats = {'l1_hits': 0, 'redis_hits': 0, 'misses': 0, 'revalidations': 0,
+                       'invalidations': 0, 'redis_errors': 0}
+
+    def key(self, base_url: str, context: NavigationContext, endpoint: str) -> str:
+        """Token-independent key of a listing"""
+        server = hashlib.sha1(base_url.rstrip('/').encode('utf-8')).hexdigest()[:12]
+        path = '|'.join(getattr(context, level) or '' for level in ('directory', 'project', 'phase'))
+        return f"{self.key_prefix}:{server}:{endpoint}:{path}"
+
+    def ttl_seconds(self, endpoint: str) -> int:
+        """Listing TTL from the staleness threshold of the listed object type"""
+        if time.monotonic() - self._ttls_loaded_at > settings.LOGIKAL_LISTING_CACHE_CONFIG_REFRESH_SECONDS:
+            self._load_ttls()
+        minutes = self._ttls.get(LISTING_OBJECT_TYPES.get(endpoint), DEFAULT_STALENESS_MINUTES)
+        return max(int(minutes * 60), 0)
+
+    def _load_ttls(self) -> None:
+        self._ttls_loaded_at = time.monotonic()
+        try:
+            from core.database import SessionLocal
+            from models.object_sync_config import ObjectSyncConfig
+
+            db = SessionLocal()
+            try:
+                configs = db.query(ObjectSyncConfig.object_type, ObjectSyncConfig.staleness_threshold_minutes).all()
+            finally:
+                db.close()
+            self._ttls = {object_type: minutes for object_type, minutes in configs}
+        except Exception as e:
+            logger.debug(f"Could not load listing TTLs from object sync configs: {str(e)}")
+
+    def _l1_get(self, key: str) -> Optional[List[Dict]]:
+        entry = self._l1.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._l1[key]
+            return None
+        self._l1.move_to_end(key)
+        return entry[1]
+
+    def _l1_set(self, key: str, items: List[Dict], ttl: int) -> None:
+        # Other workers cannot invalidate this process' L1, so it is kept short
+        self._l1[key] = (time.monotonic() + min(ttl, self.l1_ttl_seconds), items)
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.l1_max_entries:
+            self._l1.popitem(last=False)
+
+    async def _redis_call(self, method: str, *args, **kwargs):
+        if not self.redis_url or time.monotonic() < self._redis_down_until:
+            return None
+        try:
+            return await getattr(get_redis_client(self.redis_url), method)(*args, **kwargs)
+        except Exception as e:
+            # Serve from L1 / Logikal for a while instead of waiting on Redis for every listing
+            self._redis_down_until = time.monotonic() + 30
+            self._stats['redis_errors'] += 1
+            logger.warning(f"Listing cache Redis {method} failed, using L1 only for 30s: {str(e)}")
+            return None
+
+    async def get_listing(self, base_url: str, context: NavigationContext, endpoint: str,
+                          fetch: Callable[[], Awaitable[List[Dict]]],
+                          cache_mode: str = CACHE_OK) -> List[Dict]:
+        """
+        Return a listing, from the cache when ``cache_mode`` allows it.
+
+        ``fetch`` reads the listing from Logikal and raises on failure; failures
+        are never cached.
+        """
+        key = self.key(base_url, context, endpoint)
+
+        if cache_mode != MUST_REVALIDATE:
+            items = self._l1_get(key)
+            if items is not None:
+                self._stats['l1_hits'] += 1
+                return items
+
+            cached = await self._redis_call('get', key)
+            if cached is not None:
+                items = json.loads(cached)
+                self._stats['redis_hits'] += 1
+                self._l1_set(key, items, self.ttl_seconds(endpoint))
+                return items
+            self._stats['misses'] += 1
+        else:
+            self._stats['revalidations'] += 1
+
+        items = await fetch()
+        await self.store(base_url, context, endpoint, items)
+        return items
+
+    async def store(self, base_url: str, context: NavigationContext, endpoint: str, items: List[Dict]) -> None:
+        """Cache a fresh listing and drop the listings below children that changed"""
+        key = self.key(base_url, context, endpoint)
+        ttl = self.ttl_seconds(endpoint)
+        fingerprint = changed_dates(endpoint, items)
+
+        previous = await self._redis_call('get', f"{key}:changed")
+        previous = json.loads(previous) if previous is not None else self._fingerprints.get(key)
+        if previous is not None:
+            moved = [identifier for identifier, changed in previous.items()
+                     if fingerprint.get(identifier, object()) != changed]
+            for identifier in moved:
+                await self.invalidate_below(base_url, child_context(endpoint, context, identifier), endpoint)
+            if moved:
+                logger.info(f"Listing cache: {len(moved)} changed {endpoint} below {key}, dropped their listings")
+
+        if ttl > 0:
+            self._l1_set(key, items, ttl)
+            await self._redis_call('set', key, json.dumps(items, default=str), ex=ttl)
+        # Kept longer than the listing so the next fresh read can still compare against it
+        self._fingerprints[key] = fingerprint
+        self._fingerprints.move_to_end(key)
+        while len(self._fingerprints) > self.l1_max_entries:
+            self._fingerprints.popitem(last=False)
+        await self._redis_call('set', f"{key}:changed", json.dumps(fingerprint, default=str),
+                               ex=max(self.fingerprint_ttl_seconds, ttl))
+
+    async def invalidate_below(self, base_url: str, context: NavigationContext, endpoint: str) -> None:
+        """Drop the listings that hang off one child of an ``endpoint`` listing"""
+        for child_endpoint in CHILD_LISTINGS.get(endpoint, ()):
+            await self.invalidate(base_url, context, child_endpoint)
+
+    async def invalidate(self, base_url: str, context: NavigationContext, endpoint: str) -> None:
+        """Drop one cached listing"""
+        key = self.key(base_url, context, endpoint)
+        self._l1.pop(key, None)
+        await self._redis_call('delete', key)
+        self._stats['invalidations'] += 1
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        return {'l1_entries': len(self._l1), 'ttl_minutes': dict(self._ttls), **self._stats}
+
+
+_listing_cache: Optional[LogikalListingCache] = None
+
+
+def get_listing_cache() -> LogikalListingCache:
+    """Get the process-wide listing cache"""
+    global _listing_cache
+    if _listing_cache is None:
+        _listing_cache = LogikalListingCache(
+            redis_url=settings.LOGIKAL_LISTING_CACHE_REDIS_URL or settings.REDIS_URL
+        )
+    return _listing_cache
@@ -0,0 +1,212 @@
+"""
+Navigation-context tracking for Logikal sessions.
+
+Every Logikal token has a server-side context (directory -> project -> phase ->
+elevation) that the select endpoints change. NavigationSession records that
+context per token and issues only the select calls needed to reach a target,
+instead of walking the directory path from the root on every operation.
+"""
+import logging
+from dataclasses import dataclass, replace
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session
+from services.directory_service import DirectoryService
+from services.project_service import ProjectService
+from services.phase_service import PhaseService
+from services.elevation_service import ElevationService
+
+logger = logging.getLogger(__name__)
+
+# Error the Logikal API returns when a select does not fit the token's context
+INVALID_MAPPING_ERROR = "isn't valid in the current mapping"
+
+LEVELS = ('directory', 'project', 'phase', 'elevation')
+
+
+@dataclass(frozen=True)
+class NavigationContext:
+    """Selected directory path and project/phase/elevation identifiers of a token"""
+    directory: Optional[str] = None
+    project: Optional[str] = None
+    phase: Optional[str] = None
+    elevation: Optional[str] = None
+
+    @property
+    def depth(self) -> int:
+        """Number of selected levels, counted from the directory down"""
+        depth = 0
+        for level in LEVELS:
+            if getattr(self, level) is None:
+                break
+            depth += 1
+        return depth
+
+    def truncate(self, depth: int) -> 'NavigationContext':
+        """Keep only the first ``depth`` levels"""
+        return NavigationContext(*[getattr(self, level) if i < depth else None
+                                   for i, level in enumerate(LEVELS)])
+
+    @classmethod
+    def for_phase(cls, phase) -> Optional['NavigationContext']:
+        """Context in which a phase's elevations can be listed, or None if its hierarchy is incomplete"""
+        project = phase.project if phase else None
+        if not project or not project.directory or not project.directory.full_path:
+            return None
+        return cls(directory=project.directory.full_path, project=project.logikal_id, phase=phase.logikal_id)
+
+    @classmethod
+    def for_elevation(cls, elevation) -> Optional['NavigationContext']:
+        """Context in which an elevation's parts list can be fetched"""
+        phase_context = cls.for_phase(elevation.phase)
+        if phase_context is None:
+            return None
+        return replace(phase_context, elevation=elevation.logikal_id)
+
+
+ROOT_CONTEXT = NavigationContext()
+
+
+def _directory_parts(path: Optional[str]) -> List[str]:
+    return [part for part in (path or '').split('/') if part]
+
+
+def plan_directory_steps(current: Optional[str], target: Optional[str]) -> Optional[List[str]]:
+    """
+    Directory paths to select to move from ``current`` to ``target``.
+
+    Descending goes one level at a time; an ancestor can be selected directly.
+    Returns None when the target is the root, which can only be reached by
+    logging in again.
+    """
+    current_parts = _directory_parts(current)
+    target_parts = _directory_parts(target)
+    if not target_parts:
+        return [] if not current_parts else None
+
+    common = 0
+    for current_part, target_part in zip(current_parts, target_parts):
+        if current_part != target_part:
+            break
+        common += 1
+
+    steps = []
+    if common < len(current_parts) and common > 0:
+        # Step back up to the deepest shared ancestor
+        steps.append('/'.join(target_parts[:common]))
+    for depth in range(common + 1, len(target_parts) + 1):
+        steps.append('/'.join(target_parts[:depth]))
+    return steps
+
+
+def plan_navigation(current: Optional[NavigationContext],
+                    target: NavigationContext) -> Optional[List[Tuple[str, str]]]:
+    """
+    Shortest list of ``(level, identifier)`` select calls from ``current`` to ``target``.
+
+    Listing endpoints work on the deepest selected level, so a context that is
+    deeper than the target is trimmed by re-selecting the target's last level.
+    Returns None when the target cannot be reached without logging in again
+    (unknown current context, or the root after a directory was selected).
+    """
+    if current is None:
+        return None
+
+    steps: List[Tuple[str, str]] = []
+    state = current
+
+    if state.directory != target.directory:
+        directory_steps = plan_directory_steps(state.directory, target.directory)
+        if directory_steps is None:
+            return None
+        steps.extend(('directory', path) for path in directory_steps)
+        state = NavigationContext(directory=target.directory)
+
+    for index, level in enumerate(LEVELS[1:], start=1):
+        wanted = getattr(target, level)
+        if wanted is None:
+            break
+        if getattr(state, level) != wanted:
+            steps.append((level, wanted))
+            state = replace(state.truncate(index), **{level: wanted})
+
+    target_depth = target.depth
+    if state.depth > target_depth:
+        if target_depth == 0:
+            return None
+        last_level = LEVELS[target_depth - 1]
+        steps.append((last_level, getattr(target, last_level)))
+
+    return steps
+
+
+class NavigationSession:
+    """
+    Wraps a leased Logikal token and keeps its navigation context in sync.
+
+    When the API rejects a select with "isn't valid in the current mapping"
+    the recorded context is dropped and, if the session came from a pool, the
+    token is renewed and the full path is navigated from the root.
+    """
+
+    def __init__(self, db: Session, lease, base_url: str, pool=None):
+        self.db = db
+        self.lease = lease
+        self.base_url = base_url.rstrip('/')
+        self.pool = pool
+        self.select_calls = 0
+
+    @property
+    def token(self) -> str:
+        return self.lease.token
+
+    @property
+    def context(self) -> Optional[NavigationContext]:
+        return self.lease.context
+
+    def invalidate(self) -> None:
+        """Forget the recorded context, e.g. after an unexpected API error"""
+        self.lease.context = None
+
+    async def _select(self, level: str, identifier: str) -> Tuple[bool, str]:
+        self.select_calls += 1
+        if level == 'directory':
+            return await DirectoryService(self.db, self.token, self.base_url).select_directory(identifier)
+        if level == 'project':
+            return await ProjectService(self.db, self.token, self.base_url).select_project(identifier)
+        if level == 'phase':
+            return await PhaseService(self.db, self.token, self.base_url).select_phase(identifier)
+        return await ElevationService(self.db, self.token, self.base_url).select_elevation(identifier)
+
+    async def _apply(self, steps: List[Tuple[str, str]]) -> Tuple[bool, str]:
+        for level, identifier in steps:
+            success, message = await self._select(level, identifier)
+            if not success:
+                # Logikal may have applied part of the select - the token's context is unknown
+                self.invalidate()
+                return False, message
+
+            index = LEVELS.index(level)
+            state = self.context or ROOT_CONTEXT
+            self.lease.context = replace(state.truncate(index), **{level: identifier})
+        return True, "Navigation successful"
+
+    async def navigate_to(self, target: NavigationContext) -> Tuple[bool, str]:
+        """Issue the minimal select calls that bring this token to ``target``"""
+        steps = plan_navigation(self.context, target)
+        if steps is not None:
+            if not steps:
+                return True, "Already in target context"
+
+            logger.debug(f"Navigating {self.context} -> {target} with {len(steps)} select call(s)")
+            success, message = await self._apply(steps)
+            if success or INVALID_MAPPING_ERROR not in message:
+                return success, message
+
+            logger.warning(f"Navigation context rejected by Logikal, resetting session: {message}")
+
+        if self.pool is None:
+            return False, "Navigation context lost and session cannot be renewed"
+
+        # Log in again and navigate the full path from the root
+        await self.pool.renew(self.lease)
+        return await self._apply(plan_navigation(ROOT_CONTEXT, target) or [])
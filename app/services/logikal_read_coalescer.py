@@ -0,0 +1,116 @@
+"""
+Single-flight coalescing of identical Logikal reads.
+
+Listings depend on the navigation context of the token they are read with, so
+reads are keyed by (base URL, navigation context, endpoint). Concurrent callers
+asking for the same key share one upstream call and one parsed result, and the
+result is memoised for a short TTL so bursts of force syncs for projects in the
+same directory cost a single listing.
+"""
+import asyncio
+import time
+import logging
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProjectListing:
+    """Projects of one directory with a name index built once per listing"""
+    projects: List[dict]
+    by_name: Dict[str, dict] = field(default_factory=dict)
+    fetched_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_projects(cls, projects: List[dict]) -> 'ProjectListing':
+        by_name = {}
+        for project in projects:
+            name = project.get('name')
+            # First match wins, like the linear scans this replaces
+            if name and name not in by_name:
+                by_name[name] = project
+        return cls(projects=projects, by_name=by_name)
+
+    def find(self, name: str) -> Optional[dict]:
+        return self.by_name.get(name)
+
+    @property
+    def names(self) -> List[str]:
+        return [p.get('name') for p in self.projects if p.get('name')]
+
+
+class ReadCoalescer:
+    """Shares in-flight reads and memoises their results for ``ttl_seconds``"""
+
+    def __init__(self, ttl_seconds: float = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.LOGIKAL_READ_MEMO_TTL_SECONDS
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._memo: Dict[Hashable, Tuple[float, Any]] = {}
+        self._stats = {'fetches': 0, 'coalesced': 0, 'memo_hits': 0, 'failures': 0}
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], ttl_seconds: float = None) -> Any:
+        """Return the memoised value for ``key``, join an identical in-flight read, or fetch"""
+        cached = self._memo.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self._stats['memo_hits'] += 1
+                return cached[1]
+            del self._memo[key]
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self._stats['coalesced'] += 1
+            # Shield so one waiter giving up does not cancel the shared read
+            return await asyncio.shield(in_flight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self._stats['fetches'] += 1
+        try:
+            value = await fetch()
+        except BaseException as e:
+            self._stats['failures'] += 1
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark as retrieved - there may be no other waiters
+                future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl > 0:
+            self._memo[key] = (time.monotonic() + ttl, value)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """Drop one memoised value, or all of them"""
+        if key is None:
+            self._memo.clear()
+        else:
+            self._memo.pop(key, None)
+
+    def get_stats(self) -> Dict:
+        """Get coalescer statistics"""
+        return {'memoised': len(self._memo), 'in_flight': len(self._in_flight), **self._stats}
+
+
+# Futures are bound to the loop that created them, so keep one coalescer per loop
+_coalescers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ReadCoalescer]" = weakref.WeakKeyDictionary()
+
+
+def get_read_coalescer() -> ReadCoalescer:
+    """Get the read coalescer of the running event loop"""
+    loop = asyncio.get_running_loop()
+    coalescer = _coalescers.get(loop)
+    if coalescer is None:
+        coalescer = ReadCoalescer()
+        _coalescers[loop] = coalescer
+    return coalescer
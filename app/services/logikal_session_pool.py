@@ -0,0 +1,327 @@
+"""
+Pool of pre-authenticated Logikal API sessions.
+
+Logikal tokens are stateful (each one carries its own directory/project/phase
+navigation context), so a token can only serve one sync unit at a time. The
+pool keeps tokens warm, leases them out to sync units and takes them back
+afterwards, so logins happen in the background instead of on the sync path.
+"""
+import asyncio
+import time
+import logging
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from core.config import settings
+from core.database import SessionLocal
+from services.auth_service import AuthService
+from services.logikal_navigation import NavigationContext, ROOT_CONTEXT, plan_navigation
+
+logger = logging.getLogger(__name__)
+
+
+class SessionPoolError(Exception):
+    """Raised when the pool cannot provide an authenticated session"""
+    pass
+
+
+@dataclass
+class LogikalLease:
+    """A Logikal token leased to a single sync unit"""
+    token: str
+    base_url: str
+    username: str
+    authenticated_at: float
+    expires_at: float
+    # Server-side navigation context of the token; None when unknown
+    # (handed out to a caller that navigates without recording it)
+    context: Optional[NavigationContext] = ROOT_CONTEXT
+    leased_at: Optional[float] = None
+    uses: int = 0
+
+    @property
+    def is_clean(self) -> bool:
+        """True if the token is still at the root context right after login"""
+        return self.context == ROOT_CONTEXT
+
+    def is_expired(self, margin_seconds: float = 0.0) -> bool:
+        return time.time() + margin_seconds >= self.expires_at
+
+
+class LogikalSessionPool:
+    """Keeps up to ``size`` authenticated Logikal tokens and leases them out"""
+
+    def __init__(self, base_url: str, username: str, password: str,
+                 size: int = None, min_idle: int = None,
+                 max_age_seconds: float = None, refresh_interval_seconds: float = None):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.size = size or settings.LOGIKAL_SESSION_POOL_SIZE
+        self.min_idle = min(min_idle if min_idle is not None else settings.LOGIKAL_SESSION_POOL_MIN_IDLE, self.size)
+        self.max_age_seconds = max_age_seconds or settings.LOGIKAL_SESSION_MAX_AGE_SECONDS
+        self.refresh_interval_seconds = refresh_interval_seconds or settings.LOGIKAL_SESSION_REFRESH_INTERVAL_SECONDS
+
+        self._idle: List[LogikalLease] = []
+        self._leased: Dict[int, LogikalLease] = {}
+        self._slots = asyncio.Semaphore(self.size)
+        self._lock = asyncio.Lock()
+        self._refresher: Optional[asyncio.Task] = None
+        self._closed = False
+        self._stats = {'logins': 0, 'login_failures': 0, 'leases': 0, 'reused': 0, 'renewed': 0, 'discarded': 0}
+
+    async def _authenticate(self) -> Tuple[bool, str]:
+        """Log in to Logikal using a dedicated DB session"""
+        db = SessionLocal()
+        try:
+            auth_service = AuthService(db)
+            success, token = await auth_service.authenticate(self.base_url, self.username, self.password)
+            db.commit()
+            return success, token
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def _login(self) -> LogikalLease:
+        """Authenticate a new token"""
+        success, token = await self._authenticate()
+        if not success:
+            self._stats['login_failures'] += 1
+            raise SessionPoolError(f"Authentication failed: {token}")
+
+        self._stats['logins'] += 1
+        now = time.time()
+        return LogikalLease(
+            token=token,
+            base_url=self.base_url,
+            username=self.username,
+            authenticated_at=now,
+            expires_at=now + self.max_age_seconds
+        )
+
+    def _usable(self, lease: LogikalLease) -> bool:
+        return not lease.is_expired(margin_seconds=self.refresh_interval_seconds)
+
+    def _pop_idle(self, require_clean: bool, target: Optional[NavigationContext]) -> Optional[LogikalLease]:
+        """Take the best idle lease, preferring tokens closest to ``target``"""
+        if target is not None:
+            best, best_steps = None, None
+            for lease in self._idle:
+                if not self._usable(lease):
+                    continue
+                steps = plan_navigation(lease.context, target)
+                if steps is not None and (best_steps is None or len(steps) < best_steps):
+                    best, best_steps = lease, len(steps)
+            if best is not None:
+                self._idle.remove(best)
+            return best
+
+        for lease in self._idle:
+            if lease.is_clean and self._usable(lease):
+                self._idle.remove(lease)
+                return lease
+        if not require_clean:
+            for lease in self._idle:
+                if self._usable(lease):
+                    self._idle.remove(lease)
+                    return lease
+        return None
+
+    async def acquire(self, require_clean: bool = True,
+                      target: Optional[NavigationContext] = None) -> LogikalLease:
+        """
+        Lease a token. Blocks while all ``size`` tokens are leased out.
+
+        With ``target`` the caller navigates through a NavigationSession and
+        gets the idle token that needs the fewest select calls to get there.
+        Otherwise, with ``require_clean`` the token is guaranteed to be at the
+        root navigation context (a used token is re-authenticated if needed).
+        """
+        if self._closed:
+            raise SessionPoolError("Session pool is closed")
+
+        self._ensure_refresher()
+        await self._slots.acquire()
+        try:
+            async with self._lock:
+                lease = self._pop_idle(require_clean, target)
+                if lease is None and self._idle:
+                    # Only stale or dirty tokens left - recycle one slot's worth
+                    self._idle.pop(0)
+                    self._stats['discarded'] += 1
+
+            if lease is None:
+                lease = await self._login()
+            else:
+                self._stats['reused'] += 1
+
+            lease.leased_at = time.time()
+            if target is None:
+                # The caller navigates on its own - context is no longer known
+                lease.context = None
+            lease.uses += 1
+            self._leased[id(lease)] = lease
+            self._stats['leases'] += 1
+            return lease
+        except Exception:
+            self._slots.release()
+            raise
+
+    async def try_acquire(self, target: Optional[NavigationContext] = None) -> Optional[LogikalLease]:
+        """
+        Lease a token only if a slot is free right now, otherwise return None.
+        
+        For optional extra sessions taken while already holding a lease, where
+        waiting for a slot could deadlock against other holders.
+        """
+        if self._closed or self._slots.locked():
+            return None
+        return await self.acquire(target=target)
+
+    async def release(self, lease: LogikalLease, discard: bool = False) -> None:
+        """Return a leased token to the pool (or drop it when ``discard`` is set)"""
+        if self._leased.pop(id(lease), None) is None:
+            return
+        try:
+            lease.leased_at = None
+            if discard or self._closed or lease.is_expired():
+                self._stats['discarded'] += 1
+                return
+            async with self._lock:
+                self._idle.append(lease)
+        finally:
+            self._slots.release()
+
+    async def renew(self, lease: LogikalLease) -> LogikalLease:
+        """Re-authenticate a leased token in place, resetting its navigation context"""
+        fresh = await self._login()
+        lease.token = fresh.token
+        lease.authenticated_at = fresh.authenticated_at
+        lease.expires_at = fresh.expires_at
+        lease.context = ROOT_CONTEXT
+        self._stats['renewed'] += 1
+        return lease
+
+    @asynccontextmanager
+    async def lease(self, require_clean: bool = True, target: Optional[NavigationContext] = None):
+        """Context manager that leases a token and always returns it"""
+        lease = await self.acquire(require_clean=require_clean, target=target)
+        discard = False
+        try:
+            yield lease
+        except (Exception, asyncio.CancelledError):
+            # The token's navigation state is unknown after a failure or a cancelled call
+            discard = True
+            raise
+        finally:
+            await self.release(lease, discard=discard)
+
+    async def warm_up(self, count: int = None) -> int:
+        """Pre-authenticate idle tokens so the first leases do not wait on a login"""
+        count = min(count or self.min_idle, self.size)
+        created = 0
+        while True:
+            async with self._lock:
+                if len(self._idle) + len(self._leased) >= self.size or \
+                        sum(1 for l in self._idle if l.is_clean) >= count:
+                    break
+            try:
+                lease = await self._login()
+            except Exception as e:
+                logger.warning(f"Session pool warm-up failed: {str(e)}")
+                break
+            async with self._lock:
+                self._idle.append(lease)
+            created += 1
+        return created
+
+    async def _refresh_once(self) -> None:
+        """Drop expiring idle tokens and keep ``min_idle`` clean tokens ready"""
+        async with self._lock:
+            kept = []
+            for lease in self._idle:
+                if self._usable(lease):
+                    kept.append(lease)
+                else:
+                    self._stats['discarded'] += 1
+            self._idle = kept
+            clean_idle = sum(1 for l in self._idle if l.is_clean)
+            # Take used tokens out of the pool while they are being renewed
+            to_renew = [l for l in self._idle if not l.is_clean][:max(self.min_idle - clean_idle, 0)]
+            for lease in to_renew:
+                self._idle.remove(lease)
+
+        # Turn used tokens back into clean ones before creating new ones
+        for lease in to_renew:
+            try:
+                await self.renew(lease)
+            except Exception as e:
+                self._stats['discarded'] += 1
+                logger.warning(f"Session pool refresh failed: {str(e)}")
+                continue
+            async with self._lock:
+                self._idle.append(lease)
+
+        await self.warm_up(self.min_idle)
+
+    def _ensure_refresher(self) -> None:
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        while not self._closed:
+            try:
+                await self._refresh_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"Session pool refresh error: {str(e)}")
+            await asyncio.sleep(self.refresh_interval_seconds)
+
+    async def close(self) -> None:
+        """Stop background refreshing and forget all tokens"""
+        self._closed = True
+        if self._refresher and not self._refresher.done():
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._idle.clear()
+
+    def get_stats(self) -> Dict:
+        """Get pool statistics"""
+        return {
+            'base_url': self.base_url,
+            'size': self.size,
+            'idle': len(self._idle),
+            'idle_clean': sum(1 for l in self._idle if l.is_clean),
+            'leased': len(self._leased),
+            **self._stats
+        }
+
+
+# One pool per event loop and Logikal account
+_session_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], LogikalSessionPool]]" = weakref.WeakKeyDictionary()
+
+
+def get_logikal_session_pool(base_url: str, username: str, password: str) -> LogikalSessionPool:
+    """Get the session pool for the running event loop and Logikal account"""
+    loop = asyncio.get_running_loop()
+    pools = _session_pools.setdefault(loop, {})
+    key = (base_url.rstrip('/'), username)
+    pool = pools.get(key)
+    if pool is None or pool._closed:
+        pool = LogikalSessionPool(base_url, username, password)
+        pools[key] = pool
+    return pool
+
+
+async def close_logikal_session_pools() -> None:
+    """Close all session pools bound to the running event loop"""
+    pools = _session_pools.pop(asyncio.get_running_loop(), {})
+    for pool in pools.values():
+        await pool.close()
@@ -0,0 +1,110 @@
+"""
+Context-affinity planning for elevation-level Logikal work.
+
+Parts-list fetches need the token to sit in the elevation's context. Doing
+them in arbitrary order costs a login and a full navigation per elevation.
+The planner groups elevations by their (directory, project, phase) context and
+walks each group's siblings inside one leased session, so moving on to the
+next elevation is a single ``/elevations/select``.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from models.elevation import Elevation
+from services.logikal_navigation import NavigationContext, NavigationSession
+from services.logikal_session_pool import LogikalSessionPool
+
+logger = logging.getLogger(__name__)
+
+# Callback doing the actual elevation-level work once the session is in context
+ElevationWork = Callable[[Elevation, NavigationSession], Awaitable[Tuple[bool, str]]]
+
+
+@dataclass
+class ElevationWorkGroup:
+    """Sibling elevations sharing one phase context"""
+    context: NavigationContext
+    elevations: List[Elevation] = field(default_factory=list)
+
+
+class ContextAffinityPlanner:
+    """Groups elevation work by navigation context and runs each group in one session"""
+
+    def __init__(self, db: Session, session_pool: LogikalSessionPool, base_url: str):
+        self.db = db
+        self.session_pool = session_pool
+        self.base_url = base_url
+        self._stats = {'groups': 0, 'processed': 0, 'successful': 0, 'failed': 0, 'select_calls': 0}
+        self.errors: List[str] = []
+
+    def plan(self, elevations: Iterable[Elevation]) -> List[ElevationWorkGroup]:
+        """Group elevations by phase context; elevations with an incomplete hierarchy are reported as errors"""
+        groups: Dict[NavigationContext, ElevationWorkGroup] = {}
+        for elevation in elevations:
+            context = NavigationContext.for_phase(elevation.phase)
+            if context is None:
+                self._record(elevation, False, "incomplete directory/project/phase hierarchy")
+                continue
+            groups.setdefault(context, ElevationWorkGroup(context)).elevations.append(elevation)
+
+        # Neighbouring groups share directory/project prefixes, so the next group is cheap to reach too
+        ordered = sorted(groups.values(), key=lambda g: (g.context.directory, g.context.project, g.context.phase))
+        for group in ordered:
+            group.elevations.sort(key=lambda e: e.logikal_id)
+        return ordered
+
+    async def run(self, groups: List[ElevationWorkGroup], work: ElevationWork,
+                  navigation: Optional[NavigationSession] = None) -> Dict:
+        """
+        Run ``work`` for every planned elevation.
+
+        ``navigation`` lets a caller that already holds a session in the right
+        context reuse it; otherwise each group leases its own session.
+        """
+        for group in groups:
+            self._stats['groups'] += 1
+            if navigation is not None:
+                await self._run_group(group, work, navigation)
+                continue
+
+            async with self.session_pool.lease(target=group.context) as lease:
+                await self._run_group(group, work, NavigationSession(self.db, lease, self.base_url,
+                                                                     pool=self.session_pool))
+        return self.get_stats()
+
+    async def _run_group(self, group: ElevationWorkGroup, work: ElevationWork,
+                         navigation: NavigationSession) -> None:
+        select_calls_before = navigation.select_calls
+        for elevation in group.elevations:
+            try:
+                target = NavigationContext.for_elevation(elevation)
+                success, message = await navigation.navigate_to(target)
+                if success:
+                    success, message = await work(elevation, navigation)
+                else:
+                    message = f"Failed to navigate to elevation context: {message}"
+            except Exception as e:
+                # The token may have been left anywhere - navigate from a known state next time
+                navigation.invalidate()
+                success, message = False, str(e)
+            self._record(elevation, success, message)
+
+        self._stats['select_calls'] += navigation.select_calls - select_calls_before
+        logger.info(f"Processed {len(group.elevations)} elevations in {group.context} with "
+                    f"{navigation.select_calls - select_calls_before} select calls")
+
+    def _record(self, elevation: Elevation, success: bool, message: str) -> None:
+        self._stats['processed'] += 1
+        if success:
+            self._stats['successful'] += 1
+            logger.info(f"Elevation {elevation.name}: {message}")
+        else:
+            self._stats['failed'] += 1
+            error_msg = f"Elevation {elevation.name}: {message}"
+            self.errors.append(error_msg)
+            logger.warning(error_msg)
+
+    def get_stats(self) -> Dict:
+        """Get planner statistics"""
+        return dict(self._stats)
@@ -9,6 +9,7 @@ from models.directory import Directory
 from models.sync_log import SyncLog
 from services.auth_service import AuthService
 from services.directory_service import DirectoryService
+from services.logikal_session_pool import get_logikal_session_pool
 
 logger = logging.getLogger(__name__)
 
@@ -103,28 +104,25 @@ class OptimizedDirectorySyncService:
     async def _discover_root_directories_optimized(self, base_url: str, username: str, password: str) -> List[Dict]:
         """Discover root directories with minimal logging and timeout handling"""
         try:
-            # Create discovery session with minimal logging
-            logger.info("Authenticating for root directory discovery")
+            # Lease a clean discovery session
+            logger.info("Leasing session for root directory discovery")
+            session_pool = get_logikal_session_pool(base_url, username, password)
             
             # Add timeout for authentication
-            import asyncio
-            success, token = await asyncio.wait_for(
-                self.auth_service.authenticate(base_url, username, password),
-                timeout=30.0  # 30 second timeout
-            )
-            
-            if not success:
-                raise Exception(f"Authentication failed: {token}")
+            lease = await asyncio.wait_for(session_pool.acquire(), timeout=30.0)  # 30 second timeout
             
-            # Get root directories with logging disabled
-            directory_service = DirectoryService(self.db, token, base_url, enable_logging=False)
-            
-            # Add timeout for directory retrieval
-            logger.info("Fetching root directories")
-            success, directories, message = await asyncio.wait_for(
-                directory_service.get_directories(),
-                timeout=60.0  # 60 second timeout
-            )
+            try:
+                # Get root directories with logging disabled
+                directory_service = DirectoryService(self.db, lease.token, base_url, enable_logging=False)
+                
+                # Add timeout for directory retrieval
+                logger.info("Fetching root directories")
+                success, directories, message = await asyncio.wait_for(
+                    directory_service.get_directories(),
+                    timeout=60.0  # 60 second timeout
+                )
+            finally:
+                await session_pool.release(lease)
             
             if not success:
                 raise Exception(f"Failed to get root directories: {message}")
@@ -143,6 +141,7 @@ class OptimizedDirectorySyncService:
     async def _collect_all_directories_optimized(self, base_url: str, username: str, password: str,
                                               root_directories: List[Dict], all_directories: List[Dict]):
         """Collect all directories without database operations"""
+        session_pool = get_logikal_session_pool(base_url, username, password)
         
         # Process each root directory tree with dedicated session
         for root_directory in root_directories:
@@ -156,26 +155,30 @@ class OptimizedDirectorySyncService:
                 logger.info(f"Skipping excluded root directory: {root_name}")
                 continue
             
-            # Create dedicated session for this root tree
-            success, token = await self.auth_service.authenticate(base_url, username, password)
-            if not success:
-                logger.error(f"Failed to authenticate for root directory tree: {root_name}")
+            # Lease a dedicated session for this root tree
+            try:
+                lease = await session_pool.acquire()
+            except Exception as e:
+                logger.error(f"Failed to authenticate for root directory tree: {root_name}: {str(e)}")
                 continue
             
-            # Initialize directory service with minimal logging
-            directory_service = DirectoryService(self.db, token, base_url, enable_logging=False)
-            
-            # Add root directory to collection
-            all_directories.append({
-                'data': root_directory,
-                'parent_id': None,
-                'level': 0
-            })
-            
-            # Collect children recursively
-            await self._collect_children_optimized(
-                directory_service, root_directory, root_path, 0, all_directories
-            )
+            try:
+                # Initialize directory service with minimal logging
+                directory_service = DirectoryService(self.db, lease.token, base_url, enable_logging=False)
+                
+                # Add root directory to collection
+                all_directories.append({
+                    'data': root_directory,
+                    'parent_id': None,
+                    'level': 0
+                })
+                
+                # Collect children recursively
+                await self._collect_children_optimized(
+                    directory_service, root_directory, root_path, 0, all_directories
+                )
+            finally:
+                await session_pool.release(lease)
     
     async def _collect_children_optimized(self, directory_service: DirectoryService, 
                                         parent_directory: Dict, parent_path: str, 
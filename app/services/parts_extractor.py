@@ -0,0 +1,160 @@
+"""
+Schema-mapped extraction of part line items from parts-list databases.
+
+Besides the Elevations and Glass tables the parser reads, a Logikal parts
+database holds one table per kind of material (profiles, articles,
+accessories, ...). Every table that has an article number column is treated
+as a line-item table: its rows are mapped onto the common columns of
+elevation_parts through FIELD_ALIASES (first matching column wins, compared
+case-insensitively) and the remaining columns are kept in ``attributes``.
+
+The lines of an elevation are replaced as a whole on every parse and loaded
+with COPY, so bill-of-materials queries across elevations are plain SQL on
+the partitioned, indexed elevation_parts table.
+"""
+import sqlite3
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.elevation_part import ElevationPart
+from services.bulk_upsert import copy_rows
+
+logger = logging.getLogger(__name__)
+
+# elevation_parts column -> SQLite column names it is read from, in order of preference
+FIELD_ALIASES = {
+    'article_number': ('ArticleNo', 'ArticleNumber', 'Article_No', 'ArticleCode', 'Article', 'OrderNo',
+                       'OrderNumber', 'PartNo', 'PartNumber'),
+    'description': ('Description', 'Description_Long', 'Text', 'Name', 'AutoDescription'),
+    'system_code': ('SystemCode', 'System_Code', 'System'),
+    'color': ('Color', 'Colour', 'ColorCode', 'ColorBase_Long', 'Color_Long'),
+    'quantity': ('Quantity', 'Qty', 'Amount', 'Pieces', 'Count'),
+    'unit': ('Unit', 'QuantityUnit', 'Quantity_Unit'),
+    'length': ('Length', 'Length_Output', 'CutLength'),
+    'weight': ('Weight', 'Weight_Output'),
+}
+NUMERIC_FIELDS = ('quantity', 'length', 'weight')
+TEXT_LIMITS = {'article_number': 100, 'system_code': 100, 'color': 255, 'unit': 50}
+
+# Tables the parser already stores elsewhere
+SKIPPED_TABLES = {'elevations', 'glass'}
+
+PART_COLUMNS = ('elevation_id', 'source_table', 'line_no') + tuple(FIELD_ALIASES) + ('attributes',)
+
+
+def _to_float(value) -> Optional[float]:
+    if value is None or isinstance(value, bytes):
+        return None
+    try:
+        return float(str(value).replace(',', '.')) if isinstance(value, str) else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _map_columns(columns: Sequence[str]) -> Dict[str, str]:
+    """elevation_parts column -> SQLite column of one table"""
+    by_lower = {name.lower(): name for name in columns}
+    mapping = {}
+    for field, aliases in FIELD_ALIASES.items():
+        for alias in aliases:
+            if alias.lower() in by_lower:
+                mapping[field] = by_lower[alias.lower()]
+                break
+    return mapping
+
+
+def extract_part_lines(conn: sqlite3.Connection, tables: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Read the line items of every line-item table of an open parts database.
+
+    ``tables`` restricts the extraction to those tables (default:
+    settings.PARTS_LINE_ITEM_TABLES, empty meaning all with an article number).
+    """
+    if tables is None:
+        tables = settings.PARTS_LINE_ITEM_TABLES
+    wanted = {name.lower() for name in tables or ()}
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")
+    table_names = [row[0] for row in cursor.fetchall()]
+
+    lines = []
+    for table_name in table_names:
+        if table_name.lower() in SKIPPED_TABLES or (wanted and table_name.lower() not in wanted):
+            continue
+        quoted = '"' + table_name.replace('"', '""') + '"'
+        cursor.execute(f"PRAGMA table_info({quoted})")
+        columns = [row[1] for row in cursor.fetchall()]
+        mapping = _map_columns(columns)
+        if 'article_number' not in mapping:
+            continue
+
+        mapped = set(mapping.values())
+        cursor.execute(f"SELECT * FROM {quoted}")
+        for line_no, row in enumerate(cursor.fetchall(), start=1):
+            values = dict(zip(columns, row))
+            line = {'source_table': table_name, 'line_no': line_no}
+            for field in FIELD_ALIASES:
+                value = values.get(mapping[field]) if field in mapping else None
+                if field in NUMERIC_FIELDS:
+                    value = _to_float(value)
+                elif value is not None:
+                    value = str(value)[:TEXT_LIMITS[field]] if field in TEXT_LIMITS else str(value)
+                line[field] = value
+            # Binary columns (drawings, thumbnails) are not kept
+            line['attributes'] = {name: value for name, value in values.items()
+                                  if name not in mapped and value is not None and not isinstance(value, bytes)}
+            lines.append(line)
+    return lines
+
+
+def replace_part_lines(db: Session, lines_by_elevation: Dict[int, List[Dict]]) -> int:
+    """
+    Replace the line items of the given elevations (no commit).
+
+    Returns the number of lines loaded.
+    """
+    if not lines_by_elevation:
+        return 0
+    db.query(ElevationPart).filter(
+        ElevationPart.elevation_id.in_(list(lines_by_elevation))
+    ).delete(synchronize_session=False)
+
+    rows = [
+        (elevation_id, *[line[column] for column in PART_COLUMNS[1:]])
+        for elevation_id, lines in lines_by_elevation.items()
+        for line in lines
+    ]
+    return copy_rows(db, ElevationPart, PART_COLUMNS, rows)
+
+
+def bill_of_materials(db: Session, elevation_ids: Optional[Sequence[int]] = None,
+                      system_code: Optional[str] = None, article_number: Optional[str] = None,
+                      limit: int = 1000) -> List[Dict]:
+    """Quantities per article across elevations (one aggregate query)"""
+    query = db.query(
+        ElevationPart.article_number,
+        ElevationPart.system_code,
+        ElevationPart.unit,
+        func.min(ElevationPart.description).label('description'),
+        func.sum(ElevationPart.quantity).label('quantity'),
+        func.sum(ElevationPart.length).label('total_length'),
+        func.count(func.distinct(ElevationPart.elevation_id)).label('elevations'),
+        func.count().label('lines')
+    ).filter(ElevationPart.article_number.isnot(None))
+
+    if elevation_ids:
+        query = query.filter(ElevationPart.elevation_id.in_(list(elevation_ids)))
+    if system_code:
+        query = query.filter(ElevationPart.system_code == system_code)
+    if article_number:
+        query = query.filter(ElevationPart.article_number == article_number)
+
+    rows = query.group_by(
+        ElevationPart.article_number, ElevationPart.system_code, ElevationPart.unit
+    ).order_by(ElevationPart.article_number).limit(limit).all()
+    return [dict(row._mapping) for row in rows]
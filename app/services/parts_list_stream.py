@@ -0,0 +1,262 @@
+"""
+Streaming decode of the Logikal parts-list response.
+
+The parts-list endpoint returns a JSON object whose ``data`` field is the
+base64-encoded SQLite database. Instead of loading the response, the base64
+string and the decoded bytes into memory, the response body is tokenised
+incrementally: the characters of ``data`` are base64-decoded in 4-byte aligned
+chunks, hashed and written to disk as they arrive. Peak memory per download is
+the read buffer size.
+
+For in-memory parsing the decoded database can be collected into a buffer
+instead (bounded by a size limit) and written to disk later as an archive.
+"""
+import binascii
+import hashlib
+import os
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterable, AsyncIterator, Optional
+
+import aiofiles
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 64 * 1024
+
+# JSON escapes that can appear inside a base64 string value
+_SIMPLE_ESCAPES = {ord('/'): b'/', ord('\\'): b'\\', ord('"'): b'"',
+                   ord('n'): b'', ord('r'): b'', ord('t'): b'', ord('b'): b'', ord('f'): b''}
+_WHITESPACE = b' \t\r\n'
+
+
+def _next_special(chunk: bytes, start: int) -> int:
+    """Index of the next quote or backslash at or after ``start`` (len(chunk) if none)"""
+    quote = chunk.find(b'"', start)
+    backslash = chunk.find(b'\\', start)
+    candidates = [index for index in (quote, backslash) if index != -1]
+    return min(candidates) if candidates else len(chunk)
+
+
+class JsonStringFieldExtractor:
+    """
+    Incremental tokeniser that yields the raw characters of one top-level string field.
+
+    Only the nesting depth and the string/escape state of the document are
+    tracked, so other values (nested objects, long strings) are skipped without
+    being buffered.
+    """
+
+    def __init__(self, field: str = 'data'):
+        self.field = field.encode('utf-8')
+        self.found = False
+        self.complete = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._unicode: Optional[bytearray] = None
+        self._capturing = False
+        self._expect_key = False
+        self._reading_key = False
+        self._key = bytearray()
+        self._last_key: Optional[bytes] = None
+        self._awaiting_value = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Consume a chunk of the JSON document; returns the field characters it contained"""
+        out = bytearray()
+        index = 0
+        length = len(chunk)
+        while index < length and not self.complete:
+            if self._in_string and not self._escape and self._unicode is None and not self._reading_key:
+                # Copy (or skip) plain string content up to the next quote/escape in one step
+                end = _next_special(chunk, index)
+                if end > index:
+                    if self._capturing:
+                        out.extend(chunk[index:end])
+                    index = end
+                    continue
+
+            byte = chunk[index]
+            index += 1
+            if self._in_string:
+                self._string_byte(byte, out)
+                continue
+
+            if byte == ord('"'):
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._reading_key = True
+                    self._key.clear()
+                elif self._depth == 1 and self._awaiting_value and self._last_key == self.field:
+                    self._capturing = True
+                    self.found = True
+                self._awaiting_value = False
+            elif byte in b'{[':
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = byte == ord('{')
+                self._awaiting_value = False
+            elif byte in b'}]':
+                self._depth -= 1
+            elif self._depth == 1 and byte == ord(':'):
+                self._awaiting_value = True
+            elif self._depth == 1 and byte == ord(','):
+                self._expect_key = True
+            elif byte not in _WHITESPACE:
+                # Start of a number / true / false / null value
+                self._awaiting_value = False
+        return bytes(out)
+
+    def _string_byte(self, byte: int, out: bytearray) -> None:
+        if self._unicode is not None:
+            self._unicode.append(byte)
+            if len(self._unicode) == 4:
+                if self._capturing:
+                    out.extend(chr(int(self._unicode.decode('ascii'), 16)).encode('utf-8'))
+                self._unicode = None
+            return
+        if self._escape:
+            self._escape = False
+            if byte == ord('u'):
+                self._unicode = bytearray()
+            elif self._capturing:
+                out.extend(_SIMPLE_ESCAPES.get(byte, b''))
+            elif self._reading_key:
+                self._key.append(byte)
+            return
+        if byte == ord('\\'):
+            self._escape = True
+        elif byte == ord('"'):
+            self._in_string = False
+            if self._capturing:
+                self._capturing = False
+                self.complete = True
+            elif self._reading_key:
+                self._reading_key = False
+                self._expect_key = False
+                # Keys are short; anything longer cannot be the field we look for
+                self._last_key = bytes(self._key) if len(self._key) <= 256 else None
+        elif self._capturing:
+            out.append(byte)
+        elif self._reading_key and len(self._key) <= 256:
+            self._key.append(byte)
+
+
+class Base64StreamDecoder:
+    """Decodes base64 text fed in arbitrary pieces, carrying the unaligned tail over"""
+
+    def __init__(self):
+        self._pending = b''
+
+    def feed(self, text: bytes) -> bytes:
+        data = self._pending + text.translate(None, _WHITESPACE)
+        aligned = len(data) - len(data) % 4
+        self._pending = data[aligned:]
+        return binascii.a2b_base64(data[:aligned]) if aligned else b''
+
+    def finish(self) -> bytes:
+        if not self._pending:
+            return b''
+        # Tolerate missing padding on the last quantum
+        pending, self._pending = self._pending, b''
+        return binascii.a2b_base64(pending + b'=' * (-len(pending) % 4))
+
+
+@dataclass
+class PartsListFile:
+    """SQLite file written from a parts-list download"""
+    path: str
+    size_bytes: int
+    sha256: str
+
+
+@dataclass
+class PartsListBlob:
+    """SQLite database of a parts-list download, held in memory"""
+    data: bytes
+    size_bytes: int
+    sha256: str
+
+
+async def _decode_field(chunks: AsyncIterable[bytes], field: str) -> AsyncIterator[bytes]:
+    """Yield the decoded bytes of the base64 ``field``; raises if the body ends inside it"""
+    extractor = JsonStringFieldExtractor(field)
+    decoder = Base64StreamDecoder()
+    async for chunk in chunks:
+        decoded = decoder.feed(extractor.feed(chunk))
+        if decoded:
+            yield decoded
+        if extractor.complete:
+            break
+    decoded = decoder.finish()
+    if decoded:
+        yield decoded
+    if not extractor.complete and extractor.found:
+        raise ValueError(f"Parts-list response ended inside the '{field}' field")
+
+
+async def stream_parts_list_to_file(chunks: AsyncIterable[bytes], file_path: str,
+                                    field: str = 'data') -> Optional[PartsListFile]:
+    """
+    Decode the base64 ``field`` of a streamed JSON body straight into ``file_path``.
+
+    The file is written next to its final path and moved into place once
+    complete, so a failed download never leaves a truncated database behind.
+    Returns None when the response has no (or an empty) ``field``.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    partial_path = f"{file_path}.part"
+
+    try:
+        async with aiofiles.open(partial_path, 'wb') as f:
+            async for decoded in _decode_field(chunks, field):
+                digest.update(decoded)
+                size += len(decoded)
+                await f.write(decoded)
+
+        if size == 0:
+            os.remove(partial_path)
+            return None
+
+        os.replace(partial_path, file_path)
+        return PartsListFile(path=file_path, size_bytes=size, sha256=digest.hexdigest())
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+
+async def stream_parts_list_to_memory(chunks: AsyncIterable[bytes], field: str = 'data',
+                                      max_bytes: Optional[int] = None) -> Optional[PartsListBlob]:
+    """
+    Decode the base64 ``field`` of a streamed JSON body into memory.
+
+    Raises ValueError once the database grows beyond ``max_bytes``. Returns
+    None when the response has no (or an empty) ``field``.
+    """
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    async for decoded in _decode_field(chunks, field):
+        digest.update(decoded)
+        buffer += decoded
+        if max_bytes and len(buffer) > max_bytes:
+            raise ValueError(f"Parts-list database exceeds {max_bytes} bytes")
+    if not buffer:
+        return None
+    return PartsListBlob(data=bytes(buffer), size_bytes=len(buffer), sha256=digest.hexdigest())
+
+
+def archive_parts_list(blob: PartsListBlob, file_path: str) -> PartsListFile:
+    """Write an in-memory parts-list database to ``file_path``, moved into place once complete"""
+    partial_path = f"{file_path}.part"
+    try:
+        with open(partial_path, 'wb') as f:
+            f.write(blob.data)
+        os.replace(partial_path, file_path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    return PartsListFile(path=file_path, size_bytes=blob.size_bytes, sha256=blob.sha256)
@@ -1,24 +1,36 @@
-import aiohttp
-import aiofiles
-import base64
 import os
+import asyncio
 import sqlite3
 import time
 import logging
 from typing import List, Optional, Tuple, Dict
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session, joinedload
+from core.config import settings
+from core.connection_manager import get_logikal_session
+from core.database import SessionLocal
+from core.retry import navigation_rate_limiter, download_rate_limiter
 from models.elevation import Elevation
 from models.project import Project
 from models.directory import Directory
 from services.elevation_service import ElevationService
-from services.auth_service import AuthService
 from services.phase_service import PhaseService
 from services.project_service import ProjectService
 from services.directory_service import DirectoryService
+from services.logikal_session_pool import get_logikal_session_pool
+from services.logikal_navigation import NavigationContext, NavigationSession
+from services.logikal_work_planner import ContextAffinityPlanner
+from services.parts_list_stream import READ_CHUNK_SIZE, PartsListBlob, PartsListFile, archive_parts_list, \
+    stream_parts_list_to_file, stream_parts_list_to_memory
+from services.sqlite_validation_service import SQLiteValidationService
 
 logger = logging.getLogger(__name__)
 
+PARTS_DB_DIR = "/app/parts_db/elevations"
+
+# Background archive writes still running (kept referenced until they finish)
+_archive_tasks = set()
+
 
 class PartsListSyncService:
     """Service for syncing parts-list data from Logikal API"""
@@ -31,7 +43,8 @@ class PartsListSyncService:
         # All GUIDs are now stored with hyphens, so just return as-is
         return guid
         
-    async def sync_parts_for_elevation(self, elevation_id: int, base_url: str, token: str, skip_navigation: bool = False) -> Tuple[bool, str]:
+    async def sync_parts_for_elevation(self, elevation_id: int, base_url: str, token: str, skip_navigation: bool = False,
+                                       navigation: Optional[NavigationSession] = None) -> Tuple[bool, str]:
         """
         Sync parts-list for a specific elevation.
         
@@ -40,6 +53,7 @@ class PartsListSyncService:
             base_url: Logikal API base URL
             token: Authentication token
             skip_navigation: If True, skip navigation (already in elevation context)
+            navigation: Context-tracking session of the token; only the missing selects are issued
             
         Returns:
             Tuple of (success, message)
@@ -53,7 +67,17 @@ class PartsListSyncService:
             logger.info(f"Starting parts-list sync for elevation: {elevation.name} (ID: {elevation.logikal_id})")
             
             # Navigate to elevation context only if not already there
-            if not skip_navigation:
+            if not skip_navigation and navigation is not None:
+                target = NavigationContext.for_elevation(elevation)
+                if target is None:
+                    return False, f"Elevation {elevation.name} has an incomplete directory/project/phase hierarchy"
+                
+                success, message = await navigation.navigate_to(target)
+                if not success:
+                    return False, f"Failed to navigate to elevation context for {elevation.name}: {message}"
+                # Navigation may have renewed the token
+                token = navigation.token
+            elif not skip_navigation:
                 logger.info(f"Navigating to elevation context for {elevation.name}")
                 navigation_success = await self._navigate_to_elevation_context(
                     elevation, base_url, token
@@ -64,37 +88,27 @@ class PartsListSyncService:
             else:
                 logger.info(f"Skipping navigation - already in elevation context for {elevation.name}")
             
-            # Fetch parts-list from API
-            parts_data = await self._fetch_parts_list(base_url, token)
+            if settings.PARTS_LIST_IN_MEMORY_PARSE:
+                return await self._sync_parts_in_memory(elevation, base_url, token)
             
-            if not parts_data:
-                return False, f"No parts data available for elevation {elevation.name}"
+            # Stream parts-list from API straight into the SQLite file
+            parts_file = await self._download_parts_list(base_url, token, elevation.logikal_id)
             
-            # Decode and save SQLite database
-            db_path = await self._decode_and_save_sqlite(parts_data, elevation.logikal_id)
+            if not parts_file:
+                return False, f"No parts data available for elevation {elevation.name}"
             
-            if not db_path:
-                return False, f"Failed to save parts database for elevation {elevation.name}"
+            db_path = parts_file.path
             
             # Validate SQLite file and extract parts count
             parts_count = await self._validate_sqlite_file(db_path)
             
-            # Update elevation record
-            elevation.parts_data = base64.b64encode(parts_data).decode('utf-8')
-            elevation.parts_db_path = db_path
-            elevation.parts_count = parts_count
-            elevation.has_parts_data = True
-            elevation.parts_synced_at = datetime.utcnow()
+            # Update elevation record - the SQLite file is the only copy of the parts data
+            self._set_parts_fields(elevation, db_path, parts_count)
             
             self.db.commit()
             
             # Trigger SQLite parsing asynchronously
-            try:
-                from tasks.sqlite_parser_tasks import parse_elevation_sqlite_task
-                parse_elevation_sqlite_task.delay(elevation.id)
-                logger.info(f"Triggered SQLite parsing for elevation {elevation.id}")
-            except Exception as parse_error:
-                logger.warning(f"Failed to trigger parsing for elevation {elevation.id}: {str(parse_error)}")
+            self._trigger_parse(elevation.id)
             
             logger.info(f"Successfully synced parts-list for elevation {elevation.name}: {parts_count} parts")
             return True, f"Parts-list synced successfully: {parts_count} parts"
@@ -103,6 +117,136 @@ class PartsListSyncService:
             logger.error(f"Error syncing parts-list for elevation {elevation_id}: {str(e)}")
             return False, f"Error: {str(e)}"
     
+    async def _sync_parts_in_memory(self, elevation: Elevation, base_url: str, token: str) -> Tuple[bool, str]:
+        """
+        Download and parse the parts-list of an elevation without a file round-trip.
+        
+        The decoded database goes straight to the parse stage (worker processes,
+        so parsing overlaps with the downloads of the other elevations), and
+        the parsed data is committed together with the elevation's parts-list
+        fields. The .db file is written afterwards, in the background, as an
+        archive for re-parsing; parts_db_path is only recorded once it is on
+        disk. If the parse processes are unavailable the archive is written
+        first and the Celery parse task takes over.
+        """
+        blob = await self._download_parts_list_bytes(base_url, token, elevation.logikal_id)
+        if not blob:
+            return False, f"No parts data available for elevation {elevation.name}"
+        
+        from services.parts_parse_stage import ParseStageUnavailable, get_parts_parse_stage
+        from services.sqlite_parser_service import ParsingStatus, SQLiteElevationParserService
+        
+        archive_path = None
+        if settings.PARTS_LIST_ARCHIVE_FILES:
+            archive_path = os.path.join(PARTS_DB_DIR, f"{elevation.logikal_id}.db")
+        
+        if elevation.parse_status == ParsingStatus.SUCCESS and elevation.parts_file_hash == blob.sha256:
+            # Same database as the last successful parse: nothing to parse or rewrite
+            elevation.has_parts_data = True
+            elevation.parts_synced_at = datetime.utcnow()
+            self.db.commit()
+            if archive_path and not os.path.exists(archive_path):
+                self._archive_in_background(blob, archive_path, elevation.id)
+            logger.info(f"Parts-list of elevation {elevation.name} unchanged (sha256 {blob.sha256[:12]})")
+            return True, f"Parts-list unchanged: {elevation.parts_count} parts"
+        
+        parser = SQLiteElevationParserService(self.db)
+        try:
+            extraction = await get_parts_parse_stage().extract(blob.data, elevation.name)
+        except ParseStageUnavailable as e:
+            logger.warning(f"Parse stage unavailable for elevation {elevation.id}: {str(e)}")
+            extraction = None
+        
+        if extraction is not None:
+            parts_count = extraction['parts_count']
+            # The archive is written later and records its path itself
+            self._set_parts_fields(elevation, None, parts_count)
+            try:
+                # Parts-list fields and parsed data in one commit
+                parse_result = await parser.apply_extraction(elevation, extraction, blob.sha256)
+                if not parse_result.get('success'):
+                    # The parts list itself is stored; the parser recorded its error on the elevation
+                    logger.warning(f"Failed to parse parts-list of elevation {elevation.id}: {parse_result.get('error')}")
+            except Exception as e:
+                logger.error(f"Failed to store parsed parts-list of elevation {elevation.id}: {str(e)}")
+                extraction = None
+        
+        if extraction is None:
+            conn = await parser.validation_service.open_sqlite_in_memory(blob.data)
+            try:
+                parts_count = parser.validation_service.count_records(conn)
+                if archive_path:
+                    # Celery re-parses from the archive, so it has to exist before its path is committed
+                    await asyncio.get_running_loop().run_in_executor(None, self._write_archive, blob, archive_path)
+                self._set_parts_fields(elevation, archive_path, parts_count)
+                self.db.commit()
+                
+                if archive_path:
+                    self._trigger_parse(elevation.id)
+                    archive_path = None
+                else:
+                    await parser.parse_elevation_bytes(elevation.id, blob.data, blob.sha256, sqlite_conn=conn)
+            finally:
+                conn.close()
+        
+        if archive_path:
+            self._archive_in_background(blob, archive_path, elevation.id)
+        
+        logger.info(f"Successfully synced parts-list for elevation {elevation.name}: {parts_count} parts")
+        return True, f"Parts-list synced successfully: {parts_count} parts"
+    
+    def _set_parts_fields(self, elevation: Elevation, db_path: Optional[str], parts_count: Optional[int]) -> None:
+        """Record a synced parts-list on the elevation (no commit)"""
+        elevation.parts_db_path = db_path
+        elevation.parts_count = parts_count
+        elevation.has_parts_data = True
+        elevation.parts_synced_at = datetime.utcnow()
+    
+    def _trigger_parse(self, elevation_id: int) -> None:
+        """Queue the Celery task that parses the elevation's parts database file"""
+        try:
+            from tasks.sqlite_parser_tasks import parse_elevation_sqlite_task
+            parse_elevation_sqlite_task.delay(elevation_id)
+            logger.info(f"Triggered SQLite parsing for elevation {elevation_id}")
+        except Exception as parse_error:
+            logger.warning(f"Failed to trigger parsing for elevation {elevation_id}: {str(parse_error)}")
+    
+    @staticmethod
+    def _write_archive(blob: PartsListBlob, file_path: str) -> PartsListFile:
+        os.makedirs(PARTS_DB_DIR, exist_ok=True)
+        return archive_parts_list(blob, file_path)
+    
+    @classmethod
+    def _write_and_record_archive(cls, blob: PartsListBlob, file_path: str, elevation_id: int) -> PartsListFile:
+        """Write the archive, then point the elevation at it (re-parses read parts_db_path)"""
+        archived = cls._write_archive(blob, file_path)
+        db = SessionLocal()
+        try:
+            db.query(Elevation).filter(Elevation.id == elevation_id).update(
+                {Elevation.parts_db_path: file_path}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+        return archived
+    
+    def _archive_in_background(self, blob: PartsListBlob, file_path: str, elevation_id: int) -> None:
+        """Write the parts database to disk off the sync's critical path"""
+        def done(task: asyncio.Future) -> None:
+            _archive_tasks.discard(task)
+            if task.cancelled():
+                return
+            if task.exception():
+                logger.error(f"Failed to archive parts database {file_path}: {task.exception()}")
+            else:
+                logger.debug(f"Archived parts database {file_path} ({blob.size_bytes} bytes)")
+        
+        task = asyncio.get_running_loop().run_in_executor(
+            None, self._write_and_record_archive, blob, file_path, elevation_id
+        )
+        _archive_tasks.add(task)
+        task.add_done_callback(done)
+    
     async def sync_all_parts(self, base_url: str, username: str, password: str) -> Dict:
         """
         Sync parts-list for all elevations with improved session management.
@@ -148,77 +292,27 @@ class PartsListSyncService:
             
             logger.info(f"Starting parts-list sync for {len(elevations_with_context)} elevations")
             
-            # Group elevations by directory to minimize session switches
-            elevations_by_directory = {}
-            for elevation in elevations_with_context:
-                directory_name = elevation.phase.project.directory.name
-                if directory_name not in elevations_by_directory:
-                    elevations_by_directory[directory_name] = []
-                elevations_by_directory[directory_name].append(elevation)
+            session_pool = get_logikal_session_pool(base_url, username, password)
             
-            logger.info(f"Processing elevations across {len(elevations_by_directory)} directories")
+            # Group sibling elevations by phase context: one session per phase,
+            # one elevation select per sibling
+            planner = ContextAffinityPlanner(self.db, session_pool, base_url)
+            groups = planner.plan(elevations_with_context)
+            logger.info(f"Processing elevations across {len(groups)} phase contexts")
+            
+            async def sync_parts(elevation: Elevation, navigation: NavigationSession) -> Tuple[bool, str]:
+                return await self.sync_parts_for_elevation(
+                    elevation.id, base_url, navigation.token, navigation=navigation
+                )
             
-            # Process each directory group with fresh session
-            for directory_name, elevations in elevations_by_directory.items():
-                logger.info(f"Processing {len(elevations)} elevations for directory: {directory_name}")
-                
-                # Create fresh authentication for each directory
-                auth_service = AuthService(self.db)
-                auth_success, token_or_error = await auth_service.authenticate(base_url, username, password)
-                
-                if not auth_success:
-                    logger.error(f"Authentication failed for directory {directory_name}: {token_or_error}")
-                    # Skip this directory but continue with others
-                    for elevation in elevations:
-                        error_count += 1
-                        processed_count += 1
-                        errors.append(f"Elevation {elevation.name}: Authentication failed for directory {directory_name}")
-                    continue
-                
-                token = token_or_error
-                
-                # Process elevations in this directory with session reset between each
-                for elevation in elevations:
-                    try:
-                        processed_count += 1
-                        
-                        # Reset session before each elevation to prevent corruption
-                        logger.debug(f"Resetting session before processing elevation {elevation.name}")
-                        auth_service = AuthService(self.db)
-                        auth_success, fresh_token = await auth_service.authenticate(base_url, username, password)
-                        
-                        if not auth_success:
-                            logger.error(f"Session reset failed for elevation {elevation.name}: {fresh_token}")
-                            error_count += 1
-                            errors.append(f"Elevation {elevation.name}: Session reset failed")
-                            continue
-                        
-                        # Process this elevation with fresh session
-                        success, message = await self.sync_parts_for_elevation(
-                            elevation.id, base_url, fresh_token
-                        )
-                        
-                        if success:
-                            success_count += 1
-                            logger.info(f"Elevation {processed_count}: {message}")
-                        else:
-                            error_count += 1
-                            error_msg = f"Elevation {elevation.name}: {message}"
-                            errors.append(error_msg)
-                            logger.warning(error_msg)
-                            
-                    except Exception as e:
-                        error_count += 1
-                        error_msg = f"Elevation {elevation.name}: {str(e)}"
-                        errors.append(error_msg)
-                        logger.error(error_msg)
-                        continue
-            
-            # Logout
             try:
-                await auth_service.logout()
-            except Exception as e:
-                logger.warning(f"Failed to logout: {e}")
+                await planner.run(groups, sync_parts)
+            finally:
+                stats = planner.get_stats()
+                processed_count = stats['processed']
+                success_count = stats['successful']
+                error_count = stats['failed']
+                errors = planner.errors
             
             duration = time.time() - start_time
             
@@ -318,14 +412,15 @@ class PartsListSyncService:
             normalized_elevation_id = self.normalize_guid(elevation.logikal_id)
             payload = {'identifier': normalized_elevation_id}
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=headers, json=payload, timeout=30) as response:
-                    if response.status == 200:
-                        logger.info(f"Successfully selected elevation: {elevation.name}")
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Failed to select elevation {elevation.name}: HTTP {response.status} - {error_text}")
-                        return False
+            await navigation_rate_limiter.acquire()
+            session = await get_logikal_session(url)
+            async with session.post(url, headers=headers, json=payload, timeout=30) as response:
+                if response.status == 200:
+                    logger.info(f"Successfully selected elevation: {elevation.name}")
+                else:
+                    error_text = await response.text()
+                    logger.error(f"Failed to select elevation {elevation.name}: HTTP {response.status} - {error_text}")
+                    return False
             
             logger.info(f"Successfully navigated to elevation context: {elevation.name}")
             return True
@@ -334,16 +429,21 @@ class PartsListSyncService:
             logger.error(f"Failed to navigate to elevation context for {elevation.name}: {str(e)}")
             return False
     
-    async def _fetch_parts_list(self, base_url: str, token: str) -> Optional[bytes]:
+    async def _download_parts_list(self, base_url: str, token: str,
+                                   elevation_logikal_id: str) -> Optional[PartsListFile]:
         """
-        Fetch parts-list from the Logikal API.
+        Stream the parts-list of the selected elevation from the Logikal API into a SQLite file.
+        
+        The base64 payload is decoded and hashed chunk by chunk while it is
+        written, so memory use does not grow with the size of the database.
         
         Args:
             base_url: Logikal API base URL
             token: Authentication token
+            elevation_logikal_id: Elevation's Logikal ID for filename
             
         Returns:
-            Binary parts data or None if failed
+            The written file (path, size, SHA-256) or None if failed
         """
         try:
             url = f"{base_url}/elevations/selected/parts-list"
@@ -352,62 +452,78 @@ class PartsListSyncService:
                 'Accept': 'application/json'
             }
             
+            # Create parts database directory
+            os.makedirs(PARTS_DB_DIR, exist_ok=True)
+            file_path = os.path.join(PARTS_DB_DIR, f"{elevation_logikal_id}.db")
+            
             logger.info("Fetching parts-list from Logikal API")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, timeout=60) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Extract base64 data from response
-                        if 'data' in data and data['data']:
-                            base64_data = data['data']
-                            # Decode base64 to binary
-                            parts_data = base64.b64decode(base64_data)
-                            
-                            logger.info(f"Successfully retrieved parts-list: {len(parts_data)} bytes")
-                            return parts_data
-                        else:
-                            logger.warning("No parts data in API response")
-                            return None
-                    else:
-                        error_text = await response.text()
-                        logger.warning(f"Failed to fetch parts-list: HTTP {response.status} - {error_text}")
-                        return None
+            if download_rate_limiter:
+                await download_rate_limiter.acquire()
+            session = await get_logikal_session(url)
+            async with session.get(url, headers=headers, timeout=60) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.warning(f"Failed to fetch parts-list: HTTP {response.status} - {error_text[:500]}")
+                    return None
+                
+                parts_file = await stream_parts_list_to_file(
+                    response.content.iter_chunked(READ_CHUNK_SIZE), file_path
+                )
+            
+            if not parts_file:
+                logger.warning("No parts data in API response")
+                return None
+            
+            logger.info(f"Saved parts database: {parts_file.path} ({parts_file.size_bytes} bytes, sha256 {parts_file.sha256[:12]})")
+            return parts_file
                         
         except Exception as e:
             logger.error(f"Error fetching parts-list: {str(e)}")
             return None
     
-    async def _decode_and_save_sqlite(self, parts_data: bytes, elevation_logikal_id: str) -> Optional[str]:
+    async def _download_parts_list_bytes(self, base_url: str, token: str,
+                                         elevation_logikal_id: str) -> Optional[PartsListBlob]:
         """
-        Save the parts data as a SQLite file.
+        Stream the parts-list of the selected elevation from the Logikal API into memory.
+        
+        Bounded by the parser's maximum database size.
         
-        Args:
-            parts_data: Binary SQLite data
-            elevation_logikal_id: Elevation's Logikal ID for filename
-            
         Returns:
-            File path if successful, None if failed
+            The decoded database (bytes, size, SHA-256) or None if failed
         """
         try:
-            # Create parts database directory
-            parts_dir = "/app/parts_db/elevations"
-            os.makedirs(parts_dir, exist_ok=True)
+            url = f"{base_url}/elevations/selected/parts-list"
+            headers = {
+                'Authorization': f'Bearer {token}',
+                'Accept': 'application/json'
+            }
             
-            # Generate filename
-            filename = f"{elevation_logikal_id}.db"
-            file_path = os.path.join(parts_dir, filename)
+            logger.info("Fetching parts-list from Logikal API")
             
-            # Write binary data to file
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(parts_data)
+            if download_rate_limiter:
+                await download_rate_limiter.acquire()
+            session = await get_logikal_session(url)
+            async with session.get(url, headers=headers, timeout=60) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.warning(f"Failed to fetch parts-list: HTTP {response.status} - {error_text[:500]}")
+                    return None
+                
+                blob = await stream_parts_list_to_memory(
+                    response.content.iter_chunked(READ_CHUNK_SIZE),
+                    max_bytes=SQLiteValidationService.MAX_FILE_SIZE
+                )
             
-            logger.info(f"Saved parts database: {file_path}")
-            return file_path
+            if not blob:
+                logger.warning(f"No parts data in API response for elevation {elevation_logikal_id}")
+                return None
             
+            logger.info(f"Downloaded parts database of elevation {elevation_logikal_id} ({blob.size_bytes} bytes, sha256 {blob.sha256[:12]})")
+            return blob
+                        
         except Exception as e:
-            logger.error(f"Error saving SQLite file: {str(e)}")
+            logger.error(f"Error fetching parts-list: {str(e)}")
             return None
     
     async def _validate_sqlite_file(self, file_path: str) -> Optional[int]:
@@ -423,29 +539,10 @@ class PartsListSyncService:
         try:
             # Connect to SQLite database
             conn = sqlite3.connect(file_path)
-            cursor = conn.cursor()
-            
-            # Get table names
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = cursor.fetchall()
-            
-            # Try to find a table that might contain parts data
-            parts_count = 0
-            for table_name in tables:
-                table_name = table_name[0]
-                try:
-                    # Get row count for this table
-                    cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-                    count = cursor.fetchone()[0]
-                    parts_count += count
-                except Exception as e:
-                    logger.debug(f"Could not count rows in table {table_name}: {e}")
-                    continue
-            
-            conn.close()
-            
-            logger.info(f"SQLite validation successful: {parts_count} total records across {len(tables)} tables")
-            return parts_count
+            try:
+                return SQLiteValidationService().count_records(conn)
+            finally:
+                conn.close()
             
         except Exception as e:
             logger.error(f"Error validating SQLite file {file_path}: {str(e)}")
@@ -0,0 +1,208 @@
+"""
+Inline parse stage of the parts-list pipeline.
+
+Downloaded parts databases are handed to a small pool of worker processes
+that validate and extract them (CPU-bound SQLite work), while the sync keeps
+downloading the next elevations. The caller stores the extraction in the same
+commit as the elevation's parts fields, so a synced parts list is parsed
+without a Celery task re-querying the elevation and re-reading the file.
+
+The number of downloads waiting for a process is bounded; a sync that gets
+ahead of the parsers waits instead of holding every database in memory.
+The Celery parse task remains the way to re-parse single archived files;
+the batch parser runs its own stage over many (see services.batch_parser).
+"""
+import asyncio
+import hashlib
+import threading
+import logging
+import weakref
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def extract_parts_database(data: bytes, elevation_name: Optional[str] = None) -> Dict:
+    """
+    Count, validate and extract an in-memory parts database (runs in a parse process).
+
+    Problems with the database are returned, not raised: ``valid`` is False
+    and ``error_type``/``message``/``details`` describe the failure, while
+    ``parts_count`` is still set when the database could be read.
+    """
+    return asyncio.run(_extract(data, elevation_name))
+
+
+def extract_parts_file(path: str, elevation_name: Optional[str] = None, known_hash: Optional[str] = None) -> Dict:
+    """
+    Like extract_parts_database, for an archived parts database file (runs in a parse process).
+
+    The result carries the file's SHA-256 as ``file_hash``; when it equals
+    ``known_hash`` the file is not parsed again and ``skipped`` is True.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        return {'valid': False, 'parts_count': None, 'elevation_data': None, 'glass_data': [],
+                'error_type': 'file_not_found', 'message': f"SQLite file not readable: {str(e)}", 'details': {}}
+
+    file_hash = hashlib.sha256(data).hexdigest()
+    if known_hash and file_hash == known_hash:
+        return {'valid': True, 'skipped': True, 'file_hash': file_hash}
+    return {**extract_parts_database(data, elevation_name), 'file_hash': file_hash}
+
+
+async def _extract(data: bytes, elevation_name: Optional[str]) -> Dict:
+    from types import SimpleNamespace
+    from services.parts_extractor import extract_part_lines
+    from services.sqlite_parser_service import SQLiteElevationParserService
+
+    parser = SQLiteElevationParserService(db=None)
+    extraction = {'valid': False, 'parts_count': None, 'elevation_data': None, 'glass_data': [], 'part_lines': None}
+    try:
+        conn = await parser.validation_service.open_sqlite_in_memory(data)
+    except Exception as e:
+        return {**extraction, 'error_type': 'parsing_failed', 'message': str(e), 'details': {}}
+
+    try:
+        extraction['parts_count'] = parser.validation_service.count_records(conn)
+        validation_result = await parser.validation_service.validate_bytes(data, conn=conn, trusted_source=True)
+        if not validation_result.valid:
+            return {**extraction, 'error_type': 'validation_failed', 'message': validation_result.message,
+                    'details': validation_result.details}
+
+        elevation = SimpleNamespace(name=elevation_name)
+        extraction['elevation_data'] = await parser._extract_elevation_data_with_conn(conn, elevation)
+        extraction['glass_data'] = await parser._extract_glass_data_with_conn(conn)
+        if settings.PARTS_EXTRACT_LINE_ITEMS:
+            extraction['part_lines'] = extract_part_lines(conn)
+        extraction['valid'] = True
+        return extraction
+    except Exception as e:
+        return {**extraction, 'error_type': 'parsing_failed', 'message': str(e), 'details': {}}
+    finally:
+        conn.close()
+
+
+class ParseStageUnavailable(Exception):
+    """The parse processes could not run an extraction (the caller falls back to Celery)"""
+    pass
+
+
+class PartsParseStage:
+    """Bounded hand-off of downloaded parts databases to the parse processes"""
+
+    def __init__(self, processes: int = None, max_pending: int = None):
+        self.processes = settings.PARTS_PARSE_PROCESSES if processes is None else processes
+        self.max_pending = max(1, settings.PARTS_PARSE_MAX_PENDING if max_pending is None else max_pending)
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+            weakref.WeakKeyDictionary()
+        self._stats = {'parsed': 0, 'invalid': 0, 'skipped': 0, 'unavailable': 0, 'waited': 0}
+
+    def _get_executor(self) -> Optional[Executor]:
+        """The process pool, started on first use; None parses in the default thread pool"""
+        if self.processes <= 0:
+            return None
+        with self._executor_lock:
+            if self._executor is None:
+                # Spawned, not forked: the syncing process runs an event loop and connection pools
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = asyncio.Semaphore(self.max_pending)
+            self._slots[loop] = slots
+        return slots
+
+    async def extract(self, data: bytes, elevation_name: Optional[str] = None) -> Dict:
+        """
+        Extract a parts database in a parse process (see extract_parts_database).
+
+        Raises ParseStageUnavailable when the process pool is broken; the pool
+        is restarted for the next call.
+        """
+        return await self._run(extract_parts_database, data, elevation_name)
+
+    async def extract_file(self, path: str, elevation_name: Optional[str] = None,
+                           known_hash: Optional[str] = None) -> Dict:
+        """Extract an archived parts database file in a parse process (see extract_parts_file)"""
+        return await self._run(extract_parts_file, path, elevation_name, known_hash)
+
+    async def _run(self, function, *args) -> Dict:
+        slots = self._get_slots()
+        if slots.locked():
+            self._stats['waited'] += 1
+        async with slots:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            try:
+                extraction = await loop.run_in_executor(executor, function, *args)
+            except (AssertionError, OSError) as e:
+                if executor is None:
+                    raise
+                # Daemonic processes (Celery prefork children) may not start processes of their own;
+                # sync workers run a threads pool for that reason (see docker-compose.yml)
+                self._stats['unavailable'] += 1
+                self._reset_executor(executor, warn=False)
+                logger.error(f"Cannot start parse processes: {str(e) or type(e).__name__}. "
+                             f"Run this worker with a pool that may start processes (--pool=threads) "
+                             f"or set PARTS_PARSE_PROCESSES=0 to parse in threads")
+                raise ParseStageUnavailable(f"Parse processes cannot be started: {str(e) or type(e).__name__}")
+            except BrokenProcessPool as e:
+                self._stats['unavailable'] += 1
+                self._reset_executor(executor)
+                raise ParseStageUnavailable(f"Parse process pool is broken: {str(e)}")
+            except RuntimeError as e:
+                # Pool shut down (interpreter exit) or processes cannot be started
+                self._stats['unavailable'] += 1
+                raise ParseStageUnavailable(f"Parse processes unavailable: {str(e)}")
+
+        if extraction.get('skipped'):
+            self._stats['skipped'] += 1
+        else:
+            self._stats['parsed' if extraction['valid'] else 'invalid'] += 1
+        return extraction
+
+    def _reset_executor(self, executor: Optional[Executor], warn: bool = True) -> None:
+        with self._executor_lock:
+            if executor is not None and self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+                if warn:
+                    logger.warning("Parse process pool broke; it will be restarted")
+
+    def shutdown(self) -> None:
+        """Stop the parse processes"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def get_stats(self) -> Dict:
+        """Get parse stage statistics"""
+        return {'processes': self.processes, 'max_pending': self.max_pending, **self._stats}
+
+
+_stage: Optional[PartsParseStage] = None
+_stage_lock = threading.Lock()
+
+
+def get_parts_parse_stage() -> PartsParseStage:
+    """Get the parse stage of this process (its processes are shared by all event loops)"""
+    global _stage
+    with _stage_lock:
+        if _stage is None:
+            _stage = PartsParseStage()
+        return _stage
@@ -1,11 +1,11 @@
-import aiohttp
 import time
 import logging
-from typing import List, Optional, Tuple
+from typing import Any, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from core.retry import retry_async, default_retry_config, api_rate_limiter
+from core.retry import retry_async, default_retry_config, navigation_rate_limiter, listing_rate_limiter
+from core.connection_manager import get_logikal_session
 from models.phase import Phase
-from models.api_log import ApiLog
+from core.api_log_sink import get_api_log_sink
 from schemas.phase import PhaseCreate
 
 logger = logging.getLogger(__name__)
@@ -20,20 +20,20 @@ class PhaseService:
         self.base_url = base_url.rstrip('/')
         self.current_phase: Optional[str] = None
         
-    @retry_async(config=default_retry_config, rate_limiter=api_rate_limiter)
+    @retry_async(config=default_retry_config, rate_limiter=listing_rate_limiter)
     async def _get_phases_request(self, url: str, headers: dict) -> Tuple[bool, List[dict], str]:
         """Internal method to make the actual phases request with retry logic"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, timeout=30) as response:
-                response_text = await response.text()
+        session = await get_logikal_session(url)
+        async with session.get(url, headers=headers, timeout=30) as response:
+            response_text = await response.text()
                 
-                if response.status == 200:
-                    data = await response.json()
-                    phases_data = data.get('data', data) if isinstance(data, dict) else data
-                    return True, phases_data, "Success"
-                else:
-                    error_msg = f"Failed to get phases: {response.status} - {response_text}"
-                    raise Exception(error_msg)
+            if response.status == 200:
+                data = await response.json()
+                phases_data = data.get('data', data) if isinstance(data, dict) else data
+                return True, phases_data, "Success"
+            else:
+                error_msg = f"Failed to get phases: {response.status} - {response_text}"
+                raise Exception(error_msg)
     
     async def get_phases(self) -> Tuple[bool, List[dict], str]:
         """Get all phases in the current project"""
@@ -60,7 +60,7 @@ class PhaseService:
                     duration=duration,
                     request_url=url,
                     request_method='GET',
-                    response_body=str(phases_data),
+                    response_body=phases_data,
                     response_summary=f"Retrieved phases for current project"
                 )
                 
@@ -85,18 +85,18 @@ class PhaseService:
             )
             return False, [], error_msg
     
-    @retry_async(config=default_retry_config, rate_limiter=api_rate_limiter)
+    @retry_async(config=default_retry_config, rate_limiter=navigation_rate_limiter)
     async def _select_phase_request(self, url: str, payload: dict, headers: dict) -> Tuple[bool, str]:
         """Internal method to make the actual phase selection request with retry logic"""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=headers, timeout=30) as response:
-                response_text = await response.text()
+        session = await get_logikal_session(url)
+        async with session.post(url, json=payload, headers=headers, timeout=30) as response:
+            response_text = await response.text()
                 
-                if response.status == 200:
-                    return True, "Phase selected successfully"
-                else:
-                    error_msg = f"Failed to select phase: {response.status} - {response_text}"
-                    raise Exception(error_msg)
+            if response.status == 200:
+                return True, "Phase selected successfully"
+            else:
+                error_msg = f"Failed to select phase: {response.status} - {response_text}"
+                raise Exception(error_msg)
     
     async def select_phase(self, phase_identifier: str) -> Tuple[bool, str]:
         """Select a phase by identifier (required for elevation operations)"""
@@ -220,30 +220,19 @@ class PhaseService:
     
     async def _log_api_call(self, operation: str, status: str, response_code: int, 
                            duration: int, request_url: str = None, request_method: str = None,
-                           request_payload: dict = None, response_body: str = None,
+                           request_payload: dict = None, response_body: Any = None,
                            response_summary: str = None, error_message: str = None):
-        """Log API call to database"""
-        try:
-            # Extract endpoint from URL
-            endpoint = request_url.split('/')[-1] if request_url else operation
-            
-            api_log = ApiLog(
-                endpoint=endpoint,
-                method=request_method or 'GET',
-                status_code=response_code,
-                response_time_ms=duration,
-                success=(status == 'success'),
-                error_message=error_message,
-                request_url=request_url,
-                request_method=request_method,
-                request_payload=str(request_payload) if request_payload else None,
-                response_body=response_body,
-                response_summary=response_summary
-            )
-            
-            self.db.add(api_log)
-            self.db.commit()
-            
-        except Exception as e:
-            logger.error(f"Failed to log API call: {str(e)}")
-            self.db.rollback()
+        """Queue API call log record (buffered, written outside the sync transaction)"""
+        get_api_log_sink().record(
+            operation=operation,
+            success=(status == 'success'),
+            status_code=response_code,
+            duration_ms=duration,
+            request_url=request_url,
+            request_method=request_method,
+            default_method='GET',
+            request_payload=request_payload,
+            response_body=response_body,
+            response_summary=response_summary,
+            error_message=error_message
+        )
@@ -1,7 +1,7 @@
 import aiohttp
 import time
 import logging
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from models.phase import Phase
@@ -9,8 +9,11 @@ from models.project import Project
 from models.sync_log import SyncLog
 from services.auth_service import AuthService
 from services.phase_service import PhaseService
-from services.project_service import ProjectService
-from services.directory_service import DirectoryService
+from services.logikal_session_pool import get_logikal_session_pool
+from services.logikal_navigation import NavigationContext, NavigationSession
+from services.logikal_listing_cache import MUST_REVALIDATE, get_listing_cache
+from services.bulk_upsert import NULL_GUID, bulk_upsert_phases
+from services.delta_sync import partition_phases
 
 logger = logging.getLogger(__name__)
 
@@ -30,12 +33,19 @@ class PhaseSyncService:
         return guid
     
     async def sync_phases_for_project(self, db: Session, base_url: str, username: str, password: str, 
-                                     project: Project) -> Dict:
+                                     project: Project, cache_mode: str = MUST_REVALIDATE,
+                                     delta: bool = False) -> Dict:
         """
         Sync all phases for a specific project
+        
+        With ``cache_mode='cache-ok'`` a cached phase listing is used without
+        contacting Logikal. With ``delta`` the result lists the phases whose
+        ``changedDate`` did not move under 'skipped_unchanged';
+        'changed_phase_ids' holds the ids of the others.
         """
         sync_start_time = time.time()
         sync_log = None
+        session_pool = get_logikal_session_pool(base_url, username, password)
         
         try:
             # Create sync log entry
@@ -50,12 +60,6 @@ class PhaseSyncService:
             
             logger.info(f"Starting phase sync for project: {project.name}")
             
-            # Create dedicated session for this project
-            success, token = await self.auth_service.authenticate(base_url, username, password)
-            
-            if not success:
-                raise Exception(f"Authentication failed: {token}")
-            
             # Navigate to the project's directory first (required for folder-scoped API)
             if not project.directory:
                 raise Exception(f"Project {project.name} has no directory association")
@@ -63,48 +67,52 @@ class PhaseSyncService:
             if not project.directory.full_path:
                 raise Exception(f"Directory '{project.directory.name}' has no full_path")
             
-            # Navigate to the directory using hierarchical navigation
-            directory_service = DirectoryService(self.db, token, base_url)
-            success, message = await directory_service.navigate_to_directory(project.directory.full_path)
-            
-            if not success:
-                raise Exception(f"Failed to navigate to directory {project.directory.name}: {message}")
+            target = NavigationContext(directory=project.directory.full_path, project=project.logikal_id)
             
-            # Select the project within the directory context
-            project_service = ProjectService(self.db, token, base_url)
-            success, message = await project_service.select_project(project.logikal_id)
-            
-            if not success:
-                # Check if this is a 404 error (project not found)
-                if "404" in message or "Could not retrieve" in message:
-                    logger.warning(f"Project {project.name} ({project.logikal_id}) no longer exists in Logikal API - skipping")
-                    return {
-                        'success': True,
-                        'message': f'Project {project.name} no longer exists - skipped',
-                        'count': 0,
-                        'duration_seconds': 0,
-                        'skipped': True
-                    }
-                else:
-                    raise Exception(f"Failed to select project {project.name}: {message}")
-            
-            # Get phases from the selected project
-            phase_service = PhaseService(self.db, token, base_url)
-            success, phases_data, message = await phase_service.get_phases()
+            async def fetch_phases() -> List[Dict]:
+                # Lease the session closest to the project context and issue only the missing selects
+                async with session_pool.lease(target=target) as lease:
+                    navigation = NavigationSession(self.db, lease, base_url, pool=session_pool)
+                    success, message = await navigation.navigate_to(target)
+                    
+                    if not success:
+                        # Check if this is a 404 error (project not found)
+                        if "404" in message or "Could not retrieve" in message:
+                            raise LookupError(message)
+                        raise Exception(f"Failed to select project {project.name}: {message}")
+                    
+                    # Get phases from the selected project (navigation may have renewed the token)
+                    phase_service = PhaseService(self.db, lease.token, base_url)
+                    success, phases, message = await phase_service.get_phases()
+                    if not success:
+                        raise Exception(f"Failed to get phases for project {project.name}: {message}")
+                return phases
+            
+            try:
+                phases_data = await get_listing_cache().get_listing(
+                    base_url, target, 'phases', fetch_phases, cache_mode
+                )
+            except LookupError:
+                logger.warning(f"Project {project.name} ({project.logikal_id}) no longer exists in Logikal API - skipping")
+                return {
+                    'success': True,
+                    'message': f'Project {project.name} no longer exists - skipped',
+                    'count': 0,
+                    'duration_seconds': 0,
+                    'skipped': True
+                }
             
-            if not success:
-                raise Exception(f"Failed to get phases for project {project.name}: {message}")
+            # Compare with the stored changedDates before the upsert overwrites them
+            partition = partition_phases(db, phases_data, project.id) if delta else None
             
-            # Process and cache phases
-            phases_processed = 0
-            for phase_data in phases_data:
-                try:
-                    logger.info(f"Processing phase data: {phase_data}")
-                    phase = await self._create_or_update_phase(db, phase_data, project.id)
-                    phases_processed += 1
-                    logger.info(f"Successfully processed phase: {phase.name} (ID: {phase.logikal_id}) for project {project.id}")
-                except Exception as e:
-                    logger.error(f"Failed to process phase {phase_data.get('name', 'Unknown')}: {str(e)}")
+            # Upsert the whole listing in one statement; committed together with the sync log
+            try:
+                phase_ids = bulk_upsert_phases(db, phases_data, project.id)
+            except Exception:
+                # Only the failed statement is discarded - the sync log entry is already committed
+                db.rollback()
+                raise
+            phases_processed = len(phase_ids)
             
             # Calculate duration
             duration = int(time.time() - sync_start_time)
@@ -121,12 +129,17 @@ class PhaseSyncService:
             logger.info(f"Phase sync completed for project {project.name} in {duration} seconds")
             logger.info(f"Processed {phases_processed} phases")
             
-            return {
+            result = {
                 'success': True,
                 'message': f'Phase sync completed for project: {project.name}',
                 'count': phases_processed,
                 'duration_seconds': duration
             }
+            if partition is not None:
+                result['changed_phase_ids'] = [phase_ids[item.get('id') or NULL_GUID] for item in partition.changed
+                                               if (item.get('id') or NULL_GUID) in phase_ids]
+                result['skipped_unchanged'] = partition.skipped()
+            return result
             
         except Exception as e:
             duration = int(time.time() - sync_start_time)
@@ -150,128 +163,6 @@ class PhaseSyncService:
                 'error': str(e)
             }
     
-    async def _create_or_update_phase(self, db: Session, phase_data: Dict, project_id: int) -> Phase:
-        """Create or update a phase record from API data"""
-        try:
-            # Extract identifier - Logikal API uses 'id' field (GUID) as identifier
-            identifier = phase_data.get('id', '')
-            name = phase_data.get('name', 'Unnamed Phase')
-            
-            # Store null GUIDs as-is from the API (00000000-0000-0000-0000-000000000000)
-            # This is the default phase in Logikal when no specific phases are created
-            if not identifier:
-                identifier = '00000000-0000-0000-0000-000000000000'
-            
-            if not identifier:
-                raise ValueError(f"Phase data missing 'id' field: {phase_data}")
-            
-            # Check if phase already exists using composite key (project_id, logikal_id)
-            existing_phase = db.query(Phase).filter(
-                Phase.project_id == project_id,
-                Phase.logikal_id == identifier
-            ).first()
-            
-            if existing_phase:
-                # Update existing phase
-                logger.info(f"Updating existing phase: {name} (ID: {identifier}) for project {project_id}")
-                existing_phase.name = name
-                existing_phase.project_id = project_id
-                existing_phase.synced_at = datetime.utcnow()
-                existing_phase.sync_status = 'synced'
-                existing_phase.last_sync_date = datetime.utcnow()
-                
-                # Extract and store last_update_date from Logikal API
-                if 'changedDate' in phase_data and phase_data['changedDate']:
-                    try:
-                        # Parse the Unix timestamp and store it
-                        api_updated_at = datetime.fromtimestamp(phase_data['changedDate'], tz=timezone.utc)
-                        existing_phase.last_update_date = api_updated_at
-                        logger.info(f"Updated last_update_date for phase {name}: {api_updated_at}")
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"Failed to parse changedDate for phase {name}: {e}")
-                
-                db.commit()
-                
-                logger.info(f"Successfully updated existing phase: {name} (ID: {identifier}) for project {project_id}")
-                return existing_phase
-            else:
-                # Create new phase
-                logger.info(f"Creating new phase: {name} (ID: {identifier}) for project {project_id}")
-                
-                # Check for duplicates before insert using composite key (project_id, logikal_id)
-                duplicate_check = db.query(Phase).filter(
-                    Phase.project_id == project_id,
-                    Phase.logikal_id == identifier
-                ).first()
-                if duplicate_check:
-                    logger.warning(f"Duplicate phase detected: {name} (ID: {identifier}) for project {project_id} - returning existing")
-                    return duplicate_check
-                
-                # Extract last_update_date from Logikal API
-                last_update_date = None
-                if 'changedDate' in phase_data and phase_data['changedDate']:
-                    try:
-                        # Parse the Unix timestamp and store it
-                        last_update_date = datetime.fromtimestamp(phase_data['changedDate'], tz=timezone.utc)
-                        logger.info(f"Setting last_update_date for new phase {name}: {last_update_date}")
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"Failed to parse changedDate for new phase {name}: {e}")
-                
-                new_phase = Phase(
-                    logikal_id=identifier,
-                    name=name,
-                    project_id=project_id,
-                    synced_at=datetime.utcnow(),
-                    sync_status='synced',
-                    last_sync_date=datetime.utcnow(),
-                    last_update_date=last_update_date
-                )
-                db.add(new_phase)
-                
-                try:
-                    db.commit()
-                except Exception as commit_error:
-                    # Handle unique constraint violations gracefully
-                    if "UniqueViolation" in str(commit_error) or "duplicate key" in str(commit_error).lower():
-                        logger.warning(f"Unique constraint violation for phase {name} (ID: {identifier}) - checking if it already exists")
-                        db.rollback()
-                        
-                        # Check if a phase with this logikal_id already exists for this project
-                        existing_phase = db.query(Phase).filter(
-                            Phase.project_id == project_id,
-                            Phase.logikal_id == identifier
-                        ).first()
-                        
-                        if existing_phase:
-                            logger.info(f"Phase already exists: {name} (ID: {identifier}) for project {project_id} - returning existing")
-                            return existing_phase
-                        else:
-                            # This shouldn't happen, but handle it gracefully
-                            logger.error(f"Unique constraint violation but phase not found: {name} (ID: {identifier}) for project {project_id}")
-                            raise commit_error
-                    else:
-                        # Re-raise non-constraint errors
-                        raise commit_error
-                
-                # Verify the phase was actually saved using composite key (project_id, logikal_id)
-                saved_phase = db.query(Phase).filter(
-                    Phase.project_id == project_id,
-                    Phase.logikal_id == identifier
-                ).first()
-                if saved_phase:
-                    logger.info(f"Successfully created new phase: {name} (ID: {identifier}) for project {project_id} - Verified in database")
-                else:
-                    logger.error(f"Phase creation failed - phase not found in database after commit: {name} (ID: {identifier}) for project {project_id}")
-                
-                logger.info(f"Successfully created new phase: {name} (ID: {identifier}) for project {project_id}")
-                return new_phase
-                
-        except Exception as e:
-            logger.error(f"Failed to create or update phase: {str(e)}")
-            # DO NOT rollback the entire transaction - just raise the exception
-            # The rollback was causing all previous work to be lost
-            raise
-    
     async def get_all_phases(self) -> List[Phase]:
         """Get all phases from the database"""
         try:
@@ -1,11 +1,11 @@
-import aiohttp
 import time
 import logging
-from typing import List, Optional, Tuple
+from typing import Any, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from core.retry import retry_async, default_retry_config, api_rate_limiter
+from core.retry import retry_async, default_retry_config, navigation_rate_limiter, listing_rate_limiter
+from core.connection_manager import get_logikal_session
 from models.project import Project
-from models.api_log import ApiLog
+from core.api_log_sink import get_api_log_sink
 from schemas.project import ProjectCreate
 
 logger = logging.getLogger(__name__)
@@ -20,20 +20,20 @@ class ProjectService:
         self.base_url = base_url.rstrip('/')
         self.current_project: Optional[str] = None
         
-    @retry_async(config=default_retry_config, rate_limiter=api_rate_limiter)
+    @retry_async(config=default_retry_config, rate_limiter=listing_rate_limiter)
     async def _get_projects_request(self, url: str, headers: dict) -> Tuple[bool, List[dict], str]:
         """Internal method to make the actual projects request with retry logic"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, timeout=30) as response:
-                response_text = await response.text()
+        session = await get_logikal_session(url)
+        async with session.get(url, headers=headers, timeout=30) as response:
+            response_text = await response.text()
                 
-                if response.status == 200:
-                    data = await response.json()
-                    projects = data.get('data', []) if isinstance(data, dict) else data
-                    return True, projects, "Success"
-                else:
-                    error_msg = f"Failed to get projects: {response.status} - {response_text}"
-                    raise Exception(error_msg)
+            if response.status == 200:
+                data = await response.json()
+                projects = data.get('data', []) if isinstance(data, dict) else data
+                return True, projects, "Success"
+            else:
+                error_msg = f"Failed to get projects: {response.status} - {response_text}"
+                raise Exception(error_msg)
     
     async def get_projects(self) -> Tuple[bool, List[dict], str]:
         """Get projects from current selected directory context"""
@@ -60,7 +60,7 @@ class ProjectService:
                     duration=duration,
                     request_url=url,
                     request_method='GET',
-                    response_body=str(projects),
+                    response_body=projects,
                     response_summary=f"Retrieved {len(projects)} projects"
                 )
                 
@@ -85,18 +85,18 @@ class ProjectService:
             )
             return False, [], error_msg
     
-    @retry_async(config=default_retry_config, rate_limiter=api_rate_limiter)
+    @retry_async(config=default_retry_config, rate_limiter=navigation_rate_limiter)
     async def _select_project_request(self, url: str, payload: dict, headers: dict) -> Tuple[bool, str]:
         """Internal method to make the actual project selection request with retry logic"""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=headers, timeout=30) as response:
-                response_text = await response.text()
+        session = await get_logikal_session(url)
+        async with session.post(url, json=payload, headers=headers, timeout=30) as response:
+            response_text = await response.text()
                 
-                if response.status == 200:
-                    return True, "Project selected successfully"
-                else:
-                    error_msg = f"Failed to select project: {response.status} - {response_text}"
-                    raise Exception(error_msg)
+            if response.status == 200:
+                return True, "Project selected successfully"
+            else:
+                error_msg = f"Failed to select project: {response.status} - {response_text}"
+                raise Exception(error_msg)
     
     async def select_project(self, project_identifier: str) -> Tuple[bool, str]:
         """Select a project by identifier (required for phase/elevation operations)"""
@@ -154,20 +154,20 @@ class ProjectService:
             )
             return False, error_msg
     
-    @retry_async(config=default_retry_config, rate_limiter=api_rate_limiter)
+    @retry_async(config=default_retry_config, rate_limiter=listing_rate_limiter)
     async def _get_project_details_request(self, url: str, headers: dict) -> Tuple[bool, dict, str]:
         """Internal method to make the actual project details request with retry logic"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, timeout=30) as response:
-                response_text = await response.text()
+        session = await get_logikal_session(url)
+        async with session.get(url, headers=headers, timeout=30) as response:
+            response_text = await response.text()
                 
-                if response.status == 200:
-                    data = await response.json()
-                    project_data = data.get('data', data) if isinstance(data, dict) else data
-                    return True, project_data, "Success"
-                else:
-                    error_msg = f"Failed to get project details: {response.status} - {response_text}"
-                    raise Exception(error_msg)
+            if response.status == 200:
+                data = await response.json()
+                project_data = data.get('data', data) if isinstance(data, dict) else data
+                return True, project_data, "Success"
+            else:
+                error_msg = f"Failed to get project details: {response.status} - {response_text}"
+                raise Exception(error_msg)
     
     async def get_project_details(self, project_identifier: str) -> Tuple[bool, dict, str]:
         """Get project details by identifier from Logikal API"""
@@ -194,7 +194,7 @@ class ProjectService:
                     duration=duration,
                     request_url=url,
                     request_method='GET',
-                    response_body=str(project_data),
+                    response_body=project_data,
                     response_summary=f"Retrieved project details for {project_identifier}"
                 )
                 
@@ -287,30 +287,19 @@ class ProjectService:
     
     async def _log_api_call(self, operation: str, status: str, response_code: int, 
                            duration: int, request_url: str = None, request_method: str = None,
-                           request_payload: dict = None, response_body: str = None,
+                           request_payload: dict = None, response_body: Any = None,
                            response_summary: str = None, error_message: str = None):
-        """Log API call to database"""
-        try:
-            # Extract endpoint from URL
-            endpoint = request_url.split('/')[-1] if request_url else operation
-            
-            api_log = ApiLog(
-                endpoint=endpoint,
-                method=request_method or 'GET',
-                status_code=response_code,
-                response_time_ms=duration,
-                success=(status == 'success'),
-                error_message=error_message,
-                request_url=request_url,
-                request_method=request_method,
-                request_payload=str(request_payload) if request_payload else None,
-                response_body=response_body,
-                response_summary=response_summary
-            )
-            
-            self.db.add(api_log)
-            # DO NOT commit or rollback - let the main transaction handle it
-            
-        except Exception as e:
-            logger.error(f"Failed to log API call: {str(e)}")
-            # DO NOT rollback - let the main transaction handle it
+        """Queue API call log record (buffered, written outside the sync transaction)"""
+        get_api_log_sink().record(
+            operation=operation,
+            success=(status == 'success'),
+            status_code=response_code,
+            duration_ms=duration,
+            request_url=request_url,
+            request_method=request_method,
+            default_method='GET',
+            request_payload=request_payload,
+            response_body=response_body,
+            response_summary=response_summary,
+            error_message=error_message
+        )
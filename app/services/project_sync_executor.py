@@ -0,0 +1,109 @@
+"""
+Parallel executor for the phase/elevation part of a single project sync.
+
+Force sync is interactive - Odoo users wait on it - so the phases of a project
+are synced concurrently instead of one after the other. Every phase runs on
+its own database session and leases its own Logikal session (phase contexts
+cannot share a token). Results of all phases are folded into one set of
+counters and errors.
+"""
+import asyncio
+import time
+import logging
+from typing import Dict, List
+
+from core.adaptive_concurrency import get_concurrency_limiter
+from core.config import settings
+from core.database import SessionLocal
+from core.priority import yield_to_interactive
+from models.phase import Phase
+from services.sync_progress import report_progress
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectSyncExecutor:
+    """Runs the elevation syncs of a project's phases in parallel"""
+
+    def __init__(self, base_url: str, username: str, password: str, max_parallel_phases: int = None,
+                 delta: bool = False):
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        # Skip downloads for elevations whose changedDate did not move
+        self.delta = delta
+        # Upper bound; within it every phase also takes a slot of the adaptive limiter,
+        # borrowing the caller's slot when e.g. a batch project sync already holds one
+        self.max_parallel_phases = max(1, max_parallel_phases or settings.FORCE_SYNC_MAX_PARALLEL_PHASES)
+
+    async def _sync_phase(self, phase_id: int) -> Dict:
+        """Sync the elevations of one phase on a dedicated database session"""
+        from services.elevation_sync_service import ElevationSyncService
+
+        await yield_to_interactive()
+        db = SessionLocal()
+        try:
+            phase = db.query(Phase).filter(Phase.id == phase_id).first()
+            if not phase:
+                return {'success': False, 'message': f'Phase {phase_id} not found'}
+            result = await ElevationSyncService(db).sync_elevations_for_phase(
+                db, self.base_url, self.username, self.password, phase, delta=self.delta
+            )
+            result['phase_name'] = phase.name
+            report_progress('phases', f"Phase {phase.name} synced" if result.get('success') else None,
+                            phases_done=1, phases_failed=0 if result.get('success') else 1)
+            return result
+        finally:
+            db.close()
+
+    async def run(self, phase_ids: List[int]) -> Dict:
+        """
+        Sync all given phases and aggregate their results.
+
+        Returns counters for elevations, thumbnails and parts lists, the number
+        of failed phases, the collected error messages and delta skips.
+        """
+        start_time = time.time()
+        semaphore = asyncio.Semaphore(self.max_parallel_phases)
+        limiter = get_concurrency_limiter()
+
+        async def run_phase(phase_id: int) -> Dict:
+            async with semaphore, limiter.slot():
+                return await self._sync_phase(phase_id)
+
+        logger.info(f"Syncing {len(phase_ids)} phases with up to {self.max_parallel_phases} in parallel")
+        report_progress('phases', f"Syncing {len(phase_ids)} phases", phases_total=len(phase_ids))
+        results = await asyncio.gather(*[run_phase(phase_id) for phase_id in phase_ids], return_exceptions=True)
+
+        summary = {
+            'phases_processed': len(phase_ids),
+            'phases_failed': 0,
+            'elevations_synced': 0,
+            'thumbnails_synced': 0,
+            'parts_lists_synced': 0,
+            'parts_lists_failed': 0,
+            'errors': [],
+            'skipped_unchanged': [],
+            'synced_phase_ids': []
+        }
+        for phase_id, result in zip(phase_ids, results):
+            if isinstance(result, Exception):
+                summary['phases_failed'] += 1
+                summary['errors'].append(f"Phase {phase_id}: {str(result)}")
+                continue
+            if not result.get('success'):
+                summary['phases_failed'] += 1
+                summary['errors'].append(result.get('message', f'Phase {phase_id} failed'))
+                logger.warning(f"Failed to sync elevations for phase {result.get('phase_name', phase_id)}: "
+                               f"{result.get('message', 'Unknown error')}")
+                continue
+            summary['synced_phase_ids'].append(phase_id)
+            summary['elevations_synced'] += result.get('count', 0)
+            summary['thumbnails_synced'] += result.get('thumbnails_synced', 0)
+            summary['parts_lists_synced'] += result.get('parts_lists_synced', 0)
+            summary['parts_lists_failed'] += result.get('parts_lists_failed', 0)
+            summary['errors'].extend(result.get('errors', []))
+            summary['skipped_unchanged'].extend(result.get('skipped_unchanged', []))
+
+        summary['duration_seconds'] = time.time() - start_time
+        return summary
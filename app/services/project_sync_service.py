@@ -2,15 +2,25 @@ import aiohttp
 import asyncio
 import time
 import logging
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from models.project import Project
 from models.directory import Directory
 from models.sync_log import SyncLog
+from models.sync_checkpoint import SyncCheckpoint
+from core.priority import interactive_work
 from services.auth_service import AuthService
 from services.project_service import ProjectService
 from services.directory_service import DirectoryService
+from services.logikal_session_pool import get_logikal_session_pool
+from services.logikal_navigation import NavigationContext, NavigationSession, ROOT_CONTEXT
+from services.logikal_read_coalescer import ProjectListing, get_read_coalescer
+from services.logikal_listing_cache import MUST_REVALIDATE, get_listing_cache
+from services.bulk_upsert import bulk_upsert_projects, parse_changed_date
+from services.delta_sync import partition_projects
+from services.sync_checkpoint_service import SyncCheckpointService
+from services.sync_dedup import directory_projects_scope, project_name_scope, project_scope, run_deduplicated
 
 logger = logging.getLogger(__name__)
 
@@ -29,12 +39,19 @@ class ProjectSyncService:
         return cls(db)
     
     async def sync_projects_for_directory(self, db: Session, base_url: str, username: str, password: str, 
-                                        directory: Directory) -> Dict:
+                                        directory: Directory, cache_mode: str = MUST_REVALIDATE,
+                                        delta: bool = False) -> Dict:
         """
         Sync all projects for a specific directory
+        
+        With ``cache_mode='cache-ok'`` a cached project listing is used without
+        contacting Logikal. With ``delta`` the result lists the projects whose
+        ``changedDate`` did not move under 'skipped_unchanged'; 'changed_project_ids'
+        holds the ids of the others.
         """
         sync_start_time = time.time()
         sync_log = None
+        session_pool = get_logikal_session_pool(base_url, username, password)
         
         try:
             # Create sync log entry
@@ -49,41 +66,42 @@ class ProjectSyncService:
             
             logger.info(f"Starting project sync for directory: {directory.name}")
             
-            # Create dedicated session for this directory
-            success, token = await self.auth_service.authenticate(base_url, username, password)
-            
-            if not success:
-                raise Exception(f"Authentication failed: {token}")
-            
             # Validate directory path
             if not directory.full_path:
                 raise Exception(f"Directory '{directory.name}' has no full_path")
             
-            # Navigate to the directory using hierarchical navigation
-            directory_service = DirectoryService(db, token, base_url)
-            success, message = await directory_service.navigate_to_directory(directory.full_path)
-            
-            if not success:
-                raise Exception(f"Failed to navigate to directory {directory.name}: {message}")
+            target = NavigationContext(directory=directory.full_path)
             
-            # Get projects from the selected directory
-            project_service = ProjectService(db, token, base_url)
-            success, projects_data, message = await project_service.get_projects()
+            async def fetch_projects() -> List[Dict]:
+                # Lease the session closest to the directory and issue only the missing selects
+                async with session_pool.lease(target=target) as lease:
+                    navigation = NavigationSession(db, lease, base_url, pool=session_pool)
+                    success, message = await navigation.navigate_to(target)
+                    if not success:
+                        raise Exception(f"Failed to navigate to directory {directory.name}: {message}")
+                    
+                    # Get projects from the selected directory
+                    project_service = ProjectService(db, lease.token, base_url)
+                    success, projects, message = await project_service.get_projects()
+                    if not success:
+                        raise Exception(f"Failed to get projects for directory {directory.name}: {message}")
+                return projects
+            
+            projects_data = await get_listing_cache().get_listing(
+                base_url, target, 'projects', fetch_projects, cache_mode
+            )
             
-            if not success:
-                raise Exception(f"Failed to get projects for directory {directory.name}: {message}")
+            # Compare with the stored changedDates before the upsert overwrites them
+            partition = partition_projects(db, projects_data) if delta else None
             
-            # Process and cache projects
-            projects_processed = 0
-            for project_data in projects_data:
-                try:
-                    logger.info(f"Processing project data: {project_data}")
-                    project = await self._create_or_update_project(db, project_data, directory.id)
-                    projects_processed += 1
-                    logger.info(f"Successfully processed project: {project.name} (ID: {project.logikal_id})")
-                except Exception as e:
-                    logger.error(f"Failed to process project {project_data.get('name', 'Unknown')}: {str(e)}")
-                    logger.error(f"Project data was: {project_data}")
+            # Upsert the whole listing in one statement; committed together with the sync log
+            try:
+                project_ids = bulk_upsert_projects(db, projects_data, directory.id)
+            except Exception:
+                # Only the failed statement is discarded - the sync log entry is already committed
+                db.rollback()
+                raise
+            projects_processed = len(project_ids)
             
             # Calculate duration
             duration = int(time.time() - sync_start_time)
@@ -102,12 +120,17 @@ class ProjectSyncService:
             logger.info(f"Project sync completed for directory {directory.name} in {duration} seconds")
             logger.info(f"Processed {projects_processed} projects")
             
-            return {
+            result = {
                 'success': True,
                 'message': f'Project sync completed for directory: {directory.name}',
                 'count': projects_processed,
                 'duration_seconds': duration
             }
+            if partition is not None:
+                result['changed_project_ids'] = [project_ids[item['id']] for item in partition.changed
+                                                 if item.get('id') in project_ids]
+                result['skipped_unchanged'] = partition.skipped()
+            return result
             
         except Exception as e:
             duration = int(time.time() - sync_start_time)
@@ -135,97 +158,22 @@ class ProjectSyncService:
                 'error': str(e)
             }
     
-    async def _create_or_update_project(self, db: Session, project_data: Dict, directory_id: int) -> Project:
-        """Create or update a project record from API data"""
-        try:
-            # Extract identifier - Logikal API uses 'id' field (GUID) as identifier
-            identifier = project_data.get('id', '')
-            name = project_data.get('name', 'Unnamed Project')
-            
-            logger.info(f"Creating/updating project: {name} (ID: {identifier}) for directory_id: {directory_id}")
-            
-            if not identifier:
-                raise ValueError(f"Project data missing 'id' field: {project_data}")
-            
-            # Check if project already exists
-            existing_project = db.query(Project).filter(
-                Project.logikal_id == identifier
-            ).first()
-            
-            if existing_project:
-                # Update existing project
-                logger.info(f"Updating existing project: {name} (ID: {identifier})")
-                existing_project.name = name
-                existing_project.directory_id = directory_id
-                existing_project.last_sync_date = datetime.utcnow()
-                
-                # Extract and store last_update_date from Logikal API
-                if 'changedDate' in project_data and project_data['changedDate']:
-                    try:
-                        # Parse the Unix timestamp and store it
-                        api_updated_at = datetime.fromtimestamp(project_data['changedDate'], tz=timezone.utc)
-                        existing_project.last_update_date = api_updated_at
-                        logger.info(f"Updated last_update_date for project {name}: {api_updated_at}")
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"Failed to parse changedDate for project {name}: {e}")
-                
-                db.commit()
-                
-                logger.info(f"Successfully updated existing project: {name} (ID: {identifier})")
-                return existing_project
-            else:
-                # Create new project
-                logger.info(f"Creating new project: {name} (ID: {identifier})")
-                
-                # Extract last_update_date from Logikal API
-                last_update_date = None
-                if 'changedDate' in project_data and project_data['changedDate']:
-                    try:
-                        # Parse the Unix timestamp and store it
-                        last_update_date = datetime.fromtimestamp(project_data['changedDate'], tz=timezone.utc)
-                        logger.info(f"Setting last_update_date for new project {name}: {last_update_date}")
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"Failed to parse changedDate for new project {name}: {e}")
-                
-                new_project = Project(
-                    logikal_id=identifier,
-                    name=name,
-                    directory_id=directory_id,
-                    last_sync_date=datetime.utcnow(),
-                    last_update_date=last_update_date
-                )
-                db.add(new_project)
-                logger.info(f"TRANSACTION: Committing project {name} (ID: {identifier})")
-                db.commit()
-                logger.info(f"TRANSACTION: Project {name} (ID: {identifier}) committed successfully")
-                
-                # Verify the project was actually saved
-                saved_project = db.query(Project).filter(Project.logikal_id == identifier).first()
-                if saved_project:
-                    logger.info(f"Successfully created new project: {name} (ID: {identifier}) - Verified in database")
-                else:
-                    logger.error(f"Project creation failed - project not found in database after commit: {name} (ID: {identifier})")
-                
-                # No flush needed - commit is sufficient like directory storage
-                logger.info(f"Project {name} committed successfully")
-                
-                return new_project
-                
-        except Exception as e:
-            logger.error(f"Failed to create or update project: {str(e)}")
-            logger.error(f"Project data: {project_data}")
-            logger.error(f"Directory ID: {directory_id}")
-            # DO NOT rollback the entire transaction - just raise the exception
-            # The rollback was causing all previous work to be lost
-            raise
-    
-    async def sync_all_projects(self, db: Session, base_url: str, username: str, password: str) -> Dict:
+    async def sync_all_projects(self, db: Session, base_url: str, username: str, password: str,
+                                resume: bool = True) -> Dict:
         """
         Sync all projects from syncable directories (respects directory exclusions)
+        
+        Progress is checkpointed after every directory; with ``resume`` an
+        interrupted run continues after the last synced directory.
         """
         sync_start_time = time.time()
+        sync_log = None
+        checkpoint = None
+        checkpoints = SyncCheckpointService(db)
         
         try:
+            checkpoint, resumed = checkpoints.start('project', first_stage='projects', resume=resume)
+            
             logger.info("TRANSACTION: Starting sync with single session")
             
             # Create sync log entry
@@ -250,6 +198,7 @@ class ProjectSyncService:
                 sync_log.message = 'No syncable directories found'
                 sync_log.completed_at = datetime.utcnow()
                 db.commit()
+                checkpoints.complete(checkpoint)
                 
                 return {
                     'success': True,
@@ -265,8 +214,13 @@ class ProjectSyncService:
             
             # Sync projects for each syncable directory sequentially using single session
             total_projects, successful_directories = await self._sync_directories_sequentially(
-                db, base_url, username, password, syncable_directories
+                db, base_url, username, password, syncable_directories, checkpoint
             )
+            if resumed:
+                logger.info(f"Resumed from checkpoint {checkpoint.id}: {checkpoint.projects_processed} projects in total")
+                total_projects = checkpoint.projects_processed
+                successful_directories = checkpoint.directories_processed
+            checkpoints.complete(checkpoint)
             
             # Calculate duration
             duration = int(time.time() - sync_start_time)
@@ -302,7 +256,9 @@ class ProjectSyncService:
                 'projects_processed': total_projects,
                 'directories_processed': successful_directories,
                 'total_directories': len(syncable_directories),
-                'duration_seconds': duration
+                'duration_seconds': duration,
+                'resumed': resumed,
+                'checkpoint_id': checkpoint.id
             }
             
         except Exception as e:
@@ -310,6 +266,10 @@ class ProjectSyncService:
             error_msg = f"Project sync failed: {str(e)}"
             logger.error(error_msg, exc_info=True)
             
+            # The checkpoint stays 'running' so the next run resumes from it
+            if checkpoint:
+                checkpoints.record_failure(checkpoint, str(e))
+            
             # Update sync log with error
             if sync_log:
                 sync_log.status = 'failed'
@@ -334,18 +294,26 @@ class ProjectSyncService:
             logger.info("TRANSACTION: Sync completed")
 
     async def _sync_directories_sequentially(self, db: Session, base_url: str, username: str, password: str, 
-                                           directories: List[Directory]) -> Tuple[int, int]:
+                                           directories: List[Directory],
+                                           checkpoint: Optional[SyncCheckpoint] = None) -> Tuple[int, int]:
         """
         Sync projects for multiple directories sequentially using single session
+        
+        With a ``checkpoint`` directories up to its cursor are skipped and the
+        cursor is advanced after each directory.
         """
         total_projects = 0
         successful_directories = 0
+        checkpoints = SyncCheckpointService(db)
+        if checkpoint is not None:
+            directories = checkpoints.remaining(checkpoint, 'projects', directories)
         
         logger.info(f"Starting sequential project sync for {len(directories)} directories")
         
         for i, directory in enumerate(directories):
             logger.info(f"Processing directory {i+1}/{len(directories)}: {directory.name} (path: {directory.full_path})")
             
+            synced_count = None
             try:
                 result = await self.sync_projects_for_directory(
                     db, base_url, username, password, directory
@@ -353,6 +321,7 @@ class ProjectSyncService:
             
                 if result['success']:
                     logger.info(f"Completed project sync for '{directory.name}': {result['count']} projects")
+                    synced_count = result['count']
                     total_projects += result['count']
                     successful_directories += 1
                 else:
@@ -360,6 +329,14 @@ class ProjectSyncService:
                     
             except Exception as e:
                 logger.error(f"Error in project sync for '{directory.name}' (path: {directory.full_path}): {str(e)}")
+            
+            if checkpoint is not None:
+                checkpoints.advance(
+                    checkpoint,
+                    directory_id=directory.id,
+                    projects_processed=checkpoint.projects_processed + (synced_count or 0),
+                    directories_processed=checkpoint.directories_processed + (0 if synced_count is None else 1)
+                )
         
         logger.info(f"Sequential project sync completed: {successful_directories}/{len(directories)} directories, {total_projects} total projects")
         return total_projects, successful_directories
@@ -375,11 +352,42 @@ class ProjectSyncService:
             return []
 
     async def force_sync_project_from_logikal(self, project_id: str, directory_id: Optional[str], 
-                                            base_url: str, username: str, password: str) -> Dict:
+                                            base_url: str, username: str, password: str,
+                                            delta: bool = False) -> Dict:
         """
         Enhanced Force sync a specific project from Logikal API for Odoo integration
         with directory-aware lookup, staleness detection, and Logikal fallback
+        
+        With ``delta`` the project, its phases and elevations are only refreshed
+        where Logikal's ``changedDate`` moved; skips are listed under 'skipped_unchanged'.
+        A sync of the same project that is already running anywhere in the
+        cluster is joined instead of repeated. Broader background syncs (its
+        directory, a full sync shard) are not joined: they may have passed the
+        project already and would hold the interactive caller for their whole
+        run. Runs as interactive work.
         """
+        # ``project_id`` is the project name; leases are keyed on the Logikal GUID
+        # so scheduled and smart syncs of the same project are joined as well
+        project = self._find_project_by_name(project_id, directory_id)
+        scope = project_scope(project.logikal_id) if project else project_name_scope(project_id)
+        async with interactive_work():
+            return await run_deduplicated(
+                [scope],
+                lambda: self._force_sync_project_from_logikal(project_id, directory_id, base_url, username,
+                                                              password, delta=delta, project_lookup=project)
+            )
+
+    def _find_project_by_name(self, name: str, directory_id: Optional[str]) -> Optional[Project]:
+        """Look a project up by name, only within the directory when one is given"""
+        query = self.db.query(Project).filter(Project.name == name)
+        if directory_id:
+            query = query.join(Directory).filter(Directory.logikal_id == directory_id)
+        return query.first()
+
+    async def _force_sync_project_from_logikal(self, project_id: str, directory_id: Optional[str],
+                                               base_url: str, username: str, password: str,
+                                               delta: bool = False,
+                                               project_lookup: Optional[Project] = None) -> Dict:
         sync_start_time = time.time()
         sync_log = None
         
@@ -403,42 +411,21 @@ class ProjectSyncService:
                 if not directory:
                     raise Exception(f"Directory with ID {directory_id} not found")
             
-            # Create dedicated session for this project
-            success, token = await self.auth_service.authenticate(base_url, username, password)
-            if not success:
-                raise Exception(f"Authentication failed: {token}")
-            
-            # Navigate to directory if specified
-            if directory and directory.full_path:
-                directory_service = DirectoryService(self.db, token, base_url)
-                success, message = await directory_service.navigate_to_directory(directory.full_path)
-                if not success:
-                    raise Exception(f"Failed to navigate to directory {directory.name}: {message}")
-            
-            # STEP 1: Directory-aware project lookup in middleware
-            project_lookup = None
-            if directory_id:
-                # Look for project ONLY within the specified directory
-                project_lookup = self.db.query(Project).join(Directory).filter(
-                    Project.name == project_id,
-                    Directory.logikal_id == directory_id
-                ).first()
-            else:
-                # Fallback to global search if no directory specified
-                project_lookup = self.db.query(Project).filter(
-                    Project.name == project_id
-                ).first()
+            # STEP 1: Directory-aware project lookup in middleware happened before the sync was claimed
             
             # STEP 2A: Project found in middleware - Force Sync always performs full refresh
             if project_lookup:
                 logger.info(f"Found project '{project_id}' in middleware database - Force Sync will perform full refresh from Logikal")
                 
                 # Force Sync always performs full refresh regardless of staleness
-                # Get fresh project data from Logikal API
-                project_service = ProjectService(self.db, token, base_url)
-                success, projects_data, message = await project_service.get_projects()
+                # Get fresh project data from Logikal API (shared with concurrent force syncs)
+                try:
+                    listing = await self._get_project_listing(directory, base_url, username, password)
+                except Exception as e:
+                    listing = None
+                    message = str(e)
                 
-                if not success:
+                if listing is None:
                     logger.warning(f"Failed to get fresh project data from Logikal: {message}")
                     # Fallback to existing data if API fails
                     project_data = {
@@ -450,11 +437,7 @@ class ProjectSyncService:
                     logger.info(f"Using existing project data as fallback: {project_lookup.name}")
                 else:
                     # Find the specific project in the fresh data
-                    matching_project = None
-                    for project_data in projects_data:
-                        if project_data.get('name') == project_id:
-                            matching_project = project_data
-                            break
+                    matching_project = listing.find(project_id)
                     
                     if matching_project:
                         project_data = matching_project
@@ -469,11 +452,11 @@ class ProjectSyncService:
                         }
                         logger.info(f"Project not found in fresh data, using existing data: {project_lookup.name}")
                 
-                # Always perform full sync for Force Sync
+                # Full refresh unless delta mode (phase and elevation syncs lease their own sessions)
                 result = await self._sync_complete_project_from_logikal(
-                    project_data, directory, token, base_url, username, password
+                    project_data, directory, None, base_url, username, password, delta=delta
                 )
-                result['source'] = 'force_sync_full_refresh'
+                result['source'] = 'force_sync_delta' if delta else 'force_sync_full_refresh'
                 result['force_sync'] = True
                 return result
             
@@ -481,7 +464,7 @@ class ProjectSyncService:
             else:
                 logger.info(f"Project '{project_id}' not found in middleware database, searching Logikal API")
                 return await self._search_and_sync_from_logikal(
-                    project_id, directory, token, base_url, username, password
+                    project_id, directory, base_url, username, password, delta=delta
                 )
 
         except Exception as e:
@@ -616,34 +599,59 @@ class ProjectSyncService:
                 'project_id': project.name
             }
 
+    async def _get_project_listing(self, directory: Optional[Directory], base_url: str,
+                                   username: str, password: str) -> ProjectListing:
+        """
+        List the projects of a directory, coalescing identical concurrent listings.
+        
+        Raises if navigation or the listing fails; every caller waiting on the
+        same listing gets the same error.
+        """
+        if directory and directory.full_path:
+            target = NavigationContext(directory=directory.full_path)
+        else:
+            target = ROOT_CONTEXT
+        session_pool = get_logikal_session_pool(base_url, username, password)
+        
+        async def fetch_listing() -> ProjectListing:
+            async with session_pool.lease(target=target) as lease:
+                navigation = NavigationSession(self.db, lease, base_url, pool=session_pool)
+                success, message = await navigation.navigate_to(target)
+                if not success:
+                    raise Exception(f"Failed to navigate to directory {directory.name if directory else 'root'}: {message}")
+                
+                project_service = ProjectService(self.db, lease.token, base_url)
+                success, projects, message = await project_service.get_projects()
+                if not success:
+                    raise Exception(f"Failed to get projects from Logikal: {message}")
+            # Force sync always reads Logikal, but refreshes the shared listing cache for other syncs
+            await get_listing_cache().store(base_url, target, 'projects', projects)
+            return ProjectListing.from_projects(projects)
+        
+        key = (base_url.rstrip('/'), target, 'projects')
+        return await get_read_coalescer().get(key, fetch_listing)
+    
     async def _search_and_sync_from_logikal(self, project_id: str, directory: Directory, 
-                                          token: str, base_url: str, username: str, password: str) -> Dict:
+                                          base_url: str, username: str, password: str,
+                                          delta: bool = False) -> Dict:
         """Search for project in Logikal and sync if found"""
         try:
             logger.info(f"Searching for project '{project_id}' in Logikal directory: {directory.name if directory else 'global'}")
             
-            # Get all projects from the current directory context
-            project_service = ProjectService(self.db, token, base_url)
-            success, all_projects, message = await project_service.get_projects()
-            
-            if not success:
-                raise Exception(f"Failed to get projects from Logikal: {message}")
+            # Get all projects from the directory context (shared with concurrent force syncs)
+            listing = await self._get_project_listing(directory, base_url, username, password)
             
             # Search for the project by name in Logikal results
-            matching_project = None
-            for proj in all_projects:
-                if proj.get('name') == project_id:
-                    matching_project = proj
-                    break
+            matching_project = listing.find(project_id)
             
             if matching_project:
                 logger.info(f"Found project '{project_id}' in Logikal API")
                 return await self._sync_complete_project_from_logikal(
-                    matching_project, directory, token, base_url, username, password
+                    matching_project, directory, None, base_url, username, password, delta=delta
                 )
             else:
                 # Get available project names for helpful error
-                available_names = [p.get('name', 'Unknown') for p in all_projects if p.get('name')]
+                available_names = listing.names
                 directory_name = directory.name if directory else 'current directory'
                 
                 return {
@@ -664,8 +672,9 @@ class ProjectSyncService:
             }
 
     async def _sync_complete_project_from_logikal(self, project_data: dict, directory: Directory, 
-                                                token: str, base_url: str, username: str, password: str) -> Dict:
-        """Sync complete project with all related data from Logikal"""
+                                                token: str, base_url: str, username: str, password: str,
+                                                delta: bool = False) -> Dict:
+        """Sync complete project with all related data from Logikal (only what changed with ``delta``)"""
         sync_start_time = time.time()
         
         try:
@@ -674,6 +683,22 @@ class ProjectSyncService:
             
             logger.info(f"Starting complete sync for project: {project_name} (GUID: {project_id})")
             
+            partition = partition_projects(self.db, [project_data]) if delta else None
+            if partition is not None and partition.unchanged:
+                logger.info(f"Project {project_name} unchanged since last sync - skipping phases and elevations")
+                return {
+                    'success': True,
+                    'message': f'Project "{project_name}" unchanged in Logikal - skipped',
+                    'project_id': project_name,
+                    'project_synced': False,
+                    'phases_synced': 0,
+                    'elevations_synced': 0,
+                    'skipped_unchanged': partition.skipped(),
+                    'errors': [],
+                    'duration_seconds': time.time() - sync_start_time
+                }
+            last_update_date = parse_changed_date(project_data.get('changedDate'), f"project {project_name}")
+            
             # Create or update project record in middleware
             project = self.db.query(Project).filter(Project.logikal_id == project_id).first()
             if not project:
@@ -682,7 +707,8 @@ class ProjectSyncService:
                     name=project_name,
                     description=project_data.get('description', ''),
                     directory_id=directory.id if directory else None,
-                    last_sync_date=datetime.utcnow()
+                    last_sync_date=datetime.utcnow(),
+                    last_update_date=last_update_date
                 )
                 self.db.add(project)
                 self.db.commit()
@@ -691,6 +717,8 @@ class ProjectSyncService:
                 project.name = project_name
                 project.description = project_data.get('description', project.description)
                 project.last_sync_date = datetime.utcnow()
+                if last_update_date:
+                    project.last_update_date = last_update_date
                 self.db.commit()
                 logger.info(f"Updated existing project: {project.name} (GUID: {project_id})")
             
@@ -701,41 +729,51 @@ class ProjectSyncService:
             parts_list_parsed = 0
             parts_lists_synced = 0
             parts_lists_failed = 0
+            phases_failed = 0
+            errors = []
+            skipped = []
             
             # Sync phases for this project
             try:
                 from services.phase_sync_service import PhaseSyncService
                 phase_sync_service = PhaseSyncService(self.db)
                 phase_result = await phase_sync_service.sync_phases_for_project(
-                    self.db, base_url, username, password, project
+                    self.db, base_url, username, password, project, delta=delta
                 )
                 
                 if phase_result.get('success'):
                     phases_synced = phase_result.get('count', 0)
                     logger.info(f"Synced {phases_synced} phases for project {project.name}")
                     
-                    # Sync elevations for each phase
-                    from services.elevation_sync_service import ElevationSyncService
+                    # Sync elevations for all phases in parallel, one Logikal session each
+                    from services.project_sync_executor import ProjectSyncExecutor
                     from models.phase import Phase
-                    elevation_sync_service = ElevationSyncService(self.db)
-                    phases = self.db.query(Phase).filter(Phase.project_id == project.id).all()
+                    if delta:
+                        phase_ids = phase_result.get('changed_phase_ids', [])
+                        skipped.extend(phase_result.get('skipped_unchanged', []))
+                    else:
+                        phase_ids = [phase_id for (phase_id,) in
+                                     self.db.query(Phase.id).filter(Phase.project_id == project.id).all()]
                     
-                    for phase in phases:
-                        elevation_result = await elevation_sync_service.sync_elevations_for_phase(
-                            self.db, base_url, username, password, phase
-                        )
-                        
-                        if elevation_result.get('success'):
-                            elevations_synced += elevation_result.get('count', 0)
-                            parts_lists_synced += elevation_result.get('parts_lists_synced', 0)
-                            parts_lists_failed += elevation_result.get('parts_lists_failed', 0)
-                        else:
-                            logger.warning(f"Failed to sync elevations for phase {phase.name}: {elevation_result.get('message', 'Unknown error')}")
+                    executor = ProjectSyncExecutor(base_url, username, password, delta=delta)
+                    elevation_summary = await executor.run(phase_ids)
+                    elevations_synced = elevation_summary['elevations_synced']
+                    images_synced = elevation_summary['thumbnails_synced']
+                    parts_lists_synced = elevation_summary['parts_lists_synced']
+                    parts_lists_failed = elevation_summary['parts_lists_failed']
+                    phases_failed = elevation_summary['phases_failed']
+                    errors.extend(elevation_summary['errors'])
+                    skipped.extend(elevation_summary['skipped_unchanged'])
+                    
+                    # Elevations were written on the executor's sessions
+                    self.db.expire_all()
                 else:
                     logger.warning(f"Failed to sync phases for project {project.name}: {phase_result.get('message', 'Unknown error')}")
+                    errors.append(phase_result.get('message', 'Phase sync failed'))
                     
             except Exception as e:
                 logger.warning(f"Failed to sync phases/elevations for project {project.name}: {str(e)}")
+                errors.append(str(e))
             
             # Parts lists are now synced inline during elevation sync
             # Images are synced as thumbnails during elevation sync
@@ -743,8 +781,9 @@ class ProjectSyncService:
             duration = time.time() - sync_start_time
             
             logger.info(f"Force sync complete for project {project_name}: "
-                       f"{phases_synced} phases, {elevations_synced} elevations, "
-                       f"{parts_lists_synced} parts lists synced, {parts_lists_failed} parts lists failed")
+                       f"{phases_synced} phases ({phases_failed} failed), {elevations_synced} elevations, "
+                       f"{images_synced} thumbnails, {parts_lists_synced} parts lists synced, "
+                       f"{parts_lists_failed} parts lists failed")
             
             return {
                 'success': True,
@@ -752,9 +791,13 @@ class ProjectSyncService:
                 'project_id': project_name,
                 'project_synced': True,
                 'phases_synced': phases_synced,
+                'phases_failed': phases_failed,
                 'elevations_synced': elevations_synced,
+                'images_synced': images_synced,
                 'parts_lists_synced': parts_lists_synced,
                 'parts_lists_failed': parts_lists_failed,
+                'errors': errors,
+                'skipped_unchanged': skipped,
                 'duration_seconds': duration
             }
             
@@ -774,7 +817,19 @@ class ProjectSyncService:
                                               username: str, password: str) -> Dict:
         """
         Force sync all projects in a specific directory from Logikal API for Odoo integration
+        
+        Joins a refresh of the same directory's projects that is already running;
+        background syncs covering the directory are not waited for.
+        Runs as interactive work.
         """
+        async with interactive_work():
+            return await run_deduplicated(
+                [directory_projects_scope(directory_id)],
+                lambda: self._force_sync_projects_for_directory(directory_id, base_url, username, password)
+            )
+
+    async def _force_sync_projects_for_directory(self, directory_id: str, base_url: str,
+                                               username: str, password: str) -> Dict:
         sync_start_time = time.time()
         sync_log = None
         
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from celery_app import celery_app
+from core.priority import INTERACTIVE, PRIORITY_QUEUES
 from tasks.sync_tasks import sync_project_task, batch_sync_projects_task, full_sync_task
 from tasks.scheduler_tasks import hourly_smart_sync, cleanup_old_tasks, system_health_monitor
 import logging
@@ -72,7 +73,10 @@ class SchedulerService:
         Start a background sync for a specific project.
         """
         try:
-            task = sync_project_task.delay(project_id, force_sync)
+            # Requested by a user - runs on the interactive lane
+            task = sync_project_task.apply_async(
+                args=[project_id, force_sync], kwargs={"priority": INTERACTIVE}, queue=PRIORITY_QUEUES[INTERACTIVE]
+            )
             return {
                 "success": True,
                 "task_id": task.id,
@@ -1,3 +1,5 @@
+from dataclasses import dataclass, field
+from sqlalchemy import func, or_, select, union
 from sqlalchemy.orm import Session
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
@@ -8,11 +10,35 @@ from services.advanced_sync_service import AdvancedSyncService
 from services.data_consistency_service import DataConsistencyService
 from services.sync_metrics_service import SyncMetricsService
 from services.alert_service import AlertService
+from services.sync_dedup import directory_scope, project_scope, run_deduplicated
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def stale_clause(model):
+    """SQL form of the is_*_stale checks: missing timestamps or updated after the last sync"""
+    return or_(
+        model.last_update_date.is_(None),
+        model.last_sync_date.is_(None),
+        model.last_update_date > model.last_sync_date
+    )
+
+
+@dataclass
+class IncrementalSyncPlan:
+    """Minimal set of Logikal listings to re-read for one project, by navigation context"""
+    project_id: int
+    # Project context: re-list the phases of the project
+    relist_phases: bool = False
+    # Phase contexts: re-list the elevations (and download what changed) of these phases
+    phase_ids: List[int] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.relist_phases and not self.phase_ids
+
+
 class SmartSyncService:
     """
     Service for intelligent synchronization with Logikal API.
@@ -77,45 +103,74 @@ class SmartSyncService:
         """
         Check if a project and its downstream objects need syncing.
         Returns sync status information.
+        
+        Staleness of the phases and elevations is counted in the database with
+        a single query instead of loading every row.
         """
-        project = self.db.query(Project).filter(Project.logikal_id == project_id).first()
-        if not project:
+        phases = select(func.count(Phase.id)).where(Phase.project_id == Project.id)
+        elevations = (select(func.count(Elevation.id))
+                      .join(Phase, Elevation.phase_id == Phase.id)
+                      .where(Phase.project_id == Project.id))
+        row = self.db.query(
+            Project,
+            phases.scalar_subquery(),
+            phases.where(stale_clause(Phase)).scalar_subquery(),
+            elevations.scalar_subquery(),
+            elevations.where(stale_clause(Elevation)).scalar_subquery()
+        ).filter(Project.logikal_id == project_id).first()
+        
+        if not row:
             return {
                 "project_id": project_id,
                 "exists": False,
                 "sync_needed": False,
                 "reason": "Project not found"
             }
-
-        project_stale = self.is_project_stale(project)
-        
-        # Check phases
-        phases = self.db.query(Phase).filter(Phase.project_id == project.id).all()
-        stale_phases = [phase for phase in phases if self.is_phase_stale(phase)]
         
-        # Check elevations
-        elevations = self.db.query(Elevation).filter(Elevation.project_id == project.id).all()
-        stale_elevations = [elevation for elevation in elevations if self.is_elevation_stale(elevation)]
-
-        sync_needed = project_stale or len(stale_phases) > 0 or len(stale_elevations) > 0
+        project, total_phases, stale_phases, total_elevations, stale_elevations = row
+        project_stale = self.is_project_stale(project)
+        sync_needed = project_stale or stale_phases > 0 or stale_elevations > 0
 
         return {
             "project_id": project_id,
             "exists": True,
             "sync_needed": sync_needed,
             "project_stale": project_stale,
-            "stale_phases_count": len(stale_phases),
-            "stale_elevations_count": len(stale_elevations),
-            "total_phases": len(phases),
-            "total_elevations": len(elevations),
+            "stale_phases_count": stale_phases,
+            "stale_elevations_count": stale_elevations,
+            "total_phases": total_phases,
+            "total_elevations": total_elevations,
             "last_sync_date": project.last_sync_date,
             "last_update_date": project.last_update_date
         }
 
-    def sync_project_if_needed(self, project_id: str, force_sync: bool = False) -> Dict:
+    def build_sync_plan(self, project: Project, full: bool = False) -> IncrementalSyncPlan:
+        """
+        Work out which listings to re-read for a project.
+        
+        A stale project re-lists its phases; stale phases and phases holding
+        stale elevations re-list their elevations. The phase contexts come from
+        one query. ``full`` plans every phase of the project.
+        """
+        plan = IncrementalSyncPlan(project_id=project.id, relist_phases=full or self.is_project_stale(project))
+        
+        if full:
+            query = select(Phase.id).where(Phase.project_id == project.id)
+        else:
+            query = union(
+                select(Phase.id).where(Phase.project_id == project.id, stale_clause(Phase)),
+                select(Elevation.phase_id)
+                .join(Phase, Elevation.phase_id == Phase.id)
+                .where(Phase.project_id == project.id, stale_clause(Elevation))
+            )
+        plan.phase_ids = sorted(phase_id for (phase_id,) in self.db.execute(query) if phase_id is not None)
+        return plan
+
+    async def sync_project_if_needed(self, project_id: str, force_sync: bool = False,
+                                     base_url: str = None, username: str = None, password: str = None) -> Dict:
         """
         Sync a project from Logikal if it's stale or if force_sync is True.
-        Implements cascading sync logic.
+        Only the stale part of the project is re-read from Logikal.
         """
         try:
             # Check if sync is needed
@@ -139,12 +194,15 @@ class SmartSyncService:
 
             # Perform the sync
             logger.info(f"Starting smart sync for project {project_id}")
-            sync_result = self._perform_project_sync(project_id)
+            sync_result = await self._perform_project_sync(
+                project_id, full=force_sync, base_url=base_url, username=username, password=password
+            )
             
             return {
-                "success": True,
+                "success": sync_result["success"],
                 "synced": True,
                 "project_id": project_id,
+                "error": sync_result.get("error"),
                 "sync_status": sync_status,
                 "sync_result": sync_result
             }
@@ -157,66 +215,118 @@ class SmartSyncService:
                 "project_id": project_id
             }
 
-    def _perform_project_sync(self, project_id: str) -> Dict:
+    async def _perform_project_sync(self, project_id: str, full: bool = False,
+                                    base_url: str = None, username: str = None, password: str = None) -> Dict:
         """
-        Internal method to perform the actual sync with Logikal.
-        This will be enhanced in later phases to actually sync data.
-        For now, it updates timestamps to simulate a successful sync.
+        Re-read the stale part of a project from Logikal.
+        
+        The plan is executed through the regular sync services: a phase listing
+        in the project context, then the elevation listings of the planned
+        phases in parallel (delta mode, so only changed elevations are
+        downloaded). Credentials default to the configured Logikal account.
+        A request for a project that is already being synced - directly or as
+        part of its directory - returns the running sync's result.
         """
+        if not base_url:
+            from core.config_production import get_settings
+            settings = get_settings()
+            base_url = settings.LOGIKAL_API_BASE_URL
+            username = settings.LOGIKAL_AUTH_USERNAME
+            password = settings.LOGIKAL_AUTH_PASSWORD
+        
         project = self.db.query(Project).filter(Project.logikal_id == project_id).first()
         if not project:
             raise ValueError(f"Project {project_id} not found")
-
-        sync_time = datetime.utcnow()
-        
-        # Update project sync timestamp
-        project.last_sync_date = sync_time
-        project.updated_at = sync_time
         
-        # Update phases sync timestamps
-        phases = self.db.query(Phase).filter(Phase.project_id == project.id).all()
-        for phase in phases:
-            phase.last_sync_date = sync_time
-            phase.updated_at = sync_time
+        # A running sync of this project (or of its directory) is joined instead of repeated
+        covering = [directory_scope(project.directory.logikal_id)] if project.directory else []
+        return await run_deduplicated(
+            [project_scope(project_id)],
+            lambda: self._execute_sync_plan(project, full, base_url, username, password),
+            covering=covering
+        )
+
+    async def _execute_sync_plan(self, project: Project, full: bool,
+                                 base_url: str, username: str, password: str) -> Dict:
+        """Run the phase listing and elevation contexts planned for one project"""
+        from services.phase_sync_service import PhaseSyncService
+        from services.project_sync_executor import ProjectSyncExecutor
         
-        # Update elevations sync timestamps
-        elevations = self.db.query(Elevation).filter(Elevation.project_id == project.id).all()
-        for elevation in elevations:
-            elevation.last_sync_date = sync_time
-            elevation.updated_at = sync_time
+        project_id = project.logikal_id
+        plan = self.build_sync_plan(project, full=full)
+        sync_time = datetime.utcnow()
+        result = {
+            "success": True,
+            "synced_at": sync_time,
+            "phases_relisted": False,
+            "phases_synced": 0,
+            "phases_failed": 0,
+            "elevations_synced": 0,
+            "parts_lists_synced": 0,
+            "errors": [],
+            "skipped_unchanged": []
+        }
+        logger.info(f"Smart sync plan for project {project_id}: relist phases={plan.relist_phases}, "
+                    f"{len(plan.phase_ids)} phase contexts")
         
-        self.db.commit()
+        phase_ids = set(plan.phase_ids)
+        if plan.relist_phases:
+            phase_result = await PhaseSyncService(self.db).sync_phases_for_project(
+                self.db, base_url, username, password, project, delta=not full
+            )
+            if phase_result["success"]:
+                result["phases_relisted"] = True
+                project.last_sync_date = sync_time
+                self.db.commit()
+                if full:
+                    phase_ids.update(phase_id for (phase_id,) in
+                                     self.db.query(Phase.id).filter(Phase.project_id == project.id))
+                else:
+                    phase_ids.update(phase_result.get("changed_phase_ids", []))
+                    result["skipped_unchanged"].extend(phase_result.get("skipped_unchanged", []))
+            else:
+                result["success"] = False
+                result["error"] = phase_result.get("message")
+                result["errors"].append(phase_result.get("message", "Phase sync failed"))
         
-        logger.info(f"Smart sync completed for project {project_id}: {len(phases)} phases, {len(elevations)} elevations")
+        if phase_ids:
+            executor = ProjectSyncExecutor(base_url, username, password, delta=not full)
+            summary = await executor.run(sorted(phase_ids))
+            result["phases_synced"] = len(summary["synced_phase_ids"])
+            result["phases_failed"] = summary["phases_failed"]
+            result["elevations_synced"] = summary["elevations_synced"]
+            result["parts_lists_synced"] = summary["parts_lists_synced"]
+            result["errors"].extend(summary["errors"])
+            result["skipped_unchanged"].extend(summary["skipped_unchanged"])
+            
+            # Elevations were written on the executor's sessions; the phases themselves are now current
+            self.db.expire_all()
+            if summary["synced_phase_ids"]:
+                self.db.query(Phase).filter(Phase.id.in_(summary["synced_phase_ids"])).update(
+                    {Phase.last_sync_date: sync_time}, synchronize_session=False
+                )
+                self.db.commit()
         
-        return {
-            "synced_at": sync_time,
-            "phases_synced": len(phases),
-            "elevations_synced": len(elevations)
-        }
+        logger.info(f"Smart sync completed for project {project_id}: {result['phases_synced']} phases, "
+                    f"{result['elevations_synced']} elevations, {len(result['skipped_unchanged'])} unchanged skipped")
+        return result
 
     def get_sync_status_summary(self) -> Dict:
         """
         Get a summary of sync status for all projects.
         """
-        projects = self.db.query(Project).all()
-        total_projects = len(projects)
-        stale_projects = 0
-        projects_never_synced = 0
+        def counts(model) -> Tuple[int, int]:
+            # Totals and stale counts are aggregated in the database
+            total, stale = self.db.query(
+                func.count(model.id),
+                func.count(model.id).filter(stale_clause(model))
+            ).one()
+            return total, stale
         
-        for project in projects:
-            if self.is_project_stale(project):
-                stale_projects += 1
-            if not project.last_sync_date:
-                projects_never_synced += 1
-
-        phases = self.db.query(Phase).all()
-        total_phases = len(phases)
-        stale_phases = sum(1 for phase in phases if self.is_phase_stale(phase))
-
-        elevations = self.db.query(Elevation).all()
-        total_elevations = len(elevations)
-        stale_elevations = sum(1 for elevation in elevations if self.is_elevation_stale(elevation))
+        total_projects, stale_projects = counts(Project)
+        projects_never_synced = self.db.query(func.count(Project.id)).filter(Project.last_sync_date.is_(None)).scalar()
+        total_phases, stale_phases = counts(Phase)
+        total_elevations, stale_elevations = counts(Elevation)
 
         return {
             "summary": {
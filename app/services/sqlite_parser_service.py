@@ -1,6 +1,7 @@
 import sqlite3
 import os
 import traceback
+from collections import defaultdict
 from typing import Dict, List, Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
@@ -9,6 +10,9 @@ from sqlalchemy.exc import SQLAlchemyError
 from models.elevation import Elevation
 from models.elevation_glass import ElevationGlass
 from models.parsing_error_log import ParsingErrorLog
+from core.config import settings
+from services.bulk_upsert import UPSERT_BATCH_SIZE, bulk_update_rows, copy_rows
+from services.parts_extractor import extract_part_lines, replace_part_lines
 from services.sqlite_validation_service import SQLiteValidationService, ValidationResult
 import logging
 
@@ -48,28 +52,54 @@ class SQLiteElevationParserService:
         elevation = self.db.query(Elevation).filter(Elevation.id == elevation_id).first()
         if not elevation:
             return {"success": False, "error": "Elevation not found"}
+        return await self._parse_elevation(elevation)
+    
+    async def parse_elevation_bytes(self, elevation_id: int, data: bytes, file_hash: str,
+                                    sqlite_conn: Optional[sqlite3.Connection] = None) -> Dict:
+        """Parse a parts database downloaded into memory, without reading it from disk
         
-        # ✨ OPTIMIZATION 2: Open SQLite connection once and reuse
-        sqlite_conn = None
+        ``file_hash`` is the SHA-256 computed while downloading. ``sqlite_conn`` is an
+        open_sqlite_in_memory() connection of ``data`` to reuse; it is left open.
+        """
+        elevation = self.db.query(Elevation).filter(Elevation.id == elevation_id).first()
+        if not elevation:
+            return {"success": False, "error": "Elevation not found"}
+        return await self._parse_elevation(elevation, data=data, file_hash=file_hash, sqlite_conn=sqlite_conn)
+    
+    async def _parse_elevation(self, elevation: Elevation, data: Optional[bytes] = None,
+                               file_hash: Optional[str] = None,
+                               sqlite_conn: Optional[sqlite3.Connection] = None) -> Dict:
+        """Validate, extract and store the parts database of ``elevation`` (from ``data`` or its file)"""
+        elevation_id = elevation.id
+        owns_connection = sqlite_conn is None
+        parsed_hash = self._parsed_hash(elevation)
         
         try:
             # Update status to in_progress (NO COMMIT - part of transaction)
             elevation.parse_status = ParsingStatus.IN_PROGRESS
             elevation.data_parsed_at = datetime.utcnow()
             
-            # Validate file first
-            if not elevation.parts_db_path or not os.path.exists(elevation.parts_db_path):
-                raise ParsingError("SQLite file not found", "file_not_found")
-            
-            # ✨ OPEN CONNECTION ONCE - will be reused for all SQLite operations
-            sqlite_conn = await self.validation_service._open_sqlite_readonly(elevation.parts_db_path)
-            
-            # ✨ PASS CONNECTION to validation (Optimization 2 + 3)
-            validation_result = await self.validation_service.validate_file(
-                elevation.parts_db_path,
-                conn=sqlite_conn,
-                trusted_source=True  # Files from Logikal API are trusted (Optimization 3)
-            )
+            if data is not None:
+                # In-memory database: validated and extracted without touching the disk
+                if sqlite_conn is None:
+                    sqlite_conn = await self.validation_service.open_sqlite_in_memory(data)
+                validation_result = await self.validation_service.validate_bytes(
+                    data, conn=sqlite_conn, trusted_source=True
+                )
+            else:
+                # Validate file first
+                if not elevation.parts_db_path or not os.path.exists(elevation.parts_db_path):
+                    raise ParsingError("SQLite file not found", "file_not_found")
+                
+                # ✨ OPEN CONNECTION ONCE - will be reused for all SQLite operations
+                sqlite_conn = await self.validation_service._open_sqlite_readonly(elevation.parts_db_path)
+                
+                # ✨ PASS CONNECTION to validation (Optimization 2 + 3)
+                validation_result = await self.validation_service.validate_file(
+                    elevation.parts_db_path,
+                    conn=sqlite_conn,
+                    trusted_source=True  # Files from Logikal API are trusted (Optimization 3)
+                )
             
             if not validation_result.valid:
                 # Rollback IN_PROGRESS status before returning
@@ -95,19 +125,15 @@ class SQLiteElevationParserService:
             # ✨ PASS CONNECTION to extraction methods (reuse connection)
             elevation_data = await self._extract_elevation_data_with_conn(sqlite_conn, elevation)
             glass_data = await self._extract_glass_data_with_conn(sqlite_conn)
-            
-            # Update database (NO COMMITS - part of transaction)
-            await self._update_elevation_model_no_commit(elevation_id, elevation_data)
-            await self._create_glass_records_no_commit(elevation_id, glass_data)
-            
-            # Update parsing status (NO COMMIT YET - part of transaction)
-            elevation.parse_status = ParsingStatus.SUCCESS
-            elevation.parse_error = None
-            elevation.data_parsed_at = datetime.utcnow()
+            part_lines = extract_part_lines(sqlite_conn) if settings.PARTS_EXTRACT_LINE_ITEMS else None
             
             # Update file hash for future deduplication (NO COMMIT YET - part of transaction)
-            file_hash = await self.validation_service.calculate_file_hash(elevation.parts_db_path)
-            elevation.parts_file_hash = file_hash
+            if file_hash is None:
+                file_hash = await self.validation_service.calculate_file_hash(elevation.parts_db_path)
+            
+            # Update database (NO COMMITS - part of transaction)
+            await self._store_parsed_data_no_commit(elevation, elevation_data, glass_data, file_hash, part_lines,
+                                                    parsed_hash=parsed_hash)
             
             # ✨ SINGLE COMMIT POINT - all operations committed at once
             self.db.commit()
@@ -143,9 +169,73 @@ class SQLiteElevationParserService:
         
         finally:
             # ✨ CLOSE CONNECTION ONCE at the end
-            if sqlite_conn:
+            if owns_connection and sqlite_conn:
                 sqlite_conn.close()
     
+    async def apply_extraction(self, elevation: Elevation, extraction: Dict, file_hash: str) -> Dict:
+        """Store the result of parts_parse_stage.extract_parts_database for ``elevation``
+        
+        Commits pending changes of the session along with the parsed data, so the
+        caller's parts-list fields land in the same transaction. Database errors
+        are rolled back and raised.
+        """
+        parsed_hash = self._parsed_hash(elevation)
+        try:
+            if not extraction['valid']:
+                elevation.parse_status = (ParsingStatus.VALIDATION_FAILED
+                                          if extraction['error_type'] == 'validation_failed' else ParsingStatus.FAILED)
+                elevation.parse_error = extraction['message']
+                elevation.data_parsed_at = datetime.utcnow()
+                self.db.commit()
+                
+                self._log_parsing_error(elevation.id, extraction['error_type'], extraction['message'],
+                                        extraction.get('details'))
+                return {"success": False, "error": extraction['message']}
+            
+            await self._store_parsed_data_no_commit(
+                elevation, extraction['elevation_data'], extraction['glass_data'], file_hash,
+                extraction.get('part_lines'), parsed_hash=parsed_hash
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        return {
+            "success": True,
+            "elevation_data": extraction['elevation_data'],
+            "glass_count": len(extraction['glass_data']),
+            "parsed_at": elevation.data_parsed_at.isoformat()
+        }
+    
+    @staticmethod
+    def _parsed_hash(elevation: Elevation) -> Optional[str]:
+        """Hash of the parts file the elevation's stored data was parsed from, if that parse succeeded"""
+        return elevation.parts_file_hash if elevation.parse_status == ParsingStatus.SUCCESS else None
+    
+    async def _store_parsed_data_no_commit(self, elevation: Elevation, elevation_data: Dict,
+                                           glass_data: List[Dict], file_hash: str,
+                                           part_lines: Optional[List[Dict]] = None,
+                                           parsed_hash: Optional[str] = None) -> None:
+        """Write parsed elevation data, glass records, part lines, status and file hash (no commit)
+        
+        When ``file_hash`` equals ``parsed_hash`` the stored data already comes from
+        this very file, so elevation data, glass records and part lines are left untouched.
+        """
+        if file_hash and file_hash == parsed_hash:
+            self.logger.info(f"Parts file of elevation {elevation.id} unchanged; stored data kept")
+        else:
+            await self._update_elevation_model_no_commit(elevation.id, elevation_data)
+            await self._create_glass_records_no_commit(elevation.id, glass_data)
+            if part_lines is not None:
+                replace_part_lines(self.db, {elevation.id: part_lines})
+        
+        # Update parsing status (NO COMMIT YET - part of transaction)
+        elevation.parse_status = ParsingStatus.SUCCESS
+        elevation.parse_error = None
+        elevation.data_parsed_at = datetime.utcnow()
+        elevation.parts_file_hash = file_hash
+    
     async def _extract_elevation_data_safe(self, sqlite_path: str) -> Dict:
         """Extract data from Elevations table with error handling (legacy method)"""
         conn = await self.validation_service._open_sqlite_readonly(sqlite_path)
@@ -333,30 +423,13 @@ class SQLiteElevationParserService:
             raise ParsingError(f"Error updating elevation: {str(e)}")
     
     async def _create_glass_records_no_commit(self, elevation_id: int, glass_data: List[Dict]) -> bool:
-        """Create glass records (no commit - part of larger transaction)
+        """Bring the elevation's glass records in line with the parsed Glass table (no commit)
         
-        OPTIMIZATION: Removed commit to be part of single transaction in parse_elevation_data.
-        Uses bulk operations for better performance.
+        Only the differences are written (see sync_glass_records).
         """
         
         try:
-            # Clear existing glass records for this elevation
-            self.db.query(ElevationGlass).filter(
-                ElevationGlass.elevation_id == elevation_id
-            ).delete()
-            
-            # Create new glass records using bulk operations for performance
-            if glass_data:
-                glass_records = [
-                    ElevationGlass(
-                        elevation_id=elevation_id,
-                        glass_id=item.get('GlassID'),
-                        name=item.get('Name')
-                    )
-                    for item in glass_data
-                ]
-                # Use bulk_save_objects for better performance
-                self.db.bulk_save_objects(glass_records)
+            sync_glass_records(self.db, {elevation_id: glass_data})
             
             # NO COMMIT - will be committed by caller
             return True
@@ -381,6 +454,64 @@ class SQLiteElevationParserService:
             self.logger.error(f"Failed to log parsing error: {str(e)}")
 
 
+def sync_glass_records(db: Session, glass_by_elevation: Dict[int, List[Dict]]) -> Dict[str, int]:
+    """
+    Diff-upsert the elevation_glass rows of the given elevations (no commit).
+    
+    The existing rows are loaded in one query and compared with the parsed
+    Glass tables by GlassID (a GlassID may repeat): matching rows are left
+    alone, rows whose name changed are updated, and only the surplus rows are
+    deleted or inserted. Returns the counts per kind of change.
+    """
+    counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    if not glass_by_elevation:
+        return counts
+    
+    existing = defaultdict(lambda: defaultdict(list))
+    rows = db.query(
+        ElevationGlass.id, ElevationGlass.elevation_id, ElevationGlass.glass_id, ElevationGlass.name
+    ).filter(ElevationGlass.elevation_id.in_(list(glass_by_elevation))).order_by(ElevationGlass.id)
+    for row in rows:
+        existing[row.elevation_id][row.glass_id].append(row)
+    
+    inserts, updates, deletes = [], [], []
+    for elevation_id, glass_data in glass_by_elevation.items():
+        wanted = defaultdict(list)
+        for item in glass_data:
+            wanted[item.get('GlassID')].append(item.get('Name'))
+        current = existing.get(elevation_id, {})
+        
+        for glass_id, current_rows in current.items():
+            if glass_id not in wanted:
+                deletes.extend(row.id for row in current_rows)
+        
+        for glass_id, names in wanted.items():
+            unmatched_rows = list(current.get(glass_id, []))
+            unmatched_names = []
+            for name in names:
+                match = next((row for row in unmatched_rows if row.name == name), None)
+                if match is None:
+                    unmatched_names.append(name)
+                else:
+                    unmatched_rows.remove(match)
+                    counts["unchanged"] += 1
+            
+            for row, name in zip(unmatched_rows, unmatched_names):
+                updates.append({"id": row.id, "name": name})
+            deletes.extend(row.id for row in unmatched_rows[len(unmatched_names):])
+            inserts.extend((elevation_id, glass_id, name) for name in unmatched_names[len(unmatched_rows):])
+    
+    for start in range(0, len(deletes), UPSERT_BATCH_SIZE):
+        db.query(ElevationGlass).filter(
+            ElevationGlass.id.in_(deletes[start:start + UPSERT_BATCH_SIZE])
+        ).delete(synchronize_session=False)
+    bulk_update_rows(db, ElevationGlass, updates, ("name",))
+    copy_rows(db, ElevationGlass, ("elevation_id", "glass_id", "name"), inserts)
+    
+    counts.update(inserted=len(inserts), updated=len(updates), deleted=len(deletes))
+    return counts
+
+
 class ParsingDeduplicationService:
     """Handles deduplication of parsing requests"""
     
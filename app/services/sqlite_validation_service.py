@@ -68,26 +68,55 @@ class SQLiteValidationService:
             if conn is None:
                 conn = await self._open_sqlite_readonly(sqlite_path)
             
-            # 2. SQLite integrity check (skip for trusted sources)
-            if not trusted_source:
-                integrity_result = await self._check_sqlite_integrity_with_conn(conn)
-                if not integrity_result.valid:
-                    return integrity_result
-            
-            # 3. Schema validation (always do this - it's fast)
-            schema_result = await self._validate_schema_with_conn(conn)
-            if not schema_result.valid:
-                return schema_result
-            
-            # 4. Data validation (always do this - it's fast)
-            data_result = await self._validate_required_data_with_conn(conn)
-            return data_result
+            return await self._validate_with_conn(conn, trusted_source)
             
         finally:
             # Only close connection if we opened it
             if owns_connection and conn:
                 conn.close()
     
+    async def validate_bytes(self, data: bytes, conn=None, trusted_source: bool = False) -> ValidationResult:
+        """Validate a SQLite database held in memory - same checks as validate_file, no disk access
+        
+        Args:
+            data: The database bytes
+            conn: Optional connection from open_sqlite_in_memory() to reuse
+            trusted_source: If True, skip expensive integrity check for trusted data
+        """
+        if len(data) > self.MAX_FILE_SIZE:
+            return ValidationResult(
+                False,
+                f"File size exceeds {self.MAX_FILE_SIZE} bytes",
+                {"file_size": len(data), "max_size": self.MAX_FILE_SIZE}
+            )
+        if not data:
+            return ValidationResult(False, "File is empty")
+        
+        owns_connection = (conn is None)
+        try:
+            if conn is None:
+                conn = await self.open_sqlite_in_memory(data)
+            return await self._validate_with_conn(conn, trusted_source)
+        finally:
+            if owns_connection and conn:
+                conn.close()
+    
+    async def _validate_with_conn(self, conn, trusted_source: bool) -> ValidationResult:
+        """Integrity, schema and data checks on an open connection"""
+        # 2. SQLite integrity check (skip for trusted sources)
+        if not trusted_source:
+            integrity_result = await self._check_sqlite_integrity_with_conn(conn)
+            if not integrity_result.valid:
+                return integrity_result
+        
+        # 3. Schema validation (always do this - it's fast)
+        schema_result = await self._validate_schema_with_conn(conn)
+        if not schema_result.valid:
+            return schema_result
+        
+        # 4. Data validation (always do this - it's fast)
+        return await self._validate_required_data_with_conn(conn)
+    
     async def _check_sqlite_integrity(self, sqlite_path: str) -> ValidationResult:
         """Check SQLite file integrity before processing (legacy method)"""
         conn = await self._open_sqlite_readonly(sqlite_path)
@@ -330,6 +359,43 @@ class SQLiteValidationService:
         except sqlite3.Error as e:
             raise Exception(f"Failed to open SQLite file securely: {str(e)}")
     
+    async def open_sqlite_in_memory(self, data: bytes) -> sqlite3.Connection:
+        """Load SQLite database bytes into a read-only in-memory connection (no temp file)"""
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.deserialize(data)
+            # The copy is private, but parsing must not change it either
+            conn.execute("PRAGMA query_only = ON")
+            conn.execute("PRAGMA foreign_keys = OFF")
+            return conn
+        except sqlite3.Error as e:
+            conn.close()
+            raise Exception(f"Failed to load SQLite data into memory: {str(e)}")
+    
+    def count_records(self, conn: sqlite3.Connection) -> int:
+        """Total number of records across the tables of a parts database"""
+        cursor = conn.cursor()
+        
+        # Get table names
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+        tables = cursor.fetchall()
+        
+        # Try to find a table that might contain parts data
+        parts_count = 0
+        for table_name in tables:
+            table_name = table_name[0]
+            try:
+                # Get row count for this table
+                cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+                count = cursor.fetchone()[0]
+                parts_count += count
+            except Exception as e:
+                self.logger.debug(f"Could not count rows in table {table_name}: {e}")
+                continue
+        
+        self.logger.info(f"SQLite validation successful: {parts_count} total records across {len(tables)} tables")
+        return parts_count
+    
     async def calculate_file_hash(self, file_path: str) -> str:
         """Calculate SHA256 hash of SQLite file for change detection"""
         
@@ -0,0 +1,120 @@
+"""
+Persisted checkpoints for long-running syncs.
+
+A full sync walks directories, then projects, then phases, each in id order,
+and every unit commits its own upserts. After each unit the checkpoint cursor
+is moved to that unit's id and committed. A run killed by the Celery time limit
+or a worker restart leaves its checkpoint 'running'; the next run picks it up
+and skips everything up to the cursor. Re-running the unit in flight is safe
+because the listings are upserted.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.sync_checkpoint import SyncCheckpoint
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('directories', 'projects', 'phases', 'elevations')
+
+# Stage -> checkpoint column holding the id of the last committed unit
+CURSORS = {'projects': 'directory_id', 'phases': 'project_id', 'elevations': 'phase_id'}
+
+
+class SyncCheckpointService:
+    """Creates, resumes and advances sync checkpoints"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def start(self, sync_type: str, first_stage: str = 'directories', delta: bool = False,
+              cache_mode: Optional[str] = None, resume: bool = True) -> Tuple[SyncCheckpoint, bool]:
+        """
+        Resume the interrupted run of ``sync_type`` or start a new one.
+
+        An interrupted run is only resumed when it used the same delta mode and is
+        younger than SYNC_CHECKPOINT_MAX_AGE_HOURS; otherwise it is abandoned.
+        Returns the checkpoint and whether it was resumed.
+        """
+        interrupted = (self.db.query(SyncCheckpoint)
+                       .filter(SyncCheckpoint.sync_type == sync_type, SyncCheckpoint.status == 'running')
+                       .order_by(SyncCheckpoint.id.desc())
+                       .all())
+
+        checkpoint = None
+        if resume and interrupted and self._resumable(interrupted[0], delta):
+            checkpoint = interrupted.pop(0)
+            checkpoint.resume_count += 1
+            checkpoint.cache_mode = cache_mode
+            logger.info(f"Resuming {sync_type} sync from checkpoint {checkpoint.id} at stage "
+                        f"'{checkpoint.stage}' (resume #{checkpoint.resume_count})")
+
+        for stale in interrupted:
+            stale.status = 'abandoned'
+            stale.completed_at = datetime.utcnow()
+
+        resumed = checkpoint is not None
+        if not resumed:
+            checkpoint = SyncCheckpoint(
+                sync_type=sync_type,
+                status='running',
+                stage=first_stage,
+                delta=delta,
+                cache_mode=cache_mode,
+                changed_project_ids=[],
+                changed_phase_ids=[],
+                directories_processed=0,
+                projects_processed=0,
+                phases_processed=0,
+                elevations_processed=0,
+                resume_count=0
+            )
+            self.db.add(checkpoint)
+        self.db.commit()
+        return checkpoint, resumed
+
+    def _resumable(self, checkpoint: SyncCheckpoint, delta: bool) -> bool:
+        if checkpoint.delta != delta:
+            return False
+        last_progress = checkpoint.updated_at or checkpoint.started_at
+        if last_progress is None:
+            return True
+        if last_progress.tzinfo is None:
+            last_progress = last_progress.replace(tzinfo=timezone.utc)
+        age = datetime.now(timezone.utc) - last_progress
+        return age <= timedelta(hours=settings.SYNC_CHECKPOINT_MAX_AGE_HOURS)
+
+    def remaining(self, checkpoint: SyncCheckpoint, stage: str, units: Sequence) -> List:
+        """Units of ``stage`` not committed yet, in id order"""
+        current = STAGES.index(checkpoint.stage)
+        if current > STAGES.index(stage):
+            return []
+        units = sorted(units, key=lambda unit: unit.id)
+        if current < STAGES.index(stage):
+            return units
+        cursor = getattr(checkpoint, CURSORS[stage]) if stage in CURSORS else None
+        return [unit for unit in units if cursor is None or unit.id > cursor]
+
+    def advance(self, checkpoint: SyncCheckpoint, **fields) -> None:
+        """Record a committed unit (cursor and totals) or a stage change"""
+        for name, value in fields.items():
+            setattr(checkpoint, name, value)
+        checkpoint.updated_at = datetime.utcnow()
+        self.db.commit()
+
+    def complete(self, checkpoint: SyncCheckpoint) -> None:
+        checkpoint.status = 'completed'
+        checkpoint.completed_at = datetime.utcnow()
+        self.advance(checkpoint)
+
+    def record_failure(self, checkpoint: SyncCheckpoint, error: str) -> None:
+        """Keep the checkpoint resumable and note why the run stopped"""
+        try:
+            self.db.rollback()
+            self.advance(checkpoint, last_error=error)
+        except Exception as e:
+            logger.error(f"Could not record failure on sync checkpoint {checkpoint.id}: {str(e)}")
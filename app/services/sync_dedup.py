@@ -0,0 +1,339 @@
+"""
+Cluster-wide deduplication of concurrent syncs.
+
+Every sync entry point runs under one or more scopes ('full',
+'directory:<logikal id>', 'project:<logikal id>', ...). The first job to claim
+a scope holds a lease on it in Redis, renewed while it runs. A request for a
+scope that is already held - or for one covered by a held scope, e.g. a
+project whose directory is being synced - does not start a second run: it
+attaches to the running job and returns that job's result once published.
+Interactive force syncs only attach to jobs holding their own scope, never to
+broader background syncs that cover it.
+
+When Redis is not reachable every process falls back to in-process leases
+until Redis comes back, like the rate limiters. A holder that dies stops
+renewing its lease; waiters then see the scope free up and claim it themselves.
+
+An interactive request that attaches to a scheduled or maintenance job
+promotes that job to the interactive class, so it stops yielding to
+interactive work - its own waiter included.
+"""
+import asyncio
+import json
+import time
+import uuid
+import logging
+import weakref
+from contextlib import nullcontext
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from redis.exceptions import RedisError
+
+from core.config import settings
+from core.priority import INTERACTIVE, PriorityLane, current_lane, current_priority, priority_scope
+from core.rate_limiter import REDIS_RETRY_INTERVAL_SECONDS, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+SCOPE_FULL = 'full'
+
+# Claim every scope or none; returns the job holding the first taken scope
+CLAIM_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    local holder = redis.call('GET', key)
+    if holder then
+        return {key, holder}
+    end
+end
+for i, key in ipairs(KEYS) do
+    redis.call('SET', key, ARGV[1], 'PX', ARGV[2])
+end
+return false
+"""
+
+# Extend (ARGV[2] = ttl) or drop (ARGV[2] = 0) the leases still owned by the job
+RENEW_SCRIPT = """
+local owned = 0
+for i, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        if tonumber(ARGV[2]) > 0 then
+            redis.call('PEXPIRE', key, ARGV[2])
+        else
+            redis.call('DEL', key)
+        end
+        owned = owned + 1
+    end
+end
+return owned
+"""
+
+
+def directory_scope(logikal_id: str) -> str:
+    return f"directory:{logikal_id}"
+
+
+def directory_projects_scope(logikal_id: str) -> str:
+    """Listing-only refresh of a directory's projects (covered by a deep directory sync)"""
+    return f"directory_projects:{logikal_id}"
+
+
+def project_scope(logikal_id: str) -> str:
+    return f"project:{logikal_id}"
+
+
+def project_name_scope(name: str) -> str:
+    """Force sync of a project that is not in the middleware yet, so has no Logikal id"""
+    return f"project_name:{name}"
+
+
+class SyncDeduplicator:
+    """Keyed leases per sync scope with attach-to-running semantics"""
+
+    def __init__(self, redis_url: Optional[str] = None, key_prefix: str = "logikal:sync",
+                 lease_seconds: float = None, attach_timeout_seconds: float = None,
+                 result_ttl_seconds: float = None, poll_interval_seconds: float = 0.5):
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.lease_seconds = lease_seconds or settings.SYNC_DEDUP_LEASE_SECONDS
+        self.attach_timeout_seconds = attach_timeout_seconds or settings.SYNC_DEDUP_ATTACH_TIMEOUT_SECONDS
+        self.result_ttl_seconds = result_ttl_seconds or settings.SYNC_DEDUP_RESULT_TTL_SECONDS
+        self.poll_interval_seconds = poll_interval_seconds
+
+        # In-process fallback: scope -> job id, job id -> result future
+        self._local_holders: Dict[str, str] = {}
+        self._local_jobs: Dict[str, asyncio.Future] = {}
+        # Priority lanes of the jobs held by this process, for promotion
+        self._local_lanes: Dict[str, PriorityLane] = {}
+
+        self._redis_retry_at = 0.0
+        self._stats = {'runs': 0, 'attached': 0, 'subsumed': 0, 'promoted': 0, 'redis_errors': 0}
+
+    @property
+    def backend(self) -> str:
+        if self.redis_url and time.monotonic() >= self._redis_retry_at:
+            return 'redis'
+        return 'local'
+
+    def _lease_key(self, scope: str) -> str:
+        return f"{self.key_prefix}:lease:{scope}"
+
+    def _result_key(self, job_id: str) -> str:
+        return f"{self.key_prefix}:result:{job_id}"
+
+    def _promote_key(self, job_id: str) -> str:
+        return f"{self.key_prefix}:promote:{job_id}"
+
+    def _redis_failed(self, e: Exception) -> None:
+        self._stats['redis_errors'] += 1
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL_SECONDS
+        logger.warning(f"Sync deduplication falling back to in-process leases: {str(e)}")
+
+    async def run(self, scopes: Sequence[str], run: Callable[[], Awaitable[Dict]],
+                  covering: Sequence[str] = ()) -> Dict:
+        """
+        Run ``run`` as the only job for ``scopes``, or attach to the job already
+        holding one of ``scopes`` or ``covering`` and return its result.
+        """
+        scopes = list(scopes)
+        deadline = time.monotonic() + self.attach_timeout_seconds
+        while True:
+            holder = await self._find_holder(scopes + [scope for scope in covering if scope not in scopes])
+            if holder is None:
+                job_id = uuid.uuid4().hex
+                taken = await self._claim(scopes, job_id)
+                if taken is None:
+                    return await self._run_as_holder(scopes, job_id, run)
+                holder = taken
+
+            scope, job_id = holder
+            logger.info(f"Sync of {', '.join(scopes)} attaches to running job {job_id} ({scope})")
+            if current_priority() == INTERACTIVE:
+                await self._promote(job_id)
+            result = await self._wait_for_result(scope, job_id, deadline)
+            if result is not None:
+                return self._attached(scopes, scope, job_id, result)
+            if time.monotonic() >= deadline:
+                return {
+                    'success': False,
+                    'message': f'Timed out waiting for the running {scope} sync',
+                    'deduplicated': True,
+                    'attached_to': scope,
+                    'job_id': job_id
+                }
+            # The holder vanished without a result - try to take over
+
+    def _attached(self, scopes: List[str], scope: str, job_id: str, result: Dict) -> Dict:
+        if scope in scopes:
+            self._stats['attached'] += 1
+            return {**result, 'deduplicated': True, 'attached_to': scope, 'job_id': job_id}
+        self._stats['subsumed'] += 1
+        return {
+            'success': result.get('success', False),
+            'message': f"Covered by the running {scope} sync: {result.get('message', '')}",
+            'deduplicated': True,
+            'attached_to': scope,
+            'job_id': job_id,
+            'covering_result': result
+        }
+
+    async def _run_as_holder(self, scopes: List[str], job_id: str, run: Callable[[], Awaitable[Dict]]) -> Dict:
+        self._stats['runs'] += 1
+        backend = self.backend
+        # Run in a lane of its own unless the caller has one, so waiters can promote it
+        with nullcontext() if current_lane() else priority_scope(current_priority()):
+            lane = current_lane()
+            self._local_lanes[job_id] = lane
+            heartbeat = asyncio.create_task(self._heartbeat(scopes, job_id, lane)) if backend == 'redis' else None
+            result = None
+            try:
+                result = await run()
+                return result
+            except Exception as e:
+                result = {'success': False, 'message': f'Sync failed: {str(e)}', 'error': str(e)}
+                raise
+            finally:
+                if heartbeat:
+                    heartbeat.cancel()
+                self._local_lanes.pop(job_id, None)
+                await self._publish(scopes, job_id, result, backend)
+
+    # Backend operations
+
+    async def _find_holder(self, scopes: List[str]) -> Optional[Tuple[str, str]]:
+        if self.backend == 'redis':
+            try:
+                holders = await get_redis_client(self.redis_url).mget([self._lease_key(scope) for scope in scopes])
+                for scope, holder in zip(scopes, holders):
+                    if holder:
+                        return scope, holder.decode() if isinstance(holder, bytes) else holder
+                return None
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+        for scope in scopes:
+            if scope in self._local_holders:
+                return scope, self._local_holders[scope]
+        return None
+
+    async def _claim(self, scopes: List[str], job_id: str) -> Optional[Tuple[str, str]]:
+        """Claim all scopes; returns the (scope, job) that got there first on a race"""
+        if self.backend == 'redis':
+            try:
+                client = get_redis_client(self.redis_url)
+                taken = await client.eval(CLAIM_SCRIPT, len(scopes), *[self._lease_key(scope) for scope in scopes],
+                                          job_id, int(self.lease_seconds * 1000))
+                if not taken:
+                    return None
+                key, holder = [value.decode() if isinstance(value, bytes) else value for value in taken]
+                return key[len(self._lease_key('')):], holder
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+        for scope in scopes:
+            if scope in self._local_holders:
+                return scope, self._local_holders[scope]
+        for scope in scopes:
+            self._local_holders[scope] = job_id
+        self._local_jobs[job_id] = asyncio.get_running_loop().create_future()
+        return None
+
+    async def _heartbeat(self, scopes: List[str], job_id: str, lane: PriorityLane) -> None:
+        """Renew the leases and pick up promotions requested by other processes"""
+        keys = [self._lease_key(scope) for scope in scopes]
+        renewed_at = time.monotonic()
+        while True:
+            await asyncio.sleep(self.poll_interval_seconds)
+            try:
+                client = get_redis_client(self.redis_url)
+                if lane.priority != INTERACTIVE and await client.exists(self._promote_key(job_id)):
+                    lane.promote()
+                if time.monotonic() - renewed_at >= self.lease_seconds / 3:
+                    await client.eval(RENEW_SCRIPT, len(keys), *keys, job_id, int(self.lease_seconds * 1000))
+                    renewed_at = time.monotonic()
+            except (RedisError, OSError) as e:
+                logger.warning(f"Could not renew sync lease for job {job_id}: {str(e)}")
+
+    async def _promote(self, job_id: str) -> None:
+        """Promote a running job to the interactive class because interactive work waits on it"""
+        self._stats['promoted'] += 1
+        lane = self._local_lanes.get(job_id)
+        if lane is not None:
+            lane.promote()
+            return
+        if self.backend == 'redis':
+            try:
+                await get_redis_client(self.redis_url).set(self._promote_key(job_id), 1,
+                                                           ex=int(self.attach_timeout_seconds))
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+
+    async def _publish(self, scopes: List[str], job_id: str, result: Optional[Dict], backend: str) -> None:
+        """Hand the result to attached waiters and free the scopes"""
+        if backend == 'redis':
+            try:
+                client = get_redis_client(self.redis_url)
+                if result is not None:
+                    await client.set(self._result_key(job_id), json.dumps(result, default=str),
+                                     ex=int(self.result_ttl_seconds))
+                keys = [self._lease_key(scope) for scope in scopes]
+                await client.eval(RENEW_SCRIPT, len(keys), *keys, job_id, 0)
+                return
+            except (RedisError, OSError) as e:
+                # Waiters see the lease expire and take over
+                logger.warning(f"Could not publish result of sync job {job_id}: {str(e)}")
+                return
+        for scope in scopes:
+            if self._local_holders.get(scope) == job_id:
+                del self._local_holders[scope]
+        future = self._local_jobs.pop(job_id, None)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    async def _wait_for_result(self, scope: str, job_id: str, deadline: float) -> Optional[Dict]:
+        """Wait for the job's result; None once its lease is gone without one"""
+        future = self._local_jobs.get(job_id)
+        if future is not None:
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                return None
+
+        if self.backend != 'redis':
+            return None
+        client = get_redis_client(self.redis_url)
+        while time.monotonic() < deadline:
+            try:
+                result, holder = await client.mget([self._result_key(job_id), self._lease_key(scope)])
+                if result:
+                    return json.loads(result)
+                holder = holder.decode() if isinstance(holder, bytes) else holder
+                if holder != job_id:
+                    return None
+            except (RedisError, OSError) as e:
+                self._redis_failed(e)
+                return None
+            await asyncio.sleep(self.poll_interval_seconds)
+        return None
+
+    def get_stats(self) -> Dict:
+        return {'backend': self.backend, **self._stats}
+
+
+# Futures and Redis clients are bound to the event loop that created them
+_deduplicators: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, SyncDeduplicator]" = weakref.WeakKeyDictionary()
+
+
+def get_sync_deduplicator() -> SyncDeduplicator:
+    """Get the sync deduplicator of the running event loop"""
+    loop = asyncio.get_running_loop()
+    deduplicator = _deduplicators.get(loop)
+    if deduplicator is None:
+        deduplicator = SyncDeduplicator(settings.LOGIKAL_RATE_LIMIT_REDIS_URL or settings.REDIS_URL)
+        _deduplicators[loop] = deduplicator
+    return deduplicator
+
+
+async def run_deduplicated(scopes: Sequence[str], run: Callable[[], Awaitable[Dict]],
+                           covering: Sequence[str] = ()) -> Dict:
+    """Run a sync under ``scopes`` unless the same or a covering sync is already running"""
+    if not settings.SYNC_DEDUP_ENABLED:
+        return await run()
+    return await get_sync_deduplicator().run(scopes, run, covering=covering)
@@ -0,0 +1,236 @@
+"""
+Compilation of sync requests into a DAG of listing nodes.
+
+A node is one Logikal listing read in one navigation context and persisted
+with one bulk upsert: the directory tree, the projects of a directory, the
+phases of a project, or the elevations of a phase (with their thumbnails and
+parts lists). A node depends on the node that listed its parent. The listings
+below a node are only known once it has run, so completed nodes expand into
+their children. That expansion follows ObjectSyncConfig:
+- types with ``is_sync_enabled`` off get no nodes;
+- ``cascade_sync`` decides whether a listing expands at all;
+- a child type only cascades from the parent it ``depends_on``.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from models.directory import Directory
+from models.elevation import Elevation
+from models.object_sync_config import ObjectSyncConfig
+from models.phase import Phase
+from models.project import Project
+
+logger = logging.getLogger(__name__)
+
+DIRECTORIES = 'directories'
+PROJECTS = 'projects'
+PHASES = 'phases'
+ELEVATIONS = 'elevations'
+
+# Listing node kind -> object type it lists (ObjectSyncConfig.object_type)
+LISTED_TYPES = {DIRECTORIES: 'directory', PROJECTS: 'project', PHASES: 'phase', ELEVATIONS: 'elevation'}
+
+# Listing node kind -> kind of the listings below each of its entries
+CHILD_KINDS = {DIRECTORIES: PROJECTS, PROJECTS: PHASES, PHASES: ELEVATIONS}
+
+# Depth in the Logikal hierarchy; deeper ready nodes run first so subtrees finish early
+KIND_DEPTH = {DIRECTORIES: 0, PROJECTS: 1, PHASES: 2, ELEVATIONS: 3}
+
+SCOPES = ('full', 'directory', 'project', 'selective')
+
+PENDING = 'pending'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+BLOCKED = 'blocked'
+
+
+@dataclass
+class SyncNode:
+    """One listing to fetch and persist, with its timings once it ran"""
+    kind: str
+    object_id: Optional[int] = None  # directory / project / phase id; None for the directory tree
+    depends_on: Set[str] = field(default_factory=set)
+    status: str = PENDING
+    ready_at: Optional[float] = None
+    started_at: Optional[float] = None
+    duration_seconds: Optional[float] = None
+    count: int = 0
+    error: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.kind}:{'*' if self.object_id is None else self.object_id}"
+
+    def to_dict(self) -> Dict:
+        wait = None
+        if self.ready_at is not None and self.started_at is not None:
+            wait = round(self.started_at - self.ready_at, 3)
+        return {
+            'key': self.key,
+            'kind': self.kind,
+            'object_id': self.object_id,
+            'depends_on': sorted(self.depends_on),
+            'status': self.status,
+            'wait_seconds': wait,
+            'duration_seconds': None if self.duration_seconds is None else round(self.duration_seconds, 3),
+            'count': self.count,
+            'error': self.error
+        }
+
+
+@dataclass
+class _TypeConfig:
+    enabled: bool = True
+    cascade: bool = True
+    depends_on: Optional[List[str]] = None
+
+
+class SyncPlan:
+    """DAG of listing nodes that grows as nodes complete"""
+
+    def __init__(self, configs: Dict[str, _TypeConfig] = None, delta: bool = False):
+        self.configs = configs or {}
+        self.delta = delta
+        self.nodes: Dict[str, SyncNode] = {}
+        self.missing: List[str] = []
+
+    def _config(self, kind: str) -> _TypeConfig:
+        return self.configs.get(LISTED_TYPES[kind], _TypeConfig())
+
+    def add(self, kind: str, object_id: Optional[int] = None, depends_on: Iterable[str] = ()) -> Optional[SyncNode]:
+        """Add a node unless its object type is disabled or it is already planned"""
+        if not self._config(kind).enabled:
+            return None
+        node = SyncNode(kind=kind, object_id=object_id, depends_on=set(depends_on))
+        if node.key in self.nodes:
+            return None
+        self.nodes[node.key] = node
+        return node
+
+    def ready(self) -> List[SyncNode]:
+        """Pending nodes whose dependencies completed, deepest first; blocks nodes behind failures"""
+        ready = []
+        for node in self.nodes.values():
+            if node.status != PENDING:
+                continue
+            states = [self.nodes[key].status if key in self.nodes else PENDING for key in node.depends_on]
+            if any(state in (FAILED, BLOCKED) for state in states):
+                node.status = BLOCKED
+                node.error = 'A dependency failed'
+            elif all(state == COMPLETED for state in states):
+                ready.append(node)
+        return sorted(ready, key=lambda node: -KIND_DEPTH[node.kind])
+
+    def cascades(self, kind: str) -> bool:
+        """Whether a completed ``kind`` listing expands into child listings"""
+        child_kind = CHILD_KINDS.get(kind)
+        if child_kind is None or not self._config(kind).cascade:
+            return False
+        depends_on = self._config(child_kind).depends_on
+        return depends_on is None or LISTED_TYPES[kind] in depends_on
+
+    def expand(self, db: Session, node: SyncNode, result: Dict) -> List[SyncNode]:
+        """Add the child listings of a completed node"""
+        if not self.cascades(node.kind):
+            return []
+
+        if node.kind == DIRECTORIES:
+            child_ids = [directory_id for (directory_id,) in
+                         db.query(Directory.id).filter(Directory.exclude_from_sync == False)]
+        elif self.delta:
+            # Delta listings report which entries moved; the rest keep their subtree
+            child_ids = result.get('changed_project_ids' if node.kind == PROJECTS else 'changed_phase_ids', [])
+        elif node.kind == PROJECTS:
+            child_ids = [project_id for (project_id,) in
+                         db.query(Project.id).filter(Project.directory_id == node.object_id)]
+        else:
+            child_ids = [phase_id for (phase_id,) in
+                         db.query(Phase.id).filter(Phase.project_id == node.object_id)]
+
+        children = []
+        for child_id in child_ids:
+            child = self.add(CHILD_KINDS[node.kind], child_id, depends_on=[node.key])
+            if child is not None:
+                children.append(child)
+        return children
+
+    def block_unreachable(self) -> None:
+        """Block nodes left pending behind dependencies that were never planned"""
+        for node in self.nodes.values():
+            if node.status == PENDING:
+                node.status = BLOCKED
+                node.error = 'A dependency was never planned'
+
+    def count(self, status: str) -> int:
+        return sum(1 for node in self.nodes.values() if node.status == status)
+
+
+def load_type_configs(db: Session) -> Dict[str, _TypeConfig]:
+    """Enabled, cascade and dependency settings of the listed object types"""
+    configs = {}
+    for config in db.query(ObjectSyncConfig).filter(ObjectSyncConfig.object_type.in_(list(LISTED_TYPES.values()))):
+        configs[config.object_type] = _TypeConfig(
+            enabled=config.is_sync_enabled,
+            cascade=config.cascade_sync,
+            depends_on=config.get_dependencies() if config.depends_on else None
+        )
+    return configs
+
+
+def compile_sync_plan(db: Session, scope: str, object_ids: Iterable[str] = (), object_type: str = None,
+                      delta: bool = False) -> SyncPlan:
+    """
+    Turn a sync request into the initial nodes of a plan.
+
+    ``full`` starts from the directory tree, ``directory`` from the project
+    listings of the given directories and ``project`` from the phase listings of
+    the given projects (Logikal ids). ``selective`` takes the ids of one
+    ``object_type`` (project, phase or elevation) and plans the listings that
+    contain them. Unknown ids are reported in ``plan.missing``.
+    """
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown sync scope '{scope}', expected one of {', '.join(SCOPES)}")
+
+    plan = SyncPlan(load_type_configs(db), delta=delta)
+    object_ids = list(object_ids)
+
+    if scope == 'full':
+        plan.add(DIRECTORIES)
+        return plan
+
+    if scope == 'selective' and object_type not in ('project', 'phase', 'elevation'):
+        raise ValueError("Selective sync needs object_type project, phase or elevation")
+    if scope == 'directory':
+        object_type = 'directory'
+    elif scope == 'project':
+        object_type = 'project'
+
+    if object_type == 'directory':
+        rows = db.query(Directory.logikal_id, Directory.id).filter(Directory.logikal_id.in_(object_ids)).all()
+        kind = PROJECTS
+    elif object_type == 'project':
+        rows = db.query(Project.logikal_id, Project.id).filter(Project.logikal_id.in_(object_ids)).all()
+        kind = PHASES
+    elif object_type == 'phase':
+        # Phase GUIDs are only unique per project - every matching phase is planned
+        rows = db.query(Phase.logikal_id, Phase.id).filter(Phase.logikal_id.in_(object_ids)).all()
+        kind = ELEVATIONS
+    else:
+        # Elevations are read through the listing of their phase
+        rows = db.query(Elevation.logikal_id, Elevation.phase_id).filter(
+            Elevation.logikal_id.in_(object_ids), Elevation.phase_id.isnot(None)
+        ).all()
+        kind = ELEVATIONS
+
+    found = set()
+    for logikal_id, node_id in rows:
+        found.add(logikal_id)
+        plan.add(kind, node_id)
+    plan.missing = [object_id for object_id in object_ids if object_id not in found]
+    if plan.missing:
+        logger.warning(f"Sync plan: {len(plan.missing)} {object_type} ids not found: {plan.missing[:10]}")
+    return plan
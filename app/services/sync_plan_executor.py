@@ -0,0 +1,165 @@
+"""
+Executor for sync plans.
+
+Ready nodes of a SyncPlan run concurrently, each on its own database session
+through the regular sync services. Up to SYNC_PLAN_MAX_PARALLEL_NODES nodes are
+started, and every node holds a slot of the adaptive Logikal concurrency limiter
+while it runs, so the fan-out follows the learned limit; the per-call rate
+limits apply inside the services. Every node records how long it waited once
+ready and how long it ran.
+"""
+import asyncio
+import time
+import logging
+from typing import Dict
+
+from core.adaptive_concurrency import get_concurrency_limiter
+from core.config import settings
+from core.database import SessionLocal
+from core.priority import yield_to_interactive
+from models.directory import Directory
+from models.phase import Phase
+from models.project import Project
+from services.logikal_listing_cache import MUST_REVALIDATE
+from services.sync_plan import (
+    BLOCKED, COMPLETED, DIRECTORIES, ELEVATIONS, FAILED, PHASES, PROJECTS, RUNNING, SyncNode, SyncPlan
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SyncPlanExecutor:
+    """Runs the nodes of a sync plan as their dependencies complete"""
+
+    def __init__(self, plan: SyncPlan, base_url: str, username: str, password: str,
+                 cache_mode: str = MUST_REVALIDATE, max_parallel_nodes: int = None):
+        self.plan = plan
+        self.base_url = base_url
+        self.username = username
+        self.password = password
+        self.cache_mode = cache_mode
+        self.max_parallel_nodes = max(1, max_parallel_nodes or settings.SYNC_PLAN_MAX_PARALLEL_NODES)
+        self.skipped_unchanged = []
+        self.errors = []
+        self._active = 0
+        self._peak_active = 0
+
+    async def _sync_node(self, db, node: SyncNode) -> Dict:
+        """Fetch and persist the listing of one node"""
+        from services.directory_sync_service import DirectorySyncService
+        from services.elevation_sync_service import ElevationSyncService
+        from services.phase_sync_service import PhaseSyncService
+        from services.project_sync_service import ProjectSyncService
+
+        credentials = (self.base_url, self.username, self.password)
+        if node.kind == DIRECTORIES:
+            return await DirectorySyncService(db).discover_and_sync_directories(
+                *credentials, cache_mode=self.cache_mode
+            )
+        if node.kind == PROJECTS:
+            directory = db.query(Directory).filter(Directory.id == node.object_id).first()
+            if not directory:
+                return {'success': False, 'message': f'Directory {node.object_id} not found'}
+            return await ProjectSyncService(db).sync_projects_for_directory(
+                db, *credentials, directory, cache_mode=self.cache_mode, delta=self.plan.delta
+            )
+        if node.kind == PHASES:
+            project = db.query(Project).filter(Project.id == node.object_id).first()
+            if not project:
+                return {'success': False, 'message': f'Project {node.object_id} not found'}
+            return await PhaseSyncService(db).sync_phases_for_project(
+                db, *credentials, project, cache_mode=self.cache_mode, delta=self.plan.delta
+            )
+        if node.kind == ELEVATIONS:
+            phase = db.query(Phase).filter(Phase.id == node.object_id).first()
+            if not phase:
+                return {'success': False, 'message': f'Phase {node.object_id} not found'}
+            return await ElevationSyncService(db).sync_elevations_for_phase(
+                db, *credentials, phase, delta=self.plan.delta
+            )
+        raise ValueError(f"Unknown sync node kind '{node.kind}'")
+
+    async def _execute(self, node: SyncNode) -> None:
+        # Services below that take slots themselves borrow this node's slot
+        async with get_concurrency_limiter().slot():
+            await self._execute_in_slot(node)
+
+    async def _execute_in_slot(self, node: SyncNode) -> None:
+        await yield_to_interactive()
+        node.started_at = time.time()
+        self._active += 1
+        self._peak_active = max(self._peak_active, self._active)
+        db = SessionLocal()
+        try:
+            result = await self._sync_node(db, node)
+            if result.get('success'):
+                node.status = COMPLETED
+                node.count = result.get('count', 0)
+                self.skipped_unchanged.extend(result.get('skipped_unchanged', []))
+                self.errors.extend(result.get('errors', []))
+                now = time.time()
+                for child in self.plan.expand(db, node, result):
+                    child.ready_at = now
+            else:
+                node.status = FAILED
+                node.error = result.get('message', 'Sync failed')
+        except Exception as e:
+            logger.error(f"Sync plan node {node.key} failed: {str(e)}")
+            node.status = FAILED
+            node.error = str(e)
+        finally:
+            node.duration_seconds = time.time() - node.started_at
+            self._active -= 1
+            db.close()
+        if node.status == FAILED:
+            self.errors.append(f"{node.key}: {node.error}")
+
+    async def run(self) -> Dict:
+        """Run the plan to completion and summarise it"""
+        start_time = time.time()
+        running: Dict[asyncio.Future, SyncNode] = {}
+        for node in self.plan.nodes.values():
+            node.ready_at = start_time
+
+        while True:
+            for node in self.plan.ready():
+                if len(running) >= self.max_parallel_nodes:
+                    break
+                node.status = RUNNING
+                running[asyncio.ensure_future(self._execute(node))] = node
+            if not running:
+                break
+            done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                running.pop(task)
+        self.plan.block_unreachable()
+
+        counts = {kind: 0 for kind in (DIRECTORIES, PROJECTS, PHASES, ELEVATIONS)}
+        for node in self.plan.nodes.values():
+            if node.status == COMPLETED:
+                counts[node.kind] += node.count
+
+        failed = self.plan.count(FAILED)
+        blocked = self.plan.count(BLOCKED)
+        duration = time.time() - start_time
+        peak = self._peak_active
+        logger.info(f"Sync plan finished in {duration:.1f}s: {self.plan.count(COMPLETED)} nodes completed, "
+                    f"{failed} failed, {blocked} blocked, up to {peak} in parallel")
+        return {
+            'success': failed == 0 and blocked == 0,
+            'message': f'Sync plan completed with {failed} failed nodes' if failed else 'Sync plan completed',
+            'duration_seconds': duration,
+            'nodes_total': len(self.plan.nodes),
+            'nodes_completed': self.plan.count(COMPLETED),
+            'nodes_failed': failed,
+            'nodes_blocked': blocked,
+            'peak_parallel_nodes': peak,
+            'directories_processed': counts[DIRECTORIES],
+            'projects_processed': counts[PROJECTS],
+            'phases_processed': counts[PHASES],
+            'elevations_processed': counts[ELEVATIONS],
+            'missing_ids': self.plan.missing,
+            'skipped_unchanged': self.skipped_unchanged,
+            'errors': self.errors,
+            'nodes': [node.to_dict() for node in self.plan.nodes.values()]
+        }
@@ -0,0 +1,67 @@
+"""
+Live progress of a running sync.
+
+The phase executor and the elevation pipeline report what they finish
+(phases, elevations, parts lists, thumbnails) through report_progress(). The
+reports go to the SyncProgress tracked by the surrounding coroutine - and
+the tasks it spawns - or nowhere when nobody tracks the sync, so the
+executors do not need to know who is listening.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+# Counters reported by the executors
+COUNTERS = ('phases_total', 'phases_done', 'phases_failed', 'elevations_listed', 'elevations_done',
+            'thumbnails_synced', 'parts_lists_synced', 'parts_lists_failed')
+
+
+class SyncProgress:
+    """Running counters of one sync plus the stage messages not yet handed out"""
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {counter: 0 for counter in COUNTERS}
+        self.stage: Optional[str] = None
+        self.updated_at = time.time()
+        self._messages: List[str] = []
+        self._dirty = False
+
+    def report(self, stage: str, message: Optional[str] = None, **increments: int) -> None:
+        for counter, increment in increments.items():
+            self.counters[counter] = self.counters.get(counter, 0) + increment
+        self.stage = stage
+        if message:
+            self._messages.append(message)
+        self.updated_at = time.time()
+        self._dirty = True
+
+    def drain(self) -> Optional[Dict]:
+        """Snapshot of everything reported since the last drain; None if nothing was"""
+        if not self._dirty:
+            return None
+        snapshot = {'stage': self.stage, 'messages': self._messages, 'counters': dict(self.counters),
+                    'at': self.updated_at}
+        self._messages = []
+        self._dirty = False
+        return snapshot
+
+
+_current_progress: ContextVar[Optional[SyncProgress]] = ContextVar('sync_progress', default=None)
+
+
+@contextmanager
+def track_progress(progress: SyncProgress):
+    """Collect the progress reported by the enclosed sync in ``progress``"""
+    token = _current_progress.set(progress)
+    try:
+        yield progress
+    finally:
+        _current_progress.reset(token)
+
+
+def report_progress(stage: str, message: Optional[str] = None, **increments: int) -> None:
+    """Report finished work of the running sync (no-op when its progress is not tracked)"""
+    progress = _current_progress.get()
+    if progress is not None:
+        progress.report(stage, message, **increments)
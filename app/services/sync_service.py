@@ -4,13 +4,18 @@ import time
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
+from core.priority import MAINTENANCE, priority_scope, yield_to_interactive
 from models.sync_config import SyncConfig
 from models.sync_log import SyncLog
 from models.directory import Directory
+from models.sync_checkpoint import SyncCheckpoint
 from services.directory_sync_service import DirectorySyncService
 from services.project_sync_service import ProjectSyncService
 from services.phase_sync_service import PhaseSyncService
 from services.elevation_sync_service import ElevationSyncService
+from services.logikal_listing_cache import CACHE_OK, MUST_REVALIDATE
+from services.sync_checkpoint_service import SyncCheckpointService
+from services.sync_dedup import SCOPE_FULL, run_deduplicated
 
 logger = logging.getLogger(__name__)
 
@@ -25,92 +30,77 @@ class SyncService:
         self.phase_sync_service = PhaseSyncService(db)
         self.elevation_sync_service = ElevationSyncService(db)
     
-    async def full_sync(self, base_url: str, username: str, password: str) -> Dict:
+    async def full_sync(self, base_url: str, username: str, password: str,
+                        cache_mode: str = MUST_REVALIDATE, delta: bool = False,
+                        resume: bool = True) -> Dict:
         """
         Perform a full sync of all non-excluded directories, projects, phases, and elevations
+        
+        ``cache_mode`` is 'must-revalidate' (read every listing from Logikal) or
+        'cache-ok' (use directory, project and phase listings that are still fresh).
+        With ``delta`` projects, phases and elevations whose ``changedDate`` did not
+        move are pruned before they are navigated to or downloaded; every skip is
+        listed under 'skipped_unchanged'.
+        
+        Progress is checkpointed after every directory, project and phase. With
+        ``resume`` an interrupted full sync continues after its last checkpoint
+        instead of starting over. A full sync requested while another one runs
+        returns the running one's result. Full syncs run as maintenance work.
         """
+        with priority_scope(MAINTENANCE):
+            return await run_deduplicated(
+                [SCOPE_FULL],
+                lambda: self._full_sync(base_url, username, password, cache_mode=cache_mode, delta=delta, resume=resume)
+            )
+    
+    async def _full_sync(self, base_url: str, username: str, password: str,
+                         cache_mode: str = MUST_REVALIDATE, delta: bool = False,
+                         resume: bool = True) -> Dict:
         sync_start_time = time.time()
         sync_log = None
+        checkpoint = None
+        checkpoints = SyncCheckpointService(self.db)
         
         try:
+            checkpoint, resumed = checkpoints.start('full', delta=delta, cache_mode=cache_mode, resume=resume)
+            
             # Create sync log entry
             sync_log = SyncLog(
                 sync_type='full',
                 status='started',
-                message='Full sync started',
+                message=f'Full sync resumed from checkpoint {checkpoint.id}' if resumed else 'Full sync started',
                 started_at=datetime.utcnow()
             )
             self.db.add(sync_log)
             self.db.commit()
             
-            logger.info("Starting full sync operation")
+            logger.info(f"Starting full sync operation (listings: {cache_mode}, checkpoint: {checkpoint.id})")
             
             # Step 1: Discover and sync directories (excluding excluded ones)
-            logger.info("Step 1: Discovering and syncing directories")
-            directory_result = await self.directory_sync_service.discover_and_sync_directories(
-                base_url, username, password
-            )
-            
-            if not directory_result['success']:
-                raise Exception(f"Directory sync failed: {directory_result['message']}")
+            if checkpoint.stage == 'directories':
+                logger.info("Step 1: Discovering and syncing directories")
+                directory_result = await self.directory_sync_service.discover_and_sync_directories(
+                    base_url, username, password, cache_mode=cache_mode
+                )
+                
+                if not directory_result['success']:
+                    raise Exception(f"Directory sync failed: {directory_result['message']}")
+                checkpoints.advance(checkpoint, stage='projects')
+            else:
+                logger.info("Step 1: Directories already synced by the interrupted run")
             
             # Get syncable directories (non-excluded)
             syncable_directories = await self.directory_sync_service.get_syncable_directories()
             logger.info(f"Found {len(syncable_directories)} syncable directories")
             
-            total_projects = 0
-            total_phases = 0
-            total_elevations = 0
+            skipped_unchanged = await self.sync_directory_trees(
+                base_url, username, password, syncable_directories, checkpoint, cache_mode=cache_mode, delta=delta
+            )
             
-            # Step 2: Sync projects for each syncable directory
-            logger.info("Step 2: Syncing projects for each directory")
-            for directory in syncable_directories:
-                logger.info(f"Syncing projects for directory: {directory.name}")
-                
-                # Create dedicated session for this directory
-                project_result = await self.project_sync_service.sync_projects_for_directory(
-                    base_url, username, password, directory
-                )
-                
-                if project_result['success']:
-                    total_projects += project_result['count']
-                    logger.info(f"Synced {project_result['count']} projects for directory {directory.name}")
-                else:
-                    logger.warning(f"Failed to sync projects for directory {directory.name}: {project_result['message']}")
-            
-            # Step 3: Sync phases for each project
-            logger.info("Step 3: Syncing phases for each project")
-            projects = await self.project_sync_service.get_all_projects()
-            
-            for project in projects:
-                logger.info(f"Syncing phases for project: {project.name}")
-                
-                phase_result = await self.phase_sync_service.sync_phases_for_project(
-                    self.db, base_url, username, password, project
-                )
-                
-                if phase_result['success']:
-                    total_phases += phase_result['count']
-                    logger.info(f"Synced {phase_result['count']} phases for project {project.name}")
-                else:
-                    logger.warning(f"Failed to sync phases for project {project.name}: {phase_result['message']}")
-            
-            # Step 4: Sync elevations for each phase
-            logger.info("Step 4: Syncing elevations for each phase")
-            phases = await self.phase_sync_service.get_all_phases()
-            
-            for phase in phases:
-                logger.info(f"Syncing elevations for phase: {phase.name}")
-                
-                elevation_result = await self.elevation_sync_service.sync_elevations_for_phase(
-                    self.db, base_url, username, password, phase
-                )
-                
-                if elevation_result['success']:
-                    total_elevations += elevation_result['count']
-                    logger.info(f"Synced {elevation_result['count']} elevations for phase {phase.name}")
-                else:
-                    logger.warning(f"Failed to sync elevations for phase {phase.name}: {elevation_result['message']}")
+            total_projects = checkpoint.projects_processed
+            total_phases = checkpoint.phases_processed
+            total_elevations = checkpoint.elevations_processed
+            checkpoints.complete(checkpoint)
             
             # Update sync configuration
             await self._update_sync_config('full')
@@ -129,6 +119,8 @@ class SyncService:
             
             logger.info(f"Full sync completed successfully in {duration} seconds")
             logger.info(f"Processed: {len(syncable_directories)} directories, {total_projects} projects, {total_phases} phases, {total_elevations} elevations")
+            if delta:
+                logger.info(f"Delta sync skipped {len(skipped_unchanged)} unchanged objects")
             
             return {
                 'success': True,
@@ -138,7 +130,10 @@ class SyncService:
                 'projects_processed': total_projects,
                 'phases_processed': total_phases,
                 'elevations_processed': total_elevations,
-                'total_items': sync_log.items_processed
+                'total_items': sync_log.items_processed,
+                'skipped_unchanged': skipped_unchanged,
+                'resumed': resumed,
+                'checkpoint_id': checkpoint.id
             }
             
         except Exception as e:
@@ -146,6 +141,10 @@ class SyncService:
             error_msg = f"Full sync failed: {str(e)}"
             logger.error(error_msg, exc_info=True)
             
+            # The checkpoint stays 'running' so the next full sync resumes from it
+            if checkpoint:
+                checkpoints.record_failure(checkpoint, str(e))
+            
             # Update sync log with error
             if sync_log:
                 sync_log.status = 'failed'
@@ -159,12 +158,112 @@ class SyncService:
                 'success': False,
                 'message': error_msg,
                 'duration_seconds': duration,
-                'error': str(e)
+                'error': str(e),
+                'checkpoint_id': checkpoint.id if checkpoint else None
             }
     
-    async def incremental_sync(self, base_url: str, username: str, password: str) -> Dict:
+    async def sync_directory_trees(self, base_url: str, username: str, password: str,
+                                   directories: List[Directory], checkpoint: SyncCheckpoint,
+                                   cache_mode: str = MUST_REVALIDATE, delta: bool = False,
+                                   scoped: bool = False) -> List[Dict]:
+        """
+        Sync the projects of ``directories``, then their phases, then their elevations
+        
+        Units already behind the checkpoint cursor are skipped and the cursor is
+        committed after every unit; totals accumulate on the checkpoint. Without
+        ``scoped`` phases and elevations are synced for every stored project, as a
+        full sync does. Returns the objects skipped by a delta sync.
+        """
+        checkpoints = SyncCheckpointService(self.db)
+        skipped_unchanged = []
+        
+        # Step 2: Sync projects for each syncable directory
+        logger.info("Step 2: Syncing projects for each directory")
+        for directory in checkpoints.remaining(checkpoint, 'projects', directories):
+            logger.info(f"Syncing projects for directory: {directory.name}")
+            
+            # Create dedicated session for this directory
+            project_result = await self.project_sync_service.sync_projects_for_directory(
+                self.db, base_url, username, password, directory, cache_mode=cache_mode, delta=delta
+            )
+            
+            progress = {'directory_id': directory.id}
+            if project_result['success']:
+                progress['projects_processed'] = checkpoint.projects_processed + project_result['count']
+                progress['changed_project_ids'] = (checkpoint.changed_project_ids or []) + project_result.get('changed_project_ids', [])
+                skipped_unchanged.extend(project_result.get('skipped_unchanged', []))
+                logger.info(f"Synced {project_result['count']} projects for directory {directory.name}")
+            else:
+                logger.warning(f"Failed to sync projects for directory {directory.name}: {project_result['message']}")
+            checkpoints.advance(checkpoint, **progress)
+        if checkpoint.stage == 'projects':
+            checkpoints.advance(checkpoint, stage='phases')
+        
+        # Step 3: Sync phases for each project
+        logger.info("Step 3: Syncing phases for each project")
+        projects = await self.project_sync_service.get_all_projects()
+        if scoped:
+            directory_ids = {directory.id for directory in directories}
+            projects = [project for project in projects if project.directory_id in directory_ids]
+        if delta:
+            changed = set(checkpoint.changed_project_ids or [])
+            projects = [project for project in projects if project.id in changed]
+        
+        for project in checkpoints.remaining(checkpoint, 'phases', projects):
+            await yield_to_interactive()
+            logger.info(f"Syncing phases for project: {project.name}")
+            
+            phase_result = await self.phase_sync_service.sync_phases_for_project(
+                self.db, base_url, username, password, project, cache_mode=cache_mode, delta=delta
+            )
+            
+            progress = {'project_id': project.id}
+            if phase_result['success']:
+                progress['phases_processed'] = checkpoint.phases_processed + phase_result['count']
+                progress['changed_phase_ids'] = (checkpoint.changed_phase_ids or []) + phase_result.get('changed_phase_ids', [])
+                skipped_unchanged.extend(phase_result.get('skipped_unchanged', []))
+                logger.info(f"Synced {phase_result['count']} phases for project {project.name}")
+            else:
+                logger.warning(f"Failed to sync phases for project {project.name}: {phase_result['message']}")
+            checkpoints.advance(checkpoint, **progress)
+        if checkpoint.stage == 'phases':
+            checkpoints.advance(checkpoint, stage='elevations')
+        
+        # Step 4: Sync elevations for each phase
+        logger.info("Step 4: Syncing elevations for each phase")
+        phases = await self.phase_sync_service.get_all_phases()
+        if scoped:
+            project_ids = {project.id for project in projects}
+            phases = [phase for phase in phases if phase.project_id in project_ids]
+        if delta:
+            changed = set(checkpoint.changed_phase_ids or [])
+            phases = [phase for phase in phases if phase.id in changed]
+        
+        for phase in checkpoints.remaining(checkpoint, 'elevations', phases):
+            await yield_to_interactive()
+            logger.info(f"Syncing elevations for phase: {phase.name}")
+            
+            elevation_result = await self.elevation_sync_service.sync_elevations_for_phase(
+                self.db, base_url, username, password, phase, delta=delta
+            )
+            
+            progress = {'phase_id': phase.id}
+            if elevation_result['success']:
+                progress['elevations_processed'] = checkpoint.elevations_processed + elevation_result['count']
+                skipped_unchanged.extend(elevation_result.get('skipped_unchanged', []))
+                logger.info(f"Synced {elevation_result['count']} elevations for phase {phase.name}")
+            else:
+                logger.warning(f"Failed to sync elevations for phase {phase.name}: {elevation_result['message']}")
+            checkpoints.advance(checkpoint, **progress)
+        
+        return skipped_unchanged
+    
+    async def incremental_sync(self, base_url: str, username: str, password: str,
+                               cache_mode: str = CACHE_OK) -> Dict:
         """
         Perform an incremental sync of changed items since last sync
+        
+        ``cache_mode`` is 'cache-ok' (default) or 'must-revalidate', see full_sync.
         """
         sync_start_time = time.time()
         sync_log = None
@@ -188,7 +287,7 @@ class SyncService:
             
             if not last_sync_time:
                 logger.warning("No previous sync found, performing full sync instead")
-                return await self.full_sync(base_url, username, password)
+                return await self.full_sync(base_url, username, password, cache_mode=cache_mode)
             
             # TODO: Implement incremental sync logic
             # For now, we'll implement a basic version that checks for changed items
@@ -315,9 +414,9 @@ class SyncService:
             }
     
     async def sync_directories_concurrent(self, base_url: str, username: str, password: str) -> Dict:
-        """Sync directories concurrently with 2 workers"""
+        """Sync directories concurrently under the adaptive concurrency limit"""
         try:
-            logger.info("Starting concurrent directory sync (2 workers)")
+            logger.info("Starting concurrent directory sync (adaptive workers)")
             result = await self.directory_sync_service.discover_and_sync_directories_concurrent(
                 base_url, username, password
             )
@@ -9,12 +9,15 @@ from celery import current_task
 from sqlalchemy.orm import Session
 
 from celery_app import celery_app
+from core.adaptive_concurrency import get_concurrency_limiter
+from core.connection_manager import run_in_worker_loop
 from core.database import get_db
 from services.sqlite_parser_service import (
     SQLiteElevationParserService, 
     IdempotentParserService,
     ParsingStatus
 )
+from services.batch_parser import BatchParser, parseable_elevation_ids
 from models.elevation import Elevation
 import logging
 
@@ -122,70 +125,36 @@ def parse_elevation_sqlite_task(self, elevation_id: int, retry_count: int = 0) -
 
 
 @celery_app.task(bind=True, name="tasks.sqlite_parser_tasks.batch_parse_elevations")
-def batch_parse_elevations_task(self, elevation_ids: List[int]) -> Dict:
-    """Batch parse SQLite data for multiple elevations with 2-worker limit"""
+def batch_parse_elevations_task(self, elevation_ids: List[int], force: bool = False) -> Dict:
+    """Parse the SQLite files of many elevations in parse processes and store them in bulk"""
     
     task_id = self.request.id
     logger.info(f"Starting batch parsing task {task_id} for {len(elevation_ids)} elevations")
     
     try:
-        # Process with concurrency control
-        MAX_CONCURRENT_WORKERS = 2
-        semaphore = asyncio.Semaphore(MAX_CONCURRENT_WORKERS)
-        
-        async def parse_with_semaphore(elevation_id, index):
-            """Parse elevation with semaphore protection"""
-            async with semaphore:
-                # Update progress
-                progress = int((index / len(elevation_ids)) * 100)
-                self.update_state(
-                    state="PROGRESS",
-                    meta={
-                        "current": progress,
-                        "total": 100,
-                        "status": f"Parsing elevation {index+1}/{len(elevation_ids)}",
-                        "elevation_id": elevation_id,
-                        "completed": index,
-                        "total_elevations": len(elevation_ids)
-                    }
-                )
-                
-                # Parse individual elevation
-                try:
-                    result = parse_elevation_sqlite_task.delay(elevation_id)
-                    return {
-                        "elevation_id": elevation_id,
-                        "success": True,
-                        "task_id": result.id
-                    }
-                except Exception as e:
-                    logger.error(f"Failed to start parsing for elevation {elevation_id}: {str(e)}")
-                    return {
-                        "elevation_id": elevation_id,
-                        "success": False,
-                        "error": str(e)
-                    }
-        
-        # Create tasks for all elevations
-        tasks = [
-            parse_with_semaphore(eid, idx) 
-            for idx, eid in enumerate(elevation_ids)
-        ]
+        db = next(get_db())
         
-        # Process all elevations concurrently
-        results = asyncio.run(asyncio.gather(*tasks, return_exceptions=True))
+        self.update_state(
+            state="PROGRESS",
+            meta={
+                "status": f"Parsing {len(elevation_ids)} elevations",
+                "total_elevations": len(elevation_ids)
+            }
+        )
         
-        # Aggregate results
-        successful_parses = sum(1 for r in results if isinstance(r, dict) and r.get("success"))
-        failed_parses = len(elevation_ids) - successful_parses
+        result = run_in_worker_loop(BatchParser(db).parse(elevation_ids, force=force))
         
         return {
             "success": True,
             "task_id": task_id,
             "total_elevations": len(elevation_ids),
-            "successful_parses": successful_parses,
-            "failed_parses": failed_parses,
-            "results": results,
+            "successful_parses": result["parsed"],
+            "skipped_parses": result["skipped"],
+            "failed_parses": result["failed"],
+            "glass_records": result["glass_records"],
+            "part_lines": result["part_lines"],
+            "errors": result["errors"],
+            "duration_seconds": result["duration_seconds"],
             "completed_at": datetime.utcnow().isoformat()
         }
         
@@ -197,6 +166,46 @@ def batch_parse_elevations_task(self, elevation_ids: List[int]) -> Dict:
             "error": str(exc),
             "failed_at": datetime.utcnow().isoformat()
         }
+    
+    finally:
+        if 'db' in locals():
+            db.close()
+
+
+@celery_app.task(bind=True, name="tasks.sqlite_parser_tasks.reparse_all_elevations")
+def reparse_all_elevations_task(self, force: bool = True, batch_size: int = 2000) -> Dict:
+    """Re-parse every archived parts database (e.g. after a parser change) as batch parse tasks"""
+    
+    task_id = self.request.id
+    
+    try:
+        db = next(get_db())
+        elevation_ids = parseable_elevation_ids(db)
+        
+        batch_task_ids = []
+        for start in range(0, len(elevation_ids), batch_size):
+            batch = batch_parse_elevations_task.delay(elevation_ids[start:start + batch_size], force=force)
+            batch_task_ids.append(batch.id)
+        
+        logger.info(f"Re-parse task {task_id}: {len(elevation_ids)} elevations in {len(batch_task_ids)} batches")
+        return {
+            "success": True,
+            "task_id": task_id,
+            "elevations_found": len(elevation_ids),
+            "batch_task_ids": batch_task_ids
+        }
+        
+    except Exception as exc:
+        logger.error(f"Re-parse task {task_id} failed: {str(exc)}")
+        return {
+            "success": False,
+            "task_id": task_id,
+            "error": str(exc)
+        }
+    
+    finally:
+        if 'db' in locals():
+            db.close()
 
 
 @celery_app.task(bind=True, name="tasks.sqlite_parser_tasks.trigger_parsing_for_new_files")
@@ -273,19 +282,21 @@ def _is_retryable_exception(exc: Exception) -> bool:
 
 class SQLiteParserWorkerManager:
     """
-    Manages SQLite parsing workers with 2-worker limit
+    Manages SQLite parsing workers under the adaptive parser concurrency limit
     """
     
-    MAX_CONCURRENT_WORKERS = 2
-    
     @staticmethod
     async def process_elevations_with_limit(elevation_ids: List[int]):
-        """Process elevations with semaphore-based concurrency control"""
-        semaphore = asyncio.Semaphore(SQLiteParserWorkerManager.MAX_CONCURRENT_WORKERS)
+        """Process elevations with adaptive concurrency control"""
+        limiter = get_concurrency_limiter("sqlite_parser")
         
         async def parse_with_semaphore(elevation_id):
-            async with semaphore:
-                return await _parse_single_elevation(elevation_id)
+            async with limiter.slot():
+                started_at = time.monotonic()
+                result = await _parse_single_elevation(elevation_id)
+                # Parse duration and failures drive the parser limit
+                limiter.record(time.monotonic() - started_at, success=result.get("success", False))
+                return result
         
         tasks = [parse_with_semaphore(eid) for eid in elevation_ids]
         return await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,14 +1,18 @@
-from celery import current_task
+from celery import chord, current_task, group
 from celery.exceptions import Retry
 from sqlalchemy.orm import Session
 from typing import List, Dict, Optional
 from datetime import datetime
 import asyncio
 import logging
+import time
 import traceback
 
 from celery_app import celery_app
+from core.adaptive_concurrency import get_concurrency_limiter
+from core.connection_manager import run_in_worker_loop
 from core.database import get_db
+from core.priority import MAINTENANCE, SCHEDULED, with_priority
 from services.smart_sync_service import SmartSyncService
 from services.project_sync_service import ProjectSyncService
 from services.phase_sync_service import PhaseSyncService
@@ -18,9 +22,10 @@ logger = logging.getLogger(__name__)
 
 
 @celery_app.task(bind=True, name="tasks.sync_tasks.sync_project_task")
-def sync_project_task(self, project_id: str, force_sync: bool = False) -> Dict:
+def sync_project_task(self, project_id: str, force_sync: bool = False, priority: str = SCHEDULED) -> Dict:
     """
     Background task to sync a specific project from Logikal.
+    Runs in the given priority class (interactive syncs go to the sync_interactive queue).
     """
     task_id = self.request.id
     logger.info(f"Starting sync task {task_id} for project {project_id}")
@@ -79,7 +84,9 @@ def sync_project_task(self, project_id: str, force_sync: bool = False) -> Dict:
             }
         )
         
-        sync_result = sync_service._perform_project_sync(project_id)
+        sync_result = run_in_worker_loop(with_priority(
+            priority, sync_service._perform_project_sync(project_id, full=force_sync)
+        ))
         
         # Update final status
         self.update_state(
@@ -93,7 +100,7 @@ def sync_project_task(self, project_id: str, force_sync: bool = False) -> Dict:
         )
         
         result = {
-            "success": True,
+            "success": sync_result["success"],
             "synced": True,
             "project_id": project_id,
             "task_id": task_id,
@@ -146,13 +153,12 @@ async def batch_sync_projects_task(self, project_ids: List[str], force_sync: boo
         results = []
         total_projects = len(project_ids)
         
-        # Process projects with concurrency control (2 workers max)
-        MAX_CONCURRENT_WORKERS = 2
-        semaphore = asyncio.Semaphore(MAX_CONCURRENT_WORKERS)
+        # Process projects under the adaptive Logikal concurrency limit
+        limiter = get_concurrency_limiter()
         
         async def sync_project_with_semaphore(project_id, index):
-            """Sync a single project with semaphore protection"""
-            async with semaphore:
+            """Sync a single project within a concurrency slot"""
+            async with limiter.slot():
                 # Update progress
                 progress = int((index / total_projects) * 100)
                 self.update_state(
@@ -187,7 +193,7 @@ async def batch_sync_projects_task(self, project_ids: List[str], force_sync: boo
         tasks = [sync_project_with_semaphore(project_id, i) for i, project_id in enumerate(project_ids)]
         
         # Process all projects concurrently
-        logger.info(f"Launching {len(tasks)} concurrent project sync tasks with {MAX_CONCURRENT_WORKERS} worker limit")
+        logger.info(f"Launching {len(tasks)} concurrent project sync tasks with adaptive worker limit (currently {limiter.limit})")
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
         # Handle any exceptions
@@ -235,64 +241,96 @@ async def batch_sync_projects_task(self, project_ids: List[str], force_sync: boo
 
 
 @celery_app.task(bind=True, name="tasks.sync_tasks.full_sync_task")
-def full_sync_task(self) -> Dict:
+def full_sync_task(self, cache_mode: Optional[str] = None, delta: bool = False) -> Dict:
     """
-    Background task to perform a full sync of all projects.
+    Background task to perform a sharded full sync.
+    
+    Syncs the directory tree, then fans the syncable directories out as one
+    shard task per root directory (a Celery chord); full_sync_reduce_task
+    writes the aggregate SyncLog once every shard finished.
     """
+    from core.config_production import get_settings
+    from models.sync_log import SyncLog
+    from services.directory_sync_service import DirectorySyncService
+    from services.full_sync_shards import plan_full_sync_shards
+    from services.logikal_listing_cache import MUST_REVALIDATE
+    
     task_id = self.request.id
+    started_at = time.time()
+    cache_mode = cache_mode or MUST_REVALIDATE
     logger.info(f"Starting full sync task {task_id}")
     
     try:
         # Get database session
         db = next(get_db())
+        production_settings = get_settings()
+        
+        sync_log = SyncLog(
+            sync_type='full',
+            status='started',
+            message=f'Sharded full sync started by task {task_id}',
+            started_at=datetime.utcnow()
+        )
+        db.add(sync_log)
+        db.commit()
         
-        # Get all projects
         self.update_state(
             state="PROGRESS",
             meta={
                 "current": 0,
                 "total": 100,
-                "status": "Fetching all projects"
+                "status": "Syncing directory tree"
             }
         )
         
-        from models.project import Project
-        projects = db.query(Project).all()
-        project_ids = [p.logikal_id for p in projects]
-        
-        if not project_ids:
+        directory_result = run_in_worker_loop(with_priority(MAINTENANCE, DirectorySyncService(db).discover_and_sync_directories(
+            production_settings.LOGIKAL_API_BASE_URL,
+            production_settings.LOGIKAL_AUTH_USERNAME,
+            production_settings.LOGIKAL_AUTH_PASSWORD,
+            cache_mode=cache_mode
+        )))
+        if not directory_result['success']:
+            raise Exception(f"Directory sync failed: {directory_result['message']}")
+        
+        shards = plan_full_sync_shards(db)
+        if not shards:
+            sync_log.status = 'completed'
+            sync_log.message = 'No syncable directories found'
+            sync_log.completed_at = datetime.utcnow()
+            db.commit()
             return {
                 "success": True,
-                "message": "No projects found to sync",
+                "message": "No syncable directories found",
                 "task_id": task_id,
                 "completed_at": datetime.utcnow().isoformat()
             }
         
-        # Perform batch sync
-        self.update_state(
-            state="PROGRESS",
-            meta={
-                "current": 10,
-                "total": 100,
-                "status": f"Starting batch sync of {len(project_ids)} projects"
-            }
+        # Fan out: every shard runs in its own task (and worker loop, with its own Logikal leases)
+        workflow = chord(
+            group(full_sync_shard_task.s(shard, cache_mode, delta) for shard in shards),
+            full_sync_reduce_task.s(sync_log.id, started_at)
         )
+        chord_result = workflow.apply_async()
         
-        batch_result = batch_sync_projects_task.delay(project_ids, force_sync=True).get()
-        
-        result = {
+        logger.info(f"Full sync task {task_id} dispatched {len(shards)} shards")
+        return {
             "success": True,
             "task_id": task_id,
-            "message": f"Full sync completed: {batch_result['successful_syncs']}/{batch_result['total_projects']} projects synced",
-            "batch_result": batch_result,
-            "completed_at": datetime.utcnow().isoformat()
+            "message": f"Full sync dispatched as {len(shards)} shards",
+            "sync_log_id": sync_log.id,
+            "reducer_task_id": chord_result.id,
+            "shards": [shard['key'] for shard in shards],
+            "dispatched_at": datetime.utcnow().isoformat()
         }
         
-        logger.info(f"Full sync task {task_id} completed successfully")
-        return result
-        
     except Exception as exc:
         logger.error(f"Full sync task {task_id} failed: {str(exc)}")
+        if 'sync_log' in locals():
+            sync_log.status = 'failed'
+            sync_log.message = f"Full sync failed: {str(exc)}"
+            sync_log.error_details = str(exc)
+            sync_log.completed_at = datetime.utcnow()
+            db.commit()
         self.update_state(
             state="FAILURE",
             meta={
@@ -308,6 +346,84 @@ def full_sync_task(self) -> Dict:
             db.close()
 
 
+@celery_app.task(bind=True, name="tasks.sync_tasks.full_sync_shard_task")
+def full_sync_shard_task(self, shard: Dict, cache_mode: str, delta: bool = False) -> Dict:
+    """
+    Background task to sync the projects, phases and elevations of one full sync shard.
+    Never raises, so a failed shard does not keep the reducer from running.
+    """
+    from core.config_production import get_settings
+    from services.full_sync_shards import run_full_sync_shard
+    
+    task_id = self.request.id
+    logger.info(f"Starting full sync shard task {task_id} for shard {shard['key']}")
+    
+    try:
+        # Get database session
+        db = next(get_db())
+        production_settings = get_settings()
+        
+        return run_in_worker_loop(run_full_sync_shard(
+            db, shard,
+            production_settings.LOGIKAL_API_BASE_URL,
+            production_settings.LOGIKAL_AUTH_USERNAME,
+            production_settings.LOGIKAL_AUTH_PASSWORD,
+            cache_mode=cache_mode,
+            delta=delta
+        ))
+        
+    except Exception as exc:
+        logger.error(f"Full sync shard task {task_id} failed: {str(exc)}")
+        return {
+            "success": False,
+            "shard": shard['key'],
+            "message": f"Shard {shard['key']} failed: {str(exc)}",
+            "error": str(exc)
+        }
+    
+    finally:
+        if 'db' in locals():
+            db.close()
+
+
+@celery_app.task(bind=True, name="tasks.sync_tasks.full_sync_reduce_task")
+def full_sync_reduce_task(self, shard_results: List[Dict], sync_log_id: int, started_at: float) -> Dict:
+    """
+    Background task that writes the aggregate SyncLog of a sharded full sync.
+    """
+    from services.full_sync_shards import reduce_full_sync_shards
+    
+    try:
+        # Get database session
+        db = next(get_db())
+        result = reduce_full_sync_shards(db, sync_log_id, shard_results, started_at)
+        result["task_id"] = self.request.id
+        result["completed_at"] = datetime.utcnow().isoformat()
+        return result
+    
+    finally:
+        if 'db' in locals():
+            db.close()
+
+
+@celery_app.task(bind=True, name="tasks.sync_tasks.force_sync_job_task")
+def force_sync_job_task(self, job_id: str) -> Dict:
+    """
+    Background task running a force sync job submitted through the job API.
+    Progress and the result are published to the job store, not returned to Celery.
+    """
+    from services.force_sync_jobs import run_force_sync_job
+    
+    logger.info(f"Starting force sync job {job_id} in task {self.request.id}")
+    job = run_in_worker_loop(run_force_sync_job(job_id))
+    return {
+        "success": job['status'] == 'completed',
+        "job_id": job_id,
+        "task_id": self.request.id,
+        "status": job['status']
+    }
+
+
 @celery_app.task(bind=True, name="tasks.sync_tasks.health_check_task")
 def health_check_task(self) -> Dict:
     """
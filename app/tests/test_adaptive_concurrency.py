@@ -0,0 +1,216 @@
+"""
+Test script for the adaptive (AIMD) concurrency limiter
+Runs without Redis - the learned limit is only kept in memory
+"""
+
+import sys
+import os
+import asyncio
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _make_limiter(**kwargs):
+    from core.adaptive_concurrency import AdaptiveConcurrencyLimiter
+
+    options = dict(initial_limit=2, min_limit=1, max_limit=5, target_p95_seconds=1.0,
+                   max_error_rate=0.1, window_size=4)
+    options.update(kwargs)
+    return AdaptiveConcurrencyLimiter('test', **options)
+
+
+def test_limit_grows_while_healthy_and_saturated():
+    """Fast, successful windows raise the limit by one while all slots are busy"""
+    print("🧪 Testing additive increase...")
+
+    async def scenario():
+        limiter = _make_limiter()
+        await limiter.acquire()
+        await limiter.acquire()
+        for _ in range(4):
+            limiter.record(0.1)
+        limiter.release()
+        limiter.release()
+        return limiter.limit
+
+    assert asyncio.run(scenario()) == 3
+    print("✅ Additive increase works")
+    return True
+
+
+def test_limit_backs_off_on_overload():
+    """A 429/5xx or timeout cuts the limit multiplicatively, once per episode"""
+    print("🧪 Testing multiplicative decrease...")
+
+    limiter = _make_limiter(initial_limit=5)
+    limiter.record(0.5, success=False, overloaded=True)
+    limiter.record(0.5, success=False, overloaded=True)
+
+    assert limiter.limit == 3, limiter.get_stats()
+    assert limiter.get_stats()['decreases'] == 1
+    print("✅ Multiplicative decrease works")
+    return True
+
+
+def test_slots_bound_concurrency():
+    """No more than ``limit`` work units run at the same time"""
+    print("🧪 Testing slot limit...")
+
+    async def scenario():
+        limiter = _make_limiter(initial_limit=2)
+        running = 0
+        peak = 0
+
+        async def unit():
+            nonlocal running, peak
+            async with limiter.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*[unit() for _ in range(6)])
+        return peak, limiter.in_flight
+
+    peak, in_flight = asyncio.run(scenario())
+    assert peak == 2, peak
+    assert in_flight == 0
+    print("✅ Slot limit works")
+    return True
+
+
+def test_nested_fan_out_borrows_the_outer_slot():
+    """A fan-out inside a held slot makes progress even when every slot is taken"""
+    print("🧪 Testing nested slots...")
+
+    async def scenario():
+        limiter = _make_limiter(initial_limit=1, max_limit=1)
+        running = 0
+        peak = 0
+
+        async def inner():
+            nonlocal running, peak
+            async with limiter.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        async def outer():
+            async with limiter.slot():
+                await asyncio.gather(*[inner() for _ in range(3)])
+
+        await asyncio.wait_for(outer(), timeout=1.0)
+        return peak, limiter.get_stats()
+
+    peak, stats = asyncio.run(scenario())
+    assert peak == 1, peak
+    assert stats['in_flight'] == 0 and stats['lent'] == 0, stats
+    print("✅ Nested slots work")
+    return True
+
+
+def test_waiting_fan_out_lets_the_limit_grow():
+    """Units queued behind the limit mark it saturated, so healthy windows raise it"""
+    print("🧪 Testing saturation from waiting work...")
+
+    async def scenario():
+        limiter = _make_limiter(initial_limit=2)
+
+        async def unit():
+            async with limiter.slot():
+                await asyncio.sleep(0.01)
+                limiter.record(0.1)
+
+        await asyncio.gather(*[unit() for _ in range(8)])
+        return limiter.limit
+
+    assert asyncio.run(scenario()) > 2
+    print("✅ Saturation from waiting work works")
+    return True
+
+
+def test_learned_limit_is_loaded_on_first_read():
+    """Reading ``limit`` loads the limit a previous run stored in Redis"""
+    print("🧪 Testing learned limit loading...")
+
+    import fakeredis
+    from core import rate_limiter
+
+    redis_url = 'redis://fake:6379/0'
+
+    async def scenario():
+        client = fakeredis.FakeAsyncRedis()
+        rate_limiter._redis_clients[asyncio.get_running_loop()] = {redis_url: client}
+        await client.set('logikal:concurrency:test', '4.00')
+        limiter = _make_limiter(redis_url=redis_url)
+        before = limiter.limit
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return before, limiter.limit
+
+    before, after = asyncio.run(scenario())
+    assert (before, after) == (2, 4), (before, after)
+    print("✅ Learned limit loading works")
+    return True
+
+
+def test_auth_calls_do_not_feed_the_limiter():
+    """Slow logins are not samples of the fan-out"""
+    print("🧪 Testing auth latency exclusion...")
+
+    from core.retry import RetryConfig, retry_async
+
+    limiter = _make_limiter()
+
+    @retry_async(config=RetryConfig(max_retries=0), concurrency_limiter=limiter, record_latency=False)
+    async def login():
+        return True
+
+    @retry_async(config=RetryConfig(max_retries=0), concurrency_limiter=limiter)
+    async def list_projects():
+        return True
+
+    async def scenario():
+        await login()
+        await list_projects()
+
+    asyncio.run(scenario())
+    assert limiter.get_stats()['samples'] == 1, limiter.get_stats()
+    print("✅ Auth latency exclusion works")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Adaptive Concurrency Tests")
+    print("=" * 50)
+
+    tests = [
+        test_limit_grows_while_healthy_and_saturated,
+        test_limit_backs_off_on_overload,
+        test_slots_bound_concurrency,
+        test_nested_fan_out_borrows_the_outer_slot,
+        test_waiting_fan_out_lets_the_limit_grow,
+        test_learned_limit_is_loaded_on_first_read,
+        test_auth_calls_do_not_feed_the_limiter
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,119 @@
+"""
+Test script for the batch parser
+Parses archived parts databases in a real parse process into SQLite in-memory models
+"""
+
+import sys
+import os
+import asyncio
+import sqlite3
+import tempfile
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _write_parts_database(path: str, system_code: str, glass: list, with_glass_table: bool = True):
+    """Write a minimal parts database with the tables the validator requires"""
+    conn = sqlite3.connect(path)
+    columns = ['AutoDescription', 'AutoDescriptionShort', 'Width_Output', 'Width_Unit', 'Height_Output',
+               'Height_Unit', 'Weight_Output', 'Weight_Unit', 'Area_Output', 'Area_Unit', 'SystemCode',
+               'SystemName', 'SystemLongName', 'ColorBase_Long']
+    conn.execute(f"CREATE TABLE Elevations (Name TEXT, {', '.join(columns)})")
+    conn.execute("INSERT INTO Elevations (Name, SystemCode, Width_Output) VALUES ('E', ?, 900.0)", (system_code,))
+    if with_glass_table:
+        conn.execute("CREATE TABLE Glass (GlassID TEXT, Name TEXT)")
+        conn.executemany("INSERT INTO Glass VALUES (?, ?)", glass)
+    conn.commit()
+    conn.close()
+
+
+def _session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from core.database import Base
+    from models.elevation import Elevation
+    from models.elevation_glass import ElevationGlass
+    from models.elevation_part import ElevationPart
+    from models.parsing_error_log import ParsingErrorLog
+
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine, tables=[Elevation.__table__, ElevationGlass.__table__,
+                                             ElevationPart.__table__, ParsingErrorLog.__table__])
+    return sessionmaker(bind=engine)()
+
+
+def test_batch_parse_persists_in_bulk():
+    """A batch is parsed in parse processes; data, glass, failures and hashes are stored per chunk"""
+    print("🧪 Testing batch parse...")
+
+    from models.elevation import Elevation
+    from models.elevation_glass import ElevationGlass
+    from models.parsing_error_log import ParsingErrorLog
+    from services.batch_parser import BatchParser, parseable_elevation_ids
+
+    db = _session()
+    with tempfile.TemporaryDirectory() as tmp:
+        elevations = []
+        for index in range(5):
+            path = os.path.join(tmp, f'e-{index}.db')
+            _write_parts_database(path, f'SYS{index}', [(f'G{index}-{n}', f'Glass {n}') for n in range(index)],
+                                  with_glass_table=index != 3)
+            elevations.append(Elevation(name='E', logikal_id=f'e-{index}', parts_db_path=path, has_parts_data=True))
+        elevations.append(Elevation(name='E', logikal_id='e-missing', has_parts_data=True,
+                                    parts_db_path=os.path.join(tmp, 'missing.db')))
+        elevations.append(Elevation(name='E', logikal_id='e-none'))
+        db.add_all(elevations)
+        db.commit()
+        # A stale glass record of a re-parsed elevation is replaced
+        db.add(ElevationGlass(elevation_id=elevations[1].id, glass_id='OLD', name='Old glass'))
+        db.commit()
+
+        ids = [elevation.id for elevation in elevations]
+        assert parseable_elevation_ids(db) == ids[:6]
+        first = asyncio.run(BatchParser(db, processes=1, chunk_size=3).parse(ids))
+        again = asyncio.run(BatchParser(db, processes=1, chunk_size=3).parse(ids))
+
+    assert first['parsed'] == 4 and first['failed'] == 2 and first['missing'] == 1, first
+    assert first['glass_records'] == 0 + 1 + 2 + 4 and len(first['errors']) == 2
+    db.expire_all()
+    parsed = db.query(Elevation).filter(Elevation.id == ids[2]).one()
+    assert parsed.parse_status == 'success' and parsed.system_code == 'SYS2' and parsed.width_out == 900.0
+    assert len(parsed.parts_file_hash) == 64
+    glass = db.query(ElevationGlass).filter(ElevationGlass.elevation_id == ids[1]).all()
+    assert [(g.glass_id, g.name) for g in glass] == [('G1-0', 'Glass 0')], glass
+    assert db.query(Elevation).filter(Elevation.id == ids[3]).one().parse_status == 'validation_failed'
+    assert db.query(Elevation).filter(Elevation.id == ids[5]).one().parse_error.startswith('SQLite file not readable')
+    # Unchanged files are skipped; failed ones are retried (and logged again)
+    assert db.query(ParsingErrorLog).count() == 4
+    assert again['skipped'] == 4 and again['parsed'] == 0 and again['failed'] == 2, again
+    print("✅ Batch parse works")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Batch Parser Tests")
+    print("=" * 50)
+
+    tests = [
+        test_batch_parse_persists_in_bulk
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,147 @@
+"""
+Test script for the pooled Logikal HTTP client and the Celery worker loops
+Creates aiohttp sessions without sending requests - no Logikal API required
+"""
+
+import sys
+import os
+import asyncio
+import threading
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_session_is_shared_per_loop_and_server():
+    """Calls on one loop share the session of their server; another loop gets its own"""
+    print("🧪 Testing per-loop Logikal sessions...")
+
+    import aiohttp
+    from core.connection_manager import close_logikal_sessions, get_logikal_session
+
+    async def scenario():
+        first = await get_logikal_session('https://logikal.test/api/v3/auth')
+        second = await get_logikal_session('https://logikal.test/api/v3/directories')
+        other_server = await get_logikal_session('https://other.test/api/v3/auth')
+        await close_logikal_sessions()
+        return first, second, other_server
+
+    first, second, other_server = asyncio.run(scenario())
+    again, _, _ = asyncio.run(scenario())
+    assert first is second and first is not other_server
+    assert again is not first, "sessions are bound to the loop that created them"
+    assert isinstance(first.cookie_jar, aiohttp.DummyCookieJar), "tokens must not share cookies"
+    assert first.closed and other_server.closed
+    print("✅ Per-loop Logikal sessions work")
+    return True
+
+
+def test_worker_loop_survives_tasks_per_thread():
+    """Each worker thread keeps its loop between tasks; shutdown cleans up and closes every loop"""
+    print("🧪 Testing worker event loops...")
+
+    from core.connection_manager import get_logikal_session, run_in_worker_loop, shutdown_worker_loop
+
+    async def current_loop():
+        await get_logikal_session('https://logikal.test/api/v3/auth')
+        return asyncio.get_running_loop()
+
+    loops = {}
+
+    def task(name):
+        loops[name] = (run_in_worker_loop(current_loop()), run_in_worker_loop(current_loop()))
+
+    threads = [threading.Thread(target=task, args=(name,)) for name in ('worker-1', 'worker-2')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    cleaned = []
+
+    async def cleanup():
+        cleaned.append(asyncio.get_running_loop())
+
+    shutdown_worker_loop(cleanups=[cleanup])
+
+    first_loop, second_loop = loops['worker-1']
+    assert first_loop is second_loop, "the loop survives between tasks of a thread"
+    assert loops['worker-2'][0] is not first_loop, "every thread gets a loop of its own"
+    assert set(cleaned) == {first_loop, loops['worker-2'][0]}, cleaned
+    assert first_loop.is_closed() and loops['worker-2'][0].is_closed()
+    print("✅ Worker event loops work")
+    return True
+
+
+def test_worker_loop_enforces_soft_time_limit():
+    """Threads-pool tasks are cancelled at the soft time limit Celery cannot enforce on threads"""
+    print("🧪 Testing soft time limit in worker loops...")
+
+    from celery.exceptions import SoftTimeLimitExceeded
+    from core.connection_manager import (
+        clear_task_deadline, run_in_worker_loop, shutdown_worker_loop, start_task_deadline
+    )
+
+    cleaned_up = []
+    outcome = {}
+
+    async def long_sync():
+        try:
+            await asyncio.sleep(5)
+        finally:
+            cleaned_up.append(True)
+
+    async def short_sync():
+        await asyncio.sleep(0)
+        return 'done'
+
+    def task():
+        start_task_deadline(0.05)
+        try:
+            run_in_worker_loop(long_sync())
+        except SoftTimeLimitExceeded as e:
+            outcome['error'] = e
+        finally:
+            clear_task_deadline()
+        outcome['next_task'] = run_in_worker_loop(short_sync())
+
+    thread = threading.Thread(target=task)
+    thread.start()
+    thread.join(timeout=2)
+    shutdown_worker_loop()
+
+    assert isinstance(outcome.get('error'), SoftTimeLimitExceeded), outcome
+    assert cleaned_up == [True], "the task's coroutine is cancelled, not abandoned"
+    assert outcome['next_task'] == 'done'
+    print("✅ Soft time limit in worker loops works")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Connection Manager Tests")
+    print("=" * 50)
+
+    tests = [
+        test_session_is_shared_per_loop_and_server,
+        test_worker_loop_survives_tasks_per_thread,
+        test_worker_loop_enforces_soft_time_limit
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
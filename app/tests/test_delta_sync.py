@@ -0,0 +1,115 @@
+"""
+Test script for changedDate-driven delta sync
+Partitions listings against an in-memory SQLite database - no PostgreSQL or Logikal API
+"""
+
+import sys
+import os
+from datetime import datetime, timezone
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+CHANGED = 1700000000
+
+
+def _session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from core.database import Base
+    import models
+
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine, tables=[getattr(models, name).__table__ for name in models.__all__])
+    return sessionmaker(bind=engine, expire_on_commit=False)()
+
+
+def _synced_tree(db, parts_synced=True):
+    """One project -> phase -> elevation, stored with changedDate CHANGED"""
+    from models.elevation import Elevation
+    from models.phase import Phase
+    from models.project import Project
+
+    changed = datetime.fromtimestamp(CHANGED, tz=timezone.utc)
+    project = Project(logikal_id='p-1', name='Tower', last_update_date=changed)
+    db.add(project)
+    db.commit()
+    phase = Phase(logikal_id='ph-1', name='Phase 1', project_id=project.id, last_update_date=changed)
+    db.add(phase)
+    db.commit()
+    db.add(Elevation(logikal_id='e-1', name='Pos 1', phase_id=phase.id, last_update_date=changed,
+                     image_path='images/e-1.png',
+                     parts_synced_at=datetime(2024, 1, 1) if parts_synced else None))
+    db.commit()
+    return project, phase
+
+
+def test_unchanged_subtree_is_skipped():
+    """Listings whose changedDate did not move are pruned at every level"""
+    print("🧪 Testing unchanged subtree pruning...")
+
+    from services.delta_sync import partition_elevations, partition_phases, partition_projects
+
+    db = _session()
+    project, phase = _synced_tree(db)
+
+    projects = partition_projects(db, [{'id': 'p-1', 'name': 'Tower', 'changedDate': CHANGED},
+                                       {'id': 'p-2', 'name': 'New', 'changedDate': CHANGED}])
+    assert [p['id'] for p in projects.changed] == ['p-2'], projects
+    assert projects.skipped()[0]['logikal_id'] == 'p-1'
+    assert projects.skipped()[0]['reason'] == 'unchanged'
+
+    phases = partition_phases(db, [{'id': 'ph-1', 'name': 'Phase 1', 'changedDate': CHANGED + 60}], project.id)
+    assert len(phases.changed) == 1, "a moved changedDate must be synced"
+
+    elevations = partition_elevations(db, [{'id': 'e-1', 'name': 'Pos 1', 'changedDate': CHANGED}])
+    assert not elevations.changed and len(elevations.unchanged) == 1
+    print("✅ Unchanged subtree pruning works")
+    return True
+
+
+def test_unfinished_subtree_is_retried():
+    """An elevation without a synced parts list keeps its phase and project in the sync"""
+    print("🧪 Testing unfinished subtree retry...")
+
+    from services.delta_sync import partition_elevations, partition_phases, partition_projects
+
+    db = _session()
+    project, phase = _synced_tree(db, parts_synced=False)
+
+    assert partition_projects(db, [{'id': 'p-1', 'changedDate': CHANGED}]).changed
+    assert partition_phases(db, [{'id': 'ph-1', 'changedDate': CHANGED}], project.id).changed
+    assert partition_elevations(db, [{'id': 'e-1', 'changedDate': CHANGED}]).changed
+    # No changedDate in the listing - never pruned
+    assert partition_projects(db, [{'id': 'p-1'}]).changed
+    print("✅ Unfinished subtree retry works")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Delta Sync Tests")
+    print("=" * 50)
+
+    tests = [
+        test_unchanged_subtree_is_skipped,
+        test_unfinished_subtree_is_retried
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,182 @@
+"""
+Test script for asynchronous force-sync jobs
+Runs jobs in process against the in-process job store - no Redis, Celery or Logikal API
+"""
+
+import sys
+import os
+import asyncio
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _local_store():
+    """Install an in-process job store for the running loop"""
+    from services import force_sync_jobs
+
+    store = force_sync_jobs.ForceSyncJobStore(redis_url=None)
+    force_sync_jobs._stores[asyncio.get_running_loop()] = store
+    return store
+
+
+class FakeForceSync:
+    """Stands in for ProjectSyncService.force_sync_project_from_logikal, reporting progress like the executors"""
+
+    def __init__(self, phases=2, release=None):
+        self.calls = 0
+        self.phases = phases
+        self.release = release
+
+    async def __call__(self, project_id, directory_id, delta):
+        from services.sync_progress import report_progress
+
+        self.calls += 1
+        report_progress('phases', f"Syncing {self.phases} phases", phases_total=self.phases)
+
+        async def phase(index):
+            report_progress('elevations', elevations_listed=3)
+            await asyncio.sleep(0.01)
+            report_progress('phases', f"Phase {index} synced", phases_done=1)
+
+        await asyncio.gather(*[phase(index) for index in range(self.phases)])
+        if self.release:
+            await self.release.wait()
+        return {'success': True, 'message': f'Project "{project_id}" fully synced', 'phases_synced': self.phases}
+
+
+def test_job_streams_progress_and_caches_result():
+    """A job publishes the counters of its phases; a repeated request returns the cached result"""
+    print("🧪 Testing force sync job progress and result cache...")
+
+    from services.force_sync_jobs import stream_job_events, submit_force_sync_job
+
+    sync = FakeForceSync()
+
+    async def scenario():
+        _local_store()
+        job = await submit_force_sync_job('DOS22309', 'dir-1', sync=sync)
+        events = [event async for event in stream_job_events(job['job_id'], keepalive_seconds=1.0)]
+        repeat = await submit_force_sync_job('DOS22309', 'dir-1', sync=sync)
+        refreshed = await submit_force_sync_job('DOS22309', 'dir-1', refresh=True, sync=sync)
+        return job, events, repeat, refreshed
+
+    job, events, repeat, refreshed = asyncio.run(scenario())
+    assert job['created'] and job['status'] == 'queued'
+    assert events[-1].startswith('event: completed'), events
+    assert all(event.startswith('id: ') for event in events[:-1]) and len(events) > 1, events
+    assert '"phases_done": 2' in events[-1] and '"elevations_listed": 6' in events[-1], events[-1]
+    assert repeat['cached'] and repeat['job_id'] == job['job_id'] and repeat['status'] == 'completed'
+    assert refreshed['created'] and sync.calls == 2
+    print("✅ Force sync job progress and result cache work")
+    return True
+
+
+def test_repeated_request_joins_running_job():
+    """A second request while the project syncs returns the running job instead of a new one"""
+    print("🧪 Testing force sync job join...")
+
+    from services.force_sync_jobs import submit_force_sync_job, wait_for_job
+
+    async def scenario():
+        _local_store()
+        sync = FakeForceSync(release=asyncio.Event())
+        first = await submit_force_sync_job('DOS22309', None, sync=sync)
+        await asyncio.sleep(0.05)
+        second = await submit_force_sync_job('DOS22309', None, sync=sync)
+        other_mode = await submit_force_sync_job('DOS22309', None, delta=True, sync=sync)
+        polled = await wait_for_job(first['job_id'], after=0, timeout=1.0)
+        sync.release.set()
+        finished = await wait_for_job(first['job_id'], after=len(polled['events']), timeout=2.0, poll_interval_seconds=0.05)
+        while finished['status'] not in ('completed', 'failed'):
+            finished = await wait_for_job(first['job_id'], timeout=2.0, poll_interval_seconds=0.05)
+        return first, second, other_mode, polled, finished
+
+    first, second, other_mode, polled, finished = asyncio.run(scenario())
+    assert not second['created'] and second['job_id'] == first['job_id'] and second['status'] == 'running'
+    assert other_mode['created'] and other_mode['job_id'] != first['job_id']
+    assert polled['events'] and polled['events'][0]['seq'] == 1, polled
+    assert finished['result']['phases_synced'] == 2 and finished['duration_seconds'] >= 0
+    print("✅ Force sync job join works")
+    return True
+
+
+def test_queued_job_is_joined_until_a_worker_picks_it_up():
+    """A job waiting in the queue is not stale, however long it waits; a silent running job is"""
+    print("🧪 Testing queued job staleness...")
+
+    from services.force_sync_jobs import QUEUED, RUNNING, STALE_JOB_SECONDS, ForceSyncJobStore
+
+    async def scenario():
+        store = ForceSyncJobStore(redis_url=None)
+        await store.save({'job_id': 'queued', 'status': QUEUED})
+        await store.set_active('queued-target', 'queued')
+        await store.save({'job_id': 'running', 'status': RUNNING})
+        await store.set_active('running-target', 'running')
+        for job_id in ('queued', 'running'):
+            store._local_jobs[job_id]['updated_at'] -= STALE_JOB_SECONDS * 2
+        return await store.active_job('queued-target'), await store.active_job('running-target')
+
+    queued, running = asyncio.run(scenario())
+    assert queued and queued['job_id'] == 'queued', queued
+    assert running is None, running
+    print("✅ Queued job staleness works")
+    return True
+
+
+def test_local_store_is_bounded():
+    """The in-process fallback caps events per job and drops finished jobs after the job TTL"""
+    print("🧪 Testing bounded in-process job store...")
+
+    from services.force_sync_jobs import COMPLETED, RUNNING, ForceSyncJobStore
+
+    async def scenario():
+        store = ForceSyncJobStore(redis_url=None, job_ttl_seconds=60, max_events=3)
+        for index in range(5):
+            await store.append_event('job-1', {'stage': 'phases', 'index': index})
+        events = await store.events('job-1')
+        later = await store.events('job-1', after=4)
+
+        await store.save({'job_id': 'job-1', 'status': RUNNING})
+        await store.finish({'job_id': 'job-1', 'status': COMPLETED}, 'target')
+        store._local_jobs['job-1']['updated_at'] -= 120
+        await store.save({'job_id': 'job-2', 'status': RUNNING})
+        return events, later, store
+
+    events, later, store = asyncio.run(scenario())
+    assert [event['seq'] for event in events] == [3, 4, 5] and events[0]['index'] == 2, events
+    assert [event['seq'] for event in later] == [5], later
+    assert list(store._local_jobs) == ['job-2'] and 'job-1' not in store._local_events
+    print("✅ Bounded in-process job store works")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Force Sync Job Tests")
+    print("=" * 50)
+
+    tests = [
+        test_job_streams_progress_and_caches_result,
+        test_repeated_request_joins_running_job,
+        test_queued_job_is_joined_until_a_worker_picks_it_up,
+        test_local_store_is_bounded
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
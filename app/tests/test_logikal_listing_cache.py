@@ -0,0 +1,120 @@
+"""
+Test script for the Logikal listing cache
+Runs without Redis - listings are only kept in the in-process L1
+"""
+
+import sys
+import os
+import asyncio
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+BASE_URL = 'https://logikal.test/api/v3'
+
+
+def _make_cache():
+    from services.logikal_listing_cache import LogikalListingCache
+
+    cache = LogikalListingCache(redis_url=None, l1_ttl_seconds=60, l1_max_entries=100)
+    # Pretend the object sync configs were loaded
+    cache._ttls = {'directory': 120, 'project': 240, 'phase': 360}
+    cache._ttls_loaded_at = float('inf')
+    return cache
+
+
+def test_cache_ok_and_must_revalidate():
+    """cache-ok serves the cached listing, must-revalidate always reads Logikal"""
+    print("🧪 Testing cache modes...")
+
+    from services.logikal_listing_cache import CACHE_OK, MUST_REVALIDATE
+    from services.logikal_navigation import NavigationContext
+
+    calls = 0
+
+    async def fetch_projects():
+        nonlocal calls
+        calls += 1
+        return [{'id': 'p1', 'name': 'Alpha', 'changedDate': 100}]
+
+    async def scenario():
+        cache = _make_cache()
+        context = NavigationContext(directory='Customers/Acme')
+        await cache.get_listing(BASE_URL, context, 'projects', fetch_projects, CACHE_OK)
+        await cache.get_listing(BASE_URL + '/', context, 'projects', fetch_projects, CACHE_OK)
+        await cache.get_listing(BASE_URL, context, 'projects', fetch_projects, MUST_REVALIDATE)
+        return cache.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert calls == 2, calls
+    assert stats['l1_hits'] == 1 and stats['revalidations'] == 1, stats
+    print("✅ Cache modes work")
+    return True
+
+
+def test_changed_date_drops_child_listings():
+    """A project whose changedDate moved loses its cached phase listing; unchanged ones keep it"""
+    print("🧪 Testing changedDate invalidation...")
+
+    from services.logikal_listing_cache import CACHE_OK, MUST_REVALIDATE
+    from services.logikal_navigation import NavigationContext
+
+    projects = [{'id': 'p1', 'changedDate': 100}, {'id': 'p2', 'changedDate': 100}]
+    phase_calls = {'p1': 0, 'p2': 0}
+
+    def fetch_phases_for(project_id):
+        async def fetch_phases():
+            phase_calls[project_id] += 1
+            return [{'id': f'{project_id}-phase', 'changedDate': 1}]
+        return fetch_phases
+
+    async def fetch_projects():
+        return [dict(project) for project in projects]
+
+    async def scenario():
+        cache = _make_cache()
+        directory = NavigationContext(directory='Customers/Acme')
+        await cache.get_listing(BASE_URL, directory, 'projects', fetch_projects, MUST_REVALIDATE)
+        for project_id in phase_calls:
+            context = NavigationContext(directory='Customers/Acme', project=project_id)
+            await cache.get_listing(BASE_URL, context, 'phases', fetch_phases_for(project_id), CACHE_OK)
+
+        projects[0]['changedDate'] = 200
+        await cache.get_listing(BASE_URL, directory, 'projects', fetch_projects, MUST_REVALIDATE)
+        for project_id in phase_calls:
+            context = NavigationContext(directory='Customers/Acme', project=project_id)
+            await cache.get_listing(BASE_URL, context, 'phases', fetch_phases_for(project_id), CACHE_OK)
+
+    asyncio.run(scenario())
+    assert phase_calls == {'p1': 2, 'p2': 1}, phase_calls
+    print("✅ changedDate invalidation works")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Listing Cache Tests")
+    print("=" * 50)
+
+    tests = [
+        test_cache_ok_and_must_revalidate,
+        test_changed_date_drops_child_listings
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,161 @@
+"""
+Test script for Logikal navigation planning
+Checks that only the minimal select calls are planned between contexts
+"""
+
+import sys
+import os
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_plan_from_root_walks_full_path():
+    """A fresh token selects every directory level, then project and phase"""
+    print("🧪 Testing navigation from the root context...")
+
+    from services.logikal_navigation import NavigationContext, ROOT_CONTEXT, plan_navigation
+
+    target = NavigationContext(directory="Customers/ACME", project="p-1", phase="ph-1")
+    steps = plan_navigation(ROOT_CONTEXT, target)
+
+    assert steps == [
+        ('directory', 'Customers'),
+        ('directory', 'Customers/ACME'),
+        ('project', 'p-1'),
+        ('phase', 'ph-1'),
+    ], steps
+    print("✅ Navigation from root works")
+    return True
+
+
+def test_plan_between_siblings_is_minimal():
+    """Moving between sibling elevations or phases only re-selects what changed"""
+    print("🧪 Testing minimal navigation between siblings...")
+
+    from services.logikal_navigation import NavigationContext, plan_navigation
+
+    current = NavigationContext(directory="Customers/ACME", project="p-1", phase="ph-1", elevation="e-1")
+
+    sibling_elevation = NavigationContext(directory="Customers/ACME", project="p-1", phase="ph-1", elevation="e-2")
+    assert plan_navigation(current, sibling_elevation) == [('elevation', 'e-2')]
+
+    sibling_phase = NavigationContext(directory="Customers/ACME", project="p-1", phase="ph-2")
+    assert plan_navigation(current, sibling_phase) == [('phase', 'ph-2')]
+
+    # Listing projects needs the directory itself to be the deepest selection
+    directory_only = NavigationContext(directory="Customers/ACME")
+    assert plan_navigation(current, directory_only) == [('directory', 'Customers/ACME')]
+
+    # Unknown context can only be recovered by logging in again
+    assert plan_navigation(None, directory_only) is None
+    print("✅ Minimal sibling navigation works")
+    return True
+
+
+def test_planner_walks_phase_in_one_session():
+    """All elevations of a phase share one login and one select per sibling"""
+    print("🧪 Testing context-affinity work planning...")
+
+    from services.logikal_navigation import NavigationSession
+    from services.logikal_session_pool import LogikalSessionPool
+    from services.logikal_work_planner import ContextAffinityPlanner
+
+    directory = SimpleNamespace(full_path="Customers/ACME")
+    project = SimpleNamespace(logikal_id="p-1", directory=directory)
+    phase = SimpleNamespace(logikal_id="ph-1", project=project)
+    elevations = [SimpleNamespace(name=f"E{i}", logikal_id=f"e-{i:02d}", phase=phase) for i in range(13)]
+
+    async def scenario():
+        pool = LogikalSessionPool("https://logikal.test/api/", "user", "secret", size=4, min_idle=0,
+                                  max_age_seconds=3600, refresh_interval_seconds=60)
+        counter = itertools.count(1)
+
+        async def fake_authenticate():
+            return True, f"token-{next(counter)}"
+
+        async def fake_select(navigation, level, identifier):
+            navigation.select_calls += 1
+            return True, "Selected"
+
+        async def work(elevation, navigation):
+            return True, "Parts list fetched"
+
+        pool._authenticate = fake_authenticate
+        original_select = NavigationSession._select
+        NavigationSession._select = fake_select
+        try:
+            planner = ContextAffinityPlanner(None, pool, "https://logikal.test/api/")
+            stats = await planner.run(planner.plan(elevations), work)
+        finally:
+            NavigationSession._select = original_select
+        pool_stats = pool.get_stats()
+        await pool.close()
+        return stats, pool_stats
+
+    stats, pool_stats = asyncio.run(scenario())
+    assert stats['successful'] == 13, stats
+    assert pool_stats['logins'] == 1, pool_stats
+    # 2 directory levels + project + phase + 13 elevations
+    assert stats['select_calls'] == 17, stats
+    print("✅ Context-affinity planning works")
+    return True
+
+
+def test_failed_select_forgets_context():
+    """Any failed select leaves the token's context unknown, not half-updated"""
+    print("🧪 Testing context invalidation on failed selects...")
+
+    from services.logikal_navigation import NavigationContext, NavigationSession, ROOT_CONTEXT
+
+    lease = SimpleNamespace(token="token-1", context=ROOT_CONTEXT)
+    navigation = NavigationSession(None, lease, "https://logikal.test/api/")
+
+    async def fake_select(level, identifier):
+        navigation.select_calls += 1
+        if level == 'project':
+            return False, "Failed to select project: 500 Internal Server Error"
+        return True, "Selected"
+
+    navigation._select = fake_select
+    target = NavigationContext(directory="Customers", project="p-1", phase="ph-1")
+    success, message = asyncio.run(navigation.navigate_to(target))
+
+    assert success is False and "500" in message
+    assert lease.context is None, lease.context
+    print("✅ Context invalidation on failed selects works")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Logikal Navigation Tests")
+    print("=" * 50)
+
+    tests = [
+        test_plan_from_root_walks_full_path,
+        test_plan_between_siblings_is_minimal,
+        test_planner_walks_phase_in_one_session,
+        test_failed_select_forgets_context
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,98 @@
+"""
+Test script for single-flight coalescing of Logikal reads
+Runs without the Logikal API - the fetch is a local coroutine
+"""
+
+import sys
+import os
+import asyncio
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_identical_reads_share_one_fetch():
+    """Concurrent reads of the same key cost one upstream call, later reads hit the memo"""
+    print("🧪 Testing read coalescing...")
+
+    from services.logikal_read_coalescer import ProjectListing, ReadCoalescer
+
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return ProjectListing.from_projects([{'id': '1', 'name': 'Alpha'}, {'id': '2', 'name': 'Beta'}])
+
+    async def scenario():
+        coalescer = ReadCoalescer(ttl_seconds=60)
+        key = ('https://logikal.test/api/v3', 'Directory', 'projects')
+        listings = await asyncio.gather(*[coalescer.get(key, fetch) for _ in range(5)])
+        await coalescer.get(key, fetch)
+        return listings, coalescer.get_stats()
+
+    listings, stats = asyncio.run(scenario())
+    assert calls == 1, calls
+    assert all(listing is listings[0] for listing in listings)
+    assert listings[0].find('Beta')['id'] == '2'
+    assert stats['coalesced'] == 4 and stats['memo_hits'] == 1, stats
+    print("✅ Read coalescing works")
+    return True
+
+
+def test_failures_are_shared_and_not_memoised():
+    """Every waiter gets the error of the shared read, and the next read retries"""
+    print("🧪 Testing failed reads...")
+
+    from services.logikal_read_coalescer import ReadCoalescer
+
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("Failed to get projects from Logikal")
+
+    async def scenario():
+        coalescer = ReadCoalescer(ttl_seconds=60)
+        results = await asyncio.gather(*[coalescer.get('projects', fetch) for _ in range(3)],
+                                       return_exceptions=True)
+        retry = await asyncio.gather(coalescer.get('projects', fetch), return_exceptions=True)
+        return results + retry
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert calls == 2, calls
+    print("✅ Failed reads work")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Read Coalescer Tests")
+    print("=" * 50)
+
+    tests = [
+        test_identical_reads_share_one_fetch,
+        test_failures_are_shared_and_not_memoised
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
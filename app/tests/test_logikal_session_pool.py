@@ -0,0 +1,180 @@
+"""
+Test script for the Logikal session pool
+Exercises lease/return semantics without talking to the Logikal API
+"""
+
+import sys
+import os
+import asyncio
+import itertools
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _make_pool(size=2, min_idle=0):
+    """Create a pool whose logins hand out numbered fake tokens"""
+    from services.logikal_session_pool import LogikalSessionPool
+
+    pool = LogikalSessionPool("https://logikal.test/api/", "user", "secret",
+                              size=size, min_idle=min_idle,
+                              max_age_seconds=3600, refresh_interval_seconds=60)
+    counter = itertools.count(1)
+
+    async def fake_authenticate():
+        return True, f"token-{next(counter)}"
+
+    pool._authenticate = fake_authenticate
+    return pool
+
+
+def test_lease_reuses_returned_token():
+    """A returned token is reused when the caller accepts a used context"""
+    print("🧪 Testing lease reuse...")
+
+    async def scenario():
+        pool = _make_pool()
+        first = await pool.acquire()
+        await pool.release(first)
+        second = await pool.acquire(require_clean=False)
+        await pool.release(second)
+        stats = pool.get_stats()
+        await pool.close()
+        return first, second, stats
+
+    first, second, stats = asyncio.run(scenario())
+    assert first.token == second.token
+    assert stats['logins'] == 1
+    assert stats['reused'] == 1
+    print("✅ Lease reuse works")
+    return True
+
+
+def test_clean_lease_does_not_reuse_dirty_token():
+    """Callers that need the root context never get a navigated token"""
+    print("🧪 Testing clean leases...")
+
+    async def scenario():
+        pool = _make_pool(size=1)
+        first = await pool.acquire()
+        await pool.release(first)
+        second = await pool.acquire()
+        await pool.release(second)
+        stats = pool.get_stats()
+        await pool.close()
+        return first, second, stats
+
+    first, second, stats = asyncio.run(scenario())
+    assert first.token != second.token
+    # The dirty token was dropped so the pool never exceeds its size
+    assert stats['idle'] == 1
+    print("✅ Clean leases work")
+    return True
+
+
+def test_pool_size_bounds_concurrent_leases():
+    """Acquire blocks while every token is leased out"""
+    print("🧪 Testing pool size limit...")
+
+    async def scenario():
+        pool = _make_pool(size=1)
+        held = await pool.acquire()
+        waiter = asyncio.ensure_future(pool.acquire(require_clean=False))
+        await asyncio.sleep(0.05)
+        blocked = not waiter.done()
+        await pool.release(held)
+        lease = await asyncio.wait_for(waiter, timeout=1)
+        await pool.release(lease)
+        await pool.close()
+        return blocked
+
+    assert asyncio.run(scenario())
+    print("✅ Pool size limit works")
+    return True
+
+
+def test_lease_context_manager_discards_on_error():
+    """A token whose sync unit failed is not handed out again"""
+    print("🧪 Testing discard on failure...")
+
+    async def scenario():
+        pool = _make_pool()
+        try:
+            async with pool.lease():
+                raise RuntimeError("navigation failed")
+        except RuntimeError:
+            pass
+        stats = pool.get_stats()
+        await pool.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats['idle'] == 0
+    assert stats['leased'] == 0
+    assert stats['discarded'] == 1
+    print("✅ Discard on failure works")
+    return True
+
+
+def test_lease_context_manager_discards_on_cancel():
+    """A token whose sync unit was cancelled mid-call is not handed out again"""
+    print("🧪 Testing discard on cancellation...")
+
+    async def scenario():
+        pool = _make_pool()
+        leased = asyncio.Event()
+
+        async def unit():
+            async with pool.lease():
+                leased.set()
+                await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(unit())
+        await leased.wait()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        stats = pool.get_stats()
+        await pool.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats['idle'] == 0
+    assert stats['leased'] == 0
+    assert stats['discarded'] == 1
+    print("✅ Discard on cancellation works")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Logikal Session Pool Tests")
+    print("=" * 50)
+
+    tests = [
+        test_lease_reuses_returned_token,
+        test_clean_lease_does_not_reuse_dirty_token,
+        test_pool_size_bounds_concurrent_leases,
+        test_lease_context_manager_discards_on_error,
+        test_lease_context_manager_discards_on_cancel
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
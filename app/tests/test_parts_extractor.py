@@ -0,0 +1,144 @@
+"""
+Test script for the part line-item extractor
+Maps parts-list tables into elevation_parts on SQLite in-memory models
+"""
+
+import sys
+import os
+import asyncio
+import sqlite3
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _parts_database(profile_quantity='2,5') -> sqlite3.Connection:
+    """A parts database with two line-item tables and tables that are not line items"""
+    conn = sqlite3.connect(':memory:')
+    columns = ['AutoDescription', 'AutoDescriptionShort', 'Width_Output', 'Width_Unit', 'Height_Output',
+               'Height_Unit', 'Weight_Output', 'Weight_Unit', 'Area_Output', 'Area_Unit', 'SystemCode',
+               'SystemName', 'SystemLongName', 'ColorBase_Long']
+    conn.execute(f"CREATE TABLE Elevations (Name TEXT, {', '.join(columns)})")
+    conn.execute("INSERT INTO Elevations (Name, SystemCode) VALUES ('E1', 'SYS001')")
+    conn.execute("CREATE TABLE Glass (GlassID TEXT, Name TEXT)")
+    conn.execute("INSERT INTO Glass VALUES ('GLASS001', 'Clear Glass 6mm')")
+    conn.execute("CREATE TABLE Profiles (articleno TEXT, Description TEXT, SystemCode TEXT, Quantity TEXT, "
+                 "Length REAL, Position INTEGER, Drawing BLOB)")
+    conn.execute("INSERT INTO Profiles VALUES ('P-100', 'Frame profile', 'SYS001', ?, 2400.0, 1, x'00ff')",
+                 (profile_quantity,))
+    conn.execute("INSERT INTO Profiles VALUES ('P-200', 'Sash profile', 'SYS001', '4', 1200.0, 2, NULL)")
+    conn.execute('CREATE TABLE "Accessory Items" (OrderNo TEXT, Name TEXT, Qty INTEGER, Unit TEXT)')
+    conn.execute("""INSERT INTO "Accessory Items" VALUES ('A-1', 'Hinge', 3, 'pcs')""")
+    conn.execute("CREATE TABLE Settings (Key TEXT, Value TEXT)")
+    conn.execute("INSERT INTO Settings VALUES ('Version', '3.0')")
+    conn.commit()
+    return conn
+
+
+def _session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from core.database import Base
+    from models.elevation import Elevation
+    from models.elevation_glass import ElevationGlass
+    from models.elevation_part import ElevationPart
+    from models.parsing_error_log import ParsingErrorLog
+
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine, tables=[Elevation.__table__, ElevationGlass.__table__,
+                                             ElevationPart.__table__, ParsingErrorLog.__table__])
+    return sessionmaker(bind=engine)()
+
+
+def test_line_item_tables_are_mapped():
+    """Tables with an article number become line items; other columns are kept as attributes"""
+    print("🧪 Testing line item mapping...")
+
+    from services.parts_extractor import extract_part_lines
+
+    conn = _parts_database()
+    lines = extract_part_lines(conn, tables=[])
+    restricted = extract_part_lines(conn, tables=['profiles'])
+    conn.close()
+
+    assert [(line['source_table'], line['line_no'], line['article_number']) for line in lines] == [
+        ('Accessory Items', 1, 'A-1'), ('Profiles', 1, 'P-100'), ('Profiles', 2, 'P-200')
+    ], lines
+    accessory, frame = lines[0], lines[1]
+    assert accessory['quantity'] == 3.0 and accessory['unit'] == 'pcs' and accessory['description'] == 'Hinge'
+    assert frame['quantity'] == 2.5 and frame['length'] == 2400.0 and frame['system_code'] == 'SYS001'
+    assert frame['attributes'] == {'Position': 1}, frame['attributes']
+    assert len(restricted) == 2
+    print("✅ Line item mapping works")
+    return True
+
+
+def test_lines_are_replaced_and_aggregated():
+    """A parse replaces an elevation's lines; the bill of materials sums them across elevations"""
+    print("🧪 Testing line item storage and bill of materials...")
+
+    from models.elevation import Elevation
+    from models.elevation_part import ElevationPart
+    from services.parts_extractor import bill_of_materials
+    from services.parts_parse_stage import PartsParseStage
+    from services.sqlite_parser_service import SQLiteElevationParserService
+
+    db = _session()
+    elevations = [Elevation(name='E1', logikal_id=f'e-{index}') for index in range(2)]
+    db.add_all(elevations)
+    db.commit()
+
+    stage = PartsParseStage(processes=0)
+    parser = SQLiteElevationParserService(db)
+
+    async def parse(elevation, quantity):
+        conn = _parts_database(quantity)
+        data = conn.serialize()
+        conn.close()
+        extraction = await stage.extract(data, elevation.name)
+        return await parser.apply_extraction(elevation, extraction, 'sha-' + quantity)
+
+    async def scenario():
+        for elevation in elevations:
+            await parse(elevation, '2')
+        # Re-parse with a changed quantity
+        return await parse(elevations[0], '5')
+
+    assert asyncio.run(scenario())['success']
+    assert db.query(ElevationPart).count() == 6
+    bom = {row['article_number']: row for row in bill_of_materials(db)}
+    assert bom['P-100']['quantity'] == 7.0 and bom['P-100']['elevations'] == 2, bom['P-100']
+    assert bom['A-1']['quantity'] == 6.0 and bom['A-1']['unit'] == 'pcs'
+    filtered = bill_of_materials(db, [elevations[1].id], article_number='P-100')
+    assert len(filtered) == 1 and filtered[0]['quantity'] == 2.0 and filtered[0]['total_length'] == 2400.0
+    print("✅ Line item storage and bill of materials work")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Parts Extractor Tests")
+    print("=" * 50)
+
+    tests = [
+        test_line_item_tables_are_mapped,
+        test_lines_are_replaced_and_aggregated
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
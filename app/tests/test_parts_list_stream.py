@@ -0,0 +1,157 @@
+"""
+Test script for the streaming parts-list decoder
+Feeds a parts-list style JSON body in small chunks and checks the written file
+or in-memory database
+"""
+
+import sys
+import os
+import asyncio
+import base64
+import hashlib
+import json
+import sqlite3
+import tempfile
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+async def _chunks(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def test_streamed_file_matches_payload():
+    """The decoded file and its SHA-256 match the payload, whatever the chunk boundaries"""
+    print("🧪 Testing streamed decode...")
+
+    from services.parts_list_stream import stream_parts_list_to_file
+
+    payload = os.urandom(10_000)
+    encoded = base64.encodebytes(payload).decode('ascii')  # wrapped lines -> \n escapes
+    body = json.dumps({
+        'meta': {'data': 'not this one', 'note': 'quote " and slash \\ inside'},
+        'name': 'Elevation "A"',
+        'data': encoded.replace('/', '\\/', 3),
+        'trailer': [1, 2, {'x': None}]
+    }).replace('\\\\/', '\\/').encode('utf-8')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for chunk_size in (1, 7, 4096):
+            path = os.path.join(tmp, f'parts_{chunk_size}.db')
+            parts_file = asyncio.run(stream_parts_list_to_file(_chunks(body, chunk_size), path))
+            with open(path, 'rb') as f:
+                assert f.read() == payload, chunk_size
+            assert parts_file.size_bytes == len(payload)
+            assert parts_file.sha256 == hashlib.sha256(payload).hexdigest()
+            assert not os.path.exists(path + '.part')
+    print("✅ Streamed decode works")
+    return True
+
+
+def test_missing_or_empty_data_returns_none():
+    """A response without parts data writes no file"""
+    print("🧪 Testing responses without data...")
+
+    from services.parts_list_stream import stream_parts_list_to_file
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for body in (b'{"data": null}', b'{"data": ""}', b'{"message": "no parts"}'):
+            path = os.path.join(tmp, 'parts.db')
+            assert asyncio.run(stream_parts_list_to_file(_chunks(body, 3), path)) is None
+            assert not os.path.exists(path) and not os.path.exists(path + '.part')
+    print("✅ Responses without data work")
+    return True
+
+
+def _parts_database() -> bytes:
+    """A minimal parts database with the tables the validator requires"""
+    conn = sqlite3.connect(':memory:')
+    columns = ['AutoDescription', 'AutoDescriptionShort', 'Width_Output', 'Width_Unit', 'Height_Output',
+               'Height_Unit', 'Weight_Output', 'Weight_Unit', 'Area_Output', 'Area_Unit', 'SystemCode',
+               'SystemName', 'SystemLongName', 'ColorBase_Long']
+    conn.execute(f"CREATE TABLE Elevations (Name TEXT, {', '.join(columns)})")
+    conn.execute("INSERT INTO Elevations (Name, SystemCode) VALUES ('E1', 'SYS001')")
+    conn.execute("CREATE TABLE Glass (GlassID TEXT, Name TEXT)")
+    conn.execute("INSERT INTO Glass VALUES ('GLASS001', 'Clear Glass 6mm')")
+    conn.commit()
+    data = conn.serialize()
+    conn.close()
+    return data
+
+
+def test_in_memory_database_is_parsed_and_archived():
+    """A database decoded into memory is queried without a file and archived byte for byte"""
+    print("🧪 Testing in-memory parts database...")
+
+    from services.parts_list_stream import archive_parts_list, stream_parts_list_to_memory
+    from services.sqlite_validation_service import SQLiteValidationService
+
+    payload = _parts_database()
+    body = json.dumps({'name': 'E1', 'data': base64.b64encode(payload).decode('ascii')}).encode('utf-8')
+    validation = SQLiteValidationService()
+
+    async def scenario():
+        blob = await stream_parts_list_to_memory(_chunks(body, 5))
+        conn = await validation.open_sqlite_in_memory(blob.data)
+        try:
+            result = await validation.validate_bytes(blob.data, conn=conn)
+            system_code = conn.execute("SELECT SystemCode FROM Elevations").fetchone()[0]
+            try:
+                conn.execute("DELETE FROM Glass")
+                writable = True
+            except sqlite3.OperationalError:
+                writable = False
+        finally:
+            conn.close()
+        try:
+            await stream_parts_list_to_memory(_chunks(body, 5), max_bytes=len(payload) - 1)
+            bounded = False
+        except ValueError:
+            bounded = True
+        return blob, result, system_code, writable, bounded
+
+    blob, result, system_code, writable, bounded = asyncio.run(scenario())
+    assert blob.data == payload and blob.sha256 == hashlib.sha256(payload).hexdigest()
+    assert result.valid, result.message
+    assert system_code == 'SYS001' and not writable and bounded
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'parts.db')
+        archived = archive_parts_list(blob, path)
+        with open(path, 'rb') as f:
+            assert f.read() == payload
+        assert archived.sha256 == blob.sha256 and not os.path.exists(path + '.part')
+    print("✅ In-memory parts database works")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Parts-List Stream Tests")
+    print("=" * 50)
+
+    tests = [
+        test_streamed_file_matches_payload,
+        test_missing_or_empty_data_returns_none,
+        test_in_memory_database_is_parsed_and_archived
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,292 @@
+"""
+Test script for the inline parts-list parse stage
+Extracts parts databases in a real parse process and stores them in SQLite in-memory models
+"""
+
+import sys
+import os
+import asyncio
+import sqlite3
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _parts_database(with_glass_table: bool = True) -> bytes:
+    """A minimal parts database with the tables the validator requires"""
+    conn = sqlite3.connect(':memory:')
+    columns = ['AutoDescription', 'AutoDescriptionShort', 'Width_Output', 'Width_Unit', 'Height_Output',
+               'Height_Unit', 'Weight_Output', 'Weight_Unit', 'Area_Output', 'Area_Unit', 'SystemCode',
+               'SystemName', 'SystemLongName', 'ColorBase_Long']
+    conn.execute(f"CREATE TABLE Elevations (Name TEXT, {', '.join(columns)})")
+    conn.execute("INSERT INTO Elevations (Name, SystemCode, Width_Output) VALUES ('Other', 'SYS000', 100)")
+    conn.execute("INSERT INTO Elevations (Name, SystemCode, Width_Output) VALUES ('E1', 'SYS001', 1200.5)")
+    if with_glass_table:
+        conn.execute("CREATE TABLE Glass (GlassID TEXT, Name TEXT)")
+        conn.execute("INSERT INTO Glass VALUES ('GLASS001', 'Clear Glass 6mm')")
+        conn.execute("INSERT INTO Glass VALUES ('GLASS002', 'Tempered Glass 8mm')")
+    conn.commit()
+    data = conn.serialize()
+    conn.close()
+    return data
+
+
+def _session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from core.database import Base
+    from models.elevation import Elevation
+    from models.elevation_glass import ElevationGlass
+    from models.elevation_part import ElevationPart
+    from models.parsing_error_log import ParsingErrorLog
+
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine, tables=[Elevation.__table__, ElevationGlass.__table__,
+                                             ElevationPart.__table__, ParsingErrorLog.__table__])
+    return sessionmaker(bind=engine)()
+
+
+def test_parse_processes_extract_databases():
+    """Databases are counted, validated and extracted in a parse process; bad ones are reported"""
+    print("🧪 Testing parse stage extraction...")
+
+    from services.parts_parse_stage import PartsParseStage
+
+    stage = PartsParseStage(processes=1, max_pending=2)
+
+    async def scenario():
+        return await asyncio.gather(
+            stage.extract(_parts_database(), 'E1'),
+            stage.extract(_parts_database(with_glass_table=False), 'E1'),
+            stage.extract(b'not a database' * 100, 'E1')
+        )
+
+    try:
+        parsed, invalid, unreadable = asyncio.run(scenario())
+    finally:
+        stage.shutdown()
+    assert parsed['valid'] and parsed['parts_count'] == 4, parsed
+    assert parsed['elevation_data']['system_code'] == 'SYS001' and len(parsed['glass_data']) == 2
+    assert not invalid['valid'] and invalid['error_type'] == 'validation_failed' and invalid['parts_count'] == 2
+    assert not unreadable['valid'] and unreadable['error_type'] == 'parsing_failed', unreadable
+    stats = stage.get_stats()
+    assert stats['parsed'] == 1 and stats['invalid'] == 2 and stats['waited'] == 1, stats
+    print("✅ Parse stage extraction works")
+    return True
+
+
+def test_daemonic_worker_does_not_fall_back_to_threads():
+    """A process that may not start parse processes reports the stage unavailable instead of parsing in threads"""
+    print("🧪 Testing parse stage in a daemonic process...")
+
+    from concurrent.futures import ThreadPoolExecutor
+    from services.parts_parse_stage import ParseStageUnavailable, PartsParseStage
+
+    class DaemonicExecutor(ThreadPoolExecutor):
+        def submit(self, *args, **kwargs):
+            raise AssertionError('daemonic processes are not allowed to have children')
+
+    stage = PartsParseStage(processes=1)
+    stage._executor = DaemonicExecutor()
+
+    try:
+        asyncio.run(stage.extract(_parts_database(), 'E1'))
+        raise AssertionError('the extraction must not run')
+    except ParseStageUnavailable as e:
+        assert 'daemonic' in str(e)
+    assert stage.processes == 1 and stage._executor is None
+    assert stage.get_stats()['unavailable'] == 1 and stage.get_stats()['parsed'] == 0
+    print("✅ Parse stage in a daemonic process works")
+    return True
+
+
+def test_extraction_is_stored_with_the_parts_fields():
+    """The parsed data is committed in the same transaction as the parts-list fields"""
+    print("🧪 Testing storing an extraction...")
+
+    from models.elevation import Elevation
+    from models.elevation_glass import ElevationGlass
+    from services.parts_parse_stage import PartsParseStage
+    from services.sqlite_parser_service import SQLiteElevationParserService
+
+    db = _session()
+    valid, invalid = Elevation(name='E1', logikal_id='e-1'), Elevation(name='E2', logikal_id='e-2')
+    db.add_all([valid, invalid])
+    db.commit()
+
+    stage = PartsParseStage(processes=0)
+    parser = SQLiteElevationParserService(db)
+
+    async def scenario():
+        results = []
+        for elevation, data in ((valid, _parts_database()), (invalid, _parts_database(with_glass_table=False))):
+            extraction = await stage.extract(data, elevation.name)
+            elevation.parts_count = extraction['parts_count']
+            elevation.has_parts_data = True
+            results.append(await parser.apply_extraction(elevation, extraction, 'sha-' + elevation.logikal_id))
+        return results
+
+    stored, rejected = asyncio.run(scenario())
+    assert stored['success'] and stored['glass_count'] == 2
+    assert not rejected['success'] and 'Glass' in rejected['error']
+    db.expire_all()
+    assert valid.parse_status == 'success' and valid.parts_file_hash == 'sha-e-1' and valid.parts_count == 4
+    assert valid.system_code == 'SYS001' and valid.width_out == 1200.5
+    assert db.query(ElevationGlass).filter(ElevationGlass.elevation_id == valid.id).count() == 2
+    assert invalid.parse_status == 'validation_failed' and invalid.has_parts_data and invalid.parts_count == 2
+    print("✅ Storing an extraction works")
+    return True
+
+
+def test_glass_records_are_diff_upserted():
+    """Only changed glass rows are written; an unchanged parts file writes nothing"""
+    print("🧪 Testing glass record diff-upsert...")
+
+    from models.elevation import Elevation
+    from models.elevation_glass import ElevationGlass
+    from services.parts_parse_stage import PartsParseStage
+    from services.sqlite_parser_service import SQLiteElevationParserService, sync_glass_records
+
+    db = _session()
+    elevation = Elevation(name='E1', logikal_id='e-1')
+    db.add(elevation)
+    db.commit()
+    db.add_all([ElevationGlass(elevation_id=elevation.id, glass_id=glass_id, name=name) for glass_id, name in (
+        ('GLASS001', 'Clear Glass 6mm'), ('GLASS002', 'Old name'), ('GLASS003', 'Removed glass'),
+        ('GLASS003', 'Removed glass')
+    )])
+    db.commit()
+    ids = {glass.glass_id: glass.id for glass in db.query(ElevationGlass).order_by(ElevationGlass.id)}
+
+    changes = sync_glass_records(db, {elevation.id: [
+        {'GlassID': 'GLASS001', 'Name': 'Clear Glass 6mm'}, {'GlassID': 'GLASS002', 'Name': 'Tempered Glass 8mm'},
+        {'GlassID': 'GLASS004', 'Name': 'Added glass'}
+    ]})
+    db.commit()
+    assert changes == {'inserted': 1, 'updated': 1, 'deleted': 2, 'unchanged': 1}, changes
+    glass = {g.glass_id: g for g in db.query(ElevationGlass).filter(ElevationGlass.elevation_id == elevation.id)}
+    assert sorted(glass) == ['GLASS001', 'GLASS002', 'GLASS004']
+    assert glass['GLASS001'].id == ids['GLASS001'] and glass['GLASS002'].id == ids['GLASS002']
+    assert glass['GLASS002'].name == 'Tempered Glass 8mm'
+
+    # Applying a parts file with the hash of the last successful parse keeps the stored rows
+    stage = PartsParseStage(processes=0)
+    parser = SQLiteElevationParserService(db)
+
+    async def apply(file_hash):
+        extraction = await stage.extract(_parts_database(), elevation.name)
+        return await parser.apply_extraction(elevation, extraction, file_hash)
+
+    assert asyncio.run(apply('sha-1'))['success']
+    db.query(ElevationGlass).filter(ElevationGlass.glass_id == 'GLASS001').update({'name': 'Edited'})
+    db.commit()
+    assert asyncio.run(apply('sha-1'))['success']
+    assert db.query(ElevationGlass).filter(ElevationGlass.glass_id == 'GLASS001').one().name == 'Edited'
+    assert asyncio.run(apply('sha-2'))['success']
+    assert db.query(ElevationGlass).filter(ElevationGlass.glass_id == 'GLASS001').one().name == 'Clear Glass 6mm'
+    assert db.query(ElevationGlass).count() == 2
+    print("✅ Glass record diff-upsert works")
+    return True
+
+
+def test_archive_path_is_recorded_once_written():
+    """parts_db_path never points at an archive that is not on disk yet"""
+    print("🧪 Testing archive path recording...")
+
+    import hashlib
+    import tempfile
+    import threading
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from core.database import Base
+    from models.elevation import Elevation
+    from models.elevation_glass import ElevationGlass
+    from models.elevation_part import ElevationPart
+    from models.parsing_error_log import ParsingErrorLog
+    import services.parts_list_sync_service as sync_module
+    import services.parts_parse_stage as stage_module
+    from services.parts_list_stream import PartsListBlob
+    from services.parts_parse_stage import PartsParseStage
+
+    # The archive records its path from an executor thread
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[Elevation.__table__, ElevationGlass.__table__,
+                                             ElevationPart.__table__, ParsingErrorLog.__table__])
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    db = session_factory()
+    elevation = Elevation(name='E1', logikal_id='e-1')
+    db.add(elevation)
+    db.commit()
+
+    data = _parts_database()
+    blob = PartsListBlob(data=data, size_bytes=len(data), sha256=hashlib.sha256(data).hexdigest())
+    archive_released = threading.Event()
+    write_archive = sync_module.PartsListSyncService._write_archive
+
+    def slow_write_archive(blob, file_path):
+        archive_released.wait(timeout=5)
+        return write_archive(blob, file_path)
+
+    async def scenario(service):
+        async def fake_download(base_url, token, logikal_id):
+            return blob
+
+        service._download_parts_list_bytes = fake_download
+        success, _ = await service._sync_parts_in_memory(elevation, 'https://logikal.test/api/', 'token')
+        with session_factory() as check:
+            committed = check.query(Elevation.parts_db_path).filter(Elevation.id == elevation.id).scalar()
+        archive_released.set()
+        await asyncio.gather(*list(sync_module._archive_tasks))
+        return success, committed
+
+    originals = (sync_module.SessionLocal, sync_module.PARTS_DB_DIR, stage_module._stage)
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_module.SessionLocal, sync_module.PARTS_DB_DIR = session_factory, tmp
+        stage_module._stage = PartsParseStage(processes=0)
+        sync_module.PartsListSyncService._write_archive = staticmethod(slow_write_archive)
+        try:
+            success, committed = asyncio.run(scenario(sync_module.PartsListSyncService(db)))
+        finally:
+            sync_module.SessionLocal, sync_module.PARTS_DB_DIR, stage_module._stage = originals
+            sync_module.PartsListSyncService._write_archive = staticmethod(write_archive)
+        archive_path = os.path.join(tmp, 'e-1.db')
+        db.expire_all()
+        assert success
+        assert committed is None, "the path was committed before the archive was written"
+        assert elevation.parts_db_path == archive_path and os.path.exists(archive_path)
+        assert elevation.parse_status == 'success' and elevation.parts_count == 4
+    print("✅ Archive path recording works")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Parts Parse Stage Tests")
+    print("=" * 50)
+
+    tests = [
+        test_parse_processes_extract_databases,
+        test_daemonic_worker_does_not_fall_back_to_threads,
+        test_extraction_is_stored_with_the_parts_fields,
+        test_glass_records_are_diff_upserted,
+        test_archive_path_is_recorded_once_written
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
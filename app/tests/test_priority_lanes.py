@@ -0,0 +1,206 @@
+"""
+Test script for sync priority lanes
+Uses the in-process rate limiter and activity backends - no Redis server required
+"""
+
+import sys
+import os
+import time
+import asyncio
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _local_activity():
+    """Install an in-process activity registry for the running loop"""
+    from core import priority
+
+    activity = priority.InteractiveActivity(redis_url=None, check_interval_seconds=0.01)
+    priority._activities[asyncio.get_running_loop()] = activity
+    return activity
+
+
+def test_interactive_calls_get_the_whole_idle_budget():
+    """With no background traffic an interactive sync is not held to a share of the budget"""
+    print("🧪 Testing interactive use of the idle budget...")
+
+    from core.priority import INTERACTIVE, PriorityRateLimiter, current_priority, priority_scope
+
+    limiter = PriorityRateLimiter('listing', 10.0, 10.0)
+
+    async def scenario():
+        with priority_scope(INTERACTIVE):
+            return [await limiter.acquire() for _ in range(10)]
+
+    assert current_priority() == 'scheduled'
+    waits = asyncio.run(scenario())
+    assert waits == [0.0] * 10, waits
+    assert limiter.get_stats()['lanes'][INTERACTIVE]['acquired'] == 10
+    print("✅ Interactive use of the idle budget works")
+    return True
+
+
+def test_background_calls_leave_a_reserve_for_interactive_calls():
+    """Background lanes use idle capacity but interactive calls go first when they compete"""
+    print("🧪 Testing priority precedence within one budget...")
+
+    from core.priority import INTERACTIVE, MAINTENANCE, PriorityRateLimiter, priority_scope
+
+    limiter = PriorityRateLimiter('listing', 20.0, 4.0, reserves={'interactive': 0.0, 'scheduled': 0.25,
+                                                                  'maintenance': 0.5})
+    order = []
+
+    async def caller(priority, name):
+        with priority_scope(priority):
+            await limiter.acquire()
+            order.append(name)
+
+    async def scenario():
+        # Background calls take tokens only while the reserve of 2 stays in the bucket
+        with priority_scope(MAINTENANCE):
+            assert [await limiter.acquire() for _ in range(2)] == [0.0, 0.0]
+        await asyncio.gather(caller(MAINTENANCE, 'maintenance'), caller(INTERACTIVE, 'interactive:1'),
+                             caller(INTERACTIVE, 'interactive:2'))
+
+    asyncio.run(scenario())
+    assert order == ['interactive:1', 'interactive:2', 'maintenance'], order
+    stats = limiter.get_stats()
+    assert stats['reserves'][MAINTENANCE] == 2.0 and stats['lanes'][MAINTENANCE]['acquired'] == 3, stats
+    print("✅ Priority precedence within one budget works")
+    return True
+
+
+def test_processes_share_one_redis_bucket_per_endpoint_class():
+    """Limiters of different processes draw from the same Redis bucket and keep the background reserve"""
+    print("🧪 Testing shared Redis bucket...")
+
+    import fakeredis
+    from core import rate_limiter
+    from core.priority import INTERACTIVE, MAINTENANCE, PriorityRateLimiter, priority_scope
+
+    redis_url = 'redis://fake:6379/0'
+    reserves = {'interactive': 0.0, 'scheduled': 0.25, 'maintenance': 0.5}
+
+    async def scenario():
+        rate_limiter._redis_clients[asyncio.get_running_loop()] = {redis_url: fakeredis.FakeAsyncRedis()}
+        web, worker = (PriorityRateLimiter('listing', 1.0, 4.0, redis_url, reserves=reserves) for _ in range(2))
+        with priority_scope(MAINTENANCE):
+            background = [await web.bucket._take(1.0, web.reserves[MAINTENANCE]) for _ in range(3)]
+        with priority_scope(INTERACTIVE):
+            interactive = [await worker.bucket._take(1.0) for _ in range(3)]
+        return background, interactive, web.bucket.backend
+
+    background, interactive, backend = asyncio.run(scenario())
+    # 4 tokens: maintenance takes 2 and leaves the reserve of 2, which only interactive calls may use
+    assert [allowed for allowed, _, _ in background] == [True, True, False], background
+    assert [allowed for allowed, _, _ in interactive] == [True, True, False], interactive
+    assert backend == 'redis'
+    print("✅ Shared Redis bucket works")
+    return True
+
+
+def test_background_sync_yields_while_interactive_work_runs():
+    """A maintenance sync pauses at its next boundary until the interactive sync is done"""
+    print("🧪 Testing yield to interactive work...")
+
+    from core.priority import MAINTENANCE, interactive_work, priority_scope, yield_to_interactive
+
+    events = []
+
+    async def background():
+        with priority_scope(MAINTENANCE):
+            for phase in range(3):
+                await yield_to_interactive()
+                events.append(f'background:{phase}')
+                await asyncio.sleep(0.02)
+
+    async def interactive():
+        await asyncio.sleep(0.01)
+        async with interactive_work():
+            # Interactive work never yields, not even to itself
+            assert await yield_to_interactive() == 0.0
+            events.append('interactive:start')
+            await asyncio.sleep(0.1)
+            events.append('interactive:done')
+
+    async def scenario():
+        activity = _local_activity()
+        await asyncio.gather(background(), interactive())
+        return activity.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert events[:3] == ['background:0', 'interactive:start', 'interactive:done'], events
+    assert stats['yields'] == 1 and stats['interactive_jobs'] == 1, stats
+    print("✅ Yield to interactive work works")
+    return True
+
+
+def test_interactive_waiter_promotes_background_holder():
+    """An interactive sync that attaches to a maintenance sync promotes it instead of stalling it"""
+    print("🧪 Testing promotion of attached background syncs...")
+
+    from core.priority import INTERACTIVE, MAINTENANCE, current_priority, interactive_work, priority_scope, \
+        yield_to_interactive
+    from services.sync_dedup import SyncDeduplicator, project_scope
+
+    priorities = []
+
+    async def background_sync():
+        for _ in range(3):
+            await yield_to_interactive()
+            priorities.append(current_priority())
+            await asyncio.sleep(0.02)
+        return {'success': True, 'message': 'Synced'}
+
+    async def scenario():
+        _local_activity()
+        deduplicator = SyncDeduplicator(redis_url=None)
+        scope = [project_scope('p-1')]
+        with priority_scope(MAINTENANCE):
+            holder = asyncio.create_task(deduplicator.run(scope, background_sync))
+        await asyncio.sleep(0.01)
+        async with interactive_work():
+            attached = await deduplicator.run(scope, background_sync)
+        await holder
+        return attached, deduplicator.get_stats()
+
+    started_at = time.monotonic()
+    attached, stats = asyncio.run(scenario())
+    assert time.monotonic() - started_at < 1.0, "the holder must not wait out the yield limit"
+    assert attached['deduplicated'] and stats['promoted'] == 1, stats
+    assert priorities == [MAINTENANCE, INTERACTIVE, INTERACTIVE], priorities
+    print("✅ Promotion of attached background syncs works")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Priority Lane Tests")
+    print("=" * 50)
+
+    tests = [
+        test_interactive_calls_get_the_whole_idle_budget,
+        test_background_calls_leave_a_reserve_for_interactive_calls,
+        test_processes_share_one_redis_bucket_per_endpoint_class,
+        test_background_sync_yields_while_interactive_work_runs,
+        test_interactive_waiter_promotes_background_holder
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
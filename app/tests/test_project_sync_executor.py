@@ -0,0 +1,106 @@
+"""
+Test script for the parallel project sync executor
+Replaces the per-phase elevation sync with a local coroutine - no database or Logikal API
+"""
+
+import sys
+import os
+import asyncio
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_phases_run_in_parallel_and_results_are_aggregated():
+    """Phases overlap up to the parallel limit and their counters and errors are summed"""
+    print("🧪 Testing parallel phase sync...")
+
+    from services.project_sync_executor import ProjectSyncExecutor
+
+    running = 0
+    peak = 0
+
+    async def fake_sync_phase(phase_id):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        if phase_id == 3:
+            return {'success': False, 'message': 'Elevation sync failed for phase 3'}
+        if phase_id == 4:
+            raise RuntimeError("session lost")
+        return {'success': True, 'count': 5, 'thumbnails_synced': 4, 'parts_lists_synced': 5,
+                'parts_lists_failed': 0, 'errors': []}
+
+    executor = ProjectSyncExecutor('https://logikal.test/api/v3', 'user', 'secret', max_parallel_phases=2)
+    executor.max_parallel_phases = 2
+    executor._sync_phase = fake_sync_phase
+    summary = asyncio.run(executor.run([1, 2, 3, 4, 5]))
+
+    assert peak == 2, peak
+    assert summary['elevations_synced'] == 15, summary
+    assert summary['thumbnails_synced'] == 12
+    assert summary['phases_failed'] == 2
+    assert len(summary['errors']) == 2
+    print("✅ Parallel phase sync works")
+    return True
+
+
+def test_parallel_phases_follow_the_learned_limit():
+    """Phases take limiter slots, so the fan-out widens as healthy samples raise the limit"""
+    print("🧪 Testing adaptive phase parallelism...")
+
+    from core.adaptive_concurrency import get_concurrency_limiter
+    from services.project_sync_executor import ProjectSyncExecutor
+
+    running = 0
+    peak = 0
+
+    async def fake_sync_phase(phase_id):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        for _ in range(10):
+            await asyncio.sleep(0.001)
+            get_concurrency_limiter().record(0.1)
+        running -= 1
+        return {'success': True, 'count': 1, 'errors': []}
+
+    executor = ProjectSyncExecutor('https://logikal.test/api/v3', 'user', 'secret', max_parallel_phases=4)
+    executor._sync_phase = fake_sync_phase
+    summary = asyncio.run(executor.run(list(range(1, 17))))
+
+    assert peak == 4, peak
+    assert summary['elevations_synced'] == 16, summary
+    print("✅ Adaptive phase parallelism works")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Project Sync Executor Tests")
+    print("=" * 50)
+
+    tests = [
+        test_phases_run_in_parallel_and_results_are_aggregated,
+        test_parallel_phases_follow_the_learned_limit
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,120 @@
+"""
+Test script for the incremental smart sync plan
+Runs the staleness queries against an in-memory SQLite database - no PostgreSQL or Logikal API
+"""
+
+import sys
+import os
+import asyncio
+from datetime import datetime, timedelta
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+SYNCED = datetime(2025, 1, 2)
+
+
+def _session():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from core.database import Base
+    import models
+
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine, tables=[getattr(models, name).__table__ for name in models.__all__])
+    return sessionmaker(bind=engine, expire_on_commit=False)()
+
+
+def _project(db):
+    """Project with two phases of two elevations each, all synced after their last update"""
+    from models.elevation import Elevation
+    from models.phase import Phase
+    from models.project import Project
+
+    current = {'last_update_date': SYNCED - timedelta(days=1), 'last_sync_date': SYNCED}
+    project = Project(logikal_id='p-1', name='Tower', **current)
+    db.add(project)
+    db.commit()
+    phases = [Phase(logikal_id=f'ph-{i}', name=f'Phase {i}', project_id=project.id, **current) for i in (1, 2)]
+    db.add_all(phases)
+    db.commit()
+    for phase in phases:
+        db.add_all([Elevation(logikal_id=f'{phase.logikal_id}-e-{i}', name=f'Pos {i}', phase_id=phase.id, **current)
+                    for i in (1, 2)])
+    db.commit()
+    return project, phases
+
+
+def test_up_to_date_project_needs_no_logikal_call():
+    """A project without stale rows is answered from the database alone"""
+    print("🧪 Testing up-to-date project...")
+
+    from services.smart_sync_service import SmartSyncService
+
+    db = _session()
+    project, _ = _project(db)
+    service = SmartSyncService(db)
+
+    status = service.check_project_sync_needed('p-1')
+    assert status['sync_needed'] is False, status
+    assert status['total_phases'] == 2 and status['total_elevations'] == 4
+    assert service.build_sync_plan(project).is_empty
+
+    result = asyncio.run(service.sync_project_if_needed('p-1'))
+    assert result['success'] and result['synced'] is False, result
+    print("✅ Up-to-date project works")
+    return True
+
+
+def test_plan_covers_only_stale_contexts():
+    """Only the phase holding a stale elevation is planned; the project is not re-listed"""
+    print("🧪 Testing incremental sync plan...")
+
+    from models.elevation import Elevation
+    from services.smart_sync_service import SmartSyncService
+
+    db = _session()
+    project, phases = _project(db)
+    elevation = db.query(Elevation).filter(Elevation.phase_id == phases[1].id).first()
+    elevation.last_update_date = SYNCED + timedelta(hours=1)
+    db.commit()
+
+    service = SmartSyncService(db)
+    status = service.check_project_sync_needed('p-1')
+    assert status['sync_needed'] and status['stale_elevations_count'] == 1, status
+
+    plan = service.build_sync_plan(project)
+    assert plan.relist_phases is False
+    assert plan.phase_ids == [phases[1].id], plan
+    assert service.build_sync_plan(project, full=True).phase_ids == sorted(p.id for p in phases)
+    print("✅ Incremental sync plan works")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Smart Sync Plan Tests")
+    print("=" * 50)
+
+    tests = [
+        test_up_to_date_project_needs_no_logikal_call,
+        test_plan_covers_only_stale_contexts
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,155 @@
+"""
+Test script for sync deduplication
+Exercises the in-process lease backend - no Redis server required
+"""
+
+import sys
+import os
+import asyncio
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_duplicate_request_attaches_to_running_sync():
+    """A second request for a running scope gets the first run's result without a second run"""
+    print("🧪 Testing duplicate sync attach...")
+
+    from services.sync_dedup import SyncDeduplicator, project_scope
+
+    runs = []
+
+    async def sync():
+        runs.append('run')
+        await asyncio.sleep(0.05)
+        return {'success': True, 'message': 'Synced', 'phases_synced': 3}
+
+    async def scenario():
+        deduplicator = SyncDeduplicator(redis_url=None)
+        scope = [project_scope('p-1')]
+        first, second = await asyncio.gather(deduplicator.run(scope, sync), deduplicator.run(scope, sync))
+        third = await deduplicator.run(scope, sync)
+        return first, second, third, deduplicator.get_stats()
+
+    first, second, third, stats = asyncio.run(scenario())
+    assert len(runs) == 2, "the scope is free again once the first run finished"
+    assert 'deduplicated' not in first and second['deduplicated'] and second['phases_synced'] == 3, second
+    assert 'deduplicated' not in third
+    assert stats['attached'] == 1 and stats['backend'] == 'local', stats
+    print("✅ Duplicate sync attach works")
+    return True
+
+
+def test_directory_sync_subsumes_project_sync():
+    """A project sync joins the running sync of its directory; failures reach the attached caller"""
+    print("🧪 Testing sync subsumption...")
+
+    from services.sync_dedup import SyncDeduplicator, directory_scope, project_scope
+
+    async def directory_sync():
+        await asyncio.sleep(0.05)
+        raise RuntimeError('Logikal unavailable')
+
+    async def project_sync():
+        raise AssertionError('project sync must not run while its directory syncs')
+
+    async def scenario():
+        deduplicator = SyncDeduplicator(redis_url=None)
+        holder = asyncio.create_task(deduplicator.run([directory_scope('d-1')], directory_sync))
+        await asyncio.sleep(0)
+        attached = await deduplicator.run([project_scope('p-1')], project_sync, covering=[directory_scope('d-1')])
+        try:
+            await holder
+        except RuntimeError:
+            pass
+        return attached
+
+    attached = asyncio.run(scenario())
+    assert attached['attached_to'] == 'directory:d-1', attached
+    assert attached['success'] is False and 'Logikal unavailable' in attached['message']
+    assert attached['covering_result']['error'] == 'Logikal unavailable'
+    print("✅ Sync subsumption works")
+    return True
+
+
+def test_force_sync_by_name_joins_only_syncs_of_the_project():
+    """A force sync addressed by project name joins a sync of the same Logikal id, not broader background syncs"""
+    print("🧪 Testing force sync scopes...")
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from core import priority
+    from core.database import Base
+    from models.directory import Directory
+    from models.project import Project
+    from services import sync_dedup
+    from services.project_sync_service import ProjectSyncService
+    from services.sync_dedup import SCOPE_FULL, SyncDeduplicator, directory_scope, project_scope
+
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine, tables=[Directory.__table__, Project.__table__])
+    db = sessionmaker(bind=engine, expire_on_commit=False)()
+    directory = Directory(logikal_id='d-1', name='Customers', full_path='Customers')
+    db.add(directory)
+    db.commit()
+    db.add(Project(logikal_id='p-1', name='Tower', directory_id=directory.id))
+    db.commit()
+
+    async def running_sync():
+        await asyncio.sleep(0.05)
+        return {'success': True, 'message': 'Synced'}
+
+    async def force_sync(*args, **kwargs):
+        return {'success': True, 'message': 'Force synced'}
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        priority._activities[loop] = priority.InteractiveActivity(redis_url=None)
+        deduplicator = sync_dedup._deduplicators[loop] = SyncDeduplicator(redis_url=None)
+        service = ProjectSyncService(db)
+        service._force_sync_project_from_logikal = force_sync
+        attached = []
+        # A full sync, a sync of the project's directory and a smart sync of the project by its Logikal id
+        for scope in (SCOPE_FULL, directory_scope('d-1'), project_scope('p-1')):
+            holder = asyncio.create_task(deduplicator.run([scope], running_sync))
+            await asyncio.sleep(0)
+            attached.append(await service.force_sync_project_from_logikal('Tower', None, 'http://logikal',
+                                                                          'user', 'secret'))
+            await holder
+        return attached
+
+    attached = asyncio.run(scenario())
+    assert [result.get('attached_to') for result in attached] == [None, None, 'project:p-1'], attached
+    assert [result['message'] for result in attached] == ['Force synced', 'Force synced', 'Synced'], attached
+    print("✅ Force sync scopes work")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Sync Deduplication Tests")
+    print("=" * 50)
+
+    tests = [
+        test_duplicate_request_attaches_to_running_sync,
+        test_directory_sync_subsumes_project_sync,
+        test_force_sync_by_name_joins_only_syncs_of_the_project
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,172 @@
+"""
+Test script for the sync plan compiler and DAG executor
+Runs against an in-memory SQLite database with the Logikal listings replaced by fixed results
+"""
+
+import sys
+import os
+import asyncio
+
+# Add the app directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _session_factory():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from core.database import Base
+    import models
+
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[getattr(models, name).__table__ for name in models.__all__])
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def _tree(db):
+    """Directory with one project of two phases, one elevation each"""
+    from models.directory import Directory
+    from models.elevation import Elevation
+    from models.phase import Phase
+    from models.project import Project
+
+    directory = Directory(logikal_id='d-1', name='Customers')
+    db.add(directory)
+    db.commit()
+    project = Project(logikal_id='p-1', name='Tower', directory_id=directory.id)
+    db.add(project)
+    db.commit()
+    phases = [Phase(logikal_id=f'ph-{i}', name=f'Phase {i}', project_id=project.id) for i in (1, 2)]
+    db.add_all(phases)
+    db.commit()
+    db.add_all([Elevation(logikal_id=f'e-{phase.id}', name='Pos 1', phase_id=phase.id) for phase in phases])
+    db.commit()
+    return directory, project, phases
+
+
+def test_compile_selective_plan():
+    """Selective ids map to the listings that contain them; disabled types get no nodes"""
+    print("🧪 Testing sync plan compilation...")
+
+    from models.object_sync_config import ObjectSyncConfig
+    from services.sync_plan import ELEVATIONS, PHASES, compile_sync_plan
+
+    db = _session_factory()()
+    _, project, phases = _tree(db)
+
+    plan = compile_sync_plan(db, 'selective', [f'e-{phases[0].id}', 'e-404'], object_type='elevation')
+    assert list(plan.nodes) == [f'{ELEVATIONS}:{phases[0].id}'], plan.nodes
+    assert plan.missing == ['e-404']
+
+    plan = compile_sync_plan(db, 'project', ['p-1'])
+    assert [node.kind for node in plan.nodes.values()] == [PHASES]
+
+    db.add(ObjectSyncConfig(object_type='elevation', display_name='Elevations', is_sync_enabled=False))
+    db.commit()
+    plan = compile_sync_plan(db, 'project', ['p-1'])
+    assert plan.add(ELEVATIONS, phases[0].id) is None
+    print("✅ Sync plan compilation works")
+    return True
+
+
+def test_executor_runs_ready_nodes_in_parallel():
+    """Completed listings expand into child nodes, siblings overlap and failures block dependants"""
+    print("🧪 Testing sync plan executor...")
+
+    import services.sync_plan_executor as executor_module
+    from services.sync_plan import BLOCKED, COMPLETED, ELEVATIONS, FAILED, PHASES, compile_sync_plan
+    from services.sync_plan_executor import SyncPlanExecutor
+
+    session_factory = _session_factory()
+    db = session_factory()
+    directory, project, phases = _tree(db)
+    original_session_local, executor_module.SessionLocal = executor_module.SessionLocal, session_factory
+
+    class FixedListingExecutor(SyncPlanExecutor):
+        async def _sync_node(self, db, node):
+            await asyncio.sleep(0.01)
+            if node.kind == ELEVATIONS and node.object_id == phases[1].id:
+                return {'success': False, 'message': 'Logikal timeout'}
+            return {'success': True, 'count': 1}
+
+    plan = compile_sync_plan(db, 'directory', ['d-1'])
+    orphan = plan.add(PHASES, 999, depends_on=[f'{ELEVATIONS}:{phases[1].id}'])
+    try:
+        result = asyncio.run(FixedListingExecutor(plan, 'http://logikal', 'user', 'pass', max_parallel_nodes=4).run())
+    finally:
+        executor_module.SessionLocal = original_session_local
+
+    assert result['nodes_total'] == 5, result['nodes']
+    assert plan.nodes[f'{PHASES}:{project.id}'].status == COMPLETED
+    assert plan.nodes[f'{ELEVATIONS}:{phases[1].id}'].status == FAILED
+    assert orphan.status == BLOCKED
+    assert result['peak_parallel_nodes'] == 2, result
+    assert result['success'] is False and result['elevations_processed'] == 1
+    assert all(node['duration_seconds'] is not None for node in result['nodes'] if node['status'] != BLOCKED)
+    print("✅ Sync plan executor works")
+    return True
+
+
+def test_executor_follows_the_learned_limit():
+    """Nodes take limiter slots, so more of them overlap as healthy samples raise the limit"""
+    print("🧪 Testing adaptive sync plan parallelism...")
+
+    import services.sync_plan_executor as executor_module
+    from core.adaptive_concurrency import get_concurrency_limiter
+    from services.sync_plan import ELEVATIONS, compile_sync_plan
+    from services.sync_plan_executor import SyncPlanExecutor
+
+    session_factory = _session_factory()
+    db = session_factory()
+    _tree(db)
+    original_session_local, executor_module.SessionLocal = executor_module.SessionLocal, session_factory
+
+    class SampledListingExecutor(SyncPlanExecutor):
+        async def _sync_node(self, db, node):
+            for _ in range(10):
+                await asyncio.sleep(0.001)
+                get_concurrency_limiter().record(0.1)
+            return {'success': True, 'count': 1}
+
+    plan = compile_sync_plan(db, 'project', ['p-1'])
+    for phase_id in range(100, 124):
+        plan.add(ELEVATIONS, phase_id)
+    try:
+        result = asyncio.run(SampledListingExecutor(plan, 'http://logikal', 'user', 'pass', max_parallel_nodes=8).run())
+    finally:
+        executor_module.SessionLocal = original_session_local
+
+    assert result['success'] is True, result
+    assert result['peak_parallel_nodes'] > 2, result['peak_parallel_nodes']
+    print("✅ Adaptive sync plan parallelism works")
+    return True
+
+
+def main():
+    """Run all tests"""
+    print("🚀 Starting Sync Plan Tests")
+    print("=" * 50)
+
+    tests = [
+        test_compile_selective_plan,
+        test_executor_runs_ready_nodes_in_parallel,
+        test_executor_follows_the_learned_limit
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+        print()
+
+    print("=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)